@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import shapely
+from sklearn.metrics import adjusted_rand_score
+
+from src.cone_clustering import create_clusterer
+from src.danger_detector import DangerDetector
+
+
+def load_cone_positions(labels_dir: Path) -> dict[str, np.ndarray]:
+    """
+    Loads cone centres in pixels from recorded YOLO label files.
+
+    Args:
+        labels_dir (Path): Directory of YOLO label files, next to an
+            `images` directory holding the frames they describe.
+
+    Returns:
+        dict[str, np.ndarray]: The (N, 2) cone centres of each frame with
+            at least three cones, by frame name.
+    """
+    frames = {}
+    for label_file in sorted(labels_dir.glob('*.txt')):
+        rows = np.array(
+            [line.split() for line in label_file.read_text().splitlines()],
+            dtype=float,
+        ).reshape(-1, 5)
+        cones = rows[rows[:, 0] == 6, 1:3]
+        if len(cones) < 3:
+            continue
+        images = list(
+            (labels_dir.parent / 'images').glob(f"{label_file.stem}.*"),
+        )
+        height, width = cv2.imread(str(images[0])).shape[:2]
+        frames[label_file.stem] = cones * [width, height]
+    return frames
+
+
+def zone_iou(polygons1: list, polygons2: list) -> float:
+    """
+    Calculates the intersection over union of two sets of zones.
+
+    Args:
+        polygons1 (list): Zones of the first backend.
+        polygons2 (list): Zones of the second backend.
+
+    Returns:
+        float: The overlap of the areas covered, 1.0 when neither backend
+            found a zone.
+    """
+    area1 = shapely.union_all(polygons1)
+    area2 = shapely.union_all(polygons2)
+    union = area1.union(area2).area
+    if union == 0:
+        return 1.0
+    return area1.intersection(area2).area / union
+
+
+def time_backend(
+    detector: DangerDetector,
+    positions: np.ndarray,
+    repeats: int,
+) -> float:
+    """
+    Times zone detection for one frame.
+
+    Args:
+        detector (DangerDetector): Detector using the backend.
+        positions (np.ndarray): The cone centres.
+        repeats (int): Number of timed runs.
+
+    Returns:
+        float: Milliseconds per run.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        detector.polygons_from_cone_positions(positions)
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main() -> None:
+    """
+    Compares the speed and the zones of the cone clustering backends on
+    recorded detections.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark cone clustering backends.',
+    )
+    parser.add_argument(
+        '--labels',
+        type=Path,
+        default=Path('tests/dataset/train/labels'),
+        help='Directory of recorded YOLO label files',
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=50,
+        help='Number of timed runs per frame and backend',
+    )
+    args = parser.parse_args()
+
+    frames = load_cone_positions(args.labels)
+    detectors = {
+        backend: DangerDetector(clustering=backend)
+        for backend in ('hdbscan', 'radius')
+    }
+
+    print(
+        f"{'frame':>12} {'cones':>5} {'zones':>9} {'ARI':>5} "
+        f"{'zone IoU':>8} {'hdbscan ms':>10} {'radius ms':>9}",
+    )
+    totals = np.zeros(2)
+    agreements = []
+    for name, positions in frames.items():
+        labels = {
+            backend: create_clusterer(backend).fit_predict(positions)
+            for backend in detectors
+        }
+        polygons = {
+            backend: detector.polygons_from_cone_positions(positions)
+            for backend, detector in detectors.items()
+        }
+        timings = np.array([
+            time_backend(detector, positions, args.repeats)
+            for detector in detectors.values()
+        ])
+        totals += timings
+        ari = adjusted_rand_score(labels['hdbscan'], labels['radius'])
+        iou = zone_iou(polygons['hdbscan'], polygons['radius'])
+        agreements.append((ari, iou))
+        zones = f"{len(polygons['hdbscan'])}/{len(polygons['radius'])}"
+        print(
+            f"{name[:12]:>12} {len(positions):>5} {zones:>9} {ari:>5.2f} "
+            f"{iou:>8.2f} {timings[0]:>10.3f} {timings[1]:>9.3f}",
+        )
+
+    if agreements:
+        mean_ari, mean_iou = np.mean(agreements, axis=0)
+        print(
+            f"Mean ARI {mean_ari:.2f}, mean zone IoU {mean_iou:.2f}, "
+            f"speed-up {totals[0] / totals[1]:.1f}x",
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+
+from src.danger_detector import DangerDetector
+
+
+def generate_frame(
+    rng: np.random.Generator,
+    count: int,
+) -> list[list[float]]:
+    """
+    Generates a crowded frame of random detections.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of detections in the frame.
+
+    Returns:
+        list[list[float]]: The detection data.
+    """
+    x1 = rng.integers(0, 1800, count)
+    y1 = rng.integers(0, 1000, count)
+    w = rng.integers(5, 300, count)
+    h = rng.integers(5, 300, count)
+    labels = rng.choice([0, 2, 4, 5, 5, 5, 6, 7, 8, 9], count)
+    return [
+        [
+            float(x1[i]), float(y1[i]), float(x1[i] + w[i]),
+            float(y1[i] + h[i]), 0.9, float(labels[i]),
+        ]
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """
+    Times `detect_danger` for the Python and NumPy engines.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the DangerDetector rule engines.',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[10, 50, 200, 500],
+        help='Numbers of detections per frame',
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=20,
+        help='Number of timed runs per engine and size',
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    detectors = {
+        'python': DangerDetector(engine='python'),
+        'numpy': DangerDetector(engine='numpy'),
+    }
+
+    print(
+        f"{'detections':>10} {'python ms':>10} "
+        f"{'numpy ms':>10} {'speedup':>8}",
+    )
+    for size in args.sizes:
+        datas = generate_frame(rng, size)
+        array = DangerDetector.to_array(datas)
+        inputs = {'python': array.tolist(), 'numpy': array}
+        timings = {
+            name: min(
+                timeit.repeat(
+                    lambda: detector.detect_danger(inputs[name]),
+                    number=1,
+                    repeat=args.repeat,
+                ),
+            ) * 1000
+            for name, detector in detectors.items()
+        }
+        print(
+            f"{size:>10} {timings['python']:>10.2f} "
+            f"{timings['numpy']:>10.2f} "
+            f"{timings['python'] / timings['numpy']:>7.1f}x",
+        )
+
+
+if __name__ == '__main__':
+    main()
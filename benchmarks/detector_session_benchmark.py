@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from aiohttp import web
+
+from src.live_stream_detection import LiveStreamDetector
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 3, 5, 10, 20, 50)
+
+
+async def start_stub_server(delay: float) -> web.AppRunner:
+    """
+    Starts a stub detection server on a free local port.
+
+    Args:
+        delay (float): Seconds each detection takes on the server.
+
+    Returns:
+        web.AppRunner: The running server.
+    """
+    async def token(request: web.Request) -> web.Response:
+        return web.json_response({'access_token': 'token'})
+
+    async def detect(request: web.Request) -> web.Response:
+        await request.post()
+        await asyncio.sleep(delay)
+        return web.json_response([[10, 10, 50, 50, 0.9, 0]])
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post('/token', token)
+    app.router.add_post('/detect', detect)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+async def time_detections(
+    api_url: str,
+    frame: np.ndarray,
+    frames: int,
+    persistent: bool,
+) -> np.ndarray:
+    """
+    Times server detections of one detector.
+
+    Args:
+        api_url (str): URL of the stub server.
+        frame (np.ndarray): The frame to detect.
+        frames (int): Number of timed detections.
+        persistent (bool): Whether to keep the session between frames,
+            rather than opening one per request as the detector used to.
+
+    Returns:
+        np.ndarray: Latency of each detection in milliseconds.
+    """
+    latencies = []
+    async with LiveStreamDetector(
+        api_url=api_url, detect_with_server=True,
+    ) as detector:
+        # Authenticate before timing, as the token outlives the benchmark
+        await detector.ensure_authenticated()
+        for _ in range(frames):
+            if not persistent:
+                await detector.close()
+            start = time.perf_counter()
+            await detector.generate_detections_cloud(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def print_histogram(name: str, latencies: np.ndarray) -> None:
+    """
+    Prints the percentiles and a histogram of latencies.
+
+    Args:
+        name (str): The session mode.
+        latencies (np.ndarray): Latencies in milliseconds.
+    """
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{name}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms")
+    counts = np.histogram(latencies, bins=(0, *BUCKETS_MS, np.inf))[0]
+    labels = [f"<{bound} ms" for bound in BUCKETS_MS] + [
+        f">={BUCKETS_MS[-1]} ms",
+    ]
+    for label, count in zip(labels, counts):
+        bar = '#' * round(50 * count / len(latencies))
+        print(f"  {label:>8} {count:>6} {bar}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Compares a session per request with a persistent session.
+
+    Args:
+        args (argparse.Namespace): The benchmark options.
+    """
+    runner = await start_stub_server(args.server_delay_ms / 1000)
+    host, port = runner.addresses[0][:2]
+    api_url = f"http://{host}:{port}"
+    frame = np.random.default_rng(0).integers(
+        0, 255, (args.height, args.width, 3), dtype=np.uint8,
+    )
+    try:
+        for name, persistent in (
+            ('session per request', False),
+            ('persistent session', True),
+        ):
+            latencies = await time_detections(
+                api_url, frame, args.frames, persistent,
+            )
+            print_histogram(name, latencies)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """
+    Measures server detection latency with and without connection reuse
+    against a local stub server.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the detection server session.',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=500,
+        help='Number of timed detections per mode',
+    )
+    parser.add_argument(
+        '--width',
+        type=int,
+        default=64,
+        help='Frame width; small frames isolate the connection overhead',
+    )
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=64,
+        help='Frame height',
+    )
+    parser.add_argument(
+        '--server_delay_ms',
+        type=float,
+        default=0,
+        help='Simulated detection time on the server',
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import cv2
+import numpy as np
+from shapely.geometry import MultiPoint
+
+from src.drawing_manager import DrawingManager
+from src.drawing_manager import RENDER_BACKENDS
+
+
+def make_scene(
+    width: int,
+    height: int,
+    boxes: int,
+    polygons: int,
+) -> tuple[list[list[float]], list]:
+    """
+    Builds random detections and safety cone polygons.
+
+    Args:
+        width (int): Frame width.
+        height (int): Frame height.
+        boxes (int): Number of detections.
+        polygons (int): Number of cone polygons.
+
+    Returns:
+        tuple[list[list[float]], list]: The detections and polygons.
+    """
+    rng = np.random.default_rng(0)
+    datas = []
+    for _ in range(boxes):
+        x1, y1 = rng.uniform(0, (width - 200, height - 200))
+        w, h = rng.uniform(40, 200, 2)
+        datas.append(
+            [x1, y1, x1 + w, y1 + h, 0.9, int(rng.integers(0, 10))],
+        )
+    hulls = []
+    for _ in range(polygons):
+        centre = rng.uniform(200, (width - 200, height - 200))
+        points = centre + rng.normal(0, 80, (5, 2))
+        hulls.append(MultiPoint(points.tolist()).convex_hull)
+    return datas, hulls
+
+
+def main() -> None:
+    """
+    Times drawing detections on a frame with each rendering backend.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the rendering backends of DrawingManager.',
+    )
+    parser.add_argument(
+        '--width',
+        type=int,
+        default=1920,
+        help='Frame width',
+    )
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=1080,
+        help='Frame height',
+    )
+    parser.add_argument(
+        '--boxes',
+        type=int,
+        default=30,
+        help='Number of detections per frame',
+    )
+    parser.add_argument(
+        '--polygons',
+        type=int,
+        default=2,
+        help='Number of safety cone polygons per frame',
+    )
+    parser.add_argument(
+        '--languages',
+        type=str,
+        nargs='+',
+        default=['en', 'zh-TW', 'th'],
+        help='Label languages to draw',
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=20,
+        help='Number of timed frames per backend and language',
+    )
+    args = parser.parse_args()
+
+    frame = cv2.resize(
+        cv2.imread('assets/images/data_aug/origin_image.jpg'),
+        (args.width, args.height),
+    )
+    datas, polygons = make_scene(
+        args.width, args.height, args.boxes, args.polygons,
+    )
+    print(
+        f"{args.width}x{args.height}, {args.boxes} boxes, "
+        f"{args.polygons} polygons",
+    )
+    for language in args.languages:
+        for backend in RENDER_BACKENDS:
+            drawer = DrawingManager(backend=backend)
+            # Loads fonts and rasterises labels before timing
+            drawer.draw_detections_on_frame(frame, polygons, datas, language)
+            times = timeit.repeat(
+                lambda: drawer.draw_detections_on_frame(
+                    frame, polygons, datas, language,
+                ),
+                number=1,
+                repeat=args.repeats,
+            )
+            print(
+                f"{language:>6} {backend:>7}: median "
+                f"{np.median(times) * 1000:7.2f} ms, "
+                f"min {min(times) * 1000:7.2f} ms",
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from src.frame_ring import FrameRing
+
+
+def consume_ring(ring: FrameRing, count: int) -> None:
+    """
+    Reads frames from a ring, touching one pixel of each.
+    """
+    for _ in range(count):
+        descriptor = ring.read()
+        ring.view(descriptor)[0, 0]
+        ring.release(descriptor)
+
+
+def consume_queue(frames: multiprocessing.Queue, count: int) -> None:
+    """
+    Reads pickled frames from a queue, touching one pixel of each.
+    """
+    for _ in range(count):
+        frames.get()[0, 0]
+
+
+def time_ring(frame: np.ndarray, count: int, slots: int) -> float:
+    """
+    Measures frames per second through a ring to another process.
+    """
+    ring = FrameRing(
+        num_slots=slots, slot_bytes=frame.nbytes, drop_oldest=False,
+    )
+    consumer = multiprocessing.Process(
+        target=consume_ring, args=(ring, count),
+    )
+    consumer.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        ring.write(frame)
+    consumer.join()
+    elapsed = time.perf_counter() - start
+    ring.close()
+    return count / elapsed
+
+
+def time_queue(frame: np.ndarray, count: int, slots: int) -> float:
+    """
+    Measures frames per second through a pickling queue to another
+    process.
+    """
+    frames = multiprocessing.Queue(maxsize=slots)
+    consumer = multiprocessing.Process(
+        target=consume_queue, args=(frames, count),
+    )
+    consumer.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        frames.put(frame)
+    consumer.join()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """
+    Compares frames per second passed to another process through the
+    shared-memory frame ring and through a multiprocessing queue.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the shared-memory frame ring.',
+    )
+    parser.add_argument(
+        '--resolutions',
+        type=str,
+        nargs='+',
+        default=['640x480', '1280x720', '1920x1080'],
+        help='Frame resolutions as WIDTHxHEIGHT',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=500,
+        help='Number of frames passed per run',
+    )
+    parser.add_argument(
+        '--slots',
+        type=int,
+        default=4,
+        help='Ring slots, and queue size for the queue baseline',
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'resolution':>10} {'queue fps':>10} {'ring fps':>10}")
+    for resolution in args.resolutions:
+        width, height = map(int, resolution.split('x'))
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        queue_fps = time_queue(frame, args.frames, args.slots)
+        ring_fps = time_ring(frame, args.frames, args.slots)
+        print(
+            f"{resolution:>10} {queue_fps:>10.0f} {ring_fps:>10.0f} "
+            f"{ring_fps / queue_fps:>4.1f}x",
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.danger_detector_benchmark import generate_frame
+from src import label_filter
+from src.detections import Detections
+
+
+def overlap_percentage(bbox1, bbox2) -> float:
+    """
+    Calculates the overlap of two boxes in pure Python.
+    """
+    x1, y1 = max(bbox1[0], bbox2[0]), max(bbox1[1], bbox2[1])
+    x2, y2 = min(bbox1[2], bbox2[2]), min(bbox1[3], bbox2[3])
+    intersection = max(0, x2 - x1 + 1) * max(0, y2 - y1 + 1)
+    area1 = (bbox1[2] - bbox1[0] + 1) * (bbox1[3] - bbox1[1] + 1)
+    area2 = (bbox2[2] - bbox2[0] + 1) * (bbox2[3] - bbox2[1] + 1)
+    return intersection / float(area1 + area2 - intersection)
+
+
+def is_contained(inner_bbox, outer_bbox) -> bool:
+    """
+    Determines whether one box lies within another in pure Python.
+    """
+    return (
+        inner_bbox[0] >= outer_bbox[0]
+        and inner_bbox[2] <= outer_bbox[2]
+        and inner_bbox[1] >= outer_bbox[1]
+        and inner_bbox[3] <= outer_bbox[3]
+    )
+
+
+def filter_pairwise(datas: list[list[float]]) -> list[list[float]]:
+    """
+    Compares every positive box with every negative box and pops the
+    removed rows, as the clean-up passes used to.
+
+    Args:
+        datas (list[list[float]]): The detection data.
+
+    Returns:
+        list[list[float]]: The remaining detection data.
+    """
+    for check in ('overlap', 'containment'):
+        to_remove = set()
+        for positive, negative in label_filter.LABEL_PAIRS:
+            positives = [i for i, d in enumerate(datas) if d[5] == positive]
+            negatives = [i for i, d in enumerate(datas) if d[5] == negative]
+            for i in positives:
+                for j in negatives:
+                    bbox1, bbox2 = datas[i][:4], datas[j][:4]
+                    if check == 'overlap':
+                        overlap = overlap_percentage(bbox1, bbox2)
+                        if overlap > label_filter.OVERLAP_THRESHOLD:
+                            to_remove.add(j)
+                    elif is_contained(bbox2, bbox1):
+                        to_remove.add(j)
+                    elif is_contained(bbox1, bbox2):
+                        to_remove.add(i)
+        for index in sorted(to_remove, reverse=True):
+            datas.pop(index)
+    return datas
+
+
+def time_filter(func, frames, repeats: int) -> float:
+    """
+    Times a label filter over the frames.
+
+    Args:
+        func (Callable): The filter to time.
+        frames (list): The detection data of each frame.
+        repeats (int): Number of passes over the frames.
+
+    Returns:
+        float: Milliseconds per frame.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for datas in frames:
+            func(datas)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(frames))
+
+
+def main() -> None:
+    """
+    Compares the pairwise label clean-up with the indexed filter.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark hardhat and safety vest label clean-up.',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[20, 100, 500],
+        help='Numbers of detections per frame',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=20,
+        help='Number of random frames per size',
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=3,
+        help='Number of passes over the frames',
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'detections':>10} {'pairwise ms':>12} {'list ms':>9} "
+        f"{'array ms':>9}",
+    )
+    for size in args.sizes:
+        frames = [generate_frame(rng, size) for _ in range(args.frames)]
+        for datas in frames:
+            assert sorted(filter_pairwise(list(datas))) == sorted(
+                label_filter.filter_labels(datas),
+            )
+        detections = [Detections(datas) for datas in frames]
+        pairwise = time_filter(
+            lambda datas: filter_pairwise(list(datas)), frames, args.repeats,
+        )
+        indexed = time_filter(
+            label_filter.filter_labels, frames, args.repeats,
+        )
+        array = time_filter(
+            label_filter.filter_labels, detections, args.repeats,
+        )
+        print(
+            f"{size:>10} {pairwise:>12.3f} {indexed:>9.3f} {array:>9.3f}",
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+
+import numpy as np
+from ultralytics import YOLO
+
+from benchmarks.danger_detector_benchmark import generate_frame
+from src.danger_detector import DangerDetector
+from src.live_stream_detection import LiveStreamDetector
+from src.memory_policy import MemoryPolicy
+
+
+def count_overlap_pairs(datas: list[list[float]]) -> int:
+    """
+    Counts the box pairs `remove_overlapping_labels` compares, each of
+    which used to force a full collection.
+    """
+    labels = [d[5] for d in datas]
+    return (
+        labels.count(0) * labels.count(2)
+        + labels.count(7) * labels.count(4)
+    )
+
+
+def time_frames(
+    mode: str,
+    frames: list[list[list[float]]],
+    detector: LiveStreamDetector,
+    danger_detector: DangerDetector,
+    policy: MemoryPolicy,
+) -> np.ndarray:
+    """
+    Times the per-frame post-processing under a garbage collection mode.
+
+    Args:
+        mode (str): 'forced' collects once per compared box pair and once
+            per frame, as the hot paths used to; 'per_frame' collects once
+            per frame; 'policy' uses the MemoryPolicy.
+        frames (list[list[list[float]]]): The detections of each frame.
+        detector (LiveStreamDetector): Detector for label clean-up.
+        danger_detector (DangerDetector): Rule engine.
+        policy (MemoryPolicy): The policy used in 'policy' mode.
+
+    Returns:
+        np.ndarray: Milliseconds per frame.
+    """
+    timings = []
+    for datas in frames:
+        start = time.perf_counter()
+        datas = [list(d) for d in datas]
+        if mode == 'forced':
+            for _ in range(count_overlap_pairs(datas)):
+                gc.collect()
+        datas = detector.remove_overlapping_labels(datas)
+        datas = detector.remove_completely_contained_labels(datas)
+        danger_detector.detect_danger(datas)
+        if mode == 'policy':
+            policy.maybe_collect()
+        else:
+            gc.collect()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main() -> None:
+    """
+    Compares per-frame latency with forced collections on the hot paths
+    against the memory policy.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark garbage collection policies per frame.',
+    )
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='yolo11n.yaml',
+        help='YOLO model kept alive as a realistic long-lived heap',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[20, 50],
+        help='Numbers of detections per frame',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=5,
+        help='Number of timed frames per mode and size',
+    )
+    args = parser.parse_args()
+
+    # Loaded for its heap only
+    model = YOLO(args.model)
+    detector = LiveStreamDetector()
+    danger_detector = DangerDetector()
+    rng = np.random.default_rng(0)
+    default_thresholds = gc.get_threshold()
+
+    print(
+        f"{'detections':>10} {'mode':>9} {'mean ms':>9} {'p95 ms':>9}",
+    )
+    for size in args.sizes:
+        frames = [generate_frame(rng, size) for _ in range(args.frames)]
+        for mode in ('forced', 'per_frame', 'policy'):
+            policy = MemoryPolicy()
+            if mode == 'policy':
+                policy.apply()
+                policy.freeze()
+            timings = time_frames(
+                mode, frames, detector, danger_detector, policy,
+            )
+            gc.unfreeze()
+            gc.set_threshold(*default_thresholds)
+            print(
+                f"{size:>10} {mode:>9} {timings.mean():>9.2f} "
+                f"{np.percentile(timings, 95):>9.2f}",
+            )
+    del model
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import cv2
+import numpy as np
+from aiohttp import web
+
+from src.frame_codec import encode_frame
+from src.notifiers.dispatcher import NotificationDispatcher
+from src.notifiers.line_notifier import LineNotifier
+
+
+async def start_stub_server(delay: float) -> web.AppRunner:
+    """
+    Starts a stub LINE Notify API on a free local port.
+
+    Args:
+        delay (float): Seconds each notification takes on the server.
+
+    Returns:
+        web.AppRunner: The running server.
+    """
+    async def notify(request: web.Request) -> web.Response:
+        await request.read()
+        await asyncio.sleep(delay)
+        return web.json_response({'status': 200})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post('/notify', notify)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+async def time_frames(
+    notifier: LineNotifier,
+    image: bytes,
+    args: argparse.Namespace,
+    dispatcher: NotificationDispatcher | None,
+) -> np.ndarray:
+    """
+    Times the notification step of each frame of a stream.
+
+    Args:
+        notifier (LineNotifier): The notifier of the stub server.
+        image (bytes): The encoded frame sent with each notification.
+        args (argparse.Namespace): The benchmark options.
+        dispatcher (NotificationDispatcher | None): The dispatcher, or
+            None to send inline as the stream loop used to.
+
+    Returns:
+        np.ndarray: Time the frame loop spent notifying, in milliseconds.
+    """
+    stalls = []
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        for token in range(args.tokens):
+            if dispatcher is None:
+                # The blocking request stalls the event loop too
+                notifier.send_notification(
+                    'Warning', image=image, line_token=str(token),
+                )
+            else:
+                dispatcher.submit(
+                    'line', 'Warning', image=image, recipient=str(token),
+                )
+        stalls.append((time.perf_counter() - start) * 1000)
+        # Let the server and the workers run between frames
+        await asyncio.sleep(args.frame_interval_ms / 1000)
+    return np.array(stalls)
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Compares inline notifications with the dispatcher.
+
+    Args:
+        args (argparse.Namespace): The benchmark options.
+    """
+    runner = await start_stub_server(args.server_delay_ms / 1000)
+    host, port = runner.addresses[0][:2]
+    notifier = LineNotifier(f"http://{host}:{port}/notify")
+    image = encode_frame(
+        cv2.resize(cv2.imread(args.image), (args.width, args.height)), 'png',
+    )
+    try:
+        # The inline requests block the loop, so the stub server answers
+        # from a thread of its own
+        stalls = await asyncio.to_thread(
+            lambda: asyncio.run(time_frames(notifier, image, args, None)),
+        )
+        print_stalls('inline', stalls)
+
+        start = time.perf_counter()
+        async with NotificationDispatcher({'line': notifier}) as dispatcher:
+            stalls = await time_frames(notifier, image, args, dispatcher)
+        print_stalls('dispatcher', stalls)
+        print(
+            f"dispatcher drained in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms, "
+            f"metrics {dispatcher.get_metrics()}",
+        )
+    finally:
+        await runner.cleanup()
+
+
+def print_stalls(name: str, stalls: np.ndarray) -> None:
+    """
+    Prints the percentiles of the frame loop stalls.
+
+    Args:
+        name (str): The sending mode.
+        stalls (np.ndarray): Stalls in milliseconds.
+    """
+    p50, p99 = np.percentile(stalls, [50, 99])
+    print(f"{name:>10}: p50 {p50:8.2f} ms, p99 {p99:8.2f} ms per frame")
+
+
+def main() -> None:
+    """
+    Measures how long notifications hold up the frame loop against a local
+    stub server.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark sending notifications from the frame loop.',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=20,
+        help='Number of frames per mode',
+    )
+    parser.add_argument(
+        '--tokens',
+        type=int,
+        default=4,
+        help='Notifications sent per frame',
+    )
+    parser.add_argument(
+        '--image',
+        type=str,
+        default='assets/images/data_aug/origin_image.jpg',
+        help='Image sent with each notification, resized to the frame size',
+    )
+    parser.add_argument(
+        '--width',
+        type=int,
+        default=1280,
+        help='Frame width',
+    )
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=720,
+        help='Frame height',
+    )
+    parser.add_argument(
+        '--server_delay_ms',
+        type=float,
+        default=50,
+        help='Simulated response time of the notifier API',
+    )
+    parser.add_argument(
+        '--frame_interval_ms',
+        type=float,
+        default=100,
+        help='Time between frames',
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+from sahi import AutoDetectionModel
+from sahi.predict import get_sliced_prediction
+from ultralytics import YOLO
+
+from src.sliced_inference import SlicedInference
+
+
+def main() -> None:
+    """
+    Times sliced inference through SAHI's per-slice loop and through the
+    batched SlicedInference engine.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark SAHI against batched sliced inference.',
+    )
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='yolo11n.yaml',
+        help=(
+            'YOLO weights, e.g. models/pt/best_yolo11n.pt; a .yaml builds '
+            'an untrained model, which is enough for timing'
+        ),
+    )
+    parser.add_argument(
+        '--device',
+        type=str,
+        default='cpu',
+        help='Device to run the model on, e.g. cpu or cuda:0',
+    )
+    parser.add_argument(
+        '--resolutions',
+        type=str,
+        nargs='+',
+        default=['640x480', '1280x720', '1920x1080'],
+        help='Frame resolutions as WIDTHxHEIGHT',
+    )
+    parser.add_argument(
+        '--slice_size',
+        type=int,
+        default=376,
+        help='Slice height and width',
+    )
+    parser.add_argument(
+        '--overlap',
+        type=float,
+        default=0.3,
+        help='Slice overlap ratio',
+    )
+    parser.add_argument(
+        '--batch_sizes',
+        type=int,
+        nargs='+',
+        default=[4, 32],
+        help='Maximum numbers of slices per forward pass to compare',
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Number of timed runs per path and resolution',
+    )
+    args = parser.parse_args()
+
+    model = AutoDetectionModel.from_pretrained(
+        'yolov8',
+        model=YOLO(args.model),
+        device=args.device,
+    )
+    engines = {
+        f"batch {batch_size}": SlicedInference.from_sahi_model(
+            model,
+            slice_height=args.slice_size,
+            slice_width=args.slice_size,
+            overlap_height_ratio=args.overlap,
+            overlap_width_ratio=args.overlap,
+            batch_size=batch_size,
+        )
+        for batch_size in args.batch_sizes
+    }
+
+    rng = np.random.default_rng(0)
+    header = f"{'resolution':>10} {'slices':>6} {'sahi ms':>9}"
+    for name in engines:
+        header += f" {name + ' ms':>14}"
+    print(header)
+    for resolution in args.resolutions:
+        width, height = map(int, resolution.split('x'))
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        paths = {
+            'sahi': lambda: get_sliced_prediction(
+                frame,
+                model,
+                slice_height=args.slice_size,
+                slice_width=args.slice_size,
+                overlap_height_ratio=args.overlap,
+                overlap_width_ratio=args.overlap,
+                verbose=0,
+            ),
+        }
+        for name, engine in engines.items():
+            paths[name] = lambda engine=engine: engine.predict(frame)
+
+        timings = {}
+        for name, path in paths.items():
+            # Warm up the model and, for the engines, the slice grid
+            path()
+            timings[name] = min(
+                timeit.repeat(path, number=1, repeat=args.repeat),
+            ) * 1000
+
+        slices = len(next(iter(engines.values())).get_slice_plan(
+            height, width,
+        ))
+        row = f"{resolution:>10} {slices:>6} {timings['sahi']:>9.1f}"
+        for name in engines:
+            speedup = timings['sahi'] / timings[name]
+            row += f" {timings[name]:>8.1f} {speedup:>4.1f}x"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+import cv2
+import numpy as np
+from aiohttp import web
+
+from src.frame_codec import decode_frame
+from src.frame_codec import downscale_frame
+from src.frame_codec import encode_frame
+from src.frame_codec import UPLOAD_FORMATS
+
+
+async def start_stub_server(decode_times: list[float]) -> web.AppRunner:
+    """
+    Starts a stub detection server that decodes each upload.
+
+    Args:
+        decode_times (list[float]): Receives the decode time of each
+            upload, in milliseconds.
+
+    Returns:
+        web.AppRunner: The running server.
+    """
+    async def detect(request: web.Request) -> web.Response:
+        image = (await request.post())['image']
+        data = image.file.read()
+        start = time.perf_counter()
+        decode_frame(data, image.content_type)
+        decode_times.append((time.perf_counter() - start) * 1000)
+        return web.json_response([])
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post('/detect', detect)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+async def time_format(
+    session: aiohttp.ClientSession,
+    url: str,
+    frame: np.ndarray,
+    upload_format: str,
+    args: argparse.Namespace,
+    decode_times: list[float],
+) -> dict[str, float]:
+    """
+    Times uploads of a frame in one format.
+
+    Args:
+        session (aiohttp.ClientSession): The client session.
+        url (str): URL of the stub server's detection route.
+        frame (np.ndarray): The frame.
+        upload_format (str): The upload format.
+        args (argparse.Namespace): The benchmark options.
+        decode_times (list[float]): Decode times reported by the server.
+
+    Returns:
+        dict[str, float]: Median encode, round trip and decode times in
+            milliseconds, and the payload size in kilobytes.
+    """
+    encode_times = []
+    round_trips = []
+    decode_times.clear()
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        upload, _ = downscale_frame(frame, args.max_size)
+        data = encode_frame(upload, upload_format, args.quality)
+        encoded = time.perf_counter()
+
+        form = aiohttp.FormData()
+        form.add_field(
+            'image', data,
+            filename=f"frame.{upload_format}",
+            content_type=UPLOAD_FORMATS[upload_format],
+        )
+        async with session.post(url, data=form) as response:
+            await response.json()
+        encode_times.append((encoded - start) * 1000)
+        round_trips.append((time.perf_counter() - encoded) * 1000)
+    return {
+        'encode': float(np.median(encode_times)),
+        'round_trip': float(np.median(round_trips)),
+        'decode': float(np.median(decode_times)),
+        'size': len(data) / 1024,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Compares the upload formats on one frame.
+
+    Args:
+        args (argparse.Namespace): The benchmark options.
+    """
+    frame = cv2.resize(cv2.imread(args.image), (args.width, args.height))
+    decode_times: list[float] = []
+    runner = await start_stub_server(decode_times)
+    host, port = runner.addresses[0][:2]
+    url = f"http://{host}:{port}/detect"
+    print(
+        f"{'format':>6} {'size KB':>9} {'encode ms':>10} "
+        f"{'upload ms':>10} {'decode ms':>10} {'total ms':>9}",
+    )
+    try:
+        async with aiohttp.ClientSession() as session:
+            for upload_format in args.formats:
+                times = await time_format(
+                    session, url, frame, upload_format, args, decode_times,
+                )
+                # The round trip includes the server's decode
+                total = times['encode'] + times['round_trip']
+                print(
+                    f"{upload_format:>6} {times['size']:9.1f} "
+                    f"{times['encode']:10.2f} "
+                    f"{times['round_trip'] - times['decode']:10.2f} "
+                    f"{times['decode']:10.2f} {total:9.2f}",
+                )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """
+    Measures encode, transfer and decode of each upload format against a
+    local stub server.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the upload formats of server detection.',
+    )
+    parser.add_argument(
+        '--image',
+        type=str,
+        default='assets/images/data_aug/origin_image.jpg',
+        help='Image to upload, resized to the frame size',
+    )
+    parser.add_argument(
+        '--width',
+        type=int,
+        default=1920,
+        help='Frame width',
+    )
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=1080,
+        help='Frame height',
+    )
+    parser.add_argument(
+        '--formats',
+        type=str,
+        nargs='+',
+        choices=list(UPLOAD_FORMATS),
+        default=list(UPLOAD_FORMATS),
+        help='Upload formats to compare',
+    )
+    parser.add_argument(
+        '--quality',
+        type=int,
+        default=90,
+        help='JPEG or WebP quality',
+    )
+    parser.add_argument(
+        '--max_size',
+        type=int,
+        help='Longest side frames are shrunk to before upload',
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=30,
+        help='Number of timed uploads per format',
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
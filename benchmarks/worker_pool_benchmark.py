@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import multiprocessing
+import time
+from functools import partial
+
+from main import STREAM_MODULES
+from src.worker_pool import WarmWorkerPool
+
+
+def warm_up(model_key: str | None) -> None:
+    """
+    Imports the stream modules and optionally loads a model, as a stream
+    process does before its first frame.
+
+    Args:
+        model_key (str | None): The model to load, if any.
+    """
+    for module in STREAM_MODULES:
+        importlib.import_module(module)
+    if model_key:
+        from src.live_stream_detection import load_model
+        load_model(model_key)
+
+
+async def report_start(events: multiprocessing.Queue) -> None:
+    """
+    Stub stream: reports when it starts, then idles.
+
+    Args:
+        events (multiprocessing.Queue): Queue to report the start time on.
+    """
+    events.put(time.monotonic())
+    await asyncio.sleep(3600)
+
+
+def run_cold(events: multiprocessing.Queue, model_key: str | None) -> None:
+    """
+    A stream process started from scratch.
+
+    Args:
+        events (multiprocessing.Queue): Queue to report the start time on.
+        model_key (str | None): The model to load, if any.
+    """
+    warm_up(model_key)
+    asyncio.run(report_start(events))
+
+
+def main() -> None:
+    """
+    Compares the time until a stream starts in a new process and on a
+    warm worker.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark stream start-up on warm workers.',
+    )
+    parser.add_argument(
+        '--model_key',
+        type=str,
+        help='Model to load up front; only modules are imported by default',
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='Number of starts timed per mode',
+    )
+    args = parser.parse_args()
+
+    cold = []
+    for _ in range(args.repeats):
+        # A queue per process, as terminating a process may leave the
+        # queue's write lock held
+        events: multiprocessing.Queue = multiprocessing.Queue()
+        start = time.monotonic()
+        process = multiprocessing.Process(
+            target=run_cold, args=(events, args.model_key),
+        )
+        process.start()
+        cold.append(events.get() - start)
+        process.terminate()
+        process.join()
+
+    # Created before any worker is forked, so that workers inherit it
+    events = multiprocessing.Queue()
+    pool = WarmWorkerPool(
+        partial(report_start, events),
+        warm_up=partial(warm_up, args.model_key),
+    )
+    pool.start()
+    pool.wait_until_ready(timeout=300)
+    warm = []
+    release = []
+    for _ in range(args.repeats):
+        start = time.monotonic()
+        worker = pool.assign()
+        warm.append(events.get() - start)
+        start = time.monotonic()
+        pool.release(worker)
+        release.append(time.monotonic() - start)
+        # Let the replacement spare warm up before the next start
+        pool.wait_until_ready(timeout=300)
+    pool.stop()
+
+    for name, times in (
+        ('cold start', cold),
+        ('warm start', warm),
+        ('warm release', release),
+    ):
+        print(
+            f"{name:>12}: median {sorted(times)[len(times) // 2] * 1000:9.2f}"
+            f" ms, max {max(times) * 1000:9.2f} ms",
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.danger_detector import DangerDetector
+from src.zone_tracker import ZoneTracker
+
+
+def generate_cones(
+    rng: np.random.Generator,
+    zones: int,
+    cones_per_zone: int,
+) -> np.ndarray:
+    """
+    Generates cone centres laid out around separate zones.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        zones (int): The number of zones.
+        cones_per_zone (int): The number of cones around each zone.
+
+    Returns:
+        np.ndarray: An (N, 2) array of cone centres.
+    """
+    angles = np.linspace(0, 2 * np.pi, cones_per_zone, endpoint=False)
+    ring = np.column_stack((np.cos(angles), np.sin(angles))) * 60
+    centres = rng.uniform(100, 1800, (zones, 2))
+    return np.vstack([centre + ring for centre in centres])
+
+
+def main() -> None:
+    """
+    Compares clustering every frame with tracking the zones.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark controlled zone tracking.',
+    )
+    parser.add_argument(
+        '--zones', type=int, default=4, help='Number of zones',
+    )
+    parser.add_argument(
+        '--cones', type=int, default=8, help='Number of cones per zone',
+    )
+    parser.add_argument(
+        '--frames', type=int, default=200, help='Number of frames',
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=1.0,
+        help='Per-frame detection jitter of cone centres in pixels',
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cones = generate_cones(rng, args.zones, args.cones)
+    frames = [
+        cones + rng.uniform(-args.jitter, args.jitter, cones.shape)
+        for _ in range(args.frames)
+    ]
+
+    detector = DangerDetector()
+    tracker = ZoneTracker()
+    for name, func in (
+        ('per-frame', detector.polygons_from_cone_positions),
+        ('tracked', tracker.update),
+    ):
+        start = time.perf_counter()
+        for positions in frames:
+            func(positions)
+        elapsed = (time.perf_counter() - start) * 1000 / args.frames
+        print(f"{name:>10}: {elapsed:.3f} ms per frame")
+    print(f"Tracker metrics: {tracker.get_metrics()}")
+
+
+if __name__ == '__main__':
+    main()
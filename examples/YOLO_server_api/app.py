@@ -14,6 +14,7 @@ from .detection import detection_blueprint
 from .model_downloader import models_blueprint
 from .models import db
 from .security import update_secret_key
+from src.memory_policy import MemoryPolicy
 
 # Use pymysql as MySQLdb for compatibility with SQLAlchemy
 pymysql.install_as_MySQLdb()
@@ -41,6 +42,15 @@ app.register_blueprint(detection_blueprint)
 # Register object models-related routes
 app.register_blueprint(models_blueprint)
 
+# Tune garbage collection; the models were loaded when the detection
+# blueprint was imported, so they are frozen out of later collections
+memory_policy = MemoryPolicy(
+    collect_interval=Config.GC_COLLECT_INTERVAL,
+    freeze_after_load=Config.GC_FREEZE_AFTER_LOAD,
+)
+memory_policy.apply()
+memory_policy.freeze()
+
 # Set up a background scheduler
 scheduler = BackgroundScheduler()
 
@@ -51,6 +61,13 @@ scheduler.add_job(
     days=30,
 )
 
+# Schedule periodic garbage collection
+scheduler.add_job(
+    func=memory_policy.collect,
+    trigger='interval',
+    seconds=Config.GC_COLLECT_INTERVAL,
+)
+
 # Start the scheduler
 scheduler.start()
 
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+import numpy as np
+
+
+class BatchRequest:
+    """
+    A single image waiting to be detected as part of a batch.
+    """
+
+    def __init__(self, model_key: str, image: np.ndarray):
+        """
+        Initialises the request.
+
+        Args:
+            model_key (str): The model to run the image through.
+            image (np.ndarray): The decoded image.
+        """
+        self.model_key = model_key
+        self.image = image
+        # Monotonic time the request was queued
+        self.enqueued_at = time.monotonic()
+        # Resolved with the prediction result
+        self.future: Future = Future()
+
+
+class BatchScheduler:
+    """
+    Collects detection requests arriving within a short window and runs
+    them as one batch per model.
+
+    A single worker thread waits for the first queued request, takes any
+    requests already queued behind it, then keeps collecting until either
+    `max_batch_size` images are queued or `max_wait_ms` has elapsed since
+    the batch was started. The batch is
+    grouped by model key and each group is passed to `predict_batch`
+    in a single call.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[str, list[np.ndarray]], list[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        max_queue_size: int = 64,
+        max_latency: float = 30,
+    ):
+        """
+        Initialises the scheduler and starts its worker thread.
+
+        Args:
+            predict_batch (Callable[[str, list[np.ndarray]], list[Any]]):
+                Runs a list of images through the model with the given key
+                and returns one result per image, in order.
+            max_batch_size (int): Maximum number of images per batch.
+            max_wait_ms (float): How long to wait for more images after the
+                batch is started, in milliseconds.
+            max_queue_size (int): Maximum number of queued images before new
+                requests are rejected.
+            max_latency (float): Maximum time in seconds a request may wait
+                for its result, queueing included.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_latency = max_latency
+        self.queue: queue.Queue[BatchRequest] = queue.Queue(
+            maxsize=max_queue_size,
+        )
+        self.logger = logging.getLogger(__name__)
+
+        # Batch metrics, guarded by the lock
+        self.lock = threading.Lock()
+        self.batch_size_counts: Counter[int] = Counter()
+        self.total_batches = 0
+        self.total_images = 0
+        self.rejected = 0
+        self.expired = 0
+
+        self.running = True
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, model_key: str, image: np.ndarray) -> Any:
+        """
+        Queues an image and blocks until its result is ready.
+
+        Args:
+            model_key (str): The model to run the image through.
+            image (np.ndarray): The decoded image.
+
+        Returns:
+            Any: The result returned by `predict_batch` for this image.
+
+        Raises:
+            queue.Full: If the queue is at its maximum depth.
+            TimeoutError: If no result arrives within `max_latency`.
+        """
+        request = BatchRequest(model_key, image)
+        try:
+            self.queue.put_nowait(request)
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise
+
+        return request.future.result(timeout=self.max_latency)
+
+    def collect_batch(self) -> list[BatchRequest]:
+        """
+        Waits for the next request and collects a batch around it.
+
+        Returns:
+            list[BatchRequest]: Up to `max_batch_size` requests, or an empty
+                list if none arrived.
+        """
+        try:
+            first = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        # Take whatever is already waiting before opening the window, so a
+        # backed-up queue still yields full batches
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def run_batch(self, batch: list[BatchRequest]) -> None:
+        """
+        Runs a collected batch, one `predict_batch` call per model key.
+
+        Args:
+            batch (list[BatchRequest]): The requests to run.
+        """
+        # Drop requests whose caller has already given up
+        now = time.monotonic()
+        live = []
+        for request in batch:
+            if now - request.enqueued_at >= self.max_latency:
+                request.future.set_exception(
+                    TimeoutError('Detection request expired in queue.'),
+                )
+                with self.lock:
+                    self.expired += 1
+            else:
+                live.append(request)
+
+        groups: dict[str, list[BatchRequest]] = {}
+        for request in live:
+            groups.setdefault(request.model_key, []).append(request)
+
+        for model_key, requests in groups.items():
+            try:
+                results = self.predict_batch(
+                    model_key, [request.image for request in requests],
+                )
+            except Exception as e:
+                self.logger.error(f"Batch prediction failed: {e}")
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            results = list(results)
+            if len(results) != len(requests):
+                self.logger.error(
+                    f"Batch prediction returned {len(results)} results "
+                    f"for {len(requests)} images",
+                )
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+            # Callers without a result would otherwise wait for ever
+            for request in requests[len(results):]:
+                request.future.set_exception(
+                    RuntimeError('Batch prediction returned no result.'),
+                )
+
+            with self.lock:
+                self.batch_size_counts[len(requests)] += 1
+                self.total_batches += 1
+                self.total_images += len(requests)
+
+    def run(self) -> None:
+        """
+        Worker loop collecting and running batches until stopped.
+        """
+        while self.running:
+            batch = self.collect_batch()
+            if batch:
+                self.run_batch(batch)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Returns batching metrics.
+
+        Returns:
+            dict[str, Any]: Batch count, image count, mean batch size,
+                batch size histogram, queue depth, and the number of
+                rejected and expired requests.
+        """
+        with self.lock:
+            return {
+                'total_batches': self.total_batches,
+                'total_images': self.total_images,
+                'mean_batch_size': (
+                    self.total_images / self.total_batches
+                    if self.total_batches else 0.0
+                ),
+                'batch_size_histogram': dict(
+                    sorted(self.batch_size_counts.items()),
+                ),
+                'queue_depth': self.queue.qsize(),
+                'rejected': self.rejected,
+                'expired': self.expired,
+            }
+
+    def stop(self) -> None:
+        """
+        Stops the worker thread.
+        """
+        self.running = False
+        self.worker.join()
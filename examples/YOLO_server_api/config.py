@@ -18,6 +18,22 @@ class Config:
         SQLALCHEMY_DATABASE_URI (str): The URI for the SQL database connection.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag to disable or enable
             track modifications feature of SQLAlchemy.
+        DETECT_BATCH_SIZE (int): Maximum number of images per batch.
+        DETECT_BATCH_WINDOW_MS (float): How long to wait for more images
+            after the first one of a batch arrives, in milliseconds.
+        DETECT_QUEUE_SIZE (int): Maximum number of queued images before
+            /detect answers 503.
+        DETECT_MAX_LATENCY (float): Maximum seconds a request may wait for
+            its result before /detect answers 504.
+        DETECT_BATCHED_SLICING (bool): Whether the slices of each image run
+            through the model in batches, rather than one at a time with
+            SAHI.
+        DETECT_SLICE_BATCH_SIZE (int): Maximum number of slices per
+            forward pass.
+        GC_COLLECT_INTERVAL (float): Seconds between periodic full garbage
+            collections.
+        GC_FREEZE_AFTER_LOAD (bool): Whether objects alive once the models
+            are loaded are frozen out of garbage collection.
     """
 
     # Fetch the JWT secret key from environment or use a fallback
@@ -34,3 +50,28 @@ class Config:
 
     # Set SQLAlchemy to not track modifications for performance benefits
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+
+    # Micro-batching of /detect requests: images arriving within the
+    # window are run through the model together
+    DETECT_BATCH_SIZE: int = int(os.getenv('DETECT_BATCH_SIZE', 8))
+    DETECT_BATCH_WINDOW_MS: float = float(
+        os.getenv('DETECT_BATCH_WINDOW_MS', 10),
+    )
+    DETECT_QUEUE_SIZE: int = int(os.getenv('DETECT_QUEUE_SIZE', 64))
+    DETECT_MAX_LATENCY: float = float(os.getenv('DETECT_MAX_LATENCY', 30))
+
+    # Sliced inference: the slices of all images in a batch are run
+    # through the model together, DETECT_SLICE_BATCH_SIZE at a time
+    DETECT_BATCHED_SLICING: bool = os.getenv(
+        'DETECT_BATCHED_SLICING', 'true',
+    ).lower() == 'true'
+    DETECT_SLICE_BATCH_SIZE: int = int(
+        os.getenv('DETECT_SLICE_BATCH_SIZE', 32),
+    )
+
+    # Garbage collection: full collections run on a timer rather than
+    # inside request handling
+    GC_COLLECT_INTERVAL: float = float(os.getenv('GC_COLLECT_INTERVAL', 60))
+    GC_FREEZE_AFTER_LOAD: bool = os.getenv(
+        'GC_FREEZE_AFTER_LOAD', 'true',
+    ).lower() == 'true'
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
-import gc
+import queue
 
-import cv2
-import numpy as np
 from flask import Blueprint
 from flask import jsonify
 from flask import request
@@ -12,43 +10,130 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from sahi.predict import get_sliced_prediction
 
+from .batching import BatchScheduler
+from .config import Config
 from .models import DetectionModelManager
+from src import label_filter
+from src.detections import Detections
+from src.frame_codec import decode_frame
+from src.frame_codec import UPLOAD_FORMATS
+from src.sliced_inference import SlicedInference
 
 detection_blueprint = Blueprint('detection', __name__)
 limiter = Limiter(key_func=get_remote_address)
 model_loader = DetectionModelManager()
 
+# Batched slicing engines by model key, with the model each was built for
+sliced_inference_engines: dict[str, tuple[object, SlicedInference]] = {}
+
+
+def predict_batch(model_key, imgs):
+    """
+    Run a batch of images through the model with the given key.
+
+    Args:
+        model_key (str): The key of the model to use.
+        imgs (list[numpy.ndarray]): Decoded input images.
+
+    Returns:
+        list[list | Detections]: Processed detection data for each image.
+    """
+    model = model_loader.get_model(model_key)
+    if Config.DETECT_BATCHED_SLICING:
+        detections = get_sliced_inference(model_key, model).predict_many(imgs)
+    else:
+        detections = [
+            compile_detection_data(get_prediction_result(img, model))
+            for img in imgs
+        ]
+    return [process_labels(datas) for datas in detections]
+
+
+def get_sliced_inference(model_key, model):
+    """
+    Get the batched slicing engine for a model, rebuilding it when the
+    model has been reloaded.
+
+    Args:
+        model_key (str): The key of the model.
+        model: Detection model.
+
+    Returns:
+        SlicedInference: The slicing engine.
+    """
+    cached = sliced_inference_engines.get(model_key)
+    if cached is None or cached[0] is not model:
+        engine = SlicedInference.from_sahi_model(
+            model,
+            slice_height=370,
+            slice_width=370,
+            overlap_height_ratio=0.3,
+            overlap_width_ratio=0.3,
+            batch_size=Config.DETECT_SLICE_BATCH_SIZE,
+        )
+        cached = (model, engine)
+        sliced_inference_engines[model_key] = cached
+    return cached[1]
+
+
+batch_scheduler = BatchScheduler(
+    predict_batch,
+    max_batch_size=Config.DETECT_BATCH_SIZE,
+    max_wait_ms=Config.DETECT_BATCH_WINDOW_MS,
+    max_queue_size=Config.DETECT_QUEUE_SIZE,
+    max_latency=Config.DETECT_MAX_LATENCY,
+)
+
 
 @detection_blueprint.route('/detect', methods=['POST'])
 @jwt_required()
 @limiter.limit('3000 per minute')
 def detect():
-    data = request.files['image'].read()
+    image = request.files['image']
     model_key = request.args.get('model', default='yolo11n', type=str)
-    model = model_loader.get_model(model_key)
 
-    img = convert_to_image(data)
-    result = get_prediction_result(img, model)
+    try:
+        img = convert_to_image(image.read(), image.mimetype)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        datas = batch_scheduler.submit(model_key, img)
+    except queue.Full:
+        return jsonify({'error': 'Detection queue is full'}), 503
+    except TimeoutError:
+        return jsonify({'error': 'Detection timed out'}), 504
+
+    return jsonify(serialise_detections(datas))
+
+
+@detection_blueprint.route('/detect/formats', methods=['GET'])
+@jwt_required()
+def detect_formats():
+    return jsonify({'formats': list(UPLOAD_FORMATS)})
 
-    datas = compile_detection_data(result)
-    datas = process_labels(datas)
 
-    return jsonify(datas)
+@detection_blueprint.route('/detect/metrics', methods=['GET'])
+@jwt_required()
+def detect_metrics():
+    return jsonify(batch_scheduler.get_metrics())
 
 
-def convert_to_image(data):
+def convert_to_image(data, content_type=None):
     """
-    Convert string data to an image.
+    Convert uploaded data to an image.
 
     Args:
-        data (bytes): Image data in bytes.
+        data (bytes): Image data in bytes: PNG, JPEG, WebP, or a raw frame
+            with its shape header.
+        content_type (str | None): The content type of the upload.
 
     Returns:
         numpy.ndarray: Decoded image.
+
+    Raises:
+        ValueError: If the data cannot be decoded.
     """
-    npimg = np.frombuffer(data, np.uint8)
-    img = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
-    return img
+    return decode_frame(data, content_type)
 
 
 def get_prediction_result(img, model):
@@ -80,7 +165,7 @@ def compile_detection_data(result):
         result: Prediction result.
 
     Returns:
-        list: Compiled detection data.
+        list: Compiled detection data, in the order of the predictions.
     """
     datas = []
     for object_prediction in result.object_prediction_list:
@@ -91,118 +176,50 @@ def compile_detection_data(result):
     return datas
 
 
-def process_labels(datas):
-    """
-    Process detection labels to remove overlaps and contained labels.
-
-    Args:
-        datas (list): Detection data.
-
-    Returns:
-        list: Processed detection data.
-    """
-    datas = remove_overlapping_labels(datas)
-    datas = remove_completely_contained_labels(datas)
-    datas = remove_overlapping_labels(datas)
-    return datas
-
-
-def remove_overlapping_labels(datas):
+def serialise_detections(datas):
     """
-    Removes overlapping labels for Hardhat and Safety Vest categories.
+    Convert detection data to the rows of the JSON response.
 
     Args:
-        datas (list): A list of detection data in YOLO format.
+        datas (list | Detections): Detection data.
 
     Returns:
-        list: A list of detection data with overlapping labels removed.
+        list: Rows of integer box coordinates, the confidence and an
+            integer label.
     """
-    category_indices = get_category_indices(datas)
+    if not isinstance(datas, Detections):
+        return datas
+    return [
+        [int(x1), int(y1), int(x2), int(y2), confidence, int(label)]
+        for x1, y1, x2, y2, confidence, label in datas.tolist()
+    ]
 
-    to_remove = set()
-    to_remove.update(
-        find_overlaps(
-            category_indices['hardhat'],
-            category_indices['no_hardhat'],
-            datas,
-            0.8,
-        ),
-    )
-    to_remove.update(
-        find_overlaps(
-            category_indices['safety_vest'],
-            category_indices['no_safety_vest'],
-            datas,
-            0.8,
-        ),
-    )
-
-    for index in sorted(to_remove, reverse=True):
-        datas.pop(index)
-
-    gc.collect()
-    return datas
 
-
-def get_category_indices(datas):
-    """
-    Get indices of different categories in the detection data.
-
-    Args:
-        datas (list): A list of detection data in YOLO format.
-
-    Returns:
-        dict: Indices of Hardhat, NO-Hardhat, Safety Vest,
-            and NO-Safety Vest detections.
-    """
-    return {
-        'hardhat': [i for i, d in enumerate(datas) if d[5] == 0],
-        'no_hardhat': [i for i, d in enumerate(datas) if d[5] == 2],
-        'safety_vest': [i for i, d in enumerate(datas) if d[5] == 7],
-        'no_safety_vest': [i for i, d in enumerate(datas) if d[5] == 4],
-    }
-
-
-def find_overlaps(indices1, indices2, datas, threshold):
+def process_labels(datas):
     """
-    Find overlapping labels between two sets of indices.
+    Process detection labels to remove overlaps and contained labels.
 
     Args:
-        indices1 (list): First set of indices.
-        indices2 (list): Second set of indices.
-        datas (list): Detection data.
-        threshold (float): Overlap threshold.
+        datas (list | Detections): Detection data.
 
     Returns:
-        set: Indices of overlapping labels to remove.
+        list | Detections: Processed detection data.
     """
-    to_remove = set()
-    for index1 in indices1:
-        to_remove.update(
-            find_overlapping_indices(
-                index1, indices2, datas, threshold,
-            ),
-        )
-    return to_remove
+    return label_filter.filter_labels(datas)
 
 
-def find_overlapping_indices(index1, indices2, datas, threshold):
+def remove_overlapping_labels(datas):
     """
-    Find overlapping indices for a given index.
+    Removes overlapping labels for Hardhat and Safety Vest categories.
 
     Args:
-        index1 (int): The index to check for overlaps.
-        indices2 (list): The list of indices to check against.
-        datas (list): Detection data.
-        threshold (float): Overlap threshold.
+        datas (list | Detections): Detection data in YOLO format.
 
     Returns:
-        set: Indices of overlapping labels to remove.
+        list | Detections: Detection data with overlapping labels removed,
+            in the same container type as the input.
     """
-    return {
-        index2 for index2 in indices2
-        if calculate_overlap(datas[index1][:4], datas[index2][:4]) > threshold
-    }
+    return label_filter.remove_overlapping_labels(datas)
 
 
 def calculate_overlap(bbox1, bbox2):
@@ -223,7 +240,6 @@ def calculate_overlap(bbox1, bbox2):
 
     overlap_percentage = intersection_area / \
         float(bbox1_area + bbox2_area - intersection_area)
-    gc.collect()
     return overlap_percentage
 
 
@@ -285,69 +301,13 @@ def remove_completely_contained_labels(datas):
     Removes completely contained labels for Hardhat and Safety Vest categories.
 
     Args:
-        datas (list): A list of detection data in YOLO format.
+        datas (list | Detections): Detection data in YOLO format.
 
     Returns:
-        list: Detection data with fully contained labels removed.
+        list | Detections: Detection data with fully contained labels
+            removed, in the same container type as the input.
     """
-    category_indices = get_category_indices(datas)
-
-    to_remove = set()
-    to_remove.update(
-        find_contained_labels(
-            category_indices['hardhat'],
-            category_indices['no_hardhat'],
-            datas,
-        ),
-    )
-    to_remove.update(
-        find_contained_labels(
-            category_indices['safety_vest'],
-            category_indices['no_safety_vest'],
-            datas,
-        ),
-    )
-
-    for index in sorted(to_remove, reverse=True):
-        datas.pop(index)
-
-    return datas
-
-
-def find_contained_labels(indices1, indices2, datas):
-    """
-    Find completely contained labels between two sets of indices.
-
-    Args:
-        indices1 (list): First set of indices.
-        indices2 (list): Second set of indices.
-        datas (list): Detection data.
-
-    Returns:
-        set: Indices of completely contained labels to remove.
-    """
-    to_remove = set()
-    for index1 in indices1:
-        to_remove.update(find_contained_indices(index1, indices2, datas))
-    return to_remove
-
-
-def find_contained_indices(index1, indices2, datas):
-    """
-    Find contained indices for a given index.
-
-    Args:
-        index1 (int): The index to check for containment.
-        indices2 (list): The list of indices to check against.
-        datas (list): Detection data.
-
-    Returns:
-        set: Indices of completely contained labels to remove.
-    """
-    to_remove = set()
-    for index2 in indices2:
-        to_remove.update(check_containment(index1, index2, datas))
-    return to_remove
+    return label_filter.remove_completely_contained_labels(datas)
 
 
 def check_containment(index1, index2, datas):
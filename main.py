@@ -3,29 +3,69 @@ from __future__ import annotations
 import argparse
 import asyncio
 import gc
+import importlib
 import logging
+import math
 import os
 import time
 from datetime import datetime
+from multiprocessing import Pipe
 from multiprocessing import Process
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING
 from typing import TypedDict
 
 import anyio
-import cv2
 import yaml
 from dotenv import load_dotenv
-from watchdog.observers import Observer
 
-from src.danger_detector import DangerDetector
-from src.drawing_manager import DrawingManager
-from src.lang_config import Translator
-from src.live_stream_detection import LiveStreamDetector
+from src.cone_clustering import CLUSTERING_BACKENDS
+from src.memory_policy import MemoryPolicy
 from src.monitor_logger import LoggerConfig
-from src.notifiers.line_notifier import LineNotifier
-from src.stream_capture import StreamCapture
 from src.utils import FileEventHandler
 from src.utils import RedisManager
 from src.utils import Utils
+from src.worker_pool import WarmWorkerPool
+
+# Detection, capture and drawing modules pull in SAHI, torch, scikit-learn,
+# SciPy, shapely, streamlink and OpenCV. They are imported where they are
+# used, so the CLI starts quickly and only stream processes load them.
+if TYPE_CHECKING:
+    from sahi import AutoDetectionModel
+
+    from src.inference_service import InferenceClient
+    from src.inference_service import InferenceService
+    from src.live_stream_detection import LiveStreamDetector
+    from src.notification_aggregator import NotificationAggregator
+    from src.notification_aggregator import WarningEvent
+    from src.notifiers.dispatcher import NotificationDispatcher
+    from src.stream_capture import StreamCapture
+
+# Modules a warm worker imports before its first stream
+STREAM_MODULES = (
+    'cv2',
+    'src.cone_clustering',
+    'src.danger_detector',
+    'src.drawing_manager',
+    'src.lang_config',
+    'src.live_stream_detection',
+    'src.multi_stream_capture',
+    'src.notifiers.line_notifier',
+    'src.stream_capture',
+    'src.zone_tracker',
+)
+
+# Fields a running stream picks up from a reloaded configuration
+IN_PLACE_FIELDS = ('stream_name', 'notifications')
+
+# Fields a stream is set up with, which restart it when they change
+RESTART_FIELDS = (
+    'video_url',
+    'model_key',
+    'site',
+    'detect_with_server',
+    'cone_clustering',
+)
 
 # Load environment variables
 load_dotenv()
@@ -47,28 +87,179 @@ class AppConfig(TypedDict, total=False):
     stream_name: str
     notifications: dict[str, str] | None
     detect_with_server: bool
+    cone_clustering: str
     expire_date: str | None
     line_token: str | None
     language: str | None
 
 
+def get_notifications(config: AppConfig) -> dict[str, str] | None:
+    """
+    Reads the notification tokens of a stream, in the `notifications`
+    format or the older `line_token` and `language` one.
+
+    Args:
+        config (AppConfig): The configuration of the stream.
+
+    Returns:
+        dict[str, str] | None: Languages by token, or None if the stream
+            has no notifications.
+    """
+    # Check if 'notifications' field exists (new format)
+    if config.get('notifications') is not None:
+        return config['notifications']
+    # Otherwise, handle the old format
+    line_token = config.get('line_token')
+    language = config.get('language')
+    if line_token is not None and language is not None:
+        return {line_token: language}
+    return None
+
+
+def normalise_config(config: AppConfig) -> dict:
+    """
+    Reads the fields of a stream configuration that a running stream
+    depends on, filling in their defaults.
+
+    Args:
+        config (AppConfig): The configuration of the stream.
+
+    Returns:
+        dict: The values of `RESTART_FIELDS` and `IN_PLACE_FIELDS`.
+    """
+    return {
+        'video_url': config['video_url'],
+        'model_key': config['model_key'],
+        'site': config['site'],
+        'stream_name': config.get('stream_name', 'prediction_visual'),
+        'notifications': get_notifications(config),
+        'detect_with_server': config.get('detect_with_server', False),
+        'cone_clustering': config.get('cone_clustering', 'hdbscan'),
+    }
+
+
+def classify_config_changes(
+    old_config: AppConfig,
+    new_config: AppConfig,
+) -> tuple[list[str], list[str]]:
+    """
+    Compares two configurations of a stream.
+
+    Args:
+        old_config (AppConfig): The configuration the stream runs with.
+        new_config (AppConfig): The reloaded configuration.
+
+    Returns:
+        tuple[list[str], list[str]]: The changed fields that need a
+            restart, and those a running stream can apply in place.
+    """
+    old = normalise_config(old_config)
+    new = normalise_config(new_config)
+    changed = [field for field in old if old[field] != new[field]]
+    return (
+        [field for field in changed if field in RESTART_FIELDS],
+        [field for field in changed if field in IN_PLACE_FIELDS],
+    )
+
+
+def validate_configurations(configurations: object) -> list[str]:
+    """
+    Checks the stream configurations loaded from the YAML file.
+
+    Args:
+        configurations (object): The parsed YAML document.
+
+    Returns:
+        list[str]: A description of each problem found, empty if the
+            configurations are valid.
+    """
+    if not isinstance(configurations, list):
+        return ['The configuration must be a list of streams.']
+
+    errors = []
+    for index, config in enumerate(configurations):
+        if not isinstance(config, dict):
+            errors.append(f"Stream {index}: not a mapping.")
+            continue
+        for key in ('video_url', 'model_key', 'site', 'detect_with_server'):
+            if key not in config:
+                errors.append(f"Stream {index}: missing '{key}'.")
+        if 'notifications' not in config and not (
+            'line_token' in config and 'language' in config
+        ):
+            errors.append(f"Stream {index}: missing 'notifications'.")
+        cone_clustering = config.get('cone_clustering', 'hdbscan')
+        if cone_clustering not in CLUSTERING_BACKENDS:
+            errors.append(
+                f"Stream {index}: unsupported cone_clustering "
+                f"'{cone_clustering}'.",
+            )
+    return errors
+
+
 class MainApp:
     """
     Main application class for managing multiple video streams.
     """
 
-    def __init__(self, config_file: str):
+    def __init__(
+        self,
+        config_file: str,
+        inference_workers: int = 0,
+        streams_per_process: int = 1,
+        warm_workers: int = 0,
+        notification_window: float = 300.0,
+    ):
         """
         Initialise the MainApp class.
 
         Args:
             config_file (str): The path to the YAML configuration file.
+            inference_workers (int): Number of shared inference worker
+                processes. With 0, each stream process loads its own model.
+            streams_per_process (int): Number of streams each process
+                captures and processes in one event loop.
+            warm_workers (int): Number of idle pre-forked workers, with
+                modules imported and models loaded, kept ready to take
+                new or changed streams. With 0, each stream starts in a
+                new process.
+            notification_window (float): Seconds the warnings of every
+                stream are coalesced for, per LINE token and site.
         """
         self.config_file = config_file
+        self.streams_per_process = streams_per_process
         self.running_processes: dict[str, dict] = {}
         self.current_config_hashes: dict[str, str] = {}
         self.lock = anyio.Lock()
         self.logger = LoggerConfig().get_logger()
+        self.memory_policy = MemoryPolicy()
+        # Models loaded in this process, kept for the next stream of a
+        # warm worker
+        self.models: dict[str, AutoDetectionModel] = {}
+        self.warm_model_keys: list[str] = []
+        # Configurations of the streams run by this process, by URL,
+        # updated in place by config reloads
+        self.stream_configs: dict[str, AppConfig] = {}
+        # Sends the notifications of the streams run by this process
+        self.notification_dispatcher: NotificationDispatcher | None = None
+        # Coalesces the warnings of every stream process, started with
+        # the streams
+        self.notification_window = notification_window
+        self.notification_aggregator: NotificationAggregator | None = None
+        self.inference_service: InferenceService | None = None
+        if inference_workers > 0:
+            from src import inference_service
+            self.inference_service = inference_service.InferenceService(
+                num_workers=inference_workers,
+            )
+        self.worker_pool: WarmWorkerPool | None = None
+        if warm_workers > 0:
+            self.worker_pool = WarmWorkerPool(
+                self.process_assignment,
+                warm_up=self.warm_up_worker,
+                update=self.apply_config_update,
+                size=warm_workers,
+            )
 
     def compute_config_hash(self, config: dict) -> str:
         """
@@ -80,16 +271,60 @@ class MainApp:
         Returns:
             str: A hash representing the configuration.
         """
-        relevant_config = {
-            'video_url': config['video_url'],
-            'model_key': config['model_key'],
-            'site': config['site'],
-            'stream_name': config.get('stream_name', 'prediction_visual'),
-            'notifications': config['notifications'],
-            'detect_with_server': config['detect_with_server'],
-        }
+        relevant_config = normalise_config(config)
         return str(relevant_config)  # Convert to string for hashing
 
+    def update_warm_model_keys(self, configurations: list[AppConfig]) -> None:
+        """
+        Sets the models that warm workers forked from now on load before
+        their first stream: those of streams detecting locally, unless the
+        inference service loads them instead.
+
+        Args:
+            configurations (list[AppConfig]): The stream configurations.
+        """
+        if self.inference_service is not None:
+            return
+        self.warm_model_keys = sorted({
+            config['model_key'] for config in configurations
+            if not config.get('detect_with_server', False)
+        })
+
+    def warm_up_label_sprites(self, configurations: list[AppConfig]) -> None:
+        """
+        Rasterises the detection labels in every notification language,
+        so that stream processes forked from now on inherit them.
+
+        Args:
+            configurations (list[AppConfig]): The stream configurations.
+        """
+        from src.drawing_manager import DrawingManager
+
+        # Frames without notifications are drawn in English
+        languages = {'en'}
+        for config in configurations:
+            languages.update((get_notifications(config) or {}).values())
+        DrawingManager().warm_up(sorted(languages))
+
+    def warm_up_worker(self) -> None:
+        """
+        Prepares a warm worker before its first stream: imports the stream
+        modules and loads the models of `warm_model_keys`.
+        """
+        for module in STREAM_MODULES:
+            importlib.import_module(module)
+
+        from src.live_stream_detection import load_model
+
+        for model_key in self.warm_model_keys:
+            try:
+                self.models[model_key] = load_model(model_key)
+            except Exception as e:
+                # The stream loads it on its first frame instead
+                self.logger.error(f"Failed to preload {model_key}: {e}")
+        if self.models:
+            self.memory_policy.freeze()
+
     async def reload_configurations(self):
         """
         Reload the configurations from the YAML file.
@@ -100,6 +335,8 @@ class MainApp:
         current_configs = {
             config['video_url']: config for config in configurations
         }
+        self.update_warm_model_keys(configurations)
+        self.warm_up_label_sprites(configurations)
 
         async with self.lock:
             # Track keys that exist in the current config
@@ -112,8 +349,7 @@ class MainApp:
             }
 
             # Stop processes for removed or updated configurations
-            for video_url in list(self.running_processes.keys()):
-                config_data = self.running_processes[video_url]
+            for video_url, config_data in list(self.running_processes.items()):
                 config = current_configs.get(video_url)
 
                 # Get the key to be deleted
@@ -127,8 +363,9 @@ class MainApp:
                 # Stop the process if the configuration is removed
                 if not config or Utils.is_expired(config.get('expire_date')):
                     self.logger.info(f"Stop workflow: {video_url}")
-                    self.stop_process(config_data['process'])
-                    del self.running_processes[video_url]
+                    # The stream may have been stopped along with its group
+                    if video_url in self.running_processes:
+                        self.stop_workflow(video_url)
                     del self.current_config_hashes[video_url]
 
                     # Delete old key in Redis
@@ -137,17 +374,33 @@ class MainApp:
                         await redis_manager.delete(key_to_delete)
                         self.logger.info(f"Deleted Redis key: {key_to_delete}")
 
-                # Restart the process if the configuration is updated
+                # Update the stream in place, or restart its process, if
+                # the configuration is updated
                 elif self.compute_config_hash(config) != (
                     self.current_config_hashes.get(
                         video_url,
                     )
                 ):
-                    self.logger.info(
-                        f"Config changed for {video_url}. "
-                        'Restarting workflow.',
+                    restart_fields, in_place_fields = (
+                        classify_config_changes(config_data['config'], config)
                     )
-                    self.stop_process(config_data['process'])
+                    if (
+                        not restart_fields
+                        and video_url in self.running_processes
+                        and self.update_workflow(video_url, config)
+                    ):
+                        self.logger.info(
+                            f"Config changed for {video_url}: "
+                            f"{', '.join(in_place_fields)}. "
+                            'Updated in place.',
+                        )
+                    else:
+                        self.logger.info(
+                            f"Config changed for {video_url}. "
+                            'Restarting workflow.',
+                        )
+                        if video_url in self.running_processes:
+                            self.stop_workflow(video_url)
 
                     # Delete old key in Redis
                     # if it no longer exists in the config
@@ -155,18 +408,8 @@ class MainApp:
                         await redis_manager.delete(key_to_delete)
                         self.logger.info(f"Deleted Redis key: {key_to_delete}")
 
-                    # Start the new process
-                    self.running_processes[video_url] = {
-                        'process': self.start_process(config),
-                        'config': config,
-                    }
-                    self.current_config_hashes[video_url] = (
-                        self.compute_config_hash(
-                            config,
-                        )
-                    )
-
-            # Start processes for new configurations
+            # Start processes for new, updated and regrouped configurations
+            pending_configs: list[AppConfig] = []
             for video_url, config in current_configs.items():
                 if Utils.is_expired(config.get('expire_date')):
                     self.logger.info(
@@ -175,16 +418,21 @@ class MainApp:
                     continue
 
                 if video_url not in self.running_processes:
-                    self.logger.info(f"Launch new workflow: {video_url}")
-                    self.running_processes[video_url] = {
-                        'process': self.start_process(config),
-                        'config': config,
-                    }
-                    self.current_config_hashes[video_url] = (
-                        self.compute_config_hash(
-                            config,
-                        )
-                    )
+                    if video_url not in self.current_config_hashes:
+                        self.logger.info(f"Launch new workflow: {video_url}")
+                    pending_configs.append(config)
+
+            for i in range(0, len(pending_configs), self.streams_per_process):
+                self.start_workflow(
+                    pending_configs[i:i + self.streams_per_process],
+                )
+
+            if self.worker_pool is not None:
+                pool_metrics = self.worker_pool.get_metrics()
+                self.logger.info(
+                    f"Warm workers: {pool_metrics['workers']}, "
+                    f"idle: {pool_metrics['idle']}",
+                )
 
     async def run_multiple_streams(self) -> None:
         """
@@ -196,10 +444,32 @@ class MainApp:
         Returns:
             None
         """
+        # Start the shared inference workers before any stream process
+        if self.inference_service is not None:
+            self.inference_service.start()
+
+        # Stream processes forked from here on inherit the aggregator's
+        # queue, so their warnings are coalesced across streams
+        from src.notification_aggregator import NotificationAggregator
+        self.notification_aggregator = NotificationAggregator(
+            window=self.notification_window,
+        )
+        self.notification_aggregator.start()
+
+        # Fork the warm workers after the inference service, so they
+        # inherit its queues, and after the label sprites are drawn
+        if self.worker_pool is not None:
+            with open(self.config_file, encoding='utf-8') as file:
+                configurations = yaml.safe_load(file)
+            self.update_warm_model_keys(configurations)
+            self.warm_up_label_sprites(configurations)
+            self.worker_pool.start()
+
         # Initial load of configurations
         await self.reload_configurations()
 
         # Set up watchdog observer
+        from watchdog.observers import Observer
         event_handler = FileEventHandler(
             self.config_file, self.reload_configurations,
         )
@@ -218,6 +488,12 @@ class MainApp:
             observer.stop()
         observer.join()
 
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+        if self.inference_service is not None:
+            self.inference_service.stop()
+        self.notification_aggregator.stop()
+
     async def process_single_stream(
         self,
         logger: logging.Logger,
@@ -227,6 +503,10 @@ class MainApp:
         stream_name: str = 'prediction_visual',
         notifications: dict[str, str] | None = None,
         detect_with_server: bool = False,
+        cone_clustering: str = 'hdbscan',
+        inference_client: InferenceClient | None = None,
+        stream_capture: StreamCapture | None = None,
+        live_stream_detector: LiveStreamDetector | None = None,
     ) -> None:
         """
         Function to detect hazards, notify, log, save images (optional).
@@ -239,42 +519,107 @@ class MainApp:
                 Defaults to 'demo_data/{site}/prediction_visual.png'.
             notifications (Optional[dict]): Line tokens with their languages.
             detect_with_server (bool): If run detection with server api or not.
+            cone_clustering (str): The backend grouping safety cones into
+                controlled areas, 'hdbscan' or 'radius'.
+            inference_client (InferenceClient | None): Client of the shared
+                inference service, used instead of a per-process model.
+            stream_capture (StreamCapture | None): The capture object, when
+                the stream shares its process with others.
+            live_stream_detector (LiveStreamDetector | None): The detector,
+                when the caller closes it.
         """
+        from src.cone_clustering import create_clusterer
+        from src.danger_detector import DangerDetector
+        from src.drawing_manager import DrawingManager
+        from src.drawing_manager import FrameRenderCache
+        from src.lang_config import Translator
+        from src.live_stream_detection import LiveStreamDetector
+        from src.notification_aggregator import NotificationAggregator
+        from src.notifiers.dispatcher import NotificationDispatcher
+        from src.notifiers.line_notifier import LineNotifier
+        from src.stream_capture import StreamCapture
+        from src.zone_tracker import ZoneTracker
+
         # Initialise the stream capture object
-        streaming_capture = StreamCapture(stream_url=video_url)
+        streaming_capture = stream_capture or StreamCapture(
+            stream_url=video_url, background_decoding=True,
+        )
 
         # Get the API URL from environment variables
         api_url = os.getenv('API_URL', 'http://localhost:5000')
 
         # Initialise the live stream detector
-        live_stream_detector = LiveStreamDetector(
+        live_stream_detector = live_stream_detector or LiveStreamDetector(
             api_url=api_url,
             model_key=model_key,
             output_folder=site,
             detect_with_server=detect_with_server,
+            inference_client=inference_client,
+            model=self.models.get(model_key),
         )
 
-        # Initialise the drawing manager
+        # Initialise the drawing manager, rendering each frame once per
+        # language
         drawing_manager = DrawingManager()
+        render_cache = FrameRenderCache(drawing_manager)
+
+        # Coalesce warnings in the aggregator shared by all streams, or
+        # in one of the stream's own, sending its digests here
+        aggregator = self.notification_aggregator
+        owns_aggregator = aggregator is None
+        dispatcher = None
+        owns_dispatcher = False
+        if owns_aggregator:
+            aggregator = NotificationAggregator(
+                window=self.notification_window,
+            )
+            # Send LINE notifications in the background, through the
+            # process's dispatcher if it has one
+            dispatcher = self.notification_dispatcher
+            owns_dispatcher = dispatcher is None
+            if owns_dispatcher:
+                dispatcher = NotificationDispatcher({'line': LineNotifier()})
+                await dispatcher.start()
+
+        # Initialise the DangerDetector, tracking the stream's zones
+        zone_tracker = ZoneTracker(
+            clusterer=create_clusterer(cone_clustering),
+        )
+        danger_detector = DangerDetector(
+            zone_tracker=zone_tracker, clustering=cone_clustering,
+        )
 
-        # Initialise the LINE notifier
-        line_notifier = LineNotifier()
-
-        # Initialise the DangerDetector
-        danger_detector = DangerDetector()
-
-        # Init last_notification_time to 300s ago, no microseconds
-        last_notification_time = int(time.time()) - 300
+        # The model is loaded with the first detection
+        model_loaded = False
 
         # Use the generator function to process detections
         async for frame, timestamp in streaming_capture.execute_capture():
             start_time = time.time()
+
+            # Pick up the settings a config reload changed in place
+            live_config = self.stream_configs.get(video_url)
+            if live_config is not None:
+                notifications = get_notifications(live_config)
+                new_stream_name = live_config.get(
+                    'stream_name', 'prediction_visual',
+                )
+                if new_stream_name != stream_name and not is_windows:
+                    await redis_manager.delete(f"{site}_{stream_name}")
+                stream_name = new_stream_name
+
             # Convert UNIX timestamp to datetime object and format it as string
             detection_time = datetime.fromtimestamp(timestamp)
             current_hour = detection_time.hour
 
             # Detect hazards in the frame
             datas, _ = await live_stream_detector.generate_detections(frame)
+            if not model_loaded:
+                # Keep the model's objects out of later collections; only
+                # the first stream of the process freezes
+                self.memory_policy.freeze()
+                model_loaded = True
+                if live_stream_detector.model is not None:
+                    self.models[model_key] = live_stream_detector.model
 
             # Check for warnings and send notifications if necessary
             warnings, controlled_zone_polygon = danger_detector.detect_danger(
@@ -297,10 +642,20 @@ class MainApp:
                 controlled_zone_warning_str,
             ] if controlled_zone_warning_str else []
 
-            # Track whether we sent any notification
-            last_line_token = None
+            # Draw and encode each language at most once for this frame,
+            # for its notifications and the Redis stream alike
+            render_cache.start_frame(frame, controlled_zone_polygon, datas)
+            translations: dict[str, list[str]] = {}
+
+            # The warning of each language goes to the aggregator once,
+            # with the tokens of that language
+            messages: dict[str, str | None] = {}
+            tokens_by_language: dict[str, list[str]] = {}
+
+            # Track the languages of the last token warned and the last
+            # token
+            warned_language = None
             last_language = None
-            frame_with_detections = None
 
             if not notifications:
                 logger.info('No notifications provided.')
@@ -308,33 +663,19 @@ class MainApp:
             else:
                 # Check if notifications are provided
                 for line_token, language in notifications.items():
-                    # Check if notification should be skipped
-                    # (sent within last 300 seconds)
-                    if (timestamp - last_notification_time) < 300:
-                        # Store the last token and language,
-                        # but don't send notifications
-                        last_line_token = line_token
-                        last_language = language
-                        # Skip the current notification
-                        # but remember the last one
+                    last_language = language
+                    if language in messages:
+                        if messages[language]:
+                            tokens_by_language[language].append(line_token)
+                            warned_language = language
                         continue
 
-                    # Translate the warnings
-                    translated_warnings = Translator.translate_warning(
-                        warnings, language,
-                    )
-
-                    # Draw the detections on the frame
-                    frame_with_detections = (
-                        drawing_manager.draw_detections_on_frame(
-                            frame, controlled_zone_polygon, datas,
-                            language=language,
+                    # Translate the warnings once per language
+                    if language not in translations:
+                        translations[language] = (
+                            Translator.translate_warning(warnings, language)
                         )
-                    )
-
-                    # Convert the frame to a byte array
-                    _, buffer = cv2.imencode('.png', frame_with_detections)
-                    frame_bytes = buffer.tobytes()
+                    translated_warnings = translations[language]
 
                     # If it is outside working hours and there is
                     # a warning for people in the controlled zone
@@ -362,64 +703,60 @@ class MainApp:
                     else:
                         message = None
 
+                    messages[language] = message
+
                     # If a notification needs to be sent
                     if not message:
                         logger.info(
                             'No warnings or outside notification time.',
                         )
                         continue
-
-                    notification_status = line_notifier.send_notification(
-                        message,
-                        image=frame_bytes
-                        if frame_bytes is not None
-                        else None,
-                        line_token=line_token,
+                    tokens_by_language[language] = [line_token]
+                    warned_language = language
+
+            for language, tokens in tokens_by_language.items():
+                # The warning shows its own frame, whether it is sent at
+                # once or replaces the stream's held warning
+                thumbnail = aggregator.make_thumbnail(
+                    render_cache.draw(language),
+                )
+                event: WarningEvent = {
+                    'site': site,
+                    'stream_name': stream_name,
+                    'tokens': tokens,
+                    'message': messages[language],
+                    'thumbnail': thumbnail,
+                    'timestamp': timestamp,
+                }
+                if owns_aggregator:
+                    aggregator.dispatch(
+                        dispatcher, aggregator.add(event, timestamp),
                     )
+                else:
+                    aggregator.submit(event)
 
-                    # To connect to the broadcast system, do it here:
-                    # broadcast_status = (
-                    #   broadcast_notifier.broadcast_message(message)
-                    # )
-                    # logger.info(f"Broadcast status: {broadcast_status}")
-
-                    if notification_status == 200:
-                        logger.info(
-                            f"Notification sent successfully: {message}",
-                        )
-                        last_notification_time = int(timestamp)
-                    else:
-                        logger.error(f"Failed to send notification: {message}")
-
-                    # Log the notification token and language
-                    logger.info(
-                        f"Notification sent to {line_token} in {language}.",
-                    )
+                # To connect to the broadcast system, register a
+                # BroadcastNotifier with the aggregator's notifiers and
+                # send its digests on the 'broadcast' channel too
 
-                # If no notification was sent and the time condition was met,
-                # only draw the image
-                if last_line_token and last_language:
-                    language = last_language
-
-            # Draw the detections on the frame for the last token/language
-            # (if not already drawn)
-            if frame_with_detections is None:
-                frame_with_detections = (
-                    drawing_manager.draw_detections_on_frame(
-                        frame, controlled_zone_polygon,
-                        datas,
-                        language=last_language or 'en',
-                    )
+                # Log the notification tokens and language
+                logger.info(
+                    f"Warning in {language} sent to the aggregator for "
+                    f"{', '.join(tokens)}.",
                 )
 
-            # Convert the frame to a byte array
-            _, buffer = cv2.imencode('.png', frame_with_detections)
-            frame_bytes = buffer.tobytes()
+            # Send the digests of the stream's own windows that have ended
+            if owns_aggregator:
+                aggregator.dispatch(dispatcher, aggregator.flush(timestamp))
+
+            # The frame published is in the language of the last token
+            # warned, or of the last token if none was
+            published_language = warned_language or last_language or 'en'
 
             # Save the frame with detections
             # save_file_name = f'{site}_{stream_name}_{detection_time}'
             # drawing_manager.save_frame(
-            #   frame_with_detections,
+            #   render_cache.encode(published_language),
             #   save_file_name
             # )
 
@@ -432,7 +769,9 @@ class MainApp:
                     # Store the frame in Redis Stream
                     # with a maximum length of 10
                     await redis_manager.add_to_stream(
-                        key, {'frame': frame_bytes}, maxlen=10,
+                        key,
+                        {'frame': render_cache.encode(published_language)},
+                        maxlen=10,
                     )
                 except Exception as e:
                     logger.error(f"Failed to store frame in Redis: {e}")
@@ -447,50 +786,104 @@ class MainApp:
             logger.info(f"{site} - {stream_name}")
             logger.info(f"Detection time: {detection_time}")
             logger.info(f"Processing time: {processing_time:.2f} seconds")
+            capture_metrics = streaming_capture.get_capture_metrics()
+            logger.info(
+                f"Frames grabbed: {capture_metrics['grabbed']}, "
+                f"decoded: {capture_metrics['decoded']}",
+            )
+            zone_metrics = zone_tracker.get_metrics()
+            logger.info(
+                f"Zone clusterings: {zone_metrics['clusterings']}, "
+                f"skipped: {zone_metrics['skipped']}",
+            )
+            render_metrics = render_cache.get_metrics()
+            logger.info(
+                f"Frame draws: {render_metrics['frame_draws']}, "
+                f"encodes: {render_metrics['frame_encodes']}",
+            )
+            if owns_aggregator:
+                notification_metrics = dispatcher.get_metrics()
+                logger.info(
+                    f"Notifications sent: {notification_metrics['sent']}, "
+                    f"failed: {notification_metrics['failed']}, "
+                    f"dropped: {notification_metrics['dropped']}, "
+                    f"queued: {notification_metrics['queued']}",
+                )
+            else:
+                # The aggregator's process logs what it sends
+                aggregator_metrics = aggregator.get_metrics()
+                logger.info(
+                    f"Warnings submitted: {aggregator_metrics['submitted']}, "
+                    f"dropped: {aggregator_metrics['dropped']}",
+                )
 
-            # Clear variables to free up memory
+            # Clear variables to free up memory, collecting periodically
+            # rather than on every frame
+            render_cache.clear()
             del datas, frame, timestamp, detection_time
-            del frame_with_detections, buffer, frame_bytes
-            gc.collect()
+            self.memory_policy.maybe_collect()
 
         # Release resources after processing
         await streaming_capture.release_resources()
+        await live_stream_detector.close()
+        if owns_aggregator:
+            aggregator.dispatch(dispatcher, aggregator.flush(math.inf))
+        if owns_dispatcher:
+            await dispatcher.close()
         gc.collect()
 
-    async def process_streams(self, config: AppConfig) -> None:
+    async def process_streams(
+        self,
+        config: AppConfig,
+        inference_client: InferenceClient | None = None,
+        stream_capture: StreamCapture | None = None,
+    ) -> None:
         """
         Process a video stream based on the given configuration.
 
         Args:
             config (StreamConfig): The configuration for the stream processing.
+            inference_client (InferenceClient | None): Client of the shared
+                inference service, if one is running.
+            stream_capture (StreamCapture | None): The capture object, when
+                the stream shares its process with others.
 
         Returns:
             None
         """
+        # Tune garbage collection for this stream process
+        self.memory_policy.apply()
+
+        from src.live_stream_detection import LiveStreamDetector
+
+        # Own the capture and the detector's HTTP session here, so that
+        # they are also released when a warm worker cancels the stream
+        owns_capture = stream_capture is None
+        if owns_capture:
+            from src.stream_capture import StreamCapture
+            stream_capture = StreamCapture(
+                stream_url=config.get('video_url', ''),
+                background_decoding=True,
+            )
+        model_key = config.get('model_key', 'yolo11n')
+        live_stream_detector = LiveStreamDetector(
+            api_url=os.getenv('API_URL', 'http://localhost:5000'),
+            model_key=model_key,
+            output_folder=config.get('site'),
+            detect_with_server=config.get('detect_with_server', False),
+            inference_client=inference_client,
+            model=self.models.get(model_key),
+        )
+
         try:
-            # Check if 'notifications' field exists (new format)
-            if (
-                'notifications' in config and
-                config['notifications'] is not None
-            ):
-                notifications = config['notifications']
-            # Otherwise, handle the old format
-            elif 'line_token' in config and 'language' in config:
-                line_token = config.get('line_token')
-                language = config.get('language')
-                if line_token is not None and language is not None:
-                    notifications = {line_token: language}
-                else:
-                    notifications = None
-            else:
-                notifications = None
+            notifications = get_notifications(config)
 
             # Continue processing the remaining configuration
             video_url = config.get('video_url', '')
-            model_key = config.get('model_key', 'yolo11n')
             site = config.get('site')
             stream_name = config.get('stream_name', 'prediction_visual')
             detect_with_server = config.get('detect_with_server', False)
+            cone_clustering = config.get('cone_clustering', 'hdbscan')
 
             # Run hazard detection on a single video stream
             await self.process_single_stream(
@@ -501,8 +894,17 @@ class MainApp:
                 stream_name=stream_name,
                 notifications=notifications,
                 detect_with_server=detect_with_server,
+                cone_clustering=cone_clustering,
+                inference_client=inference_client,
+                stream_capture=stream_capture,
+                live_stream_detector=live_stream_detector,
             )
         finally:
+            if owns_capture:
+                await stream_capture.release_resources()
+            await live_stream_detector.close()
+            # The stream's name may have been updated in place
+            config = self.stream_configs.get(config.get('video_url'), config)
             if not is_windows:
                 site = config.get('site')
                 stream_name = config.get('stream_name', 'prediction_visual')
@@ -510,32 +912,303 @@ class MainApp:
                 await redis_manager.delete(key)
                 self.logger.info(f"Deleted Redis key: {key}")
 
-    def start_process(self, config: AppConfig) -> Process:
+    async def process_stream_group(
+        self,
+        configs: list[AppConfig],
+        inference_clients: list[InferenceClient | None],
+    ) -> None:
         """
-        Start a new process for processing a video stream.
+        Process several video streams in one event loop, sharing a pool of
+        capture threads. A failing stream is restarted on its own.
 
         Args:
-            config (StreamConfig): The configuration for the stream processing.
+            configs (list[AppConfig]): The configurations of the streams.
+            inference_clients (list[InferenceClient | None]): Clients of the
+                shared inference service, by stream.
+        """
+        from src.multi_stream_capture import MultiStreamCapture
+
+        multi_capture = MultiStreamCapture()
+        for config, inference_client in zip(configs, inference_clients):
+            multi_capture.add_stream(
+                config['video_url'],
+                config['video_url'],
+                lambda capture, config=config, client=inference_client: (
+                    self.process_streams(config, client, capture)
+                ),
+            )
+        await multi_capture.run()
+
+    async def process_assignment(
+        self,
+        configs: list[AppConfig],
+        client_ids: list[int | None],
+    ) -> None:
+        """
+        Process a group of video streams assigned to a warm worker.
+
+        Args:
+            configs (list[AppConfig]): The configurations of the streams.
+            client_ids (list[int | None]): The ID of each stream's
+                inference client, if the inference service is running.
+        """
+        inference_clients = [
+            self.inference_service.attach_client(client_id)
+            if client_id is not None and self.inference_service
+            else None
+            for client_id in client_ids
+        ]
+        await self.run_workflow(configs, inference_clients)
+
+    async def run_workflow(
+        self,
+        configs: list[AppConfig],
+        inference_clients: list[InferenceClient | None],
+        updates: Connection | None = None,
+    ) -> None:
+        """
+        Process a group of video streams in this process, applying the
+        configuration updates sent by the main process.
+
+        Args:
+            configs (list[AppConfig]): The configurations of the streams.
+            inference_clients (list[InferenceClient | None]): Clients of the
+                shared inference service, by stream.
+            updates (Connection | None): The receiving end of a pipe of
+                configuration updates. Warm workers receive theirs on the
+                pool's control queue instead.
+        """
+        self.stream_configs = {
+            config['video_url']: config for config in configs
+        }
+        if updates is not None:
+            self.listen_for_config_updates(updates)
+
+        # Streams sending their warnings to the shared aggregator leave
+        # notifying to its process
+        if self.notification_aggregator is not None:
+            await self.process_configs(configs, inference_clients)
+            return
+
+        from src.notifiers.dispatcher import NotificationDispatcher
+        from src.notifiers.line_notifier import LineNotifier
+
+        # The streams share one outbox and HTTP session for notifications
+        async with NotificationDispatcher(
+            {'line': LineNotifier()},
+        ) as dispatcher:
+            self.notification_dispatcher = dispatcher
+            try:
+                await self.process_configs(configs, inference_clients)
+            finally:
+                self.notification_dispatcher = None
+
+    async def process_configs(
+        self,
+        configs: list[AppConfig],
+        inference_clients: list[InferenceClient | None],
+    ) -> None:
+        """
+        Process one video stream, or a group of them sharing a capture.
+
+        Args:
+            configs (list[AppConfig]): The configurations of the streams.
+            inference_clients (list[InferenceClient | None]): Clients of the
+                shared inference service, by stream.
+        """
+        if len(configs) == 1:
+            await self.process_streams(configs[0], inference_clients[0])
+        else:
+            await self.process_stream_group(configs, inference_clients)
+
+    def listen_for_config_updates(self, updates: Connection) -> None:
+        """
+        Applies configuration updates as they arrive on a pipe, from the
+        running event loop.
+
+        Args:
+            updates (Connection): The receiving end of the pipe.
+        """
+        loop = asyncio.get_running_loop()
+
+        def receive() -> None:
+            try:
+                config = updates.recv()
+            except EOFError:
+                # The main process has closed its end
+                loop.remove_reader(updates.fileno())
+                return
+            self.apply_config_update(config)
+
+        loop.add_reader(updates.fileno(), receive)
+
+    def apply_config_update(self, config: AppConfig) -> None:
+        """
+        Updates the configuration of a stream run by this process. The
+        stream applies the settings of `IN_PLACE_FIELDS` from its next
+        frame on.
+
+        Args:
+            config (AppConfig): The updated configuration.
+        """
+        video_url = config['video_url']
+        if video_url in self.stream_configs:
+            self.stream_configs[video_url] = config
+            self.logger.info(f"Applied config update for {video_url}")
+
+    def update_workflow(self, video_url: str, config: AppConfig) -> bool:
+        """
+        Sends a configuration update to the process of a running stream.
+
+        Args:
+            video_url (str): The URL of the stream.
+            config (AppConfig): The updated configuration, differing from
+                the running one in `IN_PLACE_FIELDS` only.
+
+        Returns:
+            bool: Whether the update was sent. If not, the stream has to
+                be restarted instead.
+        """
+        config_data = self.running_processes[video_url]
+        process = config_data['process']
+        if not process.is_alive():
+            return False
+        if self.worker_pool is not None:
+            if not self.worker_pool.send(process, config):
+                return False
+        elif config_data['updates'] is not None:
+            try:
+                config_data['updates'].send(config)
+            except OSError as e:
+                self.logger.error(f"Failed to update {video_url}: {e}")
+                return False
+        else:
+            return False
+
+        config_data['config'] = config
+        self.current_config_hashes[video_url] = self.compute_config_hash(
+            config,
+        )
+        return True
+
+    def start_workflow(self, configs: list[AppConfig]) -> None:
+        """
+        Start the process for a group of video streams, with a client of
+        the shared inference service per stream if one is running.
+
+        Args:
+            configs (list[AppConfig]): The configurations of the streams.
+        """
+        inference_clients = [
+            self.inference_service.create_client()
+            if self.inference_service is not None
+            else None
+            for _ in configs
+        ]
+        updates = None
+        if self.worker_pool is not None:
+            process = self.worker_pool.assign(
+                configs,
+                [
+                    client.client_id if client is not None else None
+                    for client in inference_clients
+                ],
+            )
+        elif is_windows:
+            # The event loop of Windows cannot watch pipes, so changes
+            # restart the process
+            process = self.start_process(configs, inference_clients)
+        else:
+            receiver, updates = Pipe(duplex=False)
+            process = self.start_process(configs, inference_clients, receiver)
+            receiver.close()
+
+        for config, inference_client in zip(configs, inference_clients):
+            self.running_processes[config['video_url']] = {
+                'process': process,
+                'config': config,
+                'inference_client': inference_client,
+                'updates': updates,
+            }
+            self.current_config_hashes[config['video_url']] = (
+                self.compute_config_hash(config)
+            )
+
+    def stop_workflow(self, video_url: str) -> None:
+        """
+        Stop the process of a video stream. Other streams in the same
+        process are stopped too, and started again on the next reload step.
+
+        Args:
+            video_url (str): The URL of the stream to stop.
+        """
+        process = self.running_processes[video_url]['process']
+        group = [
+            url for url, config_data in self.running_processes.items()
+            if config_data['process'] is process
+        ]
+        entries = [self.running_processes.pop(url) for url in group]
+        for url in group:
+            if url != video_url:
+                self.logger.info(f"Restart workflow with its group: {url}")
+
+        self.stop_process(process, entries[0].get('inference_client'))
+        for config_data in entries[1:]:
+            self.stop_process(process, config_data.get('inference_client'))
+        if entries[0].get('updates') is not None:
+            entries[0]['updates'].close()
+
+    def start_process(
+        self,
+        configs: list[AppConfig],
+        inference_clients: list[InferenceClient | None],
+        updates: Connection | None = None,
+    ) -> Process:
+        """
+        Start a new process for processing a group of video streams.
+
+        Args:
+            configs (list[AppConfig]): The configurations of the streams.
+            inference_clients (list[InferenceClient | None]): Clients of the
+                shared inference service, by stream.
+            updates (Connection | None): The receiving end of a pipe of
+                configuration updates for the process.
 
         Returns:
             Process: The newly started process.
         """
-        p = Process(target=lambda: asyncio.run(self.process_streams(config)))
+        p = Process(
+            target=lambda: asyncio.run(
+                self.run_workflow(configs, inference_clients, updates),
+            ),
+        )
         p.start()
         return p
 
-    def stop_process(self, process: Process) -> None:
+    def stop_process(
+        self,
+        process: Process,
+        inference_client: InferenceClient | None = None,
+    ) -> None:
         """
-        Stop a running process.
+        Stop a running process, or the stream of a warm worker, which then
+        goes back to the pool.
 
         Args:
             process (Process): The process to be terminated.
+            inference_client (InferenceClient | None): The process's client
+                of the shared inference service, released once it stops.
 
         Returns:
             None
         """
-        process.terminate()
-        process.join()
+        if self.worker_pool is not None:
+            self.worker_pool.release(process)
+        else:
+            process.terminate()
+            process.join()
+        if inference_client is not None and self.inference_service:
+            self.inference_service.release_client(inference_client)
 
 
 async def process_single_image(
@@ -558,6 +1231,11 @@ async def process_single_image(
     Returns:
         None
     """
+    import cv2
+
+    from src.drawing_manager import DrawingManager
+    from src.live_stream_detection import LiveStreamDetector
+
     try:
         # Check if the image path exists
         if not os.path.exists(image_path):
@@ -582,7 +1260,10 @@ async def process_single_image(
         drawing_manager = DrawingManager()
 
         # Detect hazards in the image
-        detections, _ = await live_stream_detector.generate_detections(image)
+        async with live_stream_detector:
+            detections, _ = await live_stream_detector.generate_detections(
+                image,
+            )
 
         # For this example, no polygons are needed, so pass an empty list
         frame_with_detections = drawing_manager.draw_detections_on_frame(
@@ -620,6 +1301,11 @@ async def main():
         default='config/configuration.yaml',
         help='Configuration file path for stream processing',
     )
+    parser.add_argument(
+        '--check_config',
+        action='store_true',
+        help='Validate the configuration file and exit',
+    )
     parser.add_argument(
         '--image',
         type=str,
@@ -643,8 +1329,51 @@ async def main():
         default='en',
         help='Language for labels on the output image',
     )
+    parser.add_argument(
+        '--streams_per_process',
+        type=int,
+        default=1,
+        help='Number of streams captured and processed in each process',
+    )
+    parser.add_argument(
+        '--inference_workers',
+        type=int,
+        default=0,
+        help=(
+            'Number of shared inference worker processes; 0 loads a model '
+            'in every stream process'
+        ),
+    )
+    parser.add_argument(
+        '--notification_window',
+        type=float,
+        default=300,
+        help=(
+            'Seconds the warnings of all streams are coalesced for, per '
+            'LINE token and site'
+        ),
+    )
+    parser.add_argument(
+        '--warm_workers',
+        type=int,
+        default=0,
+        help=(
+            'Number of idle pre-forked workers with models loaded, which '
+            'take new and changed streams without a cold start'
+        ),
+    )
     args = parser.parse_args()
 
+    # Only validate the configuration file
+    if args.check_config:
+        with open(args.config, encoding='utf-8') as file:
+            errors = validate_configurations(yaml.safe_load(file))
+        for error in errors:
+            print(error)
+        if not errors:
+            print(f"{args.config} is valid.")
+        return
+
     # If an image path is provided, process the single image
     if args.image:
         await process_single_image(
@@ -655,7 +1384,13 @@ async def main():
         )
     else:
         # Otherwise, run hazard detection on multiple video streams
-        app = MainApp(args.config)
+        app = MainApp(
+            args.config,
+            inference_workers=args.inference_workers,
+            streams_per_process=args.streams_per_process,
+            warm_workers=args.warm_workers,
+            notification_window=args.notification_window,
+        )
         await app.run_multiple_streams()
 
 
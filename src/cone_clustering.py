@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Names accepted for the `cone_clustering` setting of a stream
+CLUSTERING_BACKENDS = ('hdbscan', 'radius')
+
+
+class RadiusGraphClustering:
+    """
+    Single-linkage clustering of cone centres on a radius graph.
+
+    Cones closer than the radius are linked through a KD-tree and every
+    connected component of the graph is a cluster. Without a fixed radius,
+    the radius scales with the median distance from each cone to its
+    nearest neighbour, so it follows the apparent cone spacing of the
+    camera like the density-based HDBSCAN does.
+    """
+
+    def __init__(
+        self,
+        radius: float | None = None,
+        radius_factor: float = 3.0,
+        min_cluster_size: int = 3,
+    ):
+        """
+        Initialises the RadiusGraphClustering.
+
+        Args:
+            radius (float | None): Linking distance in pixels. Defaults to
+                `radius_factor` times the median nearest-neighbour distance.
+            radius_factor (float): Multiple of the median nearest-neighbour
+                distance used when no radius is given.
+            min_cluster_size (int): Components with fewer cones are labelled
+                as noise.
+        """
+        self.radius = radius
+        self.radius_factor = radius_factor
+        self.min_cluster_size = min_cluster_size
+
+    def fit_predict(self, points: np.ndarray) -> np.ndarray:
+        """
+        Clusters the points.
+
+        Args:
+            points (np.ndarray): An (N, 2) array of cone centres.
+
+        Returns:
+            np.ndarray: The cluster label of each point, -1 for noise.
+                Labels are numbered in order of first appearance.
+        """
+        # Imported here, so reading the backend names stays cheap
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import cKDTree
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) < 2:
+            return np.full(len(points), -1)
+
+        tree = cKDTree(points)
+        radius = self.radius
+        if radius is None:
+            distances, _ = tree.query(points, k=2)
+            radius = self.radius_factor * np.median(distances[:, 1])
+
+        pairs = tree.query_pairs(radius, output_type='ndarray')
+        graph = coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])),
+            shape=(len(points), len(points)),
+        )
+        _, components = connected_components(graph, directed=False)
+
+        # Renumber large enough components by first appearance
+        sizes = np.bincount(components)
+        labels = np.full(len(points), -1)
+        next_label = 0
+        for component in dict.fromkeys(components.tolist()):
+            if sizes[component] >= self.min_cluster_size:
+                labels[components == component] = next_label
+                next_label += 1
+        return labels
+
+
+def create_clusterer(backend: str = 'hdbscan', **kwargs):
+    """
+    Creates a cone clusterer.
+
+    Args:
+        backend (str): 'hdbscan' for scikit-learn's HDBSCAN or 'radius' for
+            `RadiusGraphClustering`. Defaults to 'hdbscan'.
+        **kwargs: Options passed to `RadiusGraphClustering`.
+
+    Returns:
+        An estimator with `fit_predict`, labelling noise as -1.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend == 'hdbscan':
+        # Imported here, as scikit-learn is slow to import
+        from sklearn.cluster import HDBSCAN
+        return HDBSCAN(min_samples=3, min_cluster_size=2)
+    if backend == 'radius':
+        return RadiusGraphClustering(**kwargs)
+    raise ValueError(f"Unsupported clustering backend: {backend}")
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import numpy as np
+import shapely
 from shapely.geometry import MultiPoint
-from shapely.geometry import Point
 from shapely.geometry import Polygon
-from sklearn.cluster import HDBSCAN
+
+from .cone_clustering import create_clusterer
+from .detections import Detections
+from .zone_tracker import ZoneTracker
 
 
 class DangerDetector:
@@ -12,12 +15,36 @@ class DangerDetector:
     A class to detect potential safety hazards based on the detection data.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        engine: str = 'python',
+        zone_tracker: ZoneTracker | None = None,
+        clustering: str = 'hdbscan',
+    ):
         """
         Initialises the danger detector.
+
+        Args:
+            engine (str): The rule engine used by `detect_danger`, either
+                'python' (nested loops over lists) or 'numpy' (broadcast
+                matrix operations over an N×6 array). Defaults to 'python'.
+            zone_tracker (ZoneTracker | None): Tracks the controlled zones
+                across frames of one stream instead of clustering the
+                cones of every frame from scratch. Defaults to None.
+            clustering (str): The backend grouping safety cones into
+                controlled areas, either 'hdbscan' or 'radius' (single
+                linkage on a KD-tree radius graph). Defaults to 'hdbscan'.
         """
-        # Initialise the HDBSCAN clusterer
-        self.clusterer = HDBSCAN(min_samples=3, min_cluster_size=2)
+        if engine not in ('python', 'numpy'):
+            raise ValueError(f"Unsupported engine: {engine}")
+        self.engine = engine
+
+        # Share the tracker's clusterer rather than building a second one
+        self.zone_tracker = zone_tracker
+        if zone_tracker is not None:
+            self.clusterer = zone_tracker.clusterer
+        else:
+            self.clusterer = create_clusterer(clustering)
 
     def normalise_bbox(self, bbox):
         """
@@ -42,11 +69,14 @@ class DangerDetector:
         Normalises a list of bounding box data.
 
         Args:
-            datas (list[list[float]]): List of bounding box data.
+            datas (list[list[float]] | Detections): Bounding box data.
 
         Returns:
-            list[list[float]]: Normalised data.
+            list[list[float]] | Detections: Normalised data, in the same
+                container type as the input.
         """
+        if isinstance(datas, Detections):
+            return Detections(self.normalise_array(datas.data))
         return [self.normalise_bbox(data[:4] + data[4:]) for data in datas]
 
     def detect_polygon_from_cones(
@@ -62,7 +92,7 @@ class DangerDetector:
         Returns:
             List[Polygon]: A list of polygons formed by the safety cones.
         """
-        if not datas:
+        if len(datas) == 0:
             return []
 
         # Get positions of safety cones
@@ -74,6 +104,24 @@ class DangerDetector:
             for data in datas if data[5] == 6
         ])
 
+        return self.polygons_from_cone_positions(cone_positions)
+
+    def polygons_from_cone_positions(
+        self,
+        cone_positions: np.ndarray,
+    ) -> list[Polygon]:
+        """
+        Clusters safety cone centres and builds a polygon for each cluster.
+
+        Args:
+            cone_positions (np.ndarray): An (N, 2) array of cone centres.
+
+        Returns:
+            List[Polygon]: A list of polygons formed by the safety cones.
+        """
+        if self.zone_tracker is not None:
+            return self.zone_tracker.update(cone_positions)
+
         # Check if there are at least three safety cones to form a polygon
         if len(cone_positions) < 3:
             return []
@@ -115,33 +163,32 @@ class DangerDetector:
             int: The number of people within the controlled area.
         """
         # Check if there are any detections
-        if not datas:
+        if len(datas) == 0:
             return 0
 
         # Check if there are valid polygons
         if not polygons:
             return 0
 
-        # Use a set to track unique people
-        unique_people = set()
+        # Centres of people, computed for all detections at once
+        datas = np.asarray(datas, dtype=np.float64).reshape(-1, 6)
+        persons = datas[datas[:, 5] == 5]
+        x_centres = (persons[:, 0] + persons[:, 2]) / 2
+        y_centres = (persons[:, 1] + persons[:, 3]) / 2
 
-        # Count the number of people within the controlled area
-        for data in datas:
-            if data[5] == 5:  # Check if it's a person
-                x_center = (data[0] + data[2]) / 2
-                y_center = (data[1] + data[3]) / 2
-                point = Point(x_center, y_center)
-                for polygon in polygons:
-                    if polygon.contains(point):
-                        # Update the set of unique people
-                        unique_people.add((x_center, y_center))
-                        break  # No need to check other polygons
+        # Test every centre against each polygon in one call; preparing a
+        # polygon once speeds up the containment tests
+        inside = np.zeros(len(persons), dtype=bool)
+        for polygon in polygons:
+            shapely.prepare(polygon)
+            inside |= shapely.contains_xy(polygon, x_centres, y_centres)
 
-        return len(unique_people)
+        # Count unique people
+        return len(set(zip(x_centres[inside], y_centres[inside])))
 
     def detect_danger(
         self,
-        datas: list[list[float]],
+        datas: list[list[float]] | Detections,
     ) -> tuple[list[str], list[Polygon]]:
         """
         Detects potential safety violations in a construction site.
@@ -152,12 +199,17 @@ class DangerDetector:
         3. Workers dangerously close to machinery or vehicles.
 
         Args:
-            datas (List[List[float]]): A list of detections which includes
-                bounding box coordinates, confidence score, and class label.
+            datas (List[List[float]] | Detections): A list of detections
+                which includes bounding box coordinates, confidence score,
+                and class label. A `Detections` container always uses the
+                NumPy engine.
 
         Returns:
             Tuple[Set[str], List[Polygon]]: Warnings and polygons list.
         """
+        if self.engine == 'numpy' or isinstance(datas, Detections):
+            return self.detect_danger_vectorised(datas)
+
         warnings = set()  # Initialise the list to store warning messages
 
         # Normalise data
@@ -219,6 +271,245 @@ class DangerDetector:
 
         return list(warnings), polygons
 
+    @staticmethod
+    def to_array(
+        datas: list[list[float]] | np.ndarray | Detections,
+        dtype: type = np.float32,
+    ) -> np.ndarray:
+        """
+        Converts detection data into an N×6 array.
+
+        Args:
+            datas (list[list[float]] | np.ndarray | Detections): The
+                detection data.
+            dtype (type): The array's data type. Defaults to float32.
+
+        Returns:
+            np.ndarray: An (N, 6) array of
+                [x1, y1, x2, y2, confidence, label] rows.
+        """
+        array = np.asarray(datas, dtype=dtype)
+        return array.reshape(-1, 6)
+
+    @staticmethod
+    def normalise_array(datas: np.ndarray) -> np.ndarray:
+        """
+        Normalises the bounding boxes of an N×6 detection array.
+
+        Args:
+            datas (np.ndarray): An (N, 6) detection array.
+
+        Returns:
+            np.ndarray: A copy with x1 <= x2 and y1 <= y2 on every row.
+        """
+        normalised = datas.copy()
+        normalised[:, 0] = np.minimum(datas[:, 0], datas[:, 2])
+        normalised[:, 1] = np.minimum(datas[:, 1], datas[:, 3])
+        normalised[:, 2] = np.maximum(datas[:, 0], datas[:, 2])
+        normalised[:, 3] = np.maximum(datas[:, 1], datas[:, 3])
+        return normalised
+
+    @staticmethod
+    def overlap_matrix(
+        bboxes1: np.ndarray,
+        bboxes2: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Calculates the pairwise overlap percentage of two sets of boxes.
+
+        Args:
+            bboxes1 (np.ndarray): An (M, 4) array of bounding boxes.
+            bboxes2 (np.ndarray): An (N, 4) array of bounding boxes.
+
+        Returns:
+            np.ndarray: An (M, N) array of overlap percentages.
+        """
+        a = bboxes1[:, None, :]
+        b = bboxes2[None, :, :]
+
+        # Calculate the area of the intersection rectangles
+        overlap_w = np.maximum(
+            0, np.minimum(a[..., 2], b[..., 2]) -
+            np.maximum(a[..., 0], b[..., 0]),
+        )
+        overlap_h = np.maximum(
+            0, np.minimum(a[..., 3], b[..., 3]) -
+            np.maximum(a[..., 1], b[..., 1]),
+        )
+        overlap_area = overlap_w * overlap_h
+
+        # Calculate the area of both sets of bounding boxes
+        area1 = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+        area2 = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+        union = area1 + area2 - overlap_area
+
+        # Degenerate pairs with an empty union have no overlap
+        return np.divide(
+            overlap_area, union,
+            out=np.zeros_like(overlap_area), where=union > 0,
+        )
+
+    @staticmethod
+    def is_driver_matrix(
+        person_bboxes: np.ndarray,
+        vehicle_bboxes: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Checks every person against every vehicle for the driver position.
+
+        Args:
+            person_bboxes (np.ndarray): An (P, 4) array of person boxes.
+            vehicle_bboxes (np.ndarray): An (V, 4) array of vehicle boxes.
+
+        Returns:
+            np.ndarray: A (P, V) boolean array, True where the person is
+                likely the driver of the vehicle.
+        """
+        p = person_bboxes[:, None, :]
+        v = vehicle_bboxes[None, :, :]
+        person_width = p[..., 2] - p[..., 0]
+        person_height = p[..., 3] - p[..., 1]
+        vehicle_height = v[..., 3] - v[..., 1]
+
+        # Same four rules as `is_driver`, evaluated for all pairs at once
+        return (
+            (p[..., 3] < v[..., 3])
+            & (v[..., 3] - p[..., 3] >= person_height / 2)
+            & (p[..., 0] >= v[..., 0] - person_width / 2)
+            & (p[..., 2] <= v[..., 2] + person_width / 2)
+            & (p[..., 1] > v[..., 1])
+            & (person_height <= vehicle_height / 2)
+        )
+
+    @staticmethod
+    def is_dangerously_close_matrix(
+        person_bboxes: np.ndarray,
+        vehicle_bboxes: np.ndarray,
+        is_vehicle: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Checks every person against every machine or vehicle for proximity.
+
+        Args:
+            person_bboxes (np.ndarray): An (P, 4) array of person boxes.
+            vehicle_bboxes (np.ndarray): An (V, 4) array of machine/vehicle
+                boxes.
+            is_vehicle (np.ndarray): A (V,) boolean array, True for vehicles
+                and False for machinery.
+
+        Returns:
+            np.ndarray: A (P, V) boolean array, True where the person is
+                dangerously close to the machine or vehicle.
+        """
+        p = person_bboxes[:, None, :]
+        v = vehicle_bboxes[None, :, :]
+        person_width = p[..., 2] - p[..., 0]
+        person_height = p[..., 3] - p[..., 1]
+        person_area = person_width * person_height
+        vehicle_area = (v[..., 2] - v[..., 0]) * (v[..., 3] - v[..., 1])
+        acceptable_ratio = np.where(is_vehicle, 0.1, 0.05)[None, :]
+
+        # Person area must be small relative to the machine or vehicle
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio_ok = ~(person_area / vehicle_area > acceptable_ratio)
+
+        horizontal_distance = np.minimum(
+            np.abs(p[..., 2] - v[..., 0]),
+            np.abs(p[..., 0] - v[..., 2]),
+        )
+        vertical_distance = np.minimum(
+            np.abs(p[..., 3] - v[..., 1]),
+            np.abs(p[..., 1] - v[..., 3]),
+        )
+
+        return (
+            ratio_ok
+            & (horizontal_distance <= 5 * person_width)
+            & (vertical_distance <= 1.5 * person_height)
+        )
+
+    def detect_danger_vectorised(
+        self,
+        datas: list[list[float]] | np.ndarray | Detections,
+    ) -> tuple[list[str], list[Polygon]]:
+        """
+        Detects safety violations with broadcast matrix operations.
+
+        Produces the same warnings and polygons as the Python engine, but
+        evaluates the driver, hardhat/vest and proximity rules for all
+        pairs of boxes at once instead of in nested loops.
+
+        Args:
+            datas (list[list[float]] | np.ndarray | Detections): The
+                detections, as a list of rows, an (N, 6) array or a
+                `Detections` container.
+
+        Returns:
+            Tuple[List[str], List[Polygon]]: Warnings and polygons list.
+        """
+        warnings = set()
+
+        # Normalise data, converting straight to float64 so fractional
+        # coordinates compare exactly as in the Python engine
+        datas = self.normalise_array(self.to_array(datas, np.float64))
+        labels = datas[:, 5]
+        bboxes = datas[:, :4]
+        centres = np.column_stack((
+            (bboxes[:, 0] + bboxes[:, 2]) / 2,
+            (bboxes[:, 1] + bboxes[:, 3]) / 2,
+        ))
+
+        # Check if people are entering the controlled area
+        polygons = self.polygons_from_cone_positions(centres[labels == 6])
+        people_count = self.calculate_people_in_controlled_area(
+            polygons, datas,
+        )
+        if people_count > 0:
+            warnings.add(
+                f"Warning: {people_count} people "
+                'have entered the controlled area!',
+            )
+
+        # Classify detected objects into different categories
+        persons = bboxes[labels == 5]
+        machinery_mask = (labels == 8) | (labels == 9)
+        machinery_vehicles = bboxes[machinery_mask]
+        is_vehicle = labels[machinery_mask] == 9
+
+        # Filter out persons who are likely drivers
+        if len(machinery_vehicles):
+            drivers = self.is_driver_matrix(
+                persons, machinery_vehicles,
+            ).any(axis=1)
+            persons = persons[~drivers]
+
+        # Check for hardhat and safety vest violations
+        for label, warning_msg in (
+            (2, 'Warning: Someone is not wearing a hardhat!'),
+            (4, 'Warning: Someone is not wearing a safety vest!'),
+        ):
+            violations = bboxes[labels == label]
+            if not len(violations):
+                continue
+            covered = (
+                self.overlap_matrix(violations, persons) > 0.5
+            ).any(axis=1)
+            if not covered.all():
+                warnings.add(warning_msg)
+
+        # Check if anyone is dangerously close to machinery or vehicles
+        if len(persons) and len(machinery_vehicles):
+            close = self.is_dangerously_close_matrix(
+                persons, machinery_vehicles, is_vehicle,
+            )
+            # Only the first close object counts for each person
+            first_close = close.argmax(axis=1)[close.any(axis=1)]
+            for vehicle in np.unique(is_vehicle[first_close]):
+                label = 'vehicle' if vehicle else 'machinery'
+                warnings.add(f"Warning: Someone is too close to {label}!")
+
+        return list(warnings), polygons
+
     @staticmethod
     def is_driver(person_bbox: list[float], vehicle_bbox: list[float]) -> bool:
         """
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+
+
+class Detections:
+    """
+    A compact, columnar container for YOLO detections.
+
+    Detections are stored as one contiguous (N, 6) float32 array of
+    [x1, y1, x2, y2, confidence, label] rows, kept stable-sorted by label
+    so that every class (or run of classes) is a contiguous block and the
+    class views below are zero-copy slices of the same buffer.
+    """
+
+    __slots__ = ('_data',)
+
+    # Class labels used by the pipeline
+    HARDHAT = 0
+    MASK = 1
+    NO_HARDHAT = 2
+    NO_MASK = 3
+    NO_SAFETY_VEST = 4
+    PERSON = 5
+    SAFETY_CONE = 6
+    SAFETY_VEST = 7
+    MACHINERY = 8
+    VEHICLE = 9
+
+    def __init__(self, data: Any = None):
+        """
+        Initialises the container from an array-like of detection rows.
+
+        Args:
+            data (Any): An (N, 6) array-like of detection rows. Defaults to
+                an empty container.
+        """
+        array = np.asarray(
+            data if data is not None else (), dtype=np.float32,
+        ).reshape(-1, 6)
+
+        # Keep rows grouped by label; slices of sorted data stay sorted
+        labels = array[:, 5]
+        if len(labels) > 1 and (labels[1:] < labels[:-1]).any():
+            array = array[np.argsort(labels, kind='stable')]
+
+        self._data = np.ascontiguousarray(array)
+
+    @classmethod
+    def from_list(cls, datas: list[list[float]]) -> Detections:
+        """
+        Builds a container from the legacy list-of-lists format.
+
+        Args:
+            datas (list[list[float]]): The detection data.
+
+        Returns:
+            Detections: The detections.
+        """
+        return cls(datas)
+
+    @classmethod
+    def from_object_predictions(cls, object_predictions: list) -> Detections:
+        """
+        Builds a container from SAHI object predictions.
+
+        Box coordinates are truncated to whole pixels, as in the legacy
+        list format.
+
+        Args:
+            object_predictions (list): SAHI `ObjectPrediction` instances.
+
+        Returns:
+            Detections: The detections.
+        """
+        data = np.empty((len(object_predictions), 6), dtype=np.float32)
+        for row, object_prediction in zip(data, object_predictions):
+            row[:4] = object_prediction.bbox.to_voc_bbox()
+            row[4] = object_prediction.score.value
+            row[5] = object_prediction.category.id
+        np.trunc(data[:, :4], out=data[:, :4])
+        return cls(data)
+
+    @classmethod
+    def ensure(cls, datas: Detections | Any) -> Detections:
+        """
+        Adapts legacy detection data to a container, without copying
+        when it already is one.
+
+        Args:
+            datas (Detections | Any): The detection data.
+
+        Returns:
+            Detections: The detections.
+        """
+        return datas if isinstance(datas, cls) else cls(datas)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The underlying (N, 6) float32 array.
+        """
+        return self._data
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        """
+        An (N, 4) view of the bounding boxes.
+        """
+        return self._data[:, :4]
+
+    @property
+    def confidences(self) -> np.ndarray:
+        """
+        An (N,) view of the confidence scores.
+        """
+        return self._data[:, 4]
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        An (N,) view of the class labels.
+        """
+        return self._data[:, 5]
+
+    @property
+    def centres(self) -> np.ndarray:
+        """
+        An (N, 2) array of bounding box centres.
+        """
+        return (self._data[:, 0:2] + self._data[:, 2:4]) / 2
+
+    def of_class(
+        self,
+        first_label: int,
+        last_label: int | None = None,
+    ) -> Detections:
+        """
+        Returns a zero-copy view of one class or a run of classes.
+
+        Args:
+            first_label (int): The first class label to include.
+            last_label (int | None): The last class label to include.
+                Defaults to `first_label`.
+
+        Returns:
+            Detections: A view of the matching detections.
+        """
+        if last_label is None:
+            last_label = first_label
+        labels = self.labels
+        start = np.searchsorted(labels, first_label, side='left')
+        stop = np.searchsorted(labels, last_label, side='right')
+        return Detections._view(self._data[start:stop])
+
+    @property
+    def persons(self) -> Detections:
+        """
+        A view of the person detections.
+        """
+        return self.of_class(self.PERSON)
+
+    @property
+    def cones(self) -> Detections:
+        """
+        A view of the safety cone detections.
+        """
+        return self.of_class(self.SAFETY_CONE)
+
+    @property
+    def vehicles(self) -> Detections:
+        """
+        A view of the machinery and vehicle detections.
+        """
+        return self.of_class(self.MACHINERY, self.VEHICLE)
+
+    def drop(self, indices: Any) -> Detections:
+        """
+        Returns the detections without the rows at the given indices.
+
+        Args:
+            indices (Any): An iterable of row indices to remove.
+
+        Returns:
+            Detections: The remaining detections.
+        """
+        keep = np.ones(len(self._data), dtype=bool)
+        keep[list(indices)] = False
+        return Detections._view(self._data[keep])
+
+    def tolist(self) -> list[list[float]]:
+        """
+        Converts the detections to the legacy list-of-lists format.
+
+        Returns:
+            list[list[float]]: The detection data.
+        """
+        return self._data.tolist()
+
+    @classmethod
+    def _view(cls, data: np.ndarray) -> Detections:
+        """
+        Wraps an already sorted array without copying or re-sorting it.
+        """
+        detections = cls.__new__(cls)
+        detections._data = data
+        return detections
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is not None and dtype != self._data.dtype:
+            return self._data.astype(dtype)
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __bool__(self) -> bool:
+        return len(self._data) > 0
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self._data)
+
+    def __getitem__(self, index: Any) -> np.ndarray | Detections:
+        """
+        Returns a row for an integer index, otherwise a Detections view.
+
+        Forward slices are zero-copy; reversed slices, boolean masks and
+        index arrays copy and are re-sorted, so all of them preserve the
+        label ordering.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self._data[index]
+        if isinstance(index, slice) and (index.step is None or index.step > 0):
+            return Detections._view(self._data[index])
+        return Detections(self._data[index])
+
+    def __repr__(self) -> str:
+        return f"Detections(n={len(self)})"
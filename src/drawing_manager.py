@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TypedDict
 
 import cv2
 import numpy as np
@@ -9,21 +10,217 @@ from PIL import ImageDraw
 from PIL import ImageFont
 from shapely.geometry import Polygon
 
+from .detections import Detections
 from .lang_config import LANGUAGES
 
 
+# Rendering backends of DrawingManager
+RENDER_BACKENDS = ('opencv', 'pil')
+
+# Box and label background colours (RGB) by class label; classes without a
+# colour are not drawn
+LABEL_COLOURS: dict[int, tuple[int, int, int]] = {
+    Detections.HARDHAT: (0, 255, 0),
+    Detections.SAFETY_VEST: (0, 255, 0),
+    Detections.MACHINERY: (255, 225, 0),
+    Detections.VEHICLE: (255, 255, 0),
+    Detections.NO_HARDHAT: (255, 0, 0),
+    Detections.NO_SAFETY_VEST: (255, 0, 0),
+    Detections.PERSON: (255, 165, 0),
+}
+
+# Safety cone polygons: translucent fill (RGBA) and opaque border (RGB)
+POLYGON_FILL = (255, 105, 180, 128)
+POLYGON_BORDER = (255, 0, 255)
+
+
+class LabelSprite(TypedDict):
+    tile: np.ndarray
+    box_width: int
+    box_height: int
+
+
+class LabelSpriteCache:
+    """
+    Labels rasterised once into BGRA tiles, by (language, class label,
+    font size).
+
+    A tile holds the label's background box with the text already drawn
+    on it, fully opaque, plus any text that overhangs the box, stored
+    premultiplied with its coverage as alpha. Drawing a label copies the
+    box into the frame and blends only the overhang.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialises an empty cache.
+        """
+        self.sprites: dict[tuple[str, int, int], LabelSprite] = {}
+
+    def get(
+        self,
+        key: tuple[str, int, int],
+        text: str,
+        font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
+        colour: tuple[int, int, int],
+    ) -> LabelSprite:
+        """
+        Returns the sprite of a label, rasterising it on first use.
+
+        Args:
+            key (tuple[str, int, int]): The language, class label and font
+                size.
+            text (str): The translated label.
+            font (ImageFont.FreeTypeFont | ImageFont.ImageFont): The font.
+            colour (tuple[int, int, int]): The background colour (RGB).
+
+        Returns:
+            LabelSprite: The sprite.
+        """
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.rasterise(text, font, colour)
+            self.sprites[key] = sprite
+        return sprite
+
+    def rasterise(
+        self,
+        text: str,
+        font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
+        colour: tuple[int, int, int],
+    ) -> LabelSprite:
+        """
+        Draws a label's background box and black text into a tile.
+
+        Args:
+            text (str): The label.
+            font (ImageFont.FreeTypeFont | ImageFont.ImageFont): The font.
+            colour (tuple[int, int, int]): The background colour (RGB).
+
+        Returns:
+            LabelSprite: The sprite, whose top left is the box's.
+        """
+        left, top, right, bottom = font.getbbox(text)
+        # The box spans the text's size, plus 5 rows above the text
+        box_width = right - left + 1
+        box_height = bottom - top + 6
+        image = Image.new('L', (max(right, 1), max(bottom, 1)), 0)
+        ImageDraw.Draw(image).text((0, 0), text, fill=255, font=font)
+        coverage = np.asarray(image).astype(np.uint16)
+
+        height = max(box_height, coverage.shape[0])
+        width = max(box_width, coverage.shape[1])
+        padded = np.zeros((height, width), dtype=np.uint16)
+        padded[:coverage.shape[0], :coverage.shape[1]] = coverage
+
+        # Overhanging black text is zero once premultiplied, leaving its
+        # coverage as alpha
+        tile = np.zeros((height, width, 4), dtype=np.uint8)
+        tile[..., 3] = padded
+        # Black text over the background, as drawn on the frame
+        tile[:box_height, :box_width, :3] = (
+            np.array(colour[::-1], dtype=np.uint16)
+            * (255 - padded[:box_height, :box_width, None])
+            + 127
+        ) // 255
+        tile[:box_height, :box_width, 3] = 255
+        return {
+            'tile': tile,
+            'box_width': box_width,
+            'box_height': box_height,
+        }
+
+    def blit(
+        self,
+        frame: np.ndarray,
+        sprite: LabelSprite,
+        x: int,
+        y: int,
+    ) -> None:
+        """
+        Draws a sprite onto a BGR frame, clipped to the frame.
+
+        Args:
+            frame (np.ndarray): The frame, modified in place.
+            sprite (LabelSprite): The sprite.
+            x (int): Column of the sprite's left edge in the frame.
+            y (int): Row of the sprite's top edge in the frame.
+        """
+        tile = sprite['tile']
+        box_width, box_height = sprite['box_width'], sprite['box_height']
+        self.paste(frame, tile[:box_height, :box_width], x, y, opaque=True)
+        if tile.shape[1] > box_width:
+            self.paste(frame, tile[:, box_width:], x + box_width, y)
+        if tile.shape[0] > box_height:
+            self.paste(
+                frame, tile[box_height:, :box_width], x, y + box_height,
+            )
+
+    def paste(
+        self,
+        frame: np.ndarray,
+        tile: np.ndarray,
+        x: int,
+        y: int,
+        opaque: bool = False,
+    ) -> None:
+        """
+        Copies or blends part of a tile onto a frame, clipped to the frame.
+
+        Args:
+            frame (np.ndarray): The frame, modified in place.
+            tile (np.ndarray): The premultiplied BGRA pixels.
+            x (int): Column of the tile's left edge in the frame.
+            y (int): Row of the tile's top edge in the frame.
+            opaque (bool): Whether the tile is fully opaque, so it is
+                copied rather than blended.
+        """
+        height, width = frame.shape[:2]
+        left, top = max(x, 0), max(y, 0)
+        right = min(x + tile.shape[1], width)
+        bottom = min(y + tile.shape[0], height)
+        if left >= right or top >= bottom:
+            return
+        tile = tile[top - y:bottom - y, left - x:right - x]
+        roi = frame[top:bottom, left:right]
+        if opaque:
+            roi[:] = tile[..., :3]
+            return
+        alpha = tile[..., 3:].astype(np.uint16)
+        roi[:] = tile[..., :3] + (roi * (255 - alpha) + 127) // 255
+
+
 class DrawingManager:
     """
     A class for drawing detections on frames and saving them to disk.
+
+    The default OpenCV backend draws straight onto a copy of the BGR frame:
+    polygon fills are blended within their bounding rectangle only, and
+    labels are copied from sprites rasterised once per process. The PIL
+    backend converts the frame to RGB and back and is kept as the
+    reference rendering.
     """
 
     # Class variable for caching default font
     default_font: ImageFont.FreeTypeFont | ImageFont.ImageFont | None = None
 
-    def __init__(self) -> None:
+    # Label sprites shared by all drawing managers of the process, and
+    # inherited by processes forked after `warm_up`
+    label_sprites = LabelSpriteCache()
+
+    def __init__(self, backend: str = 'opencv', font_size: int = 20) -> None:
         """
         Initialise the DrawingManager class.
+
+        Args:
+            backend (str): The rendering backend, 'opencv' or 'pil'.
+            font_size (int): The label font size.
         """
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Unsupported rendering backend: {backend}")
+        self.backend = backend
+        self.font_size = font_size
+
         # Font cache to avoid repeated loading
         self.font_cache: dict[
             str, ImageFont.FreeTypeFont |
@@ -59,7 +256,7 @@ class DrawingManager:
 
         # Load and cache the font
         try:
-            font = ImageFont.truetype(font_path, 20)
+            font = ImageFont.truetype(font_path, self.font_size)
         except OSError:
             print(f"Error loading font from {font_path}. Using default font.")
             if DrawingManager.default_font is None:
@@ -71,6 +268,63 @@ class DrawingManager:
         self.font_cache[font_path] = font
         return font
 
+    def get_category_names(self, language: str) -> dict[int, str]:
+        """
+        Returns the translated name of each class label.
+
+        Args:
+            language (str): The language to use for labels.
+
+        Returns:
+            dict[int, str]: Class names by label.
+        """
+        lang_config = LANGUAGES.get(language, LANGUAGES['en'])
+        return {
+            0: lang_config['helmet'],
+            1: lang_config['mask'],
+            2: lang_config['no_helmet'],
+            3: lang_config['no_mask'],
+            4: lang_config['no_vest'],
+            5: lang_config['person'],
+            6: lang_config['cone'],
+            7: lang_config['vest'],
+            8: lang_config['machinery'],
+            9: lang_config['vehicle'],
+        }
+
+    def get_label_sprite(self, language: str, label_id: int) -> LabelSprite:
+        """
+        Returns the sprite of a class label in a language.
+
+        Args:
+            language (str): The language to use for labels.
+            label_id (int): The class label, one of `LABEL_COLOURS`.
+
+        Returns:
+            LabelSprite: The sprite.
+        """
+        key = (language, label_id, self.font_size)
+        sprite = self.label_sprites.sprites.get(key)
+        if sprite is None:
+            sprite = self.label_sprites.get(
+                key,
+                self.get_category_names(language)[label_id],
+                self.get_font(language),
+                LABEL_COLOURS[label_id],
+            )
+        return sprite
+
+    def warm_up(self, languages: list[str]) -> None:
+        """
+        Rasterises the sprites of every drawn class label in each language.
+
+        Args:
+            languages (list[str]): The languages to use for labels.
+        """
+        for language in languages:
+            for label_id in LABEL_COLOURS:
+                self.get_label_sprite(language, label_id)
+
     def draw_polygons(
         self,
         frame: np.ndarray,
@@ -79,6 +333,90 @@ class DrawingManager:
         """
         Draws polygons on the given frame.
 
+        Args:
+            frame (np.ndarray): The frame on which to draw polygons.
+            polygons (List[Polygon]): list of polygons containing safety cones.
+
+        Returns:
+            np.ndarray: The frame with polygons drawn.
+        """
+        if self.backend == 'pil':
+            return self.draw_polygons_pil(frame, polygons)
+        frame = frame.copy()
+        self.draw_polygons_in_place(frame, polygons)
+        return frame
+
+    def draw_polygons_in_place(
+        self,
+        frame: np.ndarray,
+        polygons: list[Polygon],
+    ) -> None:
+        """
+        Draws polygons onto a BGR frame with OpenCV.
+
+        The fills are blended once over their union, like the single
+        overlay of the PIL backend, touching only the pixels inside the
+        polygons' bounding rectangle.
+
+        Args:
+            frame (np.ndarray): The frame, modified in place.
+            polygons (List[Polygon]): list of polygons containing safety cones.
+        """
+        outlines = []
+        for polygon in polygons:
+            points = polygon.exterior.coords if isinstance(
+                polygon, Polygon,
+            ) else polygon.coords
+            outlines.append(
+                np.round(np.asarray(points, dtype=np.float64)).astype(
+                    np.int32,
+                ).reshape(-1, 2),
+            )
+        outlines = [points for points in outlines if len(points)]
+        if not outlines:
+            return
+
+        height, width = frame.shape[:2]
+        corners = np.concatenate(outlines)
+        x0, y0 = np.maximum(corners.min(axis=0), 0)
+        x1, y1 = np.minimum(corners.max(axis=0) + 1, (width, height))
+        if x0 < x1 and y0 < y1:
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.fillPoly(
+                mask, [points - (x0, y0) for points in outlines], 255,
+            )
+            inside = mask > 0
+            roi = frame[y0:y1, x0:x1]
+            alpha = POLYGON_FILL[3]
+            fill = np.array(POLYGON_FILL[2::-1], dtype=np.uint16) * alpha
+            roi[inside] = (
+                roi[inside].astype(np.uint16) * (255 - alpha) + fill + 127
+            ) // 255
+
+        # A 2-pixel border widened to one side by the rounded unit normal
+        # of each edge, as PIL draws wide lines
+        border = POLYGON_BORDER[::-1]
+        cv2.polylines(frame, outlines, True, border, thickness=1)
+        for points in outlines:
+            ends = np.roll(points, -1, axis=0)
+            direction = (ends - points).astype(np.float64)
+            length = np.maximum(np.hypot(*direction.T), 1)[:, None]
+            shifts = np.rint(
+                direction[:, ::-1] * (1, -1) / length,
+            ).astype(np.int32)
+            for start, end in zip(
+                (points + shifts).tolist(), (ends + shifts).tolist(),
+            ):
+                cv2.line(frame, start, end, border, 1)
+
+    def draw_polygons_pil(
+        self,
+        frame: np.ndarray,
+        polygons: list[Polygon],
+    ) -> np.ndarray:
+        """
+        Draws polygons on the given frame with PIL.
+
         Args:
             frame (np.ndarray): The frame on which to draw polygons.
             polygons (List[Polygon]): list of polygons containing safety cones.
@@ -105,12 +443,12 @@ class DrawingManager:
             ]  # Convert points to tuples
 
             # Draw the polygon or line
-            overlay_draw.polygon(points, fill=(255, 105, 180, 128))
+            overlay_draw.polygon(points, fill=POLYGON_FILL)
 
             # Draw the polygon border
             overlay_draw.line(
                 points + [points[0]],
-                fill=(255, 0, 255), width=2,
+                fill=POLYGON_BORDER, width=2,
             )
 
         # Composite the overlay with the original image
@@ -127,7 +465,7 @@ class DrawingManager:
         self,
         frame: np.ndarray,
         polygons: list[Polygon],
-        datas: list[list[float]],
+        datas: list[list[float]] | Detections,
         language: str = 'en',  # Accept language as input
     ) -> np.ndarray:
         """
@@ -135,47 +473,72 @@ class DrawingManager:
         and supports dynamic language selection.
 
         Args:
-            frame (np.ndarray): The frame on which to draw detections.
-            datas (List[List[float]]): The detection data.
+            frame (np.ndarray): The frame on which to draw detections. It
+                is not modified.
+            polygons (List[Polygon]): Polygons of safety cones, drawn
+                beneath the detections.
+            datas (List[List[float]] | Detections): The detection data.
             language (str): The language to use for labels.
 
         Returns:
             np.ndarray: The frame with detections drawn.
         """
-        # Load language configuration
-        lang_config = LANGUAGES.get(language, LANGUAGES['en'])
+        if self.backend == 'pil':
+            return self.draw_detections_pil(frame, polygons, datas, language)
 
-        # Define category names based on language
-        category_id_to_name: dict[int, str] = {
-            0: lang_config['helmet'],
-            1: lang_config['mask'],
-            2: lang_config['no_helmet'],
-            3: lang_config['no_mask'],
-            4: lang_config['no_vest'],
-            5: lang_config['person'],
-            6: lang_config['cone'],
-            7: lang_config['vest'],
-            8: lang_config['machinery'],
-            9: lang_config['vehicle'],
-        }
+        # A single copy, drawn on in place
+        frame = frame.copy()
+        if polygons:
+            self.draw_polygons_in_place(frame, polygons)
 
-        # Define colours for each category
-        colours: dict[str, tuple[int, int, int]] = {
-            lang_config['helmet']: (0, 255, 0),
-            lang_config['vest']: (0, 255, 0),
-            lang_config['machinery']: (255, 225, 0),
-            lang_config['vehicle']: (255, 255, 0),
-            lang_config['no_helmet']: (255, 0, 0),
-            lang_config['no_vest']: (255, 0, 0),
-            lang_config['person']: (255, 165, 0),
-        }
+        for data in datas:
+            x1, y1, x2, y2, _, label_id = data
+            colour = LABEL_COLOURS.get(int(label_id))
+            if colour is None:
+                continue
+            bgr = colour[::-1]
+
+            # Box with a 2-pixel border inside its corners, as PIL draws it
+            x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])
+            cv2.rectangle(frame, (x1, y1), (x2, y2), bgr, 1)
+            cv2.rectangle(frame, (x1 + 1, y1 + 1), (x2 - 1, y2 - 1), bgr, 1)
+
+            # Label above the box, copied from its sprite
+            sprite = self.get_label_sprite(language, int(label_id))
+            self.label_sprites.blit(
+                frame, sprite, x1, y1 - sprite['box_height'] + 1,
+            )
+
+        return frame
+
+    def draw_detections_pil(
+        self,
+        frame: np.ndarray,
+        polygons: list[Polygon],
+        datas: list[list[float]] | Detections,
+        language: str = 'en',
+    ) -> np.ndarray:
+        """
+        Draws detections on the given frame with PIL.
+
+        Args:
+            frame (np.ndarray): The frame on which to draw detections.
+            polygons (List[Polygon]): Polygons of safety cones, drawn
+                beneath the detections.
+            datas (List[List[float]] | Detections): The detection data.
+            language (str): The language to use for labels.
+
+        Returns:
+            np.ndarray: The frame with detections drawn.
+        """
+        category_id_to_name = self.get_category_names(language)
 
         # Load the font based on the input language
         font = self.get_font(language)
 
         # Draw polygons first
         if polygons:
-            frame = self.draw_polygons(frame, polygons)
+            frame = self.draw_polygons_pil(frame, polygons)
 
         # Convert the frame to RGB and create a PIL image
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -193,8 +556,8 @@ class DrawingManager:
 
             # Draw the bounding box
             x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])
-            if label in colours:
-                colour = colours.get(label, (255, 255, 255))
+            if label_id in LABEL_COLOURS:
+                colour = LABEL_COLOURS[label_id]
                 draw.rectangle((x1, y1, x2, y2), outline=colour, width=2)
                 text = f"{label}"
                 text_bbox = draw.textbbox((x1, y1), text, font=font)
@@ -237,6 +600,125 @@ class DrawingManager:
             f.write(frame_bytes)
 
 
+class FrameRenderCache:
+    """
+    The renders of one frame, drawn and encoded at most once per language.
+
+    A stream starts each frame with `start_frame`; the notifications in
+    each language and the frame it publishes then share one drawing and
+    one encoding per language.
+    """
+
+    def __init__(
+        self,
+        drawing_manager: DrawingManager,
+        extension: str = '.png',
+    ) -> None:
+        """
+        Initialises the cache.
+
+        Args:
+            drawing_manager (DrawingManager): Draws the detections.
+            extension (str): The image format frames are encoded in.
+        """
+        self.drawing_manager = drawing_manager
+        self.extension = extension
+        self.frame: np.ndarray | None = None
+        self.polygons: list[Polygon] = []
+        self.datas: list[list[float]] | Detections = []
+        self.drawn: dict[str, np.ndarray] = {}
+        self.encoded: dict[str, bytes] = {}
+        self.frames = 0
+        self.draws = 0
+        self.encodes = 0
+
+    def start_frame(
+        self,
+        frame: np.ndarray,
+        polygons: list[Polygon],
+        datas: list[list[float]] | Detections,
+    ) -> None:
+        """
+        Sets the frame to render, dropping the renders of the last one.
+
+        Args:
+            frame (np.ndarray): The frame.
+            polygons (List[Polygon]): Polygons of safety cones.
+            datas (List[List[float]] | Detections): The detection data.
+        """
+        self.clear()
+        self.frame = frame
+        self.polygons = polygons
+        self.datas = datas
+        self.frames += 1
+
+    def draw(self, language: str) -> np.ndarray:
+        """
+        Returns the frame with its detections drawn in a language.
+
+        Args:
+            language (str): The language to use for labels.
+
+        Returns:
+            np.ndarray: The drawn frame.
+        """
+        if self.frame is None:
+            raise RuntimeError('No frame to draw')
+        if language not in self.drawn:
+            self.drawn[language] = (
+                self.drawing_manager.draw_detections_on_frame(
+                    self.frame, self.polygons, self.datas, language,
+                )
+            )
+            self.draws += 1
+        return self.drawn[language]
+
+    def encode(self, language: str) -> bytes:
+        """
+        Returns the encoded frame with its detections drawn in a language.
+
+        Args:
+            language (str): The language to use for labels.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        if language not in self.encoded:
+            _, buffer = cv2.imencode(self.extension, self.draw(language))
+            self.encoded[language] = buffer.tobytes()
+            self.encodes += 1
+        return self.encoded[language]
+
+    def clear(self) -> None:
+        """
+        Drops the frame and its renders.
+        """
+        self.frame = None
+        self.polygons = []
+        self.datas = []
+        self.drawn = {}
+        self.encoded = {}
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Returns counters of the frames rendered.
+
+        Returns:
+            dict[str, float]: Frames started, drawings and encodings in
+                total and of the current frame, and drawings per frame.
+        """
+        return {
+            'frames': self.frames,
+            'draws': self.draws,
+            'encodes': self.encodes,
+            'frame_draws': len(self.drawn),
+            'frame_encodes': len(self.encoded),
+            'draws_per_frame': (
+                self.draws / self.frames if self.frames else 0.0
+            ),
+        }
+
+
 def main() -> None:
     """
     Main function to process and save the frame with detections.
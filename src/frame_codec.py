@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import struct
+
+import cv2
+import numpy as np
+
+# Content type of each upload format for the detection server
+UPLOAD_FORMATS = {
+    'png': 'image/png',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+    'raw': 'application/octet-stream',
+}
+
+# Header of a raw frame: magic, height, width and channels
+RAW_HEADER = struct.Struct('<4sIII')
+RAW_MAGIC = b'RAW1'
+
+
+def encode_frame(
+    frame: np.ndarray,
+    upload_format: str = 'jpeg',
+    quality: int = 90,
+) -> bytes:
+    """
+    Encodes a BGR frame for upload.
+
+    Raw frames are the uint8 pixels after a header giving their shape, so
+    they skip compression on both ends at the cost of a larger payload.
+
+    Args:
+        frame (np.ndarray): The frame.
+        upload_format (str): One of `UPLOAD_FORMATS`.
+        quality (int): JPEG or WebP quality, from 1 to 100.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    if upload_format == 'raw':
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        return RAW_HEADER.pack(
+            RAW_MAGIC, height, width, channels,
+        ) + frame.tobytes()
+
+    if upload_format == 'png':
+        # Fastest compression level; PNG is lossless at every level
+        params = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+    elif upload_format == 'jpeg':
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    elif upload_format == 'webp':
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    else:
+        raise ValueError(f"Unsupported upload format: {upload_format}")
+    ok, encoded = cv2.imencode(f".{upload_format}", frame, params)
+    if not ok:
+        raise ValueError(f"Failed to encode frame as {upload_format}")
+    return encoded.tobytes()
+
+
+def decode_frame(data: bytes, content_type: str | None = None) -> np.ndarray:
+    """
+    Decodes an uploaded frame.
+
+    Args:
+        data (bytes): The encoded frame.
+        content_type (str | None): The content type it was uploaded with.
+            Compressed images are recognised by their own header whatever
+            the content type.
+
+    Returns:
+        np.ndarray: The BGR frame.
+
+    Raises:
+        ValueError: If the data is not a frame.
+    """
+    if (
+        content_type == UPLOAD_FORMATS['raw']
+        or data[:len(RAW_MAGIC)] == RAW_MAGIC
+    ):
+        return decode_raw_frame(data)
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError('Failed to decode image')
+    return img
+
+
+def decode_raw_frame(data: bytes) -> np.ndarray:
+    """
+    Decodes a raw frame without copying its pixels.
+
+    Args:
+        data (bytes): The header and the pixels.
+
+    Returns:
+        np.ndarray: A read-only view of the frame.
+
+    Raises:
+        ValueError: If the header is missing or does not match the pixels.
+    """
+    if len(data) < RAW_HEADER.size:
+        raise ValueError('Raw frame is missing its header')
+    magic, height, width, channels = RAW_HEADER.unpack_from(data)
+    if magic != RAW_MAGIC or channels not in (1, 3):
+        raise ValueError('Invalid raw frame header')
+    if len(data) - RAW_HEADER.size != height * width * channels:
+        raise ValueError(
+            f"Raw frame of {height}x{width}x{channels} has "
+            f"{len(data) - RAW_HEADER.size} bytes",
+        )
+    frame = np.frombuffer(
+        data, np.uint8, offset=RAW_HEADER.size,
+    ).reshape(height, width, channels)
+    if channels == 1:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    return frame
+
+
+def downscale_frame(
+    frame: np.ndarray,
+    max_size: int | None,
+) -> tuple[np.ndarray, float]:
+    """
+    Shrinks a frame so that its longer side is at most `max_size`.
+
+    Args:
+        frame (np.ndarray): The frame.
+        max_size (int | None): Maximum length of the longer side in
+            pixels. None keeps the frame as it is.
+
+    Returns:
+        tuple[np.ndarray, float]: The frame, and the factor its
+            coordinates were scaled by.
+    """
+    if max_size is None:
+        return frame, 1.0
+    scale = max_size / max(frame.shape[:2])
+    if scale >= 1:
+        return frame, 1.0
+    height, width = frame.shape[:2]
+    size = (max(round(width * scale), 1), max(round(height * scale), 1))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
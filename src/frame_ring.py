@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import TypedDict
+
+import numpy as np
+
+# Slot states
+FREE = 0
+WRITING = 1
+READY = 2
+READING = 3
+
+# Per-slot metadata kept in shared memory next to the frames
+SLOT_DTYPE = np.dtype([
+    ('state', np.int8),
+    ('sequence', np.int64),
+    ('timestamp', np.float64),
+    ('ndim', np.int8),
+    ('shape', np.int64, 4),
+    ('dtype', 'S8'),
+])
+# Ring-wide counters: next sequence, frames written, dropped and read
+COUNTERS = 4
+
+# Room for a 1080p BGR frame
+DEFAULT_SLOT_BYTES = 1920 * 1080 * 3
+
+
+class FrameDescriptor(TypedDict):
+    slot: int
+    shape: tuple[int, ...]
+    dtype: str
+    timestamp: float
+    sequence: int
+
+
+class FrameRing:
+    """
+    A ring of shared-memory frame slots for passing frames between
+    processes without pickling them.
+
+    A producer reserves a free slot, writes a frame into it and commits it.
+    A consumer reads the oldest committed frame as a view of the slot and
+    releases the slot when done. Only small `FrameDescriptor` dicts are
+    exchanged. When every slot is taken, the producer either overwrites
+    the oldest frame nobody is reading yet (drop-oldest) or waits for a
+    consumer to release one (back-pressure).
+
+    The ring is created in one process and handed to others when they
+    are started; the creating process frees it with `close`.
+    """
+
+    def __init__(
+        self,
+        num_slots: int = 4,
+        slot_bytes: int = DEFAULT_SLOT_BYTES,
+        drop_oldest: bool = True,
+    ):
+        """
+        Initialises the ring.
+
+        Args:
+            num_slots (int): Number of frame slots.
+            slot_bytes (int): Size of each slot in bytes.
+            drop_oldest (bool): Whether a full ring drops its oldest unread
+                frame, rather than making the producer wait.
+
+        Raises:
+            ValueError: If the ring has no slots or empty slots.
+        """
+        if num_slots < 1 or slot_bytes < 1:
+            raise ValueError('num_slots and slot_bytes must be positive.')
+
+        self.num_slots = num_slots
+        self.slot_bytes = slot_bytes
+        self.drop_oldest = drop_oldest
+        self.frames = shared_memory.SharedMemory(
+            create=True, size=num_slots * slot_bytes,
+        )
+        self.header = shared_memory.SharedMemory(
+            create=True,
+            size=num_slots * SLOT_DTYPE.itemsize + COUNTERS * 8,
+        )
+        self.condition = multiprocessing.Condition()
+        self.owner = True
+        self.map_header()
+        self.slots[:] = np.zeros(num_slots, SLOT_DTYPE)
+        self.counters[:] = 0
+
+    def map_header(self) -> None:
+        """
+        Maps the slot metadata and counters onto the header block.
+        """
+        self.slots = np.ndarray(self.num_slots, SLOT_DTYPE, self.header.buf)
+        self.counters = np.ndarray(
+            COUNTERS,
+            np.int64,
+            self.header.buf,
+            offset=self.num_slots * SLOT_DTYPE.itemsize,
+        )
+
+    def __getstate__(self) -> dict:
+        """
+        Pickles the ring by the names of its shared-memory blocks, for
+        processes started with 'spawn'.
+        """
+        return {
+            'num_slots': self.num_slots,
+            'slot_bytes': self.slot_bytes,
+            'drop_oldest': self.drop_oldest,
+            'frames': self.frames.name,
+            'header': self.header.name,
+            'condition': self.condition,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Attaches to the shared-memory blocks of a pickled ring.
+        """
+        self.num_slots = state['num_slots']
+        self.slot_bytes = state['slot_bytes']
+        self.drop_oldest = state['drop_oldest']
+        self.frames = shared_memory.SharedMemory(name=state['frames'])
+        self.header = shared_memory.SharedMemory(name=state['header'])
+        self.condition = state['condition']
+        self.owner = False
+        self.map_header()
+
+    def slot_view(
+        self,
+        slot: int,
+        shape: tuple[int, ...],
+        dtype: np.dtype | str,
+    ) -> np.ndarray:
+        """
+        Returns a slot as an array, without copying.
+        """
+        return np.ndarray(
+            shape, dtype, self.frames.buf, offset=slot * self.slot_bytes,
+        )
+
+    def can_claim(self) -> bool:
+        """
+        Whether `claim_slot` would find a slot.
+        """
+        states = self.slots['state']
+        return bool(
+            np.any(states == FREE)
+            or (self.drop_oldest and np.any(states == READY)),
+        )
+
+    def claim_slot(self) -> int | None:
+        """
+        Picks the slot to write next: a free one, or with drop-oldest the
+        oldest unread frame. Must be called with the condition held.
+
+        Returns:
+            int | None: The slot, or None if none can be taken.
+        """
+        states = self.slots['state']
+        free = np.flatnonzero(states == FREE)
+        if len(free):
+            return int(free[0])
+        if self.drop_oldest:
+            ready = np.flatnonzero(states == READY)
+            if len(ready):
+                self.counters[2] += 1
+                return int(ready[np.argmin(self.slots['sequence'][ready])])
+        return None
+
+    def reserve(
+        self,
+        shape: tuple[int, ...],
+        dtype: np.dtype | str = np.uint8,
+        timeout: float | None = None,
+    ) -> tuple[int, np.ndarray]:
+        """
+        Reserves a slot for a frame, so it can be written in place, e.g. by
+        `cv2.VideoCapture.read(image)`.
+
+        Args:
+            shape (tuple[int, ...]): The frame shape.
+            dtype (np.dtype | str): The frame dtype.
+            timeout (float | None): Seconds to wait for a free slot, or
+                None to wait indefinitely.
+
+        Returns:
+            tuple[int, np.ndarray]: The slot and a writable view of it.
+
+        Raises:
+            ValueError: If the frame does not fit in a slot.
+            queue.Full: If no slot became free within the timeout.
+        """
+        dtype = np.dtype(dtype)
+        if int(np.prod(shape)) * dtype.itemsize > self.slot_bytes:
+            raise ValueError(
+                f"Frame of shape {shape} exceeds the "
+                f"{self.slot_bytes}-byte slot.",
+            )
+        if len(shape) > 4:
+            raise ValueError('Frames may have at most 4 dimensions.')
+
+        with self.condition:
+            slot = self.claim_slot()
+            if slot is None:
+                self.condition.wait_for(self.can_claim, timeout)
+                slot = self.claim_slot()
+                if slot is None:
+                    raise queue.Full('No free frame slot.')
+            record = self.slots[slot]
+            record['state'] = WRITING
+            record['ndim'] = len(shape)
+            record['shape'][:] = 0
+            record['shape'][:len(shape)] = shape
+            record['dtype'] = dtype.str.encode()
+        return slot, self.slot_view(slot, shape, dtype)
+
+    def commit(
+        self,
+        slot: int,
+        timestamp: float | None = None,
+    ) -> FrameDescriptor:
+        """
+        Publishes a reserved slot to consumers.
+
+        Args:
+            slot (int): The reserved slot.
+            timestamp (float | None): Capture time; defaults to now.
+
+        Returns:
+            FrameDescriptor: The frame's descriptor.
+        """
+        with self.condition:
+            record = self.slots[slot]
+            record['sequence'] = self.counters[0]
+            record['timestamp'] = (
+                time.time() if timestamp is None else timestamp
+            )
+            record['state'] = READY
+            self.counters[0] += 1
+            self.counters[1] += 1
+            self.condition.notify_all()
+            return self.describe(slot)
+
+    def write(
+        self,
+        frame: np.ndarray,
+        timestamp: float | None = None,
+        timeout: float | None = None,
+    ) -> FrameDescriptor:
+        """
+        Copies a frame into a slot and publishes it.
+
+        Args:
+            frame (np.ndarray): The frame.
+            timestamp (float | None): Capture time; defaults to now.
+            timeout (float | None): Seconds to wait for a free slot.
+
+        Returns:
+            FrameDescriptor: The frame's descriptor.
+        """
+        slot, view = self.reserve(frame.shape, frame.dtype, timeout)
+        view[...] = frame
+        del view
+        return self.commit(slot, timestamp)
+
+    def describe(self, slot: int) -> FrameDescriptor:
+        """
+        Builds the descriptor of a slot from its metadata.
+        """
+        record = self.slots[slot]
+        return {
+            'slot': slot,
+            'shape': tuple(int(n) for n in record['shape'][:record['ndim']]),
+            'dtype': record['dtype'].decode(),
+            'timestamp': float(record['timestamp']),
+            'sequence': int(record['sequence']),
+        }
+
+    def read(self, timeout: float | None = None) -> FrameDescriptor:
+        """
+        Takes the oldest published frame. The slot stays reserved for the
+        caller until `release`.
+
+        Args:
+            timeout (float | None): Seconds to wait for a frame, or None
+                to wait indefinitely.
+
+        Returns:
+            FrameDescriptor: The frame's descriptor.
+
+        Raises:
+            queue.Empty: If no frame arrived within the timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: np.any(self.slots['state'] == READY),
+                timeout,
+            ):
+                raise queue.Empty('No frame in the ring.')
+            ready = np.flatnonzero(self.slots['state'] == READY)
+            slot = int(ready[np.argmin(self.slots['sequence'][ready])])
+            self.slots[slot]['state'] = READING
+            self.counters[3] += 1
+            return self.describe(slot)
+
+    def take(self, descriptor: FrameDescriptor) -> bool:
+        """
+        Takes the frame of a descriptor sent by the producer, as `read`
+        takes the oldest one. The slot stays reserved for the caller until
+        `release`.
+
+        Args:
+            descriptor (FrameDescriptor): The frame's descriptor.
+
+        Returns:
+            bool: Whether the frame was still there, rather than dropped
+                for a newer one.
+        """
+        with self.condition:
+            record = self.slots[descriptor['slot']]
+            if (
+                record['state'] != READY
+                or record['sequence'] != descriptor['sequence']
+            ):
+                return False
+            record['state'] = READING
+            self.counters[3] += 1
+            return True
+
+    def view(self, descriptor: FrameDescriptor) -> np.ndarray:
+        """
+        Returns the frame of a descriptor from `read`, without copying.
+        The view is only valid until the slot is released.
+
+        Args:
+            descriptor (FrameDescriptor): The frame's descriptor.
+
+        Returns:
+            np.ndarray: The frame.
+        """
+        return self.slot_view(
+            descriptor['slot'], descriptor['shape'], descriptor['dtype'],
+        )
+
+    def release(self, descriptor: FrameDescriptor) -> None:
+        """
+        Returns a slot taken with `read` to the producer.
+
+        Args:
+            descriptor (FrameDescriptor): The frame's descriptor.
+        """
+        with self.condition:
+            self.slots[descriptor['slot']]['state'] = FREE
+            self.condition.notify_all()
+
+    def discard(self) -> None:
+        """
+        Frees the slots of frames nobody is reading, e.g. those left by a
+        producer that stopped. Slots being read stay with their reader.
+        """
+        with self.condition:
+            states = self.slots['state']
+            states[(states == READY) | (states == WRITING)] = FREE
+            self.condition.notify_all()
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Returns the ring's frame counters.
+
+        Returns:
+            dict[str, int]: Frames written, dropped, read and waiting.
+        """
+        with self.condition:
+            return {
+                'written': int(self.counters[1]),
+                'dropped': int(self.counters[2]),
+                'read': int(self.counters[3]),
+                'pending': int(np.sum(self.slots['state'] == READY)),
+            }
+
+    def close(self) -> None:
+        """
+        Detaches from the ring, and frees it in the creating process.
+        Views of slots must be deleted first.
+        """
+        del self.slots, self.counters
+        for block in (self.frames, self.header):
+            block.close()
+            if self.owner:
+                block.unlink()
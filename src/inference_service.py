@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import time
+import zlib
+from collections.abc import Callable
+from functools import partial
+from multiprocessing import resource_tracker
+from pathlib import Path
+
+import anyio
+import numpy as np
+
+from .detections import Detections
+from .frame_ring import FrameDescriptor
+from .frame_ring import FrameRing
+from .memory_policy import MemoryPolicy
+from .sliced_inference import SlicedInference
+
+# Room for a 4K BGR frame; pages are only committed once written
+DEFAULT_MAX_FRAME_BYTES = 3840 * 2160 * 3
+
+
+def create_engine(model_key: str, device: str = 'cuda:0') -> SlicedInference:
+    """
+    Loads a model and wraps it in a batched slicing engine, with the
+    slicing used for local detection.
+
+    Args:
+        model_key (str): The model key, e.g. 'yolo11n'.
+        device (str): The device to load the model on.
+
+    Returns:
+        SlicedInference: The slicing engine.
+    """
+    from sahi import AutoDetectionModel
+
+    model = AutoDetectionModel.from_pretrained(
+        'yolov8',
+        model_path=Path('models/pt/') / f"best_{model_key}.pt",
+        device=device,
+    )
+    return SlicedInference.from_sahi_model(
+        model,
+        slice_height=376,
+        slice_width=376,
+        overlap_height_ratio=0.3,
+        overlap_width_ratio=0.3,
+    )
+
+
+def route_model_key(model_key: str, num_workers: int) -> int:
+    """
+    Picks the worker serving a model key, so that each model is loaded by
+    one worker only.
+
+    Args:
+        model_key (str): The model key.
+        num_workers (int): The number of workers.
+
+    Returns:
+        int: The worker index.
+    """
+    # crc32 rather than hash(), which differs between processes
+    return zlib.crc32(model_key.encode()) % num_workers
+
+
+def run_inference_worker(
+    request_queue: multiprocessing.Queue,
+    response_queues: list[multiprocessing.Queue],
+    rings: list[FrameRing],
+    engine_factory: Callable[[str], SlicedInference],
+    max_batch_size: int,
+    max_wait: float,
+) -> None:
+    """
+    Worker loop: collects requests into batches, runs each model's frames
+    through one `predict_many` call and replies to every client.
+
+    Args:
+        request_queue (multiprocessing.Queue): The worker's request queue.
+        response_queues (list[multiprocessing.Queue]): Response queues by
+            client ID.
+        rings (list[FrameRing]): Frame rings by client ID.
+        engine_factory (Callable[[str], SlicedInference]): Builds the
+            engine for a model key; called once per key.
+        max_batch_size (int): Maximum number of frames per batch.
+        max_wait (float): Seconds to wait for more frames after the first.
+    """
+    logger = logging.getLogger(__name__)
+    engines: dict[str, SlicedInference] = {}
+    memory_policy = MemoryPolicy()
+    memory_policy.apply()
+
+    running = True
+    while running:
+        request = request_queue.get()
+        if request is None:
+            break
+
+        batch = [request]
+        deadline = time.monotonic() + max_wait
+        while len(batch) < max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = request_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                running = False
+                break
+            batch.append(request)
+
+        groups: dict[str, list[tuple]] = {}
+        for request in batch:
+            groups.setdefault(request[1], []).append(request)
+
+        for model_key, requests in groups.items():
+            # Frames a client dropped for a newer one are not run
+            taken: list[tuple[int, FrameDescriptor]] = []
+            for client_id, _, descriptor in requests:
+                if rings[client_id].take(descriptor):
+                    taken.append((client_id, descriptor))
+                else:
+                    response_queues[client_id].put((
+                        descriptor['sequence'],
+                        RuntimeError('Frame was dropped before inference.'),
+                    ))
+
+            frames = []
+            try:
+                frames = [
+                    rings[client_id].view(descriptor)
+                    for client_id, descriptor in taken
+                ]
+                if model_key not in engines:
+                    logger.info(f"Loading model {model_key}")
+                    engines[model_key] = engine_factory(model_key)
+                    memory_policy.freeze()
+                results = [
+                    detections.data
+                    for detections in engines[model_key].predict_many(frames)
+                ]
+            except Exception as e:
+                logger.error(f"Inference failed for {model_key}: {e}")
+                results = [RuntimeError(str(e))] * len(taken)
+            finally:
+                # Hand the slots back once their views are gone
+                frames = []
+                for client_id, descriptor in taken:
+                    rings[client_id].release(descriptor)
+
+            for (client_id, descriptor), result in zip(taken, results):
+                response_queues[client_id].put(
+                    (descriptor['sequence'], result),
+                )
+
+        memory_policy.maybe_collect()
+
+
+class InferenceClient:
+    """
+    A stream process's handle on the inference service.
+
+    Frames are written into the client's `FrameRing` and only the ring's
+    small `FrameDescriptor` travels through the request queue. The worker
+    reads the frame in place and releases its slot. When every slot is
+    taken, the ring drops the oldest frame not yet being read, or makes
+    the client wait, as it was configured.
+    """
+
+    def __init__(
+        self,
+        client_id: int,
+        ring: FrameRing,
+        request_queues: list[multiprocessing.Queue],
+        response_queue: multiprocessing.Queue,
+        timeout: float = 30,
+    ):
+        """
+        Initialises the client. Clients are created by
+        `InferenceService.create_client`.
+
+        Args:
+            client_id (int): The client ID.
+            ring (FrameRing): The client's frame ring.
+            request_queues (list[multiprocessing.Queue]): The workers'
+                request queues.
+            response_queue (multiprocessing.Queue): The client's response
+                queue.
+            timeout (float): Seconds to wait for a result.
+        """
+        self.client_id = client_id
+        self.ring = ring
+        self.request_queues = request_queues
+        self.response_queue = response_queue
+        self.timeout = timeout
+
+    def detect(self, model_key: str, frame: np.ndarray) -> Detections:
+        """
+        Runs a frame through a model on the inference service.
+
+        Args:
+            model_key (str): The model key.
+            frame (np.ndarray): The BGR frame.
+
+        Returns:
+            Detections: The detections.
+
+        Raises:
+            ValueError: If the frame does not fit in a slot.
+            queue.Full: If the ring waits for free slots and none was
+                released within the timeout.
+            TimeoutError: If no result arrives within the timeout.
+            RuntimeError: If inference failed on the service, or the frame
+                was dropped first.
+        """
+        descriptor = self.ring.write(frame, timeout=self.timeout)
+        worker = route_model_key(model_key, len(self.request_queues))
+        self.request_queues[worker].put(
+            (self.client_id, model_key, descriptor),
+        )
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                sequence, result = self.response_queue.get(
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+            except queue.Empty:
+                raise TimeoutError('Inference service did not reply.')
+            # Skip late replies to requests that timed out, or that were
+            # sent by a released client with the same ID; the ring numbers
+            # frames across its clients
+            if sequence == descriptor['sequence']:
+                break
+
+        if isinstance(result, Exception):
+            raise result
+        return Detections(result)
+
+    async def detect_async(
+        self,
+        model_key: str,
+        frame: np.ndarray,
+    ) -> Detections:
+        """
+        Runs `detect` in a worker thread so the event loop keeps running.
+
+        Args:
+            model_key (str): The model key.
+            frame (np.ndarray): The BGR frame.
+
+        Returns:
+            Detections: The detections.
+        """
+        return await anyio.to_thread.run_sync(self.detect, model_key, frame)
+
+
+class InferenceService:
+    """
+    A pool of inference worker processes shared by all stream processes.
+
+    Each model key is routed to one worker, which loads it once and runs
+    frames from every stream using it in batches. Stream processes only
+    capture frames and apply the rules.
+
+    Queues and frame rings, one per client ID, are created by the service
+    in the parent process and inherited by the workers and by stream
+    processes started afterwards.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 1,
+        max_clients: int = 64,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES,
+        frame_slots: int = 2,
+        drop_oldest: bool = True,
+        timeout: float = 30,
+        device: str = 'cuda:0',
+        engine_factory: Callable[[str], SlicedInference] | None = None,
+    ):
+        """
+        Initialises the service.
+
+        Args:
+            num_workers (int): Number of worker processes.
+            max_clients (int): Maximum number of clients at once.
+            max_batch_size (int): Maximum number of frames per batch.
+            max_wait_ms (float): How long a worker waits for more frames
+                after the first one arrives, in milliseconds.
+            max_frame_bytes (int): Size of each frame slot.
+            frame_slots (int): Number of frame slots per client.
+            drop_oldest (bool): Whether a client with every slot taken
+                drops its oldest frame not yet being read, rather than
+                waiting for one to be released.
+            timeout (float): Seconds a client waits for a result.
+            device (str): The device models are loaded on.
+            engine_factory (Callable[[str], SlicedInference] | None):
+                Builds the engine for a model key. Defaults to loading
+                `models/pt/best_{model_key}.pt` on `device`.
+        """
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.engine_factory = engine_factory or partial(
+            create_engine, device=device,
+        )
+
+        self.request_queues = [
+            multiprocessing.Queue() for _ in range(num_workers)
+        ]
+        self.response_queues = [
+            multiprocessing.Queue() for _ in range(max_clients)
+        ]
+        # Pages of the rings are only committed once written
+        self.rings = [
+            FrameRing(
+                num_slots=frame_slots,
+                slot_bytes=max_frame_bytes,
+                drop_oldest=drop_oldest,
+            )
+            for _ in range(max_clients)
+        ]
+        self.free_client_ids = list(range(max_clients))
+        self.active_client_ids: set[int] = set()
+        self.workers: list[multiprocessing.Process] = []
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """
+        Starts the worker processes.
+        """
+        # Workers must share the parent's resource tracker, or their own
+        # would unlink the frame rings when they exit
+        resource_tracker.ensure_running()
+        for request_queue in self.request_queues:
+            worker = multiprocessing.Process(
+                target=run_inference_worker,
+                args=(
+                    request_queue,
+                    self.response_queues,
+                    self.rings,
+                    self.engine_factory,
+                    self.max_batch_size,
+                    self.max_wait,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+        self.logger.info(f"Started {self.num_workers} inference workers")
+
+    def create_client(self) -> InferenceClient:
+        """
+        Creates a client with its own frame ring and response queue.
+
+        Returns:
+            InferenceClient: The client.
+
+        Raises:
+            RuntimeError: If all client IDs are in use.
+        """
+        if not self.free_client_ids:
+            raise RuntimeError('No free inference clients.')
+        client_id = self.free_client_ids.pop(0)
+        self.active_client_ids.add(client_id)
+        return self.attach_client(client_id)
+
+    def attach_client(self, client_id: int) -> InferenceClient:
+        """
+        Rebuilds a client in a process forked before the client was
+        created, such as a warm worker, from the queues and rings it has
+        inherited.
+
+        Args:
+            client_id (int): The client ID.
+
+        Returns:
+            InferenceClient: The client.
+        """
+        return InferenceClient(
+            client_id,
+            self.rings[client_id],
+            self.request_queues,
+            self.response_queues[client_id],
+            self.timeout,
+        )
+
+    def release_client(self, client: InferenceClient) -> None:
+        """
+        Frees a client's ID and the frames it left unread once its stream
+        process has stopped.
+
+        Args:
+            client (InferenceClient): The client.
+        """
+        if client.client_id not in self.active_client_ids:
+            return
+        self.active_client_ids.discard(client.client_id)
+        self.rings[client.client_id].discard()
+
+        # Drop replies the stopped process never read
+        response_queue = self.response_queues[client.client_id]
+        while True:
+            try:
+                response_queue.get_nowait()
+            except queue.Empty:
+                break
+        self.free_client_ids.append(client.client_id)
+
+    def stop(self) -> None:
+        """
+        Stops the workers and frees the frame rings.
+        """
+        for request_queue in self.request_queues:
+            request_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self.workers = []
+
+        for ring in self.rings:
+            ring.close()
+        self.rings = []
+
+
+def main() -> None:
+    """
+    Example: two clients sharing one worker.
+    """
+    service = InferenceService(num_workers=1)
+    service.start()
+    clients = [service.create_client() for _ in range(2)]
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for client in clients:
+        print(client.detect('yolo11n', frame).tolist())
+    for client in clients:
+        service.release_client(client)
+    service.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .detections import Detections
+
+# (positive, negative) label pairs that contradict each other
+LABEL_PAIRS = (
+    (Detections.HARDHAT, Detections.NO_HARDHAT),
+    (Detections.SAFETY_VEST, Detections.NO_SAFETY_VEST),
+)
+
+# Overlap above which a negative box duplicates a positive box
+OVERLAP_THRESHOLD = 0.8
+
+
+def as_array(datas: Detections | list[list[float]]) -> np.ndarray:
+    """
+    Returns detection rows as a float64 array without changing their order.
+
+    Args:
+        datas (Detections | list[list[float]]): Detection data in YOLO
+            format.
+
+    Returns:
+        np.ndarray: An (N, 6) array of detection rows.
+    """
+    if isinstance(datas, Detections):
+        return datas.data.astype(np.float64)
+    return np.asarray(datas, dtype=np.float64).reshape(-1, 6)
+
+
+def find_candidate_pairs(
+    boxes1: np.ndarray,
+    boxes2: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the box pairs whose x intervals may intersect.
+
+    The second set is sorted once by its left edge. For each box of the
+    first set, the boxes of the second set that can reach it lie in one
+    contiguous run of that order, found with two binary searches, so the
+    cost is O((n + m) log m) plus the number of candidates rather than
+    every pair.
+
+    Args:
+        boxes1 (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+        boxes2 (np.ndarray): An (M, 4) array of [x1, y1, x2, y2] boxes.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Indices into `boxes1` and `boxes2`
+            of each candidate pair.
+    """
+    if not len(boxes1) or not len(boxes2):
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    order = np.argsort(boxes2[:, 0], kind='stable')
+    left_edges = boxes2[order, 0]
+    max_width = (boxes2[:, 2] - boxes2[:, 0]).max()
+
+    # Areas count the edge pixels, so allow one pixel of slack
+    starts = np.searchsorted(
+        left_edges, boxes1[:, 0] - max_width - 1, side='left',
+    )
+    stops = np.searchsorted(left_edges, boxes1[:, 2] + 1, side='right')
+    counts = stops - starts
+
+    indices1 = np.repeat(np.arange(len(boxes1)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts,
+    )
+    indices2 = order[np.repeat(starts, counts) + offsets]
+    return indices1, indices2
+
+
+def overlap_percentages(
+    boxes1: np.ndarray,
+    boxes2: np.ndarray,
+) -> np.ndarray:
+    """
+    Calculates the intersection over union of paired boxes.
+
+    Args:
+        boxes1 (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+        boxes2 (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+
+    Returns:
+        np.ndarray: The overlap of each pair of rows.
+    """
+    top_left = np.maximum(boxes1[:, :2], boxes2[:, :2])
+    bottom_right = np.minimum(boxes1[:, 2:4], boxes2[:, 2:4])
+    intersection = np.clip(bottom_right - top_left + 1, 0, None).prod(axis=1)
+    areas1 = (boxes1[:, 2:4] - boxes1[:, :2] + 1).prod(axis=1)
+    areas2 = (boxes2[:, 2:4] - boxes2[:, :2] + 1).prod(axis=1)
+    return intersection / (areas1 + areas2 - intersection)
+
+
+def are_contained(
+    inner_boxes: np.ndarray,
+    outer_boxes: np.ndarray,
+) -> np.ndarray:
+    """
+    Determines which boxes are completely contained in their paired box.
+
+    Args:
+        inner_boxes (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+        outer_boxes (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+
+    Returns:
+        np.ndarray: Whether each inner box lies within its outer box.
+    """
+    return (
+        (inner_boxes[:, :2] >= outer_boxes[:, :2]).all(axis=1)
+        & (inner_boxes[:, 2:4] <= outer_boxes[:, 2:4]).all(axis=1)
+    )
+
+
+def find_labels_to_remove(
+    rows: np.ndarray,
+    overlap: bool = True,
+    containment: bool = True,
+    threshold: float = OVERLAP_THRESHOLD,
+) -> np.ndarray:
+    """
+    Finds contradicting Hardhat and Safety Vest labels in one pass.
+
+    For every positive/negative label pair, a negative box is removed when
+    it overlaps a positive box above the threshold. Of the remaining
+    pairs, a negative box inside a positive box is removed, otherwise a
+    positive box inside a negative box is removed. This matches running
+    the overlap filter before the containment filter.
+
+    Args:
+        rows (np.ndarray): An (N, 6) array of detection rows.
+        overlap (bool): Whether to remove overlapping negative labels.
+        containment (bool): Whether to remove contained labels.
+        threshold (float): Overlap above which a negative box is removed.
+
+    Returns:
+        np.ndarray: A boolean mask of the rows to remove.
+    """
+    to_remove = np.zeros(len(rows), dtype=bool)
+    if not len(rows):
+        return to_remove
+
+    labels = rows[:, 5]
+    for positive_label, negative_label in LABEL_PAIRS:
+        positives = np.flatnonzero(labels == positive_label)
+        negatives = np.flatnonzero(labels == negative_label)
+        if not len(positives) or not len(negatives):
+            continue
+        pairs1, pairs2 = find_candidate_pairs(
+            rows[positives, :4], rows[negatives, :4],
+        )
+        positives, negatives = positives[pairs1], negatives[pairs2]
+        positive_boxes = rows[positives, :4]
+        negative_boxes = rows[negatives, :4]
+
+        if overlap:
+            overlapping = overlap_percentages(
+                positive_boxes, negative_boxes,
+            ) > threshold
+            to_remove[negatives[overlapping]] = True
+
+        if containment:
+            # Pairs whose negative box is already gone are not compared
+            remaining = ~to_remove[negatives]
+            negative_inside = remaining & are_contained(
+                negative_boxes, positive_boxes,
+            )
+            positive_inside = (
+                remaining
+                & ~negative_inside
+                & are_contained(positive_boxes, negative_boxes)
+            )
+            to_remove[negatives[negative_inside]] = True
+            to_remove[positives[positive_inside]] = True
+
+    return to_remove
+
+
+def filter_labels(
+    datas: Detections | list[list[float]],
+    overlap: bool = True,
+    containment: bool = True,
+    threshold: float = OVERLAP_THRESHOLD,
+) -> Detections | list[list[float]]:
+    """
+    Removes overlapping and contained Hardhat and Safety Vest labels.
+
+    Args:
+        datas (Detections | list[list[float]]): Detection data in YOLO
+            format.
+        overlap (bool): Whether to remove overlapping negative labels.
+        containment (bool): Whether to remove contained labels.
+        threshold (float): Overlap above which a negative box is removed.
+
+    Returns:
+        Detections | list[list[float]]: The remaining detection data, in
+            the same container type and order as the input.
+    """
+    to_remove = find_labels_to_remove(
+        as_array(datas), overlap, containment, threshold,
+    )
+    if isinstance(datas, Detections):
+        return datas[~to_remove] if to_remove.any() else datas
+    return [data for data, removed in zip(datas, to_remove) if not removed]
+
+
+def remove_overlapping_labels(
+    datas: Detections | list[list[float]],
+    threshold: float = OVERLAP_THRESHOLD,
+) -> Detections | list[list[float]]:
+    """
+    Removes negative labels overlapping Hardhat and Safety Vest labels.
+
+    Args:
+        datas (Detections | list[list[float]]): Detection data in YOLO
+            format.
+        threshold (float): Overlap above which a negative box is removed.
+
+    Returns:
+        Detections | list[list[float]]: The remaining detection data.
+    """
+    return filter_labels(datas, containment=False, threshold=threshold)
+
+
+def remove_completely_contained_labels(
+    datas: Detections | list[list[float]],
+) -> Detections | list[list[float]]:
+    """
+    Removes labels contained in contradicting Hardhat and Safety Vest
+    labels.
+
+    Args:
+        datas (Detections | list[list[float]]): Detection data in YOLO
+            format.
+
+    Returns:
+        Detections | list[list[float]]: The remaining detection data.
+    """
+    return filter_labels(datas, overlap=False)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import datetime
-import gc
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TypedDict
 
@@ -20,8 +22,21 @@ from tenacity import retry_if_exception_type
 from tenacity import stop_after_attempt
 from tenacity import wait_fixed
 
+from . import label_filter
+from .detections import Detections
+from .frame_codec import downscale_frame
+from .frame_codec import encode_frame
+from .frame_codec import UPLOAD_FORMATS
+from .inference_service import InferenceClient
+from .sliced_inference import SlicedInference
+
 load_dotenv()
 
+# Connection pool of the detection server API session
+MAX_CONNECTIONS_PER_HOST = 4
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+
 
 class InputData(TypedDict):
     frame: np.ndarray
@@ -38,10 +53,62 @@ class DetectionData(TypedDict):
     label: int
 
 
+# Models loaded in this process, by model key, shared by its detectors
+_models: dict[str, AutoDetectionModel] = {}
+_models_lock = threading.Lock()
+
+# Thread running local detections of this process, one frame at a time
+_inference_executor: ThreadPoolExecutor | None = None
+
+
+def load_model(model_key: str) -> AutoDetectionModel:
+    """
+    Loads a detection model for local detection, once per process.
+
+    Args:
+        model_key (str): The model key, e.g. 'yolo11n'.
+
+    Returns:
+        AutoDetectionModel: The model, on the first GPU.
+    """
+    with _models_lock:
+        model = _models.get(model_key)
+        if model is None:
+            model = AutoDetectionModel.from_pretrained(
+                'yolov8',
+                model_path=Path('models/pt/') / f"best_{model_key}.pt",
+                device='cuda:0',
+            )
+            _models[model_key] = model
+        return model
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread running this process's local detections, so that
+    streams sharing the event loop keep capturing during forward passes
+    and the shared models are used by one thread at a time.
+
+    Returns:
+        ThreadPoolExecutor: A single-thread executor.
+    """
+    global _inference_executor
+    with _models_lock:
+        if _inference_executor is None:
+            _inference_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='local-inference',
+            )
+        return _inference_executor
+
+
 class LiveStreamDetector:
     """
     A class to perform live stream detection and tracking
     using YOLO with SAHI.
+
+    Detection through the server API keeps one HTTP session open for the
+    detector's lifetime, so frames reuse its connections. Use the detector
+    as an async context manager, or call `close`, to close the session.
     """
 
     def __init__(
@@ -50,6 +117,13 @@ class LiveStreamDetector:
         model_key: str = 'yolo11n',
         output_folder: str | None = None,
         detect_with_server: bool = False,
+        batched_slicing: bool = True,
+        slice_batch_size: int = 32,
+        inference_client: InferenceClient | None = None,
+        model: AutoDetectionModel | None = None,
+        upload_format: str = 'jpeg',
+        upload_quality: int = 90,
+        upload_max_size: int | None = None,
     ):
         """
         Initialises the LiveStreamDetector.
@@ -58,16 +132,90 @@ class LiveStreamDetector:
             api_url (str): The URL of the API for detection.
             model_key (str): The model key for detection.
             output_folder (Optional[str]): Folder for detected frames.
+            detect_with_server (bool): Whether to detect via the server API.
+            batched_slicing (bool): Whether to run the slices of a frame
+                through the local model in batches, rather than one at a
+                time with SAHI.
+            slice_batch_size (int): Maximum number of slices per batch.
+            inference_client (InferenceClient | None): Client of a shared
+                inference service. When given, local detection runs on
+                the service instead of a model loaded by this detector.
+            model (AutoDetectionModel | None): A model already loaded for
+                `model_key`. Defaults to loading it on the first local
+                detection.
+            upload_format (str): Preferred format of frames sent to the
+                server API: 'png', 'jpeg', 'webp' or 'raw'. Servers that
+                do not list it get PNG.
+            upload_quality (int): JPEG or WebP quality, from 1 to 100.
+            upload_max_size (int | None): Longest side, in pixels, frames
+                are shrunk to before upload, e.g. the model input size.
+                Detections are scaled back to the full frame. Defaults to
+                uploading full frames.
         """
+        if upload_format not in UPLOAD_FORMATS:
+            raise ValueError(f"Unsupported upload format: {upload_format}")
         self.api_url: str = (
             api_url if api_url.startswith('http') else f"http://{api_url}"
         )
         self.model_key: str = model_key
         self.output_folder: str | None = output_folder
         self.detect_with_server: bool = detect_with_server
-        self.model: AutoDetectionModel | None = None
+        self.batched_slicing: bool = batched_slicing
+        self.slice_batch_size: int = slice_batch_size
+        self.model: AutoDetectionModel | None = model
+        self.sliced_inference: SlicedInference | None = None
+        self.inference_client: InferenceClient | None = inference_client
         self.access_token: str | None = None
         self.token_expiry: float = 0
+        self.session: aiohttp.ClientSession | None = None
+        self.upload_format: str = upload_format
+        self.upload_quality: int = upload_quality
+        self.upload_max_size: int | None = upload_max_size
+        # Format agreed with the server, once asked
+        self.wire_format: str | None = None
+
+    async def __aenter__(self) -> LiveStreamDetector:
+        """
+        Returns the detector, whose session is closed on exit.
+
+        Returns:
+            LiveStreamDetector: The detector.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Closes the session for the server API.
+        """
+        await self.close()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the session for the server API, opening it on first use.
+
+        Its connections are kept alive between requests and host names
+        stay resolved, so a detection round trip skips the TCP and TLS
+        handshakes and the DNS lookup.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def close(self) -> None:
+        """
+        Closes the session for the server API, if it is open.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
 
     @retry(
         stop=stop_after_attempt(3),
@@ -78,25 +226,24 @@ class LiveStreamDetector:
         """
         Authenticates with the API and retrieves the access token.
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/token",
-                json={
-                    'username': os.getenv('API_USERNAME'),
-                    'password': os.getenv('API_PASSWORD'),
-                },
-            ) as response:
-                response.raise_for_status()
-                token_data = await response.json()
-                if 'msg' in token_data:
-                    raise Exception(token_data['msg'])
-                elif 'access_token' in token_data:
-                    self.access_token = token_data['access_token']
-                else:
-                    raise Exception(
-                        "Token data does not contain 'msg' or 'access_token'",
-                    )
-                self.token_expiry = time.time() + 850
+        async with self.get_session().post(
+            f"{self.api_url}/token",
+            json={
+                'username': os.getenv('API_USERNAME'),
+                'password': os.getenv('API_PASSWORD'),
+            },
+        ) as response:
+            response.raise_for_status()
+            token_data = await response.json()
+            if 'msg' in token_data:
+                raise Exception(token_data['msg'])
+            elif 'access_token' in token_data:
+                self.access_token = token_data['access_token']
+            else:
+                raise Exception(
+                    "Token data does not contain 'msg' or 'access_token'",
+                )
+            self.token_expiry = time.time() + 850
 
     def token_expired(self) -> bool:
         """
@@ -114,6 +261,52 @@ class LiveStreamDetector:
         if self.access_token is None or self.token_expired():
             await self.authenticate()
 
+    async def negotiate_upload_format(self) -> str:
+        """
+        Agrees the upload format with the server, asking for the formats it
+        accepts on first use. Servers without the formats route get PNG for
+        good. Any other failure sends the frame as PNG and the next call
+        asks again; a rejected token is renewed and the formats requested
+        once more first.
+
+        Returns:
+            str: The upload format.
+        """
+        if self.wire_format is not None:
+            return self.wire_format
+        if self.upload_format == 'png':
+            self.wire_format = 'png'
+            return self.wire_format
+
+        await self.ensure_authenticated()
+        for attempt in range(2):
+            formats = []
+            try:
+                async with self.get_session().get(
+                    f"{self.api_url}/detect/formats",
+                    headers={'Authorization': f"Bearer {self.access_token}"},
+                ) as response:
+                    status = response.status
+                    if status == 200:
+                        formats = (await response.json()).get('formats', [])
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return 'png'
+            if status == 401 and attempt == 0:
+                await self.authenticate()
+                continue
+            break
+
+        if status == 200:
+            self.wire_format = (
+                self.upload_format if self.upload_format in formats else 'png'
+            )
+        elif status in (404, 405):
+            # The server predates the formats route
+            self.wire_format = 'png'
+        else:
+            return 'png'
+        return self.wire_format
+
     @retry(
         stop=stop_after_attempt(2),
         wait=wait_fixed(3),
@@ -122,7 +315,7 @@ class LiveStreamDetector:
     async def generate_detections_cloud(
         self,
         frame: np.ndarray,
-    ) -> list[list[float]]:
+    ) -> Detections:
         """
         Sends the frame to the API for detection and retrieves the detections.
 
@@ -130,79 +323,107 @@ class LiveStreamDetector:
             frame (cv2.Mat): The frame to send for detection.
 
         Returns:
-            List[List[float]]: The detection data.
+            Detections: The detection data, in the frame's coordinates.
         """
         await self.ensure_authenticated()
+        upload_format = await self.negotiate_upload_format()
 
-        _, frame_encoded = cv2.imencode('.png', frame)
-        frame_encoded_bytes = frame_encoded.tobytes()
+        upload, scale = downscale_frame(frame, self.upload_max_size)
+        frame_encoded_bytes = encode_frame(
+            upload, upload_format, self.upload_quality,
+        )
         timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
-        filename = f"frame_{timestamp}.png"
+        filename = f"frame_{timestamp}.{upload_format}"
 
         headers = {'Authorization': f"Bearer {self.access_token}"}
         data = aiohttp.FormData()
         data.add_field(
             'image', frame_encoded_bytes,
-            filename=filename, content_type='image/png',
+            filename=filename, content_type=UPLOAD_FORMATS[upload_format],
         )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/detect",
-                data=data,
-                params={'model': self.model_key},
-                headers=headers,
-            ) as response:
-                response.raise_for_status()
-                detections = await response.json()
-                return detections
+        async with self.get_session().post(
+            f"{self.api_url}/detect",
+            data=data,
+            params={'model': self.model_key},
+            headers=headers,
+        ) as response:
+            response.raise_for_status()
+            detections = Detections.from_list(await response.json())
+
+        if scale != 1:
+            rows = detections.data.copy()
+            rows[:, :4] /= scale
+            detections = Detections(rows)
+        return detections
 
     async def generate_detections_local(
         self,
         frame: np.ndarray,
-    ) -> list[list[float]]:
+    ) -> Detections:
         """
-        Generates detections locally using YOLO.
+        Generates detections locally using YOLO, on the shared inference
+        service if there is one and otherwise off the event loop.
 
         Args:
             frame (np.ndarray): The frame to send for detection.
 
         Returns:
-            List[List[float]]: The detection data.
+            Detections: The detection data.
         """
-        if self.model is None:
-            model_path = Path('models/pt/') / f"best_{self.model_key}.pt"
-            self.model = AutoDetectionModel.from_pretrained(
-                'yolov8',
-                model_path=model_path,
-                device='cuda:0',
+        if self.inference_client is not None:
+            datas = await self.inference_client.detect_async(
+                self.model_key, frame,
             )
+            return label_filter.filter_labels(datas)
 
-        result = get_sliced_prediction(
-            frame,
-            self.model,
-            slice_height=376,
-            slice_width=376,
-            overlap_height_ratio=0.3,
-            overlap_width_ratio=0.3,
+        return await asyncio.get_running_loop().run_in_executor(
+            get_inference_executor(), self.detect_local, frame,
         )
 
-        # Compile detection data in YOLO format
-        datas = []
-        for object_prediction in result.object_prediction_list:
-            label = int(object_prediction.category.id)
-            x1, y1, x2, y2 = (
-                int(x)
-                for x in object_prediction.bbox.to_voc_bbox()
+    def detect_local(self, frame: np.ndarray) -> Detections:
+        """
+        Runs a frame through the process's model for `model_key`, loading
+        it on first use. Blocks for the forward passes.
+
+        Args:
+            frame (np.ndarray): The frame to detect.
+
+        Returns:
+            Detections: The detection data.
+        """
+        if self.model is None:
+            self.model = load_model(self.model_key)
+
+        if self.batched_slicing:
+            if self.sliced_inference is None:
+                self.sliced_inference = SlicedInference.from_sahi_model(
+                    self.model,
+                    slice_height=376,
+                    slice_width=376,
+                    overlap_height_ratio=0.3,
+                    overlap_width_ratio=0.3,
+                    batch_size=self.slice_batch_size,
+                )
+            datas = self.sliced_inference.predict(frame)
+        else:
+            result = get_sliced_prediction(
+                frame,
+                self.model,
+                slice_height=376,
+                slice_width=376,
+                overlap_height_ratio=0.3,
+                overlap_width_ratio=0.3,
             )
-            confidence = float(object_prediction.score.value)
-            datas.append([x1, y1, x2, y2, confidence, label])
 
-        # Remove overlapping labels for Hardhat and Safety Vest categories
-        datas = self.remove_overlapping_labels(datas)
+            # Compile detection data in YOLO format
+            datas = Detections.from_object_predictions(
+                result.object_prediction_list,
+            )
 
-        # Remove fully contained Hardhat and Safety Vest labels
-        datas = self.remove_completely_contained_labels(datas)
+        # Remove overlapping and fully contained Hardhat and Safety Vest
+        # labels in one pass
+        datas = label_filter.filter_labels(datas)
 
         return datas
 
@@ -211,46 +432,13 @@ class LiveStreamDetector:
         Removes overlapping labels for Hardhat and Safety Vest categories.
 
         Args:
-            datas (list): A list of detection data in YOLO format.
+            datas (list | Detections): Detection data in YOLO format.
 
         Returns:
-            list: A list of detection data with overlapping labels removed.
-        """
-        hardhat_indices = [
-            i for i, d in enumerate(
-                datas,
-            ) if d[5] == 0
-        ]  # Indices of Hardhat detections
-        # Indices of NO-Hardhat detections
-        no_hardhat_indices = [i for i, d in enumerate(datas) if d[5] == 2]
-        # Indices of Safety Vest detections
-        safety_vest_indices = [i for i, d in enumerate(datas) if d[5] == 7]
-        # Indices of NO-Safety Vest detections
-        no_safety_vest_indices = [i for i, d in enumerate(datas) if d[5] == 4]
-
-        to_remove = set()
-        for hardhat_index in hardhat_indices:
-            for no_hardhat_index in no_hardhat_indices:
-                overlap = self.overlap_percentage(
-                    datas[hardhat_index][:4], datas[no_hardhat_index][:4],
-                )
-                if overlap > 0.8:
-                    to_remove.add(no_hardhat_index)
-
-        for safety_vest_index in safety_vest_indices:
-            for no_safety_vest_index in no_safety_vest_indices:
-                overlap = self.overlap_percentage(
-                    datas[safety_vest_index][:4],
-                    datas[no_safety_vest_index][:4],
-                )
-                if overlap > 0.8:
-                    to_remove.add(no_safety_vest_index)
-
-        for index in sorted(to_remove, reverse=True):
-            datas.pop(index)
-
-        gc.collect()
-        return datas
+            list | Detections: Detection data with overlapping labels
+                removed, in the same container type as the input.
+        """
+        return label_filter.remove_overlapping_labels(datas)
 
     def overlap_percentage(self, bbox1, bbox2):
         """
@@ -275,7 +463,6 @@ class LiveStreamDetector:
         overlap_percentage = intersection_area / float(
             bbox1_area + bbox2_area - intersection_area,
         )
-        gc.collect()
 
         return overlap_percentage
 
@@ -302,65 +489,17 @@ class LiveStreamDetector:
         Removes labels fully contained in Hardhat/Safety Vest categories.
 
         Args:
-            datas (list): A list of detection data in YOLO format.
+            datas (list | Detections): Detection data in YOLO format.
 
         Returns:
-            list: Detection data with fully contained labels removed.
+            list | Detections: Detection data with fully contained labels
+                removed, in the same container type as the input.
         """
-        hardhat_indices = [
-            i
-            for i, d in enumerate(
-                datas,
-            )
-            if d[5] == 0
-        ]  # Indices of Hardhat detections
-
-        # Indices of NO-Hardhat detections
-        no_hardhat_indices = [i for i, d in enumerate(datas) if d[5] == 2]
-
-        # Indices of Safety Vest detections
-        safety_vest_indices = [i for i, d in enumerate(datas) if d[5] == 7]
-
-        # Indices of NO-Safety Vest detections
-        no_safety_vest_indices = [i for i, d in enumerate(datas) if d[5] == 4]
-
-        to_remove = set()
-        # Check hardhats
-        for hardhat_index in hardhat_indices:
-            for no_hardhat_index in no_hardhat_indices:
-                if self.is_contained(
-                    datas[no_hardhat_index][:4],
-                    datas[hardhat_index][:4],
-                ):
-                    to_remove.add(no_hardhat_index)
-                elif self.is_contained(
-                    datas[hardhat_index][:4],
-                    datas[no_hardhat_index][:4],
-                ):
-                    to_remove.add(hardhat_index)
-
-        # Check safety vests
-        for safety_vest_index in safety_vest_indices:
-            for no_safety_vest_index in no_safety_vest_indices:
-                if self.is_contained(
-                    datas[no_safety_vest_index][:4],
-                    datas[safety_vest_index][:4],
-                ):
-                    to_remove.add(no_safety_vest_index)
-                elif self.is_contained(
-                    datas[safety_vest_index][:4],
-                    datas[no_safety_vest_index][:4],
-                ):
-                    to_remove.add(safety_vest_index)
-
-        for index in sorted(to_remove, reverse=True):
-            datas.pop(index)
-
-        return datas
+        return label_filter.remove_completely_contained_labels(datas)
 
     async def generate_detections(
         self, frame: np.ndarray,
-    ) -> tuple[list[list[float]], np.ndarray]:
+    ) -> tuple[Detections, np.ndarray]:
         """
         Generates detections with local model or cloud API as configured.
 
@@ -368,8 +507,7 @@ class LiveStreamDetector:
             frame (np.ndarray): The frame to send for detection.
 
         Returns:
-            Tuple[List[List[float]], np.ndarray]:
-                Detections and original frame.
+            Tuple[Detections, np.ndarray]: Detections and original frame.
         """
         if self.detect_with_server:
             datas = await self.generate_detections_cloud(frame)
@@ -439,6 +577,35 @@ async def main():
         action='store_true',
         help='Run detection using server api',
     )
+    parser.add_argument(
+        '--sahi_slicing',
+        action='store_true',
+        help='Run local slices one at a time with SAHI instead of batched',
+    )
+    parser.add_argument(
+        '--slice_batch_size',
+        type=int,
+        default=32,
+        help='Maximum number of slices per batched forward pass',
+    )
+    parser.add_argument(
+        '--upload_format',
+        type=str,
+        choices=list(UPLOAD_FORMATS),
+        default='jpeg',
+        help='Format of frames sent to the detection server',
+    )
+    parser.add_argument(
+        '--upload_quality',
+        type=int,
+        default=90,
+        help='JPEG or WebP quality of uploaded frames',
+    )
+    parser.add_argument(
+        '--upload_max_size',
+        type=int,
+        help='Longest side uploaded frames are shrunk to, in pixels',
+    )
     args = parser.parse_args()
 
     detector = LiveStreamDetector(
@@ -446,8 +613,14 @@ async def main():
         model_key=args.model_key,
         output_folder=args.output_folder,
         detect_with_server=args.detect_with_server,
+        batched_slicing=not args.sahi_slicing,
+        slice_batch_size=args.slice_batch_size,
+        upload_format=args.upload_format,
+        upload_quality=args.upload_quality,
+        upload_max_size=args.upload_max_size,
     )
-    await detector.run_detection(args.url)
+    async with detector:
+        await detector.run_detection(args.url)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from .stream_capture import StreamCapture
+
+StreamConsumer = Callable[[StreamCapture], Awaitable[None]]
+
+
+class MultiStreamCapture:
+    """
+    Drives many StreamCapture instances in one event loop.
+
+    Blocking OpenCV calls of every stream run in one bounded thread pool.
+    Each stream has at most one call in flight and the pool serves calls
+    in arrival order, so streams take turns instead of a busy stream
+    starving the others. Each stream runs in its own task: when its
+    consumer fails, only that stream is restarted.
+    """
+
+    def __init__(self, max_workers: int = 8, restart_delay: float = 5):
+        """
+        Initialises the MultiStreamCapture.
+
+        Args:
+            max_workers (int): Maximum number of threads for blocking
+                capture calls, shared by all streams.
+            restart_delay (float): Seconds to wait before restarting a
+                failed stream.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='stream_capture',
+        )
+        self.restart_delay = restart_delay
+        self.captures: dict[str, StreamCapture] = {}
+        self.consumers: dict[str, StreamConsumer] = {}
+        self.failures: dict[str, int] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def add_stream(
+        self,
+        key: str,
+        stream_url: str,
+        consumer: StreamConsumer,
+        capture_interval: int = 15,
+    ) -> StreamCapture:
+        """
+        Adds a stream, captured with frame skipping on the shared pool.
+
+        Args:
+            key (str): A unique name for the stream.
+            stream_url (str): The URL of the video stream.
+            consumer (StreamConsumer): Coroutine function that reads and
+                processes the stream's frames.
+            capture_interval (int): The interval at which frames should be
+                captured.
+
+        Returns:
+            StreamCapture: The stream's capture object.
+
+        Raises:
+            ValueError: If the key is already in use.
+        """
+        if key in self.captures:
+            raise ValueError(f"Stream {key} already added.")
+        capture = StreamCapture(
+            stream_url,
+            capture_interval=capture_interval,
+            frame_skipping=True,
+            executor=self.executor,
+        )
+        self.captures[key] = capture
+        self.consumers[key] = consumer
+        self.failures[key] = 0
+        return capture
+
+    async def run_stream(self, key: str) -> None:
+        """
+        Runs one stream's consumer, restarting it after failures.
+
+        Args:
+            key (str): The stream's name.
+        """
+        capture = self.captures[key]
+        while True:
+            try:
+                await self.consumers[key](capture)
+                self.logger.info(f"Stream {key} ended")
+                return
+            except Exception as e:
+                self.failures[key] += 1
+                self.logger.error(f"Stream {key} failed: {e}")
+                await capture.release_resources()
+                await asyncio.sleep(self.restart_delay)
+
+    async def run(self) -> None:
+        """
+        Runs all streams until every consumer has ended.
+        """
+        try:
+            await asyncio.gather(
+                *(self.run_stream(key) for key in self.captures),
+            )
+        finally:
+            for capture in self.captures.values():
+                await capture.release_resources()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Returns capture counters and failures by stream.
+
+        Returns:
+            dict[str, dict[str, float]]: The metrics of each stream.
+        """
+        return {
+            key: {
+                **capture.get_capture_metrics(),
+                'failures': self.failures[key],
+            }
+            for key, capture in self.captures.items()
+        }
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import queue
+import time
+from typing import TypedDict
+
+import cv2
+import numpy as np
+
+from .frame_codec import downscale_frame
+from .frame_codec import encode_frame
+from .notifiers.dispatcher import AsyncNotifier
+from .notifiers.dispatcher import NotificationDispatcher
+
+
+class WarningEvent(TypedDict):
+    site: str | None
+    stream_name: str
+    tokens: list[str]
+    message: str
+    thumbnail: np.ndarray | None
+    timestamp: float
+
+
+class Digest(TypedDict):
+    token: str
+    site: str | None
+    message: str
+    image: bytes | None
+    events: int
+
+
+class AggregatorMetrics(TypedDict):
+    submitted: int
+    events: int
+    digests: int
+    dropped: int
+    windows: int
+
+
+class NotificationAggregator:
+    """
+    Coalesces the warnings of many streams into digests per token and
+    site.
+
+    The first warning for a token and site is sent at once and opens a
+    window. Warnings arriving during the window are held, keeping the
+    latest of each stream, and sent together as one digest when the window
+    ends, with their thumbnails composited into a grid. Each warning
+    carries the thumbnail of its own frame, so a digest shows the frames of
+    the warnings it reports. A digest opens the
+    next window, so a token hears about a site at most twice per window
+    however many of its cameras raise warnings.
+
+    The aggregator can run in a process of its own, started with `start`,
+    which streams in other processes reach through `submit`. A stream
+    without one calls `add` and `flush` itself.
+    """
+
+    def __init__(
+        self,
+        window: float = 300.0,
+        thumbnail_size: int = 640,
+        max_thumbnails: int = 9,
+        max_events: int = 1000,
+        tick: float = 1.0,
+        channel: str = 'line',
+        notifiers: dict[str, AsyncNotifier] | None = None,
+    ):
+        """
+        Initialises the aggregator.
+
+        Args:
+            window (float): Seconds warnings are coalesced for.
+            thumbnail_size (int): Longest side of each thumbnail in pixels.
+            max_thumbnails (int): Most thumbnails in a digest's grid.
+            max_events (int): Warnings the event queue holds before new
+                ones are dropped.
+            tick (float): Seconds between checks for ended windows.
+            channel (str): The dispatcher channel digests are sent on.
+            notifiers (dict[str, AsyncNotifier] | None): Notifiers of the
+                aggregator's process. Defaults to LINE Notify.
+        """
+        self.window = window
+        self.thumbnail_size = thumbnail_size
+        self.max_thumbnails = max_thumbnails
+        self.tick = tick
+        self.channel = channel
+        self.notifiers = notifiers
+        self.events: multiprocessing.Queue = multiprocessing.Queue(
+            max_events,
+        )
+        # Open windows by token and site, with the warnings they hold
+        self.buckets: dict[tuple[str, str | None], dict] = {}
+        self.process: multiprocessing.Process | None = None
+        self.logger = logging.getLogger(__name__)
+        self.metrics: AggregatorMetrics = {
+            'submitted': 0,
+            'events': 0,
+            'digests': 0,
+            'dropped': 0,
+            'windows': 0,
+        }
+
+    def make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Shrinks a drawn frame for a digest.
+
+        Args:
+            frame (np.ndarray): The BGR frame.
+
+        Returns:
+            np.ndarray: The thumbnail.
+        """
+        thumbnail, _ = downscale_frame(frame, self.thumbnail_size)
+        return thumbnail
+
+    def submit(self, event: WarningEvent) -> bool:
+        """
+        Sends a warning to the aggregator's process without waiting.
+
+        Args:
+            event (WarningEvent): The warning.
+
+        Returns:
+            bool: Whether the warning was queued.
+        """
+        self.metrics['submitted'] += 1
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.metrics['dropped'] += 1
+            self.logger.warning(
+                f"Aggregator queue full, dropped warning: {event['message']}",
+            )
+            return False
+        return True
+
+    def add(self, event: WarningEvent, now: float) -> list[Digest]:
+        """
+        Adds a warning to the windows of its tokens.
+
+        Args:
+            event (WarningEvent): The warning.
+            now (float): The current time in seconds.
+
+        Returns:
+            list[Digest]: Digests to send at once, for the tokens without
+                an open window for the site.
+        """
+        self.metrics['events'] += 1
+        digests = []
+        composed = None
+        for token in event['tokens']:
+            key = (token, event['site'])
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                # The first warning is sent at once and opens the window
+                self.open_window(key, now)
+                if composed is None:
+                    composed = self.compose([event])
+                digests.append(self.make_digest(key, composed, 1))
+            else:
+                # Keep the latest warning of each stream
+                bucket['events'][event['stream_name']] = event
+                bucket['count'] += 1
+        return digests
+
+    def flush(self, now: float) -> list[Digest]:
+        """
+        Closes the windows that have ended.
+
+        Args:
+            now (float): The current time in seconds; `math.inf` closes
+                every window.
+
+        Returns:
+            list[Digest]: Digests of the warnings the windows held.
+        """
+        digests = []
+        # Tokens holding the same warnings share one composition
+        composed: dict[tuple[int, ...], tuple[str, bytes | None]] = {}
+        for key, bucket in list(self.buckets.items()):
+            if now < bucket['window_end']:
+                continue
+            events = list(bucket['events'].values())
+            if not events:
+                del self.buckets[key]
+                continue
+            ids = tuple(id(event) for event in events)
+            if ids not in composed:
+                composed[ids] = self.compose(events)
+            digests.append(
+                self.make_digest(key, composed[ids], bucket['count']),
+            )
+            if math.isinf(now):
+                del self.buckets[key]
+            else:
+                self.open_window(key, now)
+        return digests
+
+    def open_window(self, key: tuple[str, str | None], now: float) -> None:
+        """
+        Opens an empty window for a token and site.
+
+        Args:
+            key (tuple[str, str | None]): The token and site.
+            now (float): The current time in seconds.
+        """
+        self.buckets[key] = {
+            'window_end': now + self.window,
+            'events': {},
+            'count': 0,
+        }
+        self.metrics['windows'] += 1
+
+    def make_digest(
+        self,
+        key: tuple[str, str | None],
+        composed: tuple[str, bytes | None],
+        count: int,
+    ) -> Digest:
+        """
+        Builds the digest for a token.
+
+        Args:
+            key (tuple[str, str | None]): The token and site.
+            composed (tuple[str, bytes | None]): The message and image.
+            count (int): Number of warnings the digest covers.
+
+        Returns:
+            Digest: The digest.
+        """
+        self.metrics['digests'] += 1
+        message, image = composed
+        return {
+            'token': key[0],
+            'site': key[1],
+            'message': message,
+            'image': image,
+            'events': count,
+        }
+
+    def compose(self, events: list[WarningEvent]) -> tuple[str, bytes | None]:
+        """
+        Joins the messages of warnings and composites their thumbnails.
+
+        Args:
+            events (list[WarningEvent]): The warnings, one per stream.
+
+        Returns:
+            tuple[str, bytes | None]: The message, and the thumbnail grid
+                as a PNG if any warning has a thumbnail.
+        """
+        message = '\n\n'.join(event['message'] for event in events)
+        thumbnails = [
+            event['thumbnail'] for event in events
+            if event['thumbnail'] is not None
+        ][:self.max_thumbnails]
+        if not thumbnails:
+            return message, None
+        grid = self.compose_grid(thumbnails)
+        return message, encode_frame(grid, 'png')
+
+    @staticmethod
+    def compose_grid(thumbnails: list[np.ndarray]) -> np.ndarray:
+        """
+        Tiles thumbnails into a near-square grid, in the size of the first.
+
+        Args:
+            thumbnails (list[np.ndarray]): The BGR thumbnails.
+
+        Returns:
+            np.ndarray: The grid.
+        """
+        height, width = thumbnails[0].shape[:2]
+        columns = math.ceil(math.sqrt(len(thumbnails)))
+        rows = math.ceil(len(thumbnails) / columns)
+        grid = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+        for i, thumbnail in enumerate(thumbnails):
+            if thumbnail.shape[:2] != (height, width):
+                thumbnail = cv2.resize(
+                    thumbnail, (width, height), interpolation=cv2.INTER_AREA,
+                )
+            row, column = divmod(i, columns)
+            grid[
+                row * height:(row + 1) * height,
+                column * width:(column + 1) * width,
+            ] = thumbnail
+        return grid
+
+    def dispatch(
+        self,
+        dispatcher: NotificationDispatcher,
+        digests: list[Digest],
+    ) -> None:
+        """
+        Queues digests on a dispatcher.
+
+        Args:
+            dispatcher (NotificationDispatcher): The dispatcher.
+            digests (list[Digest]): The digests.
+        """
+        for digest in digests:
+            dispatcher.submit(
+                self.channel,
+                digest['message'],
+                image=digest['image'],
+                recipient=digest['token'],
+            )
+            self.logger.info(
+                f"Digest of {digest['events']} warnings queued for "
+                f"{digest['token']} at {digest['site']}.",
+            )
+
+    async def serve(self) -> None:
+        """
+        Coalesces the submitted warnings and sends the digests until a
+        None event arrives, then sends the digests of the open windows.
+        """
+        notifiers = self.notifiers
+        if notifiers is None:
+            from .notifiers.line_notifier import LineNotifier
+            notifiers = {self.channel: LineNotifier()}
+
+        async with NotificationDispatcher(notifiers) as dispatcher:
+            stopping = False
+            while not stopping:
+                try:
+                    event = await asyncio.to_thread(
+                        self.events.get, True, self.tick,
+                    )
+                except queue.Empty:
+                    pass
+                else:
+                    if event is None:
+                        stopping = True
+                    else:
+                        self.dispatch(
+                            dispatcher, self.add(event, time.time()),
+                        )
+                now = math.inf if stopping else time.time()
+                self.dispatch(dispatcher, self.flush(now))
+        self.logger.info(
+            f"Notification aggregator stopped: {self.get_metrics()}, "
+            f"notifications {dispatcher.get_metrics()}",
+        )
+
+    def run(self) -> None:
+        """
+        Runs the aggregator in the current process.
+        """
+        asyncio.run(self.serve())
+
+    def start(self) -> None:
+        """
+        Starts the aggregator's process.
+        """
+        self.process = multiprocessing.Process(target=self.run, daemon=True)
+        self.process.start()
+        self.logger.info(
+            f"Started notification aggregator with a {self.window} s window",
+        )
+
+    def stop(self) -> None:
+        """
+        Sends the held warnings and stops the aggregator's process.
+        """
+        if self.process is None:
+            return
+        self.events.put(None)
+        self.process.join(timeout=30)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process = None
+
+    def get_metrics(self) -> AggregatorMetrics:
+        """
+        Returns counts of the warnings handled in this process.
+
+        Returns:
+            AggregatorMetrics: Warnings submitted to the aggregator's
+                process, warnings added, digests built, submitted warnings
+                dropped, and windows opened.
+        """
+        return dict(self.metrics)
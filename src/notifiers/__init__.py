@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from .broadcast_notifier import BroadcastNotifier
+from .dispatcher import NotificationDispatcher
 from .line_notifier import LineNotifier
 from .line_notifier_message_api import LineMessenger
 from .messenger_notifier import MessengerNotifier
@@ -14,4 +15,5 @@ __all__ = [
     'LineNotifier',
     'WeChatNotifier',
     'LineMessenger',
+    'NotificationDispatcher',
 ]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 
+import aiohttp
 import requests
 
+if TYPE_CHECKING:
+    from .dispatcher import Notification
+
 
 class BroadcastNotifier:
     """
@@ -50,6 +55,27 @@ class BroadcastNotifier:
             self.logger.error(f"Error broadcasting message: {e}")
             return False
 
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        notification: Notification,
+    ) -> int:
+        """
+        Sends a message to the broadcast system over a shared session.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            notification (Notification): The notification. Its recipient
+                and image are not used.
+
+        Returns:
+            int: The status code of the response.
+        """
+        async with session.post(
+            self.broadcast_url, json={'message': notification['message']},
+        ) as response:
+            return response.status
+
 
 def main():
     # Configure logging
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Protocol
+from typing import TypedDict
+
+import aiohttp
+
+# Policies for a notification submitted to a full outbox
+DROP_POLICIES = ('drop_oldest', 'drop_newest')
+
+# Statuses worth retrying; other errors would fail again
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Connection pool of the notifier session
+MAX_CONNECTIONS_PER_HOST = 8
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+
+
+class Notification(TypedDict):
+    channel: str
+    recipient: str | None
+    message: str
+    image: bytes | None
+
+
+class DispatcherMetrics(TypedDict):
+    submitted: int
+    sent: int
+    failed: int
+    dropped: int
+    retries: int
+    queued: int
+
+
+class AsyncNotifier(Protocol):
+    """
+    A notifier that delivers notifications over a shared HTTP session.
+    """
+
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        notification: Notification,
+    ) -> int:
+        """
+        Sends a notification.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            notification (Notification): The notification.
+
+        Returns:
+            int: The status code of the response.
+        """
+        ...
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications in the background from a bounded outbox.
+
+    `submit` only queues a notification, so the frame loop never waits on
+    a notifier's API. Worker tasks take notifications from the outbox and
+    deliver them over one pooled HTTP session, at most `channel_limit` at
+    a time per channel, retrying failures after a jittered backoff. When
+    the outbox is full, the oldest or the new notification is dropped.
+    Use the dispatcher as an async context manager, or call `start` and
+    `close`.
+    """
+
+    def __init__(
+        self,
+        notifiers: dict[str, AsyncNotifier],
+        max_queue: int = 100,
+        workers: int = 4,
+        channel_limit: int = 2,
+        channel_limits: dict[str, int] | None = None,
+        drop_policy: str = 'drop_oldest',
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialises the dispatcher.
+
+        Args:
+            notifiers (dict[str, AsyncNotifier]): The notifier of each
+                channel.
+            max_queue (int): Number of notifications the outbox holds.
+            workers (int): Number of worker tasks.
+            channel_limit (int): Concurrent deliveries per channel.
+            channel_limits (dict[str, int] | None): Concurrent deliveries
+                of the channels that differ from `channel_limit`.
+            drop_policy (str): One of `DROP_POLICIES`.
+            max_attempts (int): Attempts per notification.
+            backoff (float): Upper bound of the first retry delay in
+                seconds, doubled on each further retry.
+            max_backoff (float): Upper bound of any retry delay in seconds.
+            timeout (float): Timeout of each delivery in seconds.
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unsupported drop policy: {drop_policy}")
+        self.notifiers = notifiers
+        self.workers = workers
+        self.drop_policy = drop_policy
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.outbox: asyncio.Queue[Notification] = asyncio.Queue(max_queue)
+        self.semaphores = {
+            channel: asyncio.Semaphore(
+                (channel_limits or {}).get(channel, channel_limit),
+            )
+            for channel in notifiers
+        }
+        self.tasks: list[asyncio.Task] = []
+        self.session: aiohttp.ClientSession | None = None
+        self.logger = logging.getLogger(__name__)
+        self.metrics: DispatcherMetrics = {
+            'submitted': 0,
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'retries': 0,
+            'queued': 0,
+        }
+
+    async def __aenter__(self) -> NotificationDispatcher:
+        """
+        Starts the workers and returns the dispatcher.
+        """
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Sends the queued notifications and stops the workers.
+        """
+        await self.close()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the session shared by the notifiers, opening it on first
+        use.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def start(self) -> None:
+        """
+        Starts the worker tasks, unless they are running.
+        """
+        if self.tasks:
+            return
+        self.tasks = [
+            asyncio.create_task(self.work()) for _ in range(self.workers)
+        ]
+
+    async def close(self, drain: bool = True) -> None:
+        """
+        Stops the workers and closes the session.
+
+        Args:
+            drain (bool): Whether to send the queued notifications first.
+        """
+        if drain and self.tasks:
+            await self.outbox.join()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def submit(
+        self,
+        channel: str,
+        message: str,
+        image: bytes | None = None,
+        recipient: str | None = None,
+    ) -> bool:
+        """
+        Queues a notification without waiting for it to be sent.
+
+        Args:
+            channel (str): The channel, a key of `notifiers`.
+            message (str): The message.
+            image (bytes | None): An encoded image sent with the message.
+            recipient (str | None): The token, chat or user to notify, if
+                the channel's notifier needs one.
+
+        Returns:
+            bool: Whether the notification was queued.
+        """
+        if channel not in self.notifiers:
+            raise ValueError(f"Unknown notification channel: {channel}")
+        self.metrics['submitted'] += 1
+        if self.outbox.full():
+            self.metrics['dropped'] += 1
+            if self.drop_policy == 'drop_newest':
+                self.logger.warning(
+                    f"Outbox full, dropped notification: {message}",
+                )
+                return False
+            dropped = self.outbox.get_nowait()
+            self.outbox.task_done()
+            self.logger.warning(
+                f"Outbox full, dropped notification: {dropped['message']}",
+            )
+        self.outbox.put_nowait({
+            'channel': channel,
+            'recipient': recipient,
+            'message': message,
+            'image': image,
+        })
+        return True
+
+    async def join(self) -> None:
+        """
+        Waits until every queued notification has been handled.
+        """
+        await self.outbox.join()
+
+    async def work(self) -> None:
+        """
+        Delivers notifications from the outbox until cancelled.
+        """
+        while True:
+            notification = await self.outbox.get()
+            try:
+                status = await self.deliver(notification)
+                if status is not None and 200 <= status < 300:
+                    self.metrics['sent'] += 1
+                    self.logger.info(
+                        f"Notification sent successfully: "
+                        f"{notification['message']}",
+                    )
+                else:
+                    self.metrics['failed'] += 1
+                    self.logger.error(
+                        f"Failed to send notification ({status}): "
+                        f"{notification['message']}",
+                    )
+            except Exception as e:
+                self.metrics['failed'] += 1
+                self.logger.error(f"Error sending notification: {e}")
+            finally:
+                self.outbox.task_done()
+
+    async def deliver(self, notification: Notification) -> int | None:
+        """
+        Sends a notification, retrying failures after a backoff.
+
+        Args:
+            notification (Notification): The notification.
+
+        Returns:
+            int | None: The status code of the last attempt, or None if
+                it failed to connect.
+        """
+        channel = notification['channel']
+        notifier = self.notifiers[channel]
+        status = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self.semaphores[channel]:
+                    status = await notifier.deliver(
+                        self.get_session(), notification,
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"Notification attempt failed: {e}")
+                status = None
+            if status is not None and status not in RETRY_STATUSES:
+                return status
+            if attempt < self.max_attempts:
+                self.metrics['retries'] += 1
+                await asyncio.sleep(self.get_backoff(attempt))
+        return status
+
+    def get_backoff(self, attempt: int) -> float:
+        """
+        Returns a random delay before a retry, so that notifiers failing
+        together do not retry together.
+
+        Args:
+            attempt (int): The number of the attempt that failed.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        bound = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, bound)
+
+    def get_metrics(self) -> DispatcherMetrics:
+        """
+        Returns counts of the notifications handled.
+
+        Returns:
+            DispatcherMetrics: Notifications submitted, sent, failed and
+                dropped, retries, and notifications in the outbox.
+        """
+        return {**self.metrics, 'queued': self.outbox.qsize()}
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 import os
 from io import BytesIO
+from typing import TYPE_CHECKING
 from typing import TypedDict
 
+import aiohttp
 import numpy as np
 import requests
 from dotenv import load_dotenv
 from PIL import Image
 
+if TYPE_CHECKING:
+    from .dispatcher import Notification
+
 
 class InputData(TypedDict):
     message: str
@@ -24,11 +29,15 @@ class LineNotifier:
     A class for managing notifications sent via the LINE Notify API.
     """
 
-    def __init__(self):
+    def __init__(self, api_url: str = 'https://notify-api.line.me/api/notify'):
         """
         Initialises the LineNotifier instance.
+
+        Args:
+            api_url (str): The URL of the LINE Notify API.
         """
         load_dotenv()
+        self.api_url = api_url
 
     def send_notification(
         self,
@@ -48,14 +57,7 @@ class LineNotifier:
         Returns:
             int: The status code of the response.
         """
-        # Get the LINE Notify token
-        if not line_token:
-            line_token = os.getenv('LINE_NOTIFY_TOKEN')
-        if not line_token:
-            raise ValueError(
-                'LINE_NOTIFY_TOKEN not provided or in environment variables.',
-            )
-
+        line_token = self._get_token(line_token)
         payload = {'message': message}
         headers = {'Authorization': f"Bearer {line_token}"}
 
@@ -64,7 +66,7 @@ class LineNotifier:
 
         # Send the request
         response = requests.post(
-            'https://notify-api.line.me/api/notify',
+            self.api_url,
             headers=headers,
             params=payload,
             files=files,
@@ -72,6 +74,57 @@ class LineNotifier:
 
         return response.status_code
 
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        notification: Notification,
+    ) -> int:
+        """
+        Sends a notification via LINE Notify over a shared session.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            notification (Notification): The notification, whose recipient
+                is the LINE Notify token and whose image is a PNG.
+
+        Returns:
+            int: The status code of the response.
+        """
+        line_token = self._get_token(notification['recipient'])
+        data = None
+        if notification['image'] is not None:
+            # The image is already encoded, so it is sent as it is
+            data = aiohttp.FormData()
+            data.add_field(
+                'imageFile', notification['image'],
+                filename='image.png', content_type='image/png',
+            )
+        async with session.post(
+            self.api_url,
+            headers={'Authorization': f"Bearer {line_token}"},
+            params={'message': notification['message']},
+            data=data,
+        ) as response:
+            return response.status
+
+    def _get_token(self, line_token: str | None) -> str:
+        """
+        Returns the LINE Notify token to use.
+
+        Args:
+            line_token (str | None): The token given, if any.
+
+        Returns:
+            str: The token, from the environment if none was given.
+        """
+        if not line_token:
+            line_token = os.getenv('LINE_NOTIFY_TOKEN')
+        if not line_token:
+            raise ValueError(
+                'LINE_NOTIFY_TOKEN not provided or in environment variables.',
+            )
+        return line_token
+
     def _prepare_image_file(self, image: np.ndarray | bytes) -> dict:
         """
         Prepares the image file for the request.
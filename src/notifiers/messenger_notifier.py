@@ -2,25 +2,35 @@ from __future__ import annotations
 
 import os
 from io import BytesIO
+from typing import TYPE_CHECKING
 
+import aiohttp
 import numpy as np
 import requests
 from dotenv import load_dotenv
 from PIL import Image
 
+if TYPE_CHECKING:
+    from .dispatcher import Notification
+
 
 class MessengerNotifier:
     """
     A class to handle sending notifications through Facebook Messenger
     """
 
-    def __init__(self, page_access_token: str | None = None):
+    def __init__(
+        self,
+        page_access_token: str | None = None,
+        api_url: str = 'https://graph.facebook.com/v11.0/me/messages',
+    ):
         """
         Initialises the MessengerNotifier with a Facebook page access token.
 
         Args:
             page_access_token (str, optional): The token for the Facebook page.
                 Defaults to environment variable 'FACEBOOK_PAGE_ACCESS_TOKEN'.
+            api_url (str): The URL of the Send API.
 
         Raises:
             ValueError: If 'FACEBOOK_PAGE_ACCESS_TOKEN' is missing.
@@ -31,6 +41,7 @@ class MessengerNotifier:
         )
         if not self.page_access_token:
             raise ValueError('FACEBOOK_PAGE_ACCESS_TOKEN missing.')
+        self.api_url = api_url
 
     def send_notification(
         self,
@@ -54,10 +65,7 @@ class MessengerNotifier:
             - Otherwise, sends a text message.
         """
         headers = {'Authorization': f"Bearer {self.page_access_token}"}
-        url = (
-            f"https://graph.facebook.com/v11.0/me/messages?"
-            f"access_token={self.page_access_token}"
-        )
+        url = f"{self.api_url}?access_token={self.page_access_token}"
 
         if image is not None:
             # Prepare image data
@@ -91,6 +99,49 @@ class MessengerNotifier:
 
         return response.status_code
 
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        notification: Notification,
+    ) -> int:
+        """
+        Sends a notification via Facebook Messenger over a shared session.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            notification (Notification): The notification, whose recipient
+                is the recipient's ID and whose image is a PNG.
+
+        Returns:
+            int: The HTTP status code of the response.
+        """
+        headers = {'Authorization': f"Bearer {self.page_access_token}"}
+        url = f"{self.api_url}?access_token={self.page_access_token}"
+        recipient_id = notification['recipient']
+
+        if notification['image'] is not None:
+            # Send message with image attachment
+            data = aiohttp.FormData()
+            data.add_field('recipient', f'{{"id":"{recipient_id}"}}')
+            data.add_field(
+                'message', '{"attachment":{"type":"image","payload":{}}}',
+            )
+            data.add_field(
+                'filedata', notification['image'],
+                filename='image.png', content_type='image/png',
+            )
+            request = session.post(url, headers=headers, data=data)
+        else:
+            # Send plain text message
+            payload = {
+                'message': {'text': notification['message']},
+                'recipient': {'id': recipient_id},
+            }
+            request = session.post(url, headers=headers, json=payload)
+
+        async with request as response:
+            return response.status
+
 
 # Example usage
 def main():
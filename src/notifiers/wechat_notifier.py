@@ -2,12 +2,24 @@ from __future__ import annotations
 
 import os
 from io import BytesIO
+from typing import TYPE_CHECKING
 
+import aiohttp
 import numpy as np
 import requests
 from dotenv import load_dotenv
 from PIL import Image
 
+if TYPE_CHECKING:
+    from .dispatcher import Notification
+
+# Error codes of an invalid or expired access token
+TOKEN_ERRCODES = frozenset({40014, 42001})
+
+# Statuses reported for error codes worth retrying: the system is busy,
+# or the API's rate limit was hit
+RETRY_ERRCODES = {-1: 503, 45009: 429}
+
 
 class WeChatNotifier:
     """
@@ -18,6 +30,7 @@ class WeChatNotifier:
         self, corp_id: str | None = None,
         corp_secret: str | None = None,
         agent_id: int | None = None,
+        api_url: str = 'https://qyapi.weixin.qq.com/cgi-bin',
     ):
         """
         Initialises the WeChatNotifier with authentication details.
@@ -29,8 +42,10 @@ class WeChatNotifier:
                 Defaults to environment variable 'WECHAT_CORP_SECRET'.
             agent_id (int, optional): The agent ID.
                 Defaults to env variable 'WECHAT_AGENT_ID' or 0 if not set.
+            api_url (str): The base URL of the WeChat Work API.
         """
         load_dotenv()
+        self.api_url = api_url
         self.corp_id = corp_id or os.getenv('WECHAT_CORP_ID')
         self.corp_secret = corp_secret or os.getenv('WECHAT_CORP_SECRET')
         self.agent_id = agent_id or int(os.getenv('WECHAT_AGENT_ID') or 0)
@@ -44,7 +59,7 @@ class WeChatNotifier:
             str: The access token string.
         """
         url = (
-            f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?"
+            f"{self.api_url}/gettoken?"
             f"corpid={self.corp_id}&corpsecret={self.corp_secret}"
         )
         response = requests.get(url)
@@ -68,7 +83,7 @@ class WeChatNotifier:
             dict: The response JSON from the WeChat API.
         """
         url = (
-            f"https://qyapi.weixin.qq.com/cgi-bin/message/send?"
+            f"{self.api_url}/message/send?"
             f"access_token={self.access_token}"
         )
         payload = {
@@ -111,13 +126,120 @@ class WeChatNotifier:
         image_pil.save(buffer, format='PNG')
         buffer.seek(0)
         url = (
-            f"https://qyapi.weixin.qq.com/cgi-bin/media/upload?"
+            f"{self.api_url}/media/upload?"
             f"access_token={self.access_token}&type=image"
         )
         files = {'media': ('image.png', buffer, 'image/png')}
         response = requests.post(url, files=files)
         return response.json().get('media_id')
 
+    async def refresh_access_token(
+        self,
+        session: aiohttp.ClientSession,
+    ) -> None:
+        """
+        Fetches a new access token over a shared session.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+        """
+        async with session.get(
+            f"{self.api_url}/gettoken",
+            params={'corpid': self.corp_id, 'corpsecret': self.corp_secret},
+        ) as response:
+            self.access_token = (await response.json()).get('access_token')
+
+    async def check_response(
+        self,
+        session: aiohttp.ClientSession,
+        response: aiohttp.ClientResponse,
+    ) -> int:
+        """
+        Maps a WeChat Work response to a status. The API reports errors
+        with HTTP 200 and a non-zero `errcode` in the body.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            response (aiohttp.ClientResponse): The response.
+
+        Returns:
+            int: The response's status if it succeeded or failed at the
+                HTTP level, 503 or 429 for errors worth retrying, including
+                a rejected token, which is refreshed first, and 400 for
+                other errors.
+        """
+        if response.status != 200:
+            return response.status
+        errcode = (await response.json(content_type=None)).get('errcode', 0)
+        if errcode == 0:
+            return response.status
+        if errcode in TOKEN_ERRCODES:
+            # Retried with the new token
+            await self.refresh_access_token(session)
+            return 503
+        return RETRY_ERRCODES.get(errcode, 400)
+
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        notification: Notification,
+    ) -> int:
+        """
+        Sends a notification to a user in WeChat Work over a shared session.
+
+        Args:
+            session (aiohttp.ClientSession): The dispatcher's session.
+            notification (Notification): The notification, whose recipient
+                is the user ID and whose image is a PNG.
+
+        Returns:
+            int: The status of the response, as `check_response` maps it.
+        """
+        payload = {
+            'touser': notification['recipient'],
+            'msgtype': 'text',
+            'agentid': self.agent_id,
+            'text': {
+                'content': notification['message'],
+            },
+            'safe': 0,
+        }
+
+        if notification['image'] is not None:
+            # Upload the encoded image as it is
+            data = aiohttp.FormData()
+            data.add_field(
+                'media', notification['image'],
+                filename='image.png', content_type='image/png',
+            )
+            async with session.post(
+                f"{self.api_url}/media/upload",
+                params={'access_token': self.access_token, 'type': 'image'},
+                data=data,
+            ) as response:
+                status = await self.check_response(session, response)
+                if status != 200:
+                    return status
+                media_id = (await response.json(content_type=None)).get(
+                    'media_id',
+                )
+            payload = {
+                'touser': notification['recipient'],
+                'msgtype': 'image',
+                'agentid': self.agent_id,
+                'image': {
+                    'media_id': media_id,
+                },
+                'safe': 0,
+            }
+
+        async with session.post(
+            f"{self.api_url}/message/send",
+            params={'access_token': self.access_token},
+            json=payload,
+        ) as response:
+            return await self.check_response(session, response)
+
 
 # Example usage
 def main():
@@ -0,0 +1,638 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from .detections import Detections
+
+
+def get_slice_bboxes(
+    image_height: int,
+    image_width: int,
+    slice_height: int,
+    slice_width: int,
+    overlap_height_ratio: float,
+    overlap_width_ratio: float,
+) -> np.ndarray:
+    """
+    Computes the slice grid for an image, using the same layout as SAHI.
+
+    Slices step across the image with the given overlap; slices that
+    would run past the right or bottom edge are shifted back inside the
+    image, so every slice has the same size.
+
+    Args:
+        image_height (int): The height of the image.
+        image_width (int): The width of the image.
+        slice_height (int): The height of each slice.
+        slice_width (int): The width of each slice.
+        overlap_height_ratio (float): Fractional overlap between rows.
+        overlap_width_ratio (float): Fractional overlap between columns.
+
+    Returns:
+        np.ndarray: An (N, 4) int array of [x1, y1, x2, y2] slice boxes.
+    """
+    y_overlap = int(overlap_height_ratio * slice_height)
+    x_overlap = int(overlap_width_ratio * slice_width)
+
+    slice_bboxes = []
+    y_min = y_max = 0
+    while y_max < image_height:
+        y_max = y_min + slice_height
+        x_min = x_max = 0
+        while x_max < image_width:
+            x_max = x_min + slice_width
+            if y_max > image_height or x_max > image_width:
+                x2 = min(image_width, x_max)
+                y2 = min(image_height, y_max)
+                slice_bboxes.append(
+                    [max(0, x2 - slice_width), max(0, y2 - slice_height),
+                     x2, y2],
+                )
+            else:
+                slice_bboxes.append([x_min, y_min, x_max, y_max])
+            x_min = x_max - x_overlap
+        y_min = y_max - y_overlap
+
+    return np.asarray(slice_bboxes, dtype=np.int64).reshape(-1, 4)
+
+
+class SlicePlan:
+    """
+    The precomputed slice geometry for one frame resolution and slice
+    configuration.
+    """
+
+    def __init__(self, bboxes: np.ndarray):
+        """
+        Initialises the plan.
+
+        Args:
+            bboxes (np.ndarray): An (N, 4) int array of [x1, y1, x2, y2]
+                slice boxes.
+        """
+        self.bboxes = bboxes
+        # Per-slice [x, y, x, y] shifts mapping slice coordinates to
+        # frame coordinates
+        self.shifts = np.tile(bboxes[:, :2], 2).astype(np.float32)
+        # Make the cached arrays safe to share between callers
+        self.bboxes.flags.writeable = False
+        self.shifts.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def crop(self, frame: np.ndarray) -> list[np.ndarray]:
+        """
+        Cuts a frame into its slices.
+
+        Args:
+            frame (np.ndarray): The frame.
+
+        Returns:
+            list[np.ndarray]: Zero-copy views of the slices.
+        """
+        return [
+            frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.bboxes.tolist()
+        ]
+
+
+class SlicePlanCache:
+    """
+    An LRU cache of slice plans keyed by frame resolution and slice
+    configuration.
+
+    A camera's resolution does not change, so after the first frame every
+    lookup is a hit. Hit rate is logged every `log_interval` lookups and
+    whenever a new plan is computed.
+    """
+
+    def __init__(self, maxsize: int = 64, log_interval: int = 1000):
+        """
+        Initialises the cache.
+
+        Args:
+            maxsize (int): Maximum number of plans kept.
+            log_interval (int): Number of lookups between hit rate logs.
+        """
+        self.maxsize = maxsize
+        self.log_interval = log_interval
+        self.plans: OrderedDict[tuple, SlicePlan] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def get(
+        self,
+        height: int,
+        width: int,
+        slice_height: int,
+        slice_width: int,
+        overlap_height_ratio: float,
+        overlap_width_ratio: float,
+    ) -> SlicePlan:
+        """
+        Returns the slice plan for a frame resolution and slice
+        configuration, computing it on a miss.
+
+        Args:
+            height (int): The frame height.
+            width (int): The frame width.
+            slice_height (int): The height of each slice.
+            slice_width (int): The width of each slice.
+            overlap_height_ratio (float): Fractional overlap between rows.
+            overlap_width_ratio (float): Fractional overlap between columns.
+
+        Returns:
+            SlicePlan: The slice plan.
+        """
+        key = (
+            height,
+            width,
+            slice_height,
+            slice_width,
+            overlap_height_ratio,
+            overlap_width_ratio,
+        )
+        with self.lock:
+            plan = self.plans.get(key)
+            if plan is not None:
+                self.hits += 1
+                self.plans.move_to_end(key)
+                message = None
+            else:
+                self.misses += 1
+                plan = SlicePlan(get_slice_bboxes(*key))
+                self.plans[key] = plan
+                if len(self.plans) > self.maxsize:
+                    self.plans.popitem(last=False)
+                message = f"Computed {len(plan)}-slice plan for {key}"
+
+            lookups = self.hits + self.misses
+            if message is None and lookups % self.log_interval == 0:
+                message = f"{lookups} lookups"
+            hit_rate = self.hit_rate
+
+        if message is not None:
+            self.logger.info(
+                f"Slice plan cache: {message}, hit rate {hit_rate:.1%}",
+            )
+        return plan
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of lookups served from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Returns cache metrics.
+
+        Returns:
+            dict[str, float]: Hits, misses, hit rate and cached plans.
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'size': len(self.plans),
+            }
+
+    def clear(self) -> None:
+        """
+        Removes all plans and resets the counters.
+        """
+        with self.lock:
+            self.plans.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every engine in the process
+slice_plan_cache = SlicePlanCache()
+
+
+def match_matrix(
+    boxes: np.ndarray,
+    match_metric: str = 'IOS',
+) -> np.ndarray:
+    """
+    Computes the pairwise match metric between boxes.
+
+    Args:
+        boxes (np.ndarray): An (N, 4) array of [x1, y1, x2, y2] boxes.
+        match_metric (str): 'IOU' (intersection over union) or 'IOS'
+            (intersection over the smaller box).
+
+    Returns:
+        np.ndarray: An (N, N) float64 matrix of match values.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64)
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+
+    inter_w = np.minimum(x2[:, None], x2) - np.maximum(x1[:, None], x1)
+    inter_h = np.minimum(y2[:, None], y2) - np.maximum(y1[:, None], y1)
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+    if match_metric == 'IOU':
+        denominator = areas[:, None] + areas - inter
+    elif match_metric == 'IOS':
+        denominator = np.minimum(areas[:, None], areas)
+    else:
+        raise ValueError(f"Unknown match metric: {match_metric}")
+
+    return np.divide(
+        inter,
+        denominator,
+        out=np.zeros_like(inter),
+        where=denominator > 0,
+    )
+
+
+def greedy_match(
+    data: np.ndarray,
+    match_metric: str = 'IOS',
+    match_threshold: float = 0.5,
+    class_agnostic: bool = False,
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Greedily groups detections around the most confident ones.
+
+    Walking detections in descending confidence, each detection not yet
+    claimed becomes a keeper and claims every unclaimed detection whose
+    match value with it reaches the threshold.
+
+    Args:
+        data (np.ndarray): An (N, 6) array of detection rows.
+        match_metric (str): 'IOU' or 'IOS'.
+        match_threshold (float): The match value at which boxes match.
+        class_agnostic (bool): Whether boxes of different classes match.
+
+    Returns:
+        tuple[np.ndarray, list[np.ndarray]]: The keeper indices, and for
+            each keeper the indices it claimed, most confident first.
+    """
+    matches = match_matrix(data[:, :4], match_metric) >= match_threshold
+    if not class_agnostic:
+        matches &= data[:, 5][:, None] == data[:, 5]
+
+    order = np.argsort(-data[:, 4], kind='stable')
+    claimed = np.zeros(len(data), dtype=bool)
+    keep = []
+    groups = []
+    for index in order:
+        if claimed[index]:
+            continue
+        claimed[index] = True
+        group = order[matches[index, order] & ~claimed[order]]
+        claimed[group] = True
+        keep.append(index)
+        groups.append(group)
+
+    return np.asarray(keep, dtype=np.int64), groups
+
+
+def nms(
+    data: np.ndarray,
+    match_metric: str = 'IOS',
+    match_threshold: float = 0.5,
+    class_agnostic: bool = False,
+) -> np.ndarray:
+    """
+    Non-maximum suppression: keeps the most confident detection of each
+    group of matching detections.
+
+    Args:
+        data (np.ndarray): An (N, 6) array of detection rows.
+        match_metric (str): 'IOU' or 'IOS'.
+        match_threshold (float): The match value at which boxes match.
+        class_agnostic (bool): Whether boxes of different classes match.
+
+    Returns:
+        np.ndarray: The kept detection rows.
+    """
+    if len(data) < 2:
+        return data
+    keep, _ = greedy_match(data, match_metric, match_threshold, class_agnostic)
+    return data[keep]
+
+
+def greedy_nmm(
+    data: np.ndarray,
+    match_metric: str = 'IOS',
+    match_threshold: float = 0.5,
+    class_agnostic: bool = False,
+) -> np.ndarray:
+    """
+    Greedy non-maximum merging, as SAHI's GREEDYNMM post-processing.
+
+    Each keeper is merged with the detections it claimed that still
+    match its growing box: the boxes are replaced by their union, the
+    confidence by the maximum and the label by the most confident one.
+
+    Args:
+        data (np.ndarray): An (N, 6) array of detection rows.
+        match_metric (str): 'IOU' or 'IOS'.
+        match_threshold (float): The match value at which boxes match.
+        class_agnostic (bool): Whether boxes of different classes match.
+
+    Returns:
+        np.ndarray: The merged detection rows.
+    """
+    if len(data) < 2:
+        return data
+    keep, groups = greedy_match(
+        data, match_metric, match_threshold, class_agnostic,
+    )
+
+    merged = data[keep].copy()
+    for row, group in zip(merged, groups):
+        for candidate in data[group]:
+            # Compare against the merged box, as it grows with each merge
+            value = match_matrix(
+                np.stack([row[:4], candidate[:4]]), match_metric,
+            )[0, 1]
+            if value <= match_threshold:
+                continue
+            row[:2] = np.minimum(row[:2], candidate[:2])
+            row[2:4] = np.maximum(row[2:4], candidate[2:4])
+            if candidate[4] >= row[4]:
+                row[4:6] = candidate[4:6]
+    return merged
+
+
+class SlicedInference:
+    """
+    Sliced (SAHI-style) inference that runs all slices of a frame through
+    the model in batched forward passes.
+
+    Slice plans are computed once per frame resolution. Slices are
+    zero-copy views of the frame, passed to the model `batch_size` at a
+    time, and the shifted detections are merged with a vectorised
+    NMS/NMM.
+    """
+
+    POSTPROCESS_TYPES = ('GREEDYNMM', 'NMS')
+
+    def __init__(
+        self,
+        predict_batch: Callable[[list[np.ndarray]], list[np.ndarray]],
+        slice_height: int = 376,
+        slice_width: int = 376,
+        overlap_height_ratio: float = 0.3,
+        overlap_width_ratio: float = 0.3,
+        batch_size: int = 32,
+        perform_standard_pred: bool = True,
+        postprocess_type: str = 'GREEDYNMM',
+        match_metric: str = 'IOS',
+        match_threshold: float = 0.5,
+        class_agnostic: bool = False,
+        plan_cache: SlicePlanCache | None = None,
+        truncate: bool = True,
+    ):
+        """
+        Initialises the engine.
+
+        Args:
+            predict_batch (Callable[[list[np.ndarray]], list[np.ndarray]]):
+                Runs a list of same-sized BGR images through the model in
+                one forward pass, returning an (N, 6) array of
+                [x1, y1, x2, y2, confidence, label] rows per image.
+            slice_height (int): The height of each slice.
+            slice_width (int): The width of each slice.
+            overlap_height_ratio (float): Fractional overlap between rows.
+            overlap_width_ratio (float): Fractional overlap between columns.
+            batch_size (int): Maximum number of slices per forward pass.
+            perform_standard_pred (bool): Whether to also run the whole
+                frame through the model, to catch objects larger than a
+                slice.
+            postprocess_type (str): 'GREEDYNMM' to merge matching
+                detections, or 'NMS' to suppress them.
+            match_metric (str): 'IOS' or 'IOU'.
+            match_threshold (float): The match value at which detections
+                are merged or suppressed.
+            class_agnostic (bool): Whether detections of different classes
+                are merged or suppressed.
+            plan_cache (SlicePlanCache | None): The cache of slice plans.
+                Defaults to the cache shared by the process.
+            truncate (bool): Whether box coordinates are truncated to whole
+                pixels, as in the live pipeline's list format.
+        """
+        if postprocess_type not in self.POSTPROCESS_TYPES:
+            raise ValueError(
+                f"postprocess_type must be one of {self.POSTPROCESS_TYPES}",
+            )
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+
+        self.predict_batch = predict_batch
+        self.slice_height = slice_height
+        self.slice_width = slice_width
+        self.overlap_height_ratio = overlap_height_ratio
+        self.overlap_width_ratio = overlap_width_ratio
+        self.batch_size = batch_size
+        self.perform_standard_pred = perform_standard_pred
+        self.postprocess_type = postprocess_type
+        self.match_metric = match_metric
+        self.match_threshold = match_threshold
+        self.class_agnostic = class_agnostic
+        self.truncate = truncate
+
+        self.plan_cache = (
+            plan_cache if plan_cache is not None else slice_plan_cache
+        )
+
+    @classmethod
+    def from_sahi_model(cls, model: Any, **kwargs: Any) -> SlicedInference:
+        """
+        Builds an engine around a SAHI YOLOv8 detection model.
+
+        Images are passed to the underlying Ultralytics model as BGR, which
+        is the channel order it expects for NumPy input.
+
+        Args:
+            model (Any): A SAHI `Yolov8DetectionModel`.
+            **kwargs (Any): Keyword arguments for the engine.
+
+        Returns:
+            SlicedInference: The engine.
+        """
+        predict_kwargs = {
+            'conf': model.confidence_threshold,
+            'device': model.device,
+            'verbose': False,
+        }
+        if model.image_size is not None:
+            predict_kwargs['imgsz'] = model.image_size
+
+        def predict_batch(images: list[np.ndarray]) -> list[np.ndarray]:
+            results = model.model(images, **predict_kwargs)
+            return [result.boxes.data.cpu().numpy() for result in results]
+
+        return cls(predict_batch, **kwargs)
+
+    def get_slice_plan(self, height: int, width: int) -> SlicePlan:
+        """
+        Returns the slice plan for a frame resolution.
+
+        Args:
+            height (int): The frame height.
+            width (int): The frame width.
+
+        Returns:
+            SlicePlan: The slice plan.
+        """
+        return self.plan_cache.get(
+            height,
+            width,
+            self.slice_height,
+            self.slice_width,
+            self.overlap_height_ratio,
+            self.overlap_width_ratio,
+        )
+
+    def run_batches(self, images: list[np.ndarray]) -> list[np.ndarray]:
+        """
+        Runs images through the model, `batch_size` at a time.
+
+        Args:
+            images (list[np.ndarray]): The images to run.
+
+        Returns:
+            list[np.ndarray]: An (N, 6) float32 array per image.
+        """
+        predictions = []
+        for start in range(0, len(images), self.batch_size):
+            batch = images[start:start + self.batch_size]
+            predictions.extend(
+                np.asarray(prediction, dtype=np.float32).reshape(-1, 6)
+                for prediction in self.predict_batch(batch)
+            )
+        return predictions
+
+    @staticmethod
+    def clip_to_frame(
+        data: np.ndarray,
+        height: int,
+        width: int,
+    ) -> np.ndarray:
+        """
+        Clips boxes to the frame and drops those left without area.
+
+        Args:
+            data (np.ndarray): An (N, 6) array of detection rows.
+            height (int): The frame height.
+            width (int): The frame width.
+
+        Returns:
+            np.ndarray: The valid detection rows.
+        """
+        np.clip(data[:, 0:3:2], 0, width, out=data[:, 0:3:2])
+        np.clip(data[:, 1:4:2], 0, height, out=data[:, 1:4:2])
+        valid = (data[:, 0] < data[:, 2]) & (data[:, 1] < data[:, 3])
+        return data[valid]
+
+    def postprocess(self, data: np.ndarray) -> np.ndarray:
+        """
+        Merges or suppresses matching detections.
+
+        Args:
+            data (np.ndarray): An (N, 6) array of detection rows.
+
+        Returns:
+            np.ndarray: The remaining detection rows.
+        """
+        if self.postprocess_type == 'GREEDYNMM':
+            postprocess = greedy_nmm
+        else:
+            postprocess = nms
+        return postprocess(
+            data,
+            self.match_metric,
+            self.match_threshold,
+            self.class_agnostic,
+        )
+
+    def predict(self, frame: np.ndarray) -> Detections:
+        """
+        Runs sliced inference on a frame.
+
+        Args:
+            frame (np.ndarray): The BGR frame.
+
+        Returns:
+            Detections: The detections, with coordinates truncated to whole
+                pixels unless `truncate` is off.
+        """
+        return self.predict_many([frame])[0]
+
+    def predict_many(self, frames: list[np.ndarray]) -> list[Detections]:
+        """
+        Runs sliced inference on several frames, sharing forward passes
+        between their slices.
+
+        Args:
+            frames (list[np.ndarray]): The BGR frames.
+
+        Returns:
+            list[Detections]: The detections for each frame.
+        """
+        plans = [self.get_slice_plan(*frame.shape[:2]) for frame in frames]
+        slices = []
+        for plan, frame in zip(plans, frames):
+            slices.extend(plan.crop(frame))
+        shifts = np.concatenate([plan.shifts for plan in plans])
+        owners = np.repeat(
+            np.arange(len(frames)), [len(plan) for plan in plans],
+        )
+
+        predictions = self.run_batches(slices)
+        counts = np.array(
+            [len(prediction) for prediction in predictions], dtype=np.int64,
+        )
+        data = np.concatenate(predictions) if predictions else np.empty(
+            (0, 6), dtype=np.float32,
+        )
+        # Shift slice coordinates onto the frame
+        data[:, 0:4] += np.repeat(shifts, counts, axis=0)
+        data_owners = np.repeat(owners, counts)
+
+        per_frame = [
+            data[data_owners == index] for index in range(len(frames))
+        ]
+
+        if self.perform_standard_pred:
+            # Whole frames of the same size share a forward pass
+            by_shape: dict[tuple[int, ...], list[int]] = {}
+            for index, (plan, frame) in enumerate(zip(plans, frames)):
+                if len(plan) > 1:
+                    by_shape.setdefault(frame.shape, []).append(index)
+            for indices in by_shape.values():
+                full_predictions = self.run_batches(
+                    [frames[index] for index in indices],
+                )
+                for index, prediction in zip(indices, full_predictions):
+                    per_frame[index] = np.concatenate(
+                        [per_frame[index], prediction],
+                    )
+
+        results = []
+        for frame, frame_data in zip(frames, per_frame):
+            height, width = frame.shape[:2]
+            frame_data = self.clip_to_frame(frame_data, height, width)
+            frame_data = self.postprocess(frame_data)
+            if self.truncate:
+                np.trunc(frame_data[:, :4], out=frame_data[:, :4])
+            results.append(Detections(frame_data))
+        return results
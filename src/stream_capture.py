@@ -4,7 +4,12 @@ import argparse
 import asyncio
 import datetime
 import gc
+import threading
+import time
 from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any
 from typing import TypedDict
 
 import cv2
@@ -13,6 +18,7 @@ import speedtest
 import streamlink
 
 
+
 class InputData(TypedDict):
     stream_url: str
     capture_interval: int
@@ -28,7 +34,14 @@ class StreamCapture:
     A class to capture frames from a video stream.
     """
 
-    def __init__(self, stream_url: str, capture_interval: int = 15):
+    def __init__(
+        self,
+        stream_url: str,
+        capture_interval: int = 15,
+        background_decoding: bool = False,
+        frame_skipping: bool = False,
+        executor: Executor | None = None,
+    ):
         """
         Initialises the StreamCapture with the given stream URL.
 
@@ -36,6 +49,14 @@ class StreamCapture:
             stream_url (str): The URL of the video stream.
             capture_interval (int, optional): The interval at which frames
                 should be captured. Defaults to 15.
+            background_decoding (bool, optional): Whether a background
+                thread keeps grabbing frames and only the latest one is
+                decoded when needed. Defaults to False.
+            frame_skipping (bool, optional): Whether frames between
+                captures are only grabbed, not decoded. Defaults to False.
+            executor (Executor | None, optional): Executor for blocking
+                OpenCV calls, so they do not stall the event loop. Defaults
+                to None, which runs them in the event loop.
         """
         # Video stream URL
         self.stream_url = stream_url
@@ -45,6 +66,36 @@ class StreamCapture:
         self.capture_interval = capture_interval
         # Flag to indicate successful capture
         self.successfully_captured = False
+        # Background decoder: the thread grabs frames under the lock, so
+        # retrieving decodes the latest one
+        self.background_decoding = background_decoding
+        self.decoder_thread: threading.Thread | None = None
+        self.decoder_stop = threading.Event()
+        self.frame_grabbed = threading.Event()
+        self.cap_lock = threading.Lock()
+        self.grab_timestamp = 0.0
+        # Frames advanced past versus frames decoded
+        self.frame_skipping = frame_skipping
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.executor = executor
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs a blocking call in the executor, if one was given.
+
+        Args:
+            func (Callable[..., Any]): The blocking function.
+            *args (Any): Its arguments.
+
+        Returns:
+            Any: The function's result.
+        """
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, func, *args,
+        )
 
     async def initialise_stream(self, stream_url: str) -> None:
         """
@@ -53,23 +104,192 @@ class StreamCapture:
         Args:
             stream_url (str): The URL of the stream to initialise.
         """
-        self.cap = cv2.VideoCapture(stream_url)
+        self.cap = await self.run_blocking(cv2.VideoCapture, stream_url)
         self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         # self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'H264'))
 
         if not self.cap.isOpened():
             await asyncio.sleep(5)
-            self.cap.open(stream_url)
+            await self.run_blocking(self.cap.open, stream_url)
 
     async def release_resources(self) -> None:
         """
         Releases resources like the capture object.
         """
+        if self.decoder_thread is not None:
+            self.decoder_stop.set()
+            await asyncio.to_thread(self.decoder_thread.join)
+            self.decoder_thread = None
         if self.cap:
             self.cap.release()
             self.cap = None
         gc.collect()
 
+    def start_decoder(self) -> None:
+        """
+        Starts the background decoder thread, if it is not running.
+        """
+        if self.decoder_thread is not None:
+            return
+        self.decoder_stop.clear()
+        self.frame_grabbed.clear()
+        self.decoder_thread = threading.Thread(
+            target=self.run_decoder, daemon=True,
+        )
+        self.decoder_thread.start()
+
+    def run_decoder(self) -> None:
+        """
+        Keeps grabbing frames from the stream without decoding them, so
+        the latest frame is always ready to be retrieved. Reopens the
+        stream after failures.
+        """
+        stream_url = self.stream_url
+        fail_count = 0  # Counter for consecutive failures
+
+        while not self.decoder_stop.is_set():
+            with self.cap_lock:
+                if self.cap is None:
+                    self.cap = cv2.VideoCapture(stream_url)
+                    self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                grabbed = self.cap.grab()
+                if grabbed:
+                    self.grab_timestamp = time.time()
+                    self.frames_grabbed += 1
+
+            if grabbed:
+                fail_count = 0
+                self.successfully_captured = True
+                self.frame_grabbed.set()
+                continue
+
+            fail_count += 1
+            print(
+                'Failed to grab frame, trying to reinitialise stream. '
+                f"Fail count: {fail_count}",
+            )
+            self.frame_grabbed.clear()
+            with self.cap_lock:
+                self.cap.release()
+                self.cap = None
+
+            # Switch to the generic stream after 5 consecutive failures
+            if fail_count == 5 and not self.successfully_captured:
+                print('Switching to generic frame capture method.')
+                stream_url = self.select_quality_based_on_speed() or stream_url
+            self.decoder_stop.wait(min(fail_count, 5))
+
+    def retrieve_latest(self) -> tuple[np.ndarray, float] | None:
+        """
+        Decodes the latest frame grabbed by the decoder thread.
+
+        Returns:
+            tuple[np.ndarray, float] | None: The frame and the time it was
+                grabbed, or None if no frame is available.
+        """
+        with self.cap_lock:
+            if self.cap is None or not self.frame_grabbed.is_set():
+                return None
+            ret, frame = self.cap.retrieve()
+            timestamp = self.grab_timestamp
+        if not ret or frame is None:
+            return None
+        self.frames_decoded += 1
+        return frame, timestamp
+
+    async def read_latest_frame(
+        self,
+        timeout: float = 10,
+    ) -> tuple[np.ndarray, float] | None:
+        """
+        Returns the freshest frame of the stream, starting the decoder
+        thread if needed. OpenCV calls run off the event loop.
+
+        Args:
+            timeout (float): Seconds to wait for a first frame.
+
+        Returns:
+            tuple[np.ndarray, float] | None: The frame and the time it was
+                grabbed, or None if no frame arrived in time.
+        """
+        self.start_decoder()
+        if not await asyncio.to_thread(self.frame_grabbed.wait, timeout):
+            return None
+        return await asyncio.to_thread(self.retrieve_latest)
+
+    async def capture_latest_frames(
+        self,
+    ) -> AsyncGenerator[tuple[np.ndarray, float]]:
+        """
+        Yields the freshest frame every capture interval, decoding only
+        the frames that are yielded.
+
+        Yields:
+            Tuple[np.ndarray, float]: The captured frame and the timestamp.
+        """
+        self.start_decoder()
+        while True:
+            last_process_time = time.monotonic()
+            result = await self.read_latest_frame()
+            if result is None:
+                print('No frame available from the decoder thread.')
+                await asyncio.sleep(1)
+                continue
+
+            yield result
+            del result
+
+            # Wait out the rest of the interval, counting the time the
+            # caller spent on the frame
+            elapsed_time = time.monotonic() - last_process_time
+            await asyncio.sleep(max(self.capture_interval - elapsed_time, 0))
+
+    def read_frame(
+        self,
+        decode: bool = True,
+    ) -> tuple[bool, np.ndarray | None]:
+        """
+        Advances the stream by one frame. With frame skipping, the frame
+        is only decoded if it is needed.
+
+        Args:
+            decode (bool): Whether the frame will be used.
+
+        Returns:
+            tuple[bool, np.ndarray | None]: Whether a frame was read, and
+                the frame if it was decoded.
+        """
+        if self.cap is None:
+            return False, None
+        if self.frame_skipping and not decode:
+            ret = self.cap.grab()
+            self.frames_grabbed += int(ret)
+            return ret, None
+
+        ret, frame = self.cap.read()
+        if ret and frame is not None:
+            self.frames_grabbed += 1
+            self.frames_decoded += 1
+        return ret, frame
+
+    def get_capture_metrics(self) -> dict[str, float]:
+        """
+        Returns how many frames were grabbed and decoded, for sizing hosts
+        by camera count.
+
+        Returns:
+            dict[str, float]: Frames grabbed, frames decoded and the share
+                of grabbed frames that were decoded.
+        """
+        return {
+            'grabbed': self.frames_grabbed,
+            'decoded': self.frames_decoded,
+            'decode_ratio': (
+                self.frames_decoded / self.frames_grabbed
+                if self.frames_grabbed else 0.0
+            ),
+        }
+
     async def execute_capture(
         self,
     ) -> AsyncGenerator[tuple[np.ndarray, float]]:
@@ -79,6 +299,11 @@ class StreamCapture:
         Yields:
             Tuple[np.ndarray, float]: The captured frame and the timestamp.
         """
+        if self.background_decoding:
+            async for frame, timestamp in self.capture_latest_frames():
+                yield frame, timestamp
+            return
+
         await self.initialise_stream(self.stream_url)
         last_process_time = datetime.datetime.now() - datetime.timedelta(
             seconds=self.capture_interval,
@@ -89,11 +314,15 @@ class StreamCapture:
             if self.cap is None:
                 await self.initialise_stream(self.stream_url)
 
-            ret, frame = (
-                self.cap.read() if self.cap is not None else (False, None)
-            )
+            # Decide before reading whether the frame will be yielded,
+            # so that skipped frames need not be decoded
+            current_time = datetime.datetime.now()
+            elapsed_time = (current_time - last_process_time).total_seconds()
+            capture_due = elapsed_time >= self.capture_interval
+
+            ret, frame = await self.run_blocking(self.read_frame, capture_due)
 
-            if not ret or frame is None:
+            if not ret or (capture_due and frame is None):
                 fail_count += 1
                 print(
                     'Failed to read frame, trying to reinitialise stream. '
@@ -117,19 +346,15 @@ class StreamCapture:
                 # Mark as successfully captured
                 self.successfully_captured = True
 
-            # Process the frame if the capture interval has elapsed
-            current_time = datetime.datetime.now()
-            elapsed_time = (current_time - last_process_time).total_seconds()
-
             # If the capture interval has elapsed, yield the frame
-            if elapsed_time >= self.capture_interval:
+            if capture_due:
                 last_process_time = current_time
                 timestamp = current_time.timestamp()
                 yield frame, timestamp
 
-                # Clear memory
+                # Drop references to the frame; the memory policy
+                # collects periodically instead of on every frame
                 del frame, timestamp
-                gc.collect()
 
             await asyncio.sleep(0.01)  # Adjust the sleep time as needed
 
@@ -212,13 +437,15 @@ class StreamCapture:
         fail_count = 0  # Counter for consecutive failures
 
         while True:
+            current_time = datetime.datetime.now()
+            elapsed_time = (current_time - last_process_time).total_seconds()
+            capture_due = elapsed_time >= self.capture_interval
+
             # Read the frame from the stream
-            ret, frame = (
-                self.cap.read() if self.cap is not None else (False, None)
-            )
+            ret, frame = await self.run_blocking(self.read_frame, capture_due)
 
             # Handle failed frame reads
-            if not ret or frame is None:
+            if not ret or (capture_due and frame is None):
                 fail_count += 1
                 print(
                     'Failed to read frame from generic stream. '
@@ -248,17 +475,14 @@ class StreamCapture:
                 # Mark as successfully captured
                 self.successfully_captured = True
 
-            current_time = datetime.datetime.now()
-            elapsed_time = (current_time - last_process_time).total_seconds()
-
-            if elapsed_time >= self.capture_interval:
+            if capture_due:
                 last_process_time = current_time
                 timestamp = current_time.timestamp()
                 yield frame, timestamp
 
-                # Clear memory
+                # Drop references to the frame; the memory policy
+                # collects periodically instead of on every frame
                 del frame, timestamp
-                gc.collect()
 
             await asyncio.sleep(0.01)  # Adjust the sleep time as needed
 
@@ -282,9 +506,23 @@ async def main():
         help='Live stream URL',
         required=True,
     )
+    parser.add_argument(
+        '--background_decoding',
+        action='store_true',
+        help='Grab frames in a background thread, decoding only the latest',
+    )
+    parser.add_argument(
+        '--frame_skipping',
+        action='store_true',
+        help='Only decode the frames that are captured',
+    )
     args = parser.parse_args()
 
-    stream_capture = StreamCapture(args.url)
+    stream_capture = StreamCapture(
+        args.url,
+        background_decoding=args.background_decoding,
+        frame_skipping=args.frame_skipping,
+    )
     async for frame, timestamp in stream_capture.execute_capture():
         # Process the frame here
         print(f"Frame at {timestamp} displayed")
@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from multiprocessing import resource_tracker
+from typing import TypedDict
+
+
+class WorkerPoolMetrics(TypedDict):
+    workers: int
+    idle: int
+    spawned: int
+    assignments: int
+    replaced: int
+
+
+async def serve_assignments(
+    worker_id: int,
+    control_queue: multiprocessing.Queue,
+    status_queue: multiprocessing.Queue,
+    target: Callable[..., Awaitable[None]],
+    update: Callable[..., None] | None = None,
+) -> None:
+    """
+    Runs the assignments sent to a worker, one at a time, as a task of the
+    worker's event loop.
+
+    Commands are `('start', args)` to run `target(*args)`, `('update',
+    args)` to call `update(*args)` in the event loop while the assignment
+    runs, `('stop',)` to cancel the running assignment and `None` to exit.
+
+    Args:
+        worker_id (int): The worker ID.
+        control_queue (multiprocessing.Queue): The worker's commands.
+        status_queue (multiprocessing.Queue): Replies to the pool.
+        target (Callable[..., Awaitable[None]]): The assignment coroutine.
+        update (Callable[..., None] | None): Applies updates to the
+            running assignment.
+    """
+    logger = logging.getLogger(__name__)
+    task: asyncio.Task | None = None
+
+    async def cancel() -> None:
+        if task is None:
+            return
+        task.cancel()
+        results = await asyncio.gather(task, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            logger.error(
+                f"Worker {worker_id} assignment failed: {results[0]}",
+            )
+
+    while True:
+        command = await asyncio.to_thread(control_queue.get)
+        if command is None:
+            await cancel()
+            return
+        if command[0] == 'start':
+            await cancel()
+            task = asyncio.create_task(target(*command[1]))
+        elif command[0] == 'update':
+            if update is not None and task is not None:
+                update(*command[1])
+        elif command[0] == 'stop':
+            await cancel()
+            task = None
+            status_queue.put(('stopped', worker_id))
+
+
+def run_warm_worker(
+    worker_id: int,
+    control_queue: multiprocessing.Queue,
+    status_queue: multiprocessing.Queue,
+    target: Callable[..., Awaitable[None]],
+    warm_up: Callable[[], None] | None,
+    update: Callable[..., None] | None = None,
+) -> None:
+    """
+    Worker process: warms up once, then serves assignments until told to
+    exit.
+
+    Args:
+        worker_id (int): The worker ID.
+        control_queue (multiprocessing.Queue): The worker's commands.
+        status_queue (multiprocessing.Queue): Replies to the pool.
+        target (Callable[..., Awaitable[None]]): The assignment coroutine.
+        warm_up (Callable[[], None] | None): Imports modules and loads
+            models before the first assignment.
+        update (Callable[..., None] | None): Applies updates to the
+            running assignment.
+    """
+    if warm_up is not None:
+        try:
+            warm_up()
+        except Exception as e:
+            # The assignments load what they need themselves
+            logging.getLogger(__name__).error(
+                f"Worker {worker_id} warm-up failed: {e}",
+            )
+    status_queue.put(('ready', worker_id))
+    asyncio.run(
+        serve_assignments(
+            worker_id, control_queue, status_queue, target, update,
+        ),
+    )
+
+
+class WarmWorkerPool:
+    """
+    A pool of pre-forked worker processes kept warm for stream processing.
+
+    Each worker runs the warm-up, importing modules and loading models,
+    as soon as it is forked, then waits on its control queue. An
+    assignment runs as a task in the worker's event loop, and releasing it
+    cancels the task but keeps the process, so the worker goes back to the
+    pool with its models loaded. Starting or restarting a stream is then a
+    message to a warm worker instead of a cold process start, and running
+    assignments can be updated through the same control queue.
+
+    The pool keeps `size` idle workers, forking a replacement whenever one
+    is assigned. Workers are forked from the process owning the pool, so
+    objects it holds when a worker is forked, such as queues of the
+    inference service, are inherited. Assignment arguments are pickled.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., Awaitable[None]],
+        warm_up: Callable[[], None] | None = None,
+        update: Callable[..., None] | None = None,
+        size: int = 1,
+        stop_timeout: float = 10,
+    ):
+        """
+        Initialises the pool.
+
+        Args:
+            target (Callable[..., Awaitable[None]]): The coroutine function
+                each assignment runs, called with the assignment's
+                arguments.
+            warm_up (Callable[[], None] | None): Run by each worker before
+                its first assignment.
+            update (Callable[..., None] | None): Called in a worker's
+                event loop with the arguments of each `send` to it.
+            size (int): Number of idle workers to keep ready.
+            stop_timeout (float): Seconds to wait for a worker to cancel an
+                assignment before it is terminated and replaced.
+        """
+        self.target = target
+        self.warm_up = warm_up
+        self.update = update
+        self.size = size
+        self.stop_timeout = stop_timeout
+
+        self.status_queue: multiprocessing.Queue = multiprocessing.Queue()
+        self.workers: dict[int, multiprocessing.Process] = {}
+        self.control_queues: dict[int, multiprocessing.Queue] = {}
+        # Most recently released last, so a restarted stream gets the
+        # worker it just left
+        self.idle: list[int] = []
+        self.ready: set[int] = set()
+        # Surplus workers told to exit
+        self.retired: list[multiprocessing.Process] = []
+        self.next_worker_id = 0
+        self.spawned = 0
+        self.assignments = 0
+        self.replaced = 0
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """
+        Forks the idle workers. They warm up in the background; an
+        assignment sent before a worker is ready runs once it is.
+        """
+        # Workers must share the parent's resource tracker, or their own
+        # would unlink shared memory they attached to when they exit
+        resource_tracker.ensure_running()
+        self.fill()
+        self.logger.info(f"Started {self.size} warm workers")
+
+    def fill(self) -> None:
+        """
+        Forks workers until `size` of them are idle.
+        """
+        while len(self.idle) < self.size:
+            self.idle.insert(0, self.spawn())
+
+    def spawn(self) -> int:
+        """
+        Forks a worker.
+
+        Returns:
+            int: The worker ID.
+        """
+        worker_id = self.next_worker_id
+        self.next_worker_id += 1
+        control_queue: multiprocessing.Queue = multiprocessing.Queue()
+        worker = multiprocessing.Process(
+            target=run_warm_worker,
+            args=(
+                worker_id,
+                control_queue,
+                self.status_queue,
+                self.target,
+                self.warm_up,
+                self.update,
+            ),
+            daemon=True,
+        )
+        worker.start()
+        self.workers[worker_id] = worker
+        self.control_queues[worker_id] = control_queue
+        self.spawned += 1
+        return worker_id
+
+    def assign(self, *args) -> multiprocessing.Process:
+        """
+        Runs `target(*args)` on an idle worker, forking one if none is
+        idle, and forks a replacement to keep the pool at its size.
+
+        Args:
+            *args: The assignment's arguments.
+
+        Returns:
+            multiprocessing.Process: The worker process, the handle to
+                release the assignment with.
+        """
+        worker_id = None
+        while self.idle:
+            candidate = self.idle.pop()
+            if self.workers[candidate].is_alive():
+                worker_id = candidate
+                break
+            self.remove(candidate)
+        if worker_id is None:
+            worker_id = self.spawn()
+
+        self.control_queues[worker_id].put(('start', args))
+        self.assignments += 1
+        self.fill()
+        return self.workers[worker_id]
+
+    def find(self, worker: multiprocessing.Process) -> int | None:
+        """
+        Looks up the ID of a worker.
+
+        Args:
+            worker (multiprocessing.Process): The handle from `assign`.
+
+        Returns:
+            int | None: The worker ID, or None if the worker has left the
+                pool.
+        """
+        return next(
+            (
+                worker_id for worker_id, process in self.workers.items()
+                if process is worker
+            ),
+            None,
+        )
+
+    def send(self, worker: multiprocessing.Process, *args) -> bool:
+        """
+        Sends an update to a worker's running assignment.
+
+        Args:
+            worker (multiprocessing.Process): The handle from `assign`.
+            *args: The arguments for the pool's `update`.
+
+        Returns:
+            bool: Whether the worker is assigned and can take the update.
+        """
+        worker_id = self.find(worker)
+        if (
+            worker_id is None
+            or worker_id in self.idle
+            or not worker.is_alive()
+        ):
+            return False
+        self.control_queues[worker_id].put(('update', args))
+        return True
+
+    def release(self, worker: multiprocessing.Process) -> None:
+        """
+        Cancels a worker's assignment and returns the worker to the pool.
+        A worker that does not stop in time is terminated instead. Idle
+        workers beyond the pool size exit.
+
+        Args:
+            worker (multiprocessing.Process): The handle from `assign`.
+        """
+        worker_id = self.find(worker)
+        # Already released, e.g. along with the rest of its group
+        if worker_id is None or worker_id in self.idle:
+            return
+
+        self.control_queues[worker_id].put(('stop',))
+        if self.wait_for('stopped', worker_id):
+            self.idle.append(worker_id)
+        else:
+            self.logger.warning(f"Worker {worker_id} did not stop, replacing")
+            worker.terminate()
+            worker.join()
+            self.remove(worker_id)
+            self.replaced += 1
+
+        # Retire the spares forked meanwhile rather than the worker that
+        # ran the stream, without waiting for them to finish warming up
+        while len(self.idle) > self.size:
+            surplus = self.idle.pop(0)
+            self.control_queues[surplus].put(None)
+            self.retired.append(self.workers[surplus])
+            self.remove(surplus)
+        self.retired = [
+            process for process in self.retired if process.is_alive()
+        ]
+
+    def wait_for(self, status: str, worker_id: int) -> bool:
+        """
+        Waits for a status reply of a worker, noting the other replies
+        that arrive meanwhile.
+
+        Args:
+            status (str): The expected status.
+            worker_id (int): The worker ID.
+
+        Returns:
+            bool: Whether the reply arrived within the stop timeout.
+        """
+        deadline = time.monotonic() + self.stop_timeout
+        while True:
+            try:
+                reply = self.status_queue.get(
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+            except queue.Empty:
+                return False
+            if reply[0] == 'ready':
+                self.ready.add(reply[1])
+            if reply == (status, worker_id):
+                return True
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """
+        Waits until every worker has warmed up.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            bool: Whether all workers were ready within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.ready.issuperset(self.workers):
+            try:
+                reply = self.status_queue.get(
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+            except queue.Empty:
+                return False
+            if reply[0] == 'ready':
+                self.ready.add(reply[1])
+        return True
+
+    def remove(self, worker_id: int) -> None:
+        """
+        Forgets a worker that has exited.
+
+        Args:
+            worker_id (int): The worker ID.
+        """
+        if worker_id in self.idle:
+            self.idle.remove(worker_id)
+        self.ready.discard(worker_id)
+        del self.workers[worker_id]
+        del self.control_queues[worker_id]
+
+    def get_metrics(self) -> WorkerPoolMetrics:
+        """
+        Returns the pool's counters.
+
+        Returns:
+            WorkerPoolMetrics: Live and idle workers, workers forked,
+                assignments run and workers replaced after failing to
+                stop.
+        """
+        return {
+            'workers': len(self.workers),
+            'idle': len(self.idle),
+            'spawned': self.spawned,
+            'assignments': self.assignments,
+            'replaced': self.replaced,
+        }
+
+    def stop(self) -> None:
+        """
+        Cancels every assignment and stops the workers.
+        """
+        for control_queue in self.control_queues.values():
+            control_queue.put(None)
+        for worker in [*self.workers.values(), *self.retired]:
+            worker.join(timeout=self.stop_timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self.workers = {}
+        self.retired = []
+        self.control_queues = {}
+        self.idle = []
+        self.ready = set()
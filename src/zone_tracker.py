@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy.spatial import cKDTree
+from shapely.geometry import MultiPoint
+from shapely.geometry import Polygon
+
+from .cone_clustering import create_clusterer
+
+
+class ZoneTracker:
+    """
+    Tracks the controlled zones formed by safety cones across the frames
+    of one stream.
+
+    Cones on a site rarely move, so the tracker matches each frame's cone
+    centres to the cones of the last clustering. While the set is stable,
+    the clustering is skipped and every cone keeps its previous cluster;
+    only the hulls of clusters whose cones moved are rebuilt. The cones are
+    clustered again when too few match, when their number changes, when a
+    cluster keeps fewer than three matched cones, or after a forced
+    refresh interval.
+    """
+
+    def __init__(
+        self,
+        clusterer=None,
+        tolerance: float = 15.0,
+        move_tolerance: float = 2.0,
+        stability_threshold: float = 0.9,
+        refresh_interval: int = 100,
+    ):
+        """
+        Initialises the ZoneTracker.
+
+        Args:
+            clusterer: An estimator with `fit_predict`, labelling noise as
+                -1. Defaults to the HDBSCAN settings of `DangerDetector`.
+            tolerance (float): Maximum distance in pixels between a cone
+                and a cone of the last clustering for the two to match.
+            move_tolerance (float): Distance in pixels a cone may move
+                before the hull of its cluster is rebuilt.
+            stability_threshold (float): Minimum fraction of cones that
+                must match for the clustering to be skipped.
+            refresh_interval (int): Number of frames after which the cones
+                are clustered again even if they are stable.
+        """
+        self.clusterer = clusterer or create_clusterer('hdbscan')
+        self.tolerance = tolerance
+        self.move_tolerance = move_tolerance
+        self.stability_threshold = stability_threshold
+        self.refresh_interval = refresh_interval
+
+        # Cones of the last clustering, used for matching
+        self.tree: cKDTree | None = None
+        self.cluster_labels = np.empty(0, dtype=int)
+        # Positions each cone had when its cluster's hull was built
+        self.anchors = np.empty((0, 2))
+        # Cluster label to hull, in order of first appearance
+        self.hulls: dict[int, Polygon] = {}
+        self.frames_since_clustering = 0
+
+        self.frames = 0
+        self.clusterings = 0
+        self.skipped = 0
+        self.hulls_rebuilt = 0
+        self.hulls_reused = 0
+
+    def update(self, cone_positions: np.ndarray) -> list[Polygon]:
+        """
+        Returns the controlled zones for the current frame's cones.
+
+        Args:
+            cone_positions (np.ndarray): An (N, 2) array of cone centres.
+
+        Returns:
+            list[Polygon]: A polygon for each cluster of at least three
+                cones.
+        """
+        self.frames += 1
+
+        # Check if there are at least three safety cones to form a polygon
+        if len(cone_positions) < 3:
+            self.reset()
+            return []
+
+        nearest = self.match(cone_positions)
+        if nearest is None or not self.update_hulls(cone_positions, nearest):
+            self.cluster(cone_positions)
+        else:
+            self.frames_since_clustering += 1
+            self.skipped += 1
+
+        return list(self.hulls.values())
+
+    def match(self, cone_positions: np.ndarray) -> np.ndarray | None:
+        """
+        Matches cones one-to-one to the cones of the last clustering.
+
+        Each cone matches its nearest previous cone within the tolerance.
+        When several cones share a nearest previous cone, only the closest
+        of them matches it.
+
+        Args:
+            cone_positions (np.ndarray): An (N, 2) array of cone centres.
+
+        Returns:
+            np.ndarray | None: The index of each cone's matched previous
+                cone, -1 for cones without a match, or None if the cones
+                must be clustered again.
+        """
+        if (
+            self.tree is None
+            or self.tree.n != len(cone_positions)
+            or self.frames_since_clustering >= self.refresh_interval
+        ):
+            return None
+
+        distances, nearest = self.tree.query(
+            cone_positions, distance_upper_bound=self.tolerance,
+        )
+        # Cones beyond the tolerance get the tree's size as their index
+        nearest[nearest == self.tree.n] = -1
+
+        # Keep the closest cone for each previous cone
+        order = np.argsort(distances, kind='stable')
+        _, first = np.unique(nearest[order], return_index=True)
+        unique = np.zeros(len(nearest), dtype=bool)
+        unique[order[first]] = True
+        nearest[~unique] = -1
+
+        matched = np.count_nonzero(nearest >= 0)
+        if matched < self.stability_threshold * len(cone_positions):
+            return None
+        return nearest
+
+    def cluster(self, cone_positions: np.ndarray) -> None:
+        """
+        Clusters the cones and builds every hull.
+
+        Args:
+            cone_positions (np.ndarray): An (N, 2) array of cone centres.
+        """
+        self.cluster_labels = self.clusterer.fit_predict(cone_positions)
+        self.tree = cKDTree(cone_positions)
+        self.anchors = np.array(cone_positions, dtype=float)
+        self.frames_since_clustering = 0
+        self.clusterings += 1
+
+        self.hulls = {}
+        for label in dict.fromkeys(self.cluster_labels.tolist()):
+            if label == -1:
+                continue  # Skip noise points
+            members = self.cluster_labels == label
+            if np.count_nonzero(members) >= 3:
+                self.hulls[label] = MultiPoint(
+                    cone_positions[members],
+                ).convex_hull
+                self.hulls_rebuilt += 1
+
+    def update_hulls(
+        self,
+        cone_positions: np.ndarray,
+        nearest: np.ndarray,
+    ) -> bool:
+        """
+        Rebuilds the hulls of clusters whose cones moved.
+
+        Cones without a match belong to no cluster until the next
+        clustering.
+
+        Args:
+            cone_positions (np.ndarray): An (N, 2) array of cone centres.
+            nearest (np.ndarray): The index of each cone's matched cone of
+                the last clustering, or -1.
+
+        Returns:
+            bool: False, with the hulls unchanged, if a cluster has fewer
+                than three matched cones and the cones must be clustered
+                again.
+        """
+        matched = nearest >= 0
+        labels = np.full(len(nearest), -1, dtype=self.cluster_labels.dtype)
+        labels[matched] = self.cluster_labels[nearest[matched]]
+
+        members_by_label = {label: labels == label for label in self.hulls}
+        if any(
+            np.count_nonzero(members) < 3
+            for members in members_by_label.values()
+        ):
+            return False
+
+        moved = np.abs(
+            cone_positions - self.anchors[nearest],
+        ).max(axis=1) > self.move_tolerance
+
+        for label, members in members_by_label.items():
+            expected = np.count_nonzero(self.cluster_labels == label)
+            if (
+                np.count_nonzero(members) == expected
+                and not moved[members].any()
+            ):
+                self.hulls_reused += 1
+                continue
+            points = cone_positions[members]
+            self.hulls[label] = MultiPoint(points).convex_hull
+            self.anchors[nearest[members]] = points
+            self.hulls_rebuilt += 1
+        return True
+
+    def reset(self) -> None:
+        """
+        Forgets the tracked cones, so the next frame is clustered.
+        """
+        self.tree = None
+        self.cluster_labels = np.empty(0, dtype=int)
+        self.anchors = np.empty((0, 2))
+        self.hulls = {}
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Returns counters of the work the tracker did and skipped.
+
+        Returns:
+            dict[str, float]: Frames seen, clusterings run and skipped,
+                the share skipped of frames with at least three cones,
+                hulls rebuilt and hulls reused.
+        """
+        tracked = self.clusterings + self.skipped
+        return {
+            'frames': self.frames,
+            'clusterings': self.clusterings,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / tracked if tracked else 0.0,
+            'hulls_rebuilt': self.hulls_rebuilt,
+            'hulls_reused': self.hulls_reused,
+        }
@@ -9,6 +9,7 @@ import numpy as np
 
 from examples.YOLO_evaluation.evaluate_sahi_yolo import COCOEvaluator
 from examples.YOLO_evaluation.evaluate_sahi_yolo import main
+from src.detections import Detections
 
 
 class TestCOCOEvaluator(unittest.TestCase):
@@ -103,6 +104,109 @@ class TestCOCOEvaluator(unittest.TestCase):
 
         self.assertEqual(metrics, expected_metrics)
 
+    @patch(
+        'examples.YOLO_evaluation.evaluate_sahi_yolo.'
+        'SlicedInference.from_sahi_model',
+    )
+    @patch('examples.YOLO_evaluation.evaluate_sahi_yolo.cv2.imread')
+    @patch(
+        'examples.YOLO_evaluation.evaluate_sahi_yolo.'
+        'Coco.from_coco_dict_or_path',
+    )
+    @patch('examples.YOLO_evaluation.evaluate_sahi_yolo.COCO')
+    @patch('examples.YOLO_evaluation.evaluate_sahi_yolo.COCOeval')
+    def test_evaluate_batched(
+        self,
+        mock_cocoeval: MagicMock,
+        mock_coco: MagicMock,
+        mock_coco_from_path: MagicMock,
+        mock_imread: MagicMock,
+        mock_from_sahi_model: MagicMock,
+    ) -> None:
+        """
+        Test that batched slicing maps labels to COCO categories.
+        """
+        category = MagicMock(id=3)
+        category.name = 'Hardhat'
+        mock_coco_from_path.return_value.categories = [category]
+        mock_coco_from_path.return_value.images = [
+            MagicMock(id=7, file_name='image.jpg'),
+        ]
+        mock_cocoeval.return_value.eval = {
+            'precision': np.random.rand(10, 10, 10, 10, 10),
+            'recall': np.random.rand(10, 10, 10, 10),
+        }
+        self.evaluator.model = MagicMock(category_mapping={'0': 'Hardhat'})
+        self.evaluator.batched_slicing = True
+        mock_from_sahi_model.return_value.predict.return_value = Detections(
+            [[10.5, 20.25, 110.5, 220.25, 0.5, 0]],
+        )
+
+        with patch(
+            'examples.YOLO_evaluation.evaluate_sahi_yolo.json.dump',
+        ) as mock_dump:
+            self.evaluator.evaluate()
+
+        mock_imread.assert_called_once_with(
+            'tests/dataset/val/images/image.jpg',
+        )
+        self.assertFalse(mock_from_sahi_model.call_args.kwargs['truncate'])
+        self.assertEqual(
+            mock_dump.call_args[0][0],
+            [{
+                'image_id': 7,
+                'category_id': 3,
+                'bbox': [10.5, 20.25, 100.0, 200.0],
+                'score': 0.5,
+            }],
+        )
+
+    @patch(
+        'examples.YOLO_evaluation.evaluate_sahi_yolo.'
+        'SlicedInference.from_sahi_model',
+    )
+    @patch(
+        'examples.YOLO_evaluation.evaluate_sahi_yolo.cv2.imread',
+        return_value=None,
+    )
+    @patch(
+        'examples.YOLO_evaluation.evaluate_sahi_yolo.'
+        'Coco.from_coco_dict_or_path',
+    )
+    @patch('examples.YOLO_evaluation.evaluate_sahi_yolo.COCO')
+    @patch('examples.YOLO_evaluation.evaluate_sahi_yolo.COCOeval')
+    def test_evaluate_batched_unreadable_image(
+        self,
+        mock_cocoeval: MagicMock,
+        mock_coco: MagicMock,
+        mock_coco_from_path: MagicMock,
+        mock_imread: MagicMock,
+        mock_from_sahi_model: MagicMock,
+    ) -> None:
+        """
+        Test that batched slicing skips images that cannot be read.
+        """
+        mock_coco_from_path.return_value.categories = []
+        mock_coco_from_path.return_value.images = [
+            MagicMock(id=7, file_name='missing.jpg'),
+        ]
+        mock_cocoeval.return_value.eval = {
+            'precision': np.random.rand(10, 10, 10, 10, 10),
+            'recall': np.random.rand(10, 10, 10, 10),
+        }
+        self.evaluator.batched_slicing = True
+
+        with patch(
+            'examples.YOLO_evaluation.evaluate_sahi_yolo.json.dump',
+        ) as mock_dump, patch('builtins.print') as mock_print:
+            self.evaluator.evaluate()
+
+        mock_from_sahi_model.return_value.predict.assert_not_called()
+        mock_print.assert_any_call(
+            'Skipping unreadable image: tests/dataset/val/images/missing.jpg',
+        )
+        self.assertEqual(mock_dump.call_args[0][0], [])
+
     @patch(
         'examples.YOLO_evaluation.evaluate_sahi_yolo.'
         'COCOEvaluator.evaluate',
@@ -112,6 +216,7 @@ class TestCOCOEvaluator(unittest.TestCase):
             model_path='models/pt/best_yolo11n.pt',
             coco_json='tests/dataset/coco_annotations.json',
             image_dir='tests/dataset/val/images',
+            batched_slicing=False,
         ),
     )
     def test_main(
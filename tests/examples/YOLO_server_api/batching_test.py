@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from examples.YOLO_server_api.batching import BatchScheduler
+
+
+class StubModel:
+    """
+    A stub model recording the batches it is called with.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        """
+        Initialises the stub model.
+
+        Args:
+            delay (float): Seconds each batch call blocks for.
+        """
+        self.delay = delay
+        self.calls: list[tuple[str, int]] = []
+        self.lock = threading.Lock()
+
+    def predict_batch(
+        self,
+        model_key: str,
+        images: list[np.ndarray],
+    ) -> list[float]:
+        """
+        Returns the mean pixel value of each image.
+        """
+        with self.lock:
+            self.calls.append((model_key, len(images)))
+        time.sleep(self.delay)
+        return [float(image.mean()) for image in images]
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """
+    Unit tests for the BatchScheduler class.
+    """
+
+    def tearDown(self) -> None:
+        """
+        Stop the scheduler created by the test.
+        """
+        self.scheduler.stop()
+
+    def submit_concurrently(
+        self,
+        requests: list[tuple[str, np.ndarray]],
+    ) -> list[float]:
+        """
+        Submits requests from separate threads, as concurrent HTTP
+        requests would.
+        """
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            futures = [
+                executor.submit(self.scheduler.submit, model_key, image)
+                for model_key, image in requests
+            ]
+            return [future.result() for future in futures]
+
+    def test_single_request(self) -> None:
+        """
+        Test that a lone request is run after the window expires.
+        """
+        model = StubModel()
+        self.scheduler = BatchScheduler(model.predict_batch, max_wait_ms=5)
+        result = self.scheduler.submit('yolo11n', np.full((4, 4, 3), 7))
+        self.assertEqual(result, 7.0)
+        self.assertEqual(model.calls, [('yolo11n', 1)])
+
+    def test_requests_are_batched(self) -> None:
+        """
+        Test that concurrent requests share one batch and keep their
+        own results.
+        """
+        model = StubModel()
+        self.scheduler = BatchScheduler(
+            model.predict_batch, max_batch_size=8, max_wait_ms=200,
+        )
+        images = [np.full((4, 4, 3), i) for i in range(8)]
+        results = self.submit_concurrently(
+            [('yolo11n', image) for image in images],
+        )
+        self.assertEqual(results, [float(i) for i in range(8)])
+        self.assertEqual(model.calls, [('yolo11n', 8)])
+
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics['total_batches'], 1)
+        self.assertEqual(metrics['total_images'], 8)
+        self.assertEqual(metrics['mean_batch_size'], 8.0)
+        self.assertEqual(metrics['batch_size_histogram'], {8: 1})
+
+    def test_batches_grouped_by_model(self) -> None:
+        """
+        Test that a mixed batch calls the model once per model key.
+        """
+        model = StubModel()
+        self.scheduler = BatchScheduler(
+            model.predict_batch, max_batch_size=4, max_wait_ms=200,
+        )
+        results = self.submit_concurrently([
+            ('yolo11n', np.full((2, 2, 3), 1)),
+            ('yolo11x', np.full((2, 2, 3), 2)),
+            ('yolo11n', np.full((2, 2, 3), 3)),
+            ('yolo11x', np.full((2, 2, 3), 4)),
+        ])
+        self.assertEqual(results, [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(
+            sorted(model.calls), [('yolo11n', 2), ('yolo11x', 2)],
+        )
+
+    def test_max_batch_size(self) -> None:
+        """
+        Test that batches never exceed the maximum size.
+        """
+        model = StubModel()
+        self.scheduler = BatchScheduler(
+            model.predict_batch, max_batch_size=3, max_wait_ms=100,
+        )
+        self.submit_concurrently(
+            [('yolo11n', np.zeros((2, 2, 3))) for _ in range(7)],
+        )
+        self.assertTrue(all(size <= 3 for _, size in model.calls))
+        self.assertEqual(sum(size for _, size in model.calls), 7)
+
+    def test_backlog_is_batched(self) -> None:
+        """
+        Test that requests queued behind a slow batch are batched together
+        rather than run one at a time.
+        """
+        model = StubModel(delay=0.2)
+        self.scheduler = BatchScheduler(
+            model.predict_batch, max_batch_size=8, max_wait_ms=10,
+        )
+        image = np.zeros((2, 2, 3))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # The first request occupies the worker while the rest queue up
+            first = executor.submit(self.scheduler.submit, 'yolo11n', image)
+            time.sleep(0.05)
+            self.submit_concurrently(
+                [('yolo11n', image) for _ in range(24)],
+            )
+            first.result()
+
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics['total_images'], 25)
+        self.assertGreater(metrics['mean_batch_size'], 1.0)
+        self.assertLessEqual(metrics['total_batches'], 5)
+        self.assertTrue(all(size <= 8 for _, size in model.calls))
+
+    def test_queue_full(self) -> None:
+        """
+        Test that requests beyond the queue depth are rejected.
+        """
+        model = StubModel(delay=0.5)
+        self.scheduler = BatchScheduler(
+            model.predict_batch,
+            max_batch_size=1,
+            max_wait_ms=0,
+            max_queue_size=1,
+        )
+        image = np.zeros((2, 2, 3))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # The first request occupies the worker, the second the queue
+            executor.submit(self.scheduler.submit, 'yolo11n', image)
+            time.sleep(0.1)
+            executor.submit(self.scheduler.submit, 'yolo11n', image)
+            time.sleep(0.1)
+            with self.assertRaises(queue.Full):
+                self.scheduler.submit('yolo11n', image)
+        self.assertEqual(self.scheduler.get_metrics()['rejected'], 1)
+
+    def test_latency_limit(self) -> None:
+        """
+        Test that requests waiting past the latency limit time out.
+        """
+        model = StubModel(delay=0.3)
+        self.scheduler = BatchScheduler(
+            model.predict_batch,
+            max_batch_size=1,
+            max_wait_ms=0,
+            max_latency=0.2,
+        )
+        with self.assertRaises(TimeoutError):
+            self.scheduler.submit('yolo11n', np.zeros((2, 2, 3)))
+
+    def test_prediction_error(self) -> None:
+        """
+        Test that model errors are raised to every caller in the batch.
+        """
+        def failing_predict_batch(model_key, images):
+            raise RuntimeError('model failure')
+
+        self.scheduler = BatchScheduler(failing_predict_batch, max_wait_ms=5)
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit('yolo11n', np.zeros((2, 2, 3)))
+        self.assertEqual(self.scheduler.get_metrics()['total_batches'], 0)
+
+    def test_missing_results(self) -> None:
+        """
+        Test that callers the model returned no result for get an error
+        rather than waiting.
+        """
+        def short_predict_batch(model_key, images):
+            return [float(image.mean()) for image in images][:1]
+
+        self.scheduler = BatchScheduler(
+            short_predict_batch, max_batch_size=2, max_wait_ms=500,
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(
+                    self.scheduler.submit, 'yolo11n', np.full((2, 2, 3), 3),
+                )
+                for _ in range(2)
+            ]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result(timeout=5))
+                except RuntimeError:
+                    outcomes.append('error')
+        self.assertEqual(sorted(map(str, outcomes)), ['3.0', 'error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
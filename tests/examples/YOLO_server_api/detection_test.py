@@ -22,6 +22,9 @@ from examples.YOLO_server_api.detection import (
     remove_completely_contained_labels,
 )
 from examples.YOLO_server_api.detection import remove_overlapping_labels
+from examples.YOLO_server_api.detection import serialise_detections
+from src.detections import Detections
+from src.frame_codec import encode_frame
 
 
 class TestDetectionAPI(unittest.TestCase):
@@ -80,6 +83,50 @@ class TestDetectionAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json, list)
 
+    def test_detection_route_raw(self):
+        access_token = create_access_token(identity='testuser')
+        img = np.zeros((500, 500, 3), dtype=np.uint8)
+
+        # A raw frame is decoded from its shape header
+        response = self.client.post(
+            '/detect',
+            headers={'Authorization': f'Bearer {access_token}'},
+            content_type='multipart/form-data',
+            data={
+                'image': (
+                    BytesIO(encode_frame(img, 'raw')), 'test.raw',
+                    'application/octet-stream',
+                ),
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, list)
+
+        # A truncated frame is rejected
+        response = self.client.post(
+            '/detect',
+            headers={'Authorization': f'Bearer {access_token}'},
+            content_type='multipart/form-data',
+            data={
+                'image': (
+                    BytesIO(encode_frame(img, 'raw')[:-1]), 'test.raw',
+                    'application/octet-stream',
+                ),
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_detection_formats(self):
+        access_token = create_access_token(identity='testuser')
+        response = self.client.get(
+            '/detect/formats',
+            headers={'Authorization': f'Bearer {access_token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json['formats'], ['png', 'jpeg', 'webp', 'raw'],
+        )
+
 
 class TestDetectionFunctions(unittest.TestCase):
     def tearDown(self):
@@ -142,6 +189,19 @@ class TestDetectionFunctions(unittest.TestCase):
         self.assertEqual(len(datas), 1)
         self.assertEqual(datas[0], [10, 20, 30, 40, 0.95, 1])
 
+    def test_serialise_detections(self):
+        datas = [[10, 20, 30, 40, 0.95, 5], [1, 2, 3, 4, 0.5, 0]]
+        self.assertIs(serialise_detections(datas), datas)
+
+        rows = serialise_detections(Detections(datas))
+        self.assertEqual(rows[0], [1, 2, 3, 4, 0.5, 0])
+        self.assertEqual(rows[1][:4], [10, 20, 30, 40])
+        self.assertAlmostEqual(rows[1][4], 0.95)
+        self.assertEqual(rows[1][5], 5)
+        for row in rows:
+            self.assertTrue(all(isinstance(x, int) for x in row[:4]))
+            self.assertIsInstance(row[5], int)
+
     def test_check_containment(self):
         datas = [
             [10, 10, 50, 50, 0.9],  # 第一个检测框
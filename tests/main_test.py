@@ -0,0 +1,610 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import numpy as np
+import yaml
+
+from main import classify_config_changes
+from main import MainApp
+from main import validate_configurations
+from src.monitor_logger import LoggerConfig
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Import time budget of main.py in microseconds
+IMPORT_BUDGET_US = 1_000_000
+
+# Directory the apps under test write their logs to
+log_dir = tempfile.TemporaryDirectory()
+log_patcher = patch(
+    'main.LoggerConfig', lambda: LoggerConfig(log_dir=log_dir.name),
+)
+
+
+def setUpModule() -> None:
+    """
+    Keeps the logs of the apps under test out of the repository.
+    """
+    log_patcher.start()
+
+
+def tearDownModule() -> None:
+    """
+    Restores the app's logger and removes the logs.
+    """
+    log_patcher.stop()
+    log_dir.cleanup()
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Imports a module in a fresh interpreter with `-X importtime`.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        dict[str, int]: Cumulative import time in microseconds by module.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Tests that main.py starts without loading heavy dependencies.
+    """
+
+    def test_heavy_imports_deferred(self) -> None:
+        """
+        Test that detection dependencies are not imported with main.
+        """
+        times = import_times('main')
+        for module in (
+            'cv2',
+            'sahi',
+            'torch',
+            'sklearn',
+            'scipy',
+            'shapely',
+            'streamlink',
+            'speedtest',
+        ):
+            self.assertNotIn(module, times)
+
+    def test_import_budget(self) -> None:
+        """
+        Test that main imports within the budget.
+        """
+        # Best of three, to be robust against a busy machine
+        cumulative = min(import_times('main')['main'] for _ in range(3))
+        self.assertLess(cumulative, IMPORT_BUDGET_US)
+
+    def test_help(self) -> None:
+        """
+        Test that the CLI help is printed.
+        """
+        result = subprocess.run(
+            [sys.executable, 'main.py', '--help'],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertIn('--check_config', result.stdout)
+
+
+class TestValidateConfigurations(unittest.TestCase):
+    """
+    Unit tests for validate_configurations.
+    """
+
+    def test_valid(self) -> None:
+        """
+        Test that complete configurations have no errors.
+        """
+        configurations = [
+            {
+                'video_url': 'rtsp://example.com/stream',
+                'model_key': 'yolo11n',
+                'site': 'Site',
+                'notifications': {'token': 'en'},
+                'detect_with_server': False,
+                'cone_clustering': 'radius',
+            },
+            {
+                'video_url': 'rtsp://example.com/stream2',
+                'model_key': 'yolo11n',
+                'site': 'Site',
+                'line_token': 'token',
+                'language': 'en',
+                'detect_with_server': True,
+            },
+        ]
+        self.assertEqual(validate_configurations(configurations), [])
+
+    def test_invalid(self) -> None:
+        """
+        Test that problems are reported for each stream.
+        """
+        self.assertEqual(
+            validate_configurations({'video_url': 'x'}),
+            ['The configuration must be a list of streams.'],
+        )
+        errors = validate_configurations([
+            'rtsp://example.com/stream',
+            {'video_url': 'x', 'cone_clustering': 'kmeans'},
+        ])
+        self.assertEqual(errors[0], 'Stream 0: not a mapping.')
+        self.assertIn("Stream 1: missing 'model_key'.", errors)
+        self.assertIn("Stream 1: missing 'notifications'.", errors)
+        self.assertIn(
+            "Stream 1: unsupported cone_clustering 'kmeans'.", errors,
+        )
+
+
+class TestClassifyConfigChanges(unittest.TestCase):
+    """
+    Unit tests for classify_config_changes.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the configuration of a running stream.
+        """
+        self.config = {
+            'video_url': 'rtsp://example.com/stream',
+            'model_key': 'yolo11n',
+            'site': 'Site',
+            'notifications': {'token': 'en'},
+            'detect_with_server': False,
+        }
+
+    def test_unchanged(self) -> None:
+        """
+        Test that defaults and equal values are not changes.
+        """
+        config = dict(
+            self.config,
+            stream_name='prediction_visual',
+            cone_clustering='hdbscan',
+        )
+        self.assertEqual(
+            classify_config_changes(self.config, config), ([], []),
+        )
+
+    def test_in_place(self) -> None:
+        """
+        Test that notification and name changes apply in place, whatever
+        the notification format.
+        """
+        config = dict(
+            self.config,
+            notifications=None,
+            line_token='token',
+            language='zh-TW',
+            stream_name='gate',
+        )
+        self.assertEqual(
+            classify_config_changes(self.config, config),
+            ([], ['stream_name', 'notifications']),
+        )
+
+    def test_restart(self) -> None:
+        """
+        Test that changes to how the stream is set up need a restart.
+        """
+        config = dict(
+            self.config,
+            model_key='yolo11x',
+            cone_clustering='radius',
+            notifications={'token': 'de'},
+        )
+        self.assertEqual(
+            classify_config_changes(self.config, config),
+            (['model_key', 'cone_clustering'], ['notifications']),
+        )
+
+
+class TestWarmUpLabelSprites(unittest.TestCase):
+    """
+    Tests that labels are rasterised for the configured languages.
+    """
+
+    def test_configured_languages(self) -> None:
+        """
+        Test that sprites cover English and every notification language,
+        in either notification format.
+        """
+        from src.drawing_manager import DrawingManager
+        from src.drawing_manager import LabelSpriteCache
+
+        app = MainApp('config/configuration.yaml')
+        with patch.object(
+            DrawingManager, 'label_sprites', LabelSpriteCache(),
+        ) as sprites:
+            app.warm_up_label_sprites([
+                {'notifications': {'token': 'th', 'token2': 'zh-TW'}},
+                {'line_token': 'token', 'language': 'vi'},
+                {'notifications': None},
+            ])
+            self.assertEqual(
+                {language for language, _, _ in sprites.sprites},
+                {'en', 'th', 'zh-TW', 'vi'},
+            )
+
+
+class StubCapture:
+    """
+    Stream capture yielding frames a second apart.
+    """
+
+    def __init__(self, timestamp: float, frames: int = 1):
+        """
+        Initialises the capture.
+
+        Args:
+            timestamp (float): Timestamp of the first frame.
+            frames (int): Number of frames.
+        """
+        self.timestamp = timestamp
+        self.frames = frames
+
+    async def execute_capture(self):
+        """
+        Yields the frames and their timestamps.
+        """
+        for i in range(self.frames):
+            yield np.zeros((240, 320, 3), dtype=np.uint8), self.timestamp + i
+
+    def update_capture_interval(self, interval: int) -> None:
+        """
+        Ignores the capture interval.
+        """
+
+    def get_capture_metrics(self) -> dict[str, float]:
+        """
+        Returns fixed capture counters.
+        """
+        return {'grabbed': 1, 'decoded': 1, 'decode_ratio': 1.0}
+
+    async def release_resources(self) -> None:
+        """
+        Releases nothing.
+        """
+
+
+class StubDetector:
+    """
+    Detector finding a person without a hardhat.
+    """
+
+    model = None
+
+    async def generate_detections(self, frame):
+        """
+        Returns the fixed detections.
+        """
+        from src.detections import Detections
+
+        return Detections([
+            [100, 100, 150, 150, 0.9, 2],
+            [90, 90, 160, 230, 0.9, 5],
+        ]), frame
+
+    async def close(self) -> None:
+        """
+        Closes nothing.
+        """
+
+
+class TestRenderFanOut(unittest.TestCase):
+    """
+    Tests that each frame is drawn once per language for its warnings.
+    """
+
+    def run_stream(
+        self,
+        app: MainApp,
+        frames: int = 1,
+    ) -> tuple[MagicMock, AsyncMock, MagicMock]:
+        """
+        Runs frames with warnings for three tokens in two languages.
+
+        Args:
+            app (MainApp): The app.
+            frames (int): Number of frames.
+
+        Returns:
+            tuple[MagicMock, AsyncMock, MagicMock]: The mocks of LINE
+                deliveries, the Redis manager and the frame drawing.
+        """
+        from src.drawing_manager import DrawingManager
+
+        app.memory_policy = MagicMock()
+        # During working hours, with the last notification long ago
+        timestamp = (
+            datetime.now() + timedelta(days=1)
+        ).replace(hour=10).timestamp()
+
+        with patch(
+            'src.notifiers.line_notifier.LineNotifier.deliver',
+            autospec=True, return_value=200,
+        ) as mock_deliver, patch(
+            'main.redis_manager', AsyncMock(),
+        ) as mock_redis, patch.object(
+            DrawingManager, 'draw_detections_on_frame', autospec=True,
+            side_effect=DrawingManager.draw_detections_on_frame,
+        ) as mock_draw:
+            asyncio.run(
+                app.process_single_stream(
+                    MagicMock(),
+                    'rtsp://example.com/stream',
+                    site='Site',
+                    notifications={'a': 'en', 'b': 'th', 'c': 'en'},
+                    stream_capture=StubCapture(timestamp, frames),
+                    live_stream_detector=StubDetector(),
+                ),
+            )
+        return mock_deliver, mock_redis, mock_draw
+
+    def test_notifications_share_renders(self) -> None:
+        """
+        Test that tokens of one language share an image, drawn from the
+        frame Redis publishes.
+        """
+        from src.frame_codec import decode_frame
+
+        mock_deliver, mock_redis, mock_draw = self.run_stream(
+            MainApp('config/configuration.yaml'),
+        )
+
+        self.assertEqual(mock_draw.call_count, 2)
+        # The stream's own aggregator sends each token's first warning at
+        # once, and its dispatcher delivers them on close
+        notifications = [call.args[2] for call in mock_deliver.call_args_list]
+        images = {
+            notification['recipient']: notification['image']
+            for notification in notifications
+        }
+        self.assertEqual(set(images), {'a', 'b', 'c'})
+        self.assertIs(images['a'], images['c'])
+        self.assertNotEqual(images['a'], images['b'])
+        mock_redis.add_to_stream.assert_awaited_once()
+        published = mock_redis.add_to_stream.await_args.args[1]['frame']
+        np.testing.assert_array_equal(
+            decode_frame(published), decode_frame(images['c']),
+        )
+
+    def test_warnings_sent_to_aggregator(self) -> None:
+        """
+        Test that a stream with a shared aggregator queues one warning per
+        language instead of notifying.
+        """
+        from src.notification_aggregator import NotificationAggregator
+
+        app = MainApp('config/configuration.yaml')
+        app.notification_aggregator = NotificationAggregator()
+        mock_deliver, _, _ = self.run_stream(app)
+
+        mock_deliver.assert_not_called()
+        events = [
+            app.notification_aggregator.events.get(timeout=5)
+            for _ in range(2)
+        ]
+        self.assertEqual(
+            {event['site'] for event in events}, {'Site'},
+        )
+        self.assertEqual(
+            sorted(event['tokens'] for event in events), [['a', 'c'], ['b']],
+        )
+        self.assertEqual(events[0]['thumbnail'].shape, (240, 320, 3))
+
+    def test_thumbnail_per_warning(self) -> None:
+        """
+        Test that every warning goes to the aggregator with the thumbnail
+        of its own frame, drawing each language once per frame.
+        """
+        from src.notification_aggregator import NotificationAggregator
+
+        app = MainApp('config/configuration.yaml')
+        app.notification_aggregator = NotificationAggregator()
+        _, mock_redis, mock_draw = self.run_stream(app, frames=3)
+
+        events = [
+            app.notification_aggregator.events.get(timeout=5)
+            for _ in range(6)
+        ]
+        self.assertTrue(
+            all(event['thumbnail'] is not None for event in events),
+        )
+        # Redis reuses the drawing of its language
+        self.assertEqual(mock_draw.call_count, 3 * 2)
+        self.assertEqual(mock_redis.add_to_stream.await_count, 3)
+        self.assertEqual(
+            app.notification_aggregator.get_metrics()['submitted'], 6,
+        )
+
+    def test_shared_aggregator_without_dispatcher(self) -> None:
+        """
+        Test that stream processes of a shared aggregator start no
+        dispatcher of their own.
+        """
+        app = MainApp('config/configuration.yaml')
+        app.notification_aggregator = MagicMock()
+        with patch.object(
+            app, 'process_configs', AsyncMock(),
+        ) as mock_process, patch(
+            'src.notifiers.dispatcher.NotificationDispatcher',
+        ) as mock_dispatcher:
+            asyncio.run(app.run_workflow([MagicMock()], [None]))
+
+        mock_process.assert_awaited_once()
+        mock_dispatcher.assert_not_called()
+        self.assertIsNone(app.notification_dispatcher)
+
+
+class ReportingApp(MainApp):
+    """
+    MainApp whose streams report their settings instead of detecting.
+    """
+
+    def __init__(self, *args, events: multiprocessing.Queue, **kwargs):
+        """
+        Initialises the app.
+
+        Args:
+            *args: Arguments of MainApp.
+            events (multiprocessing.Queue): Queue the streams report on.
+            **kwargs: Options of MainApp.
+        """
+        self.events = events
+        super().__init__(*args, **kwargs)
+
+    async def process_streams(self, config, inference_client=None,
+                              stream_capture=None) -> None:
+        """
+        Reports the process and the notifications of the stream whenever
+        they change.
+        """
+        reported = None
+        while True:
+            live_config = self.stream_configs[config['video_url']]
+            if live_config['notifications'] != reported:
+                reported = live_config['notifications']
+                self.events.put((os.getpid(), reported))
+            await asyncio.sleep(0.01)
+
+    def warm_up_worker(self) -> None:
+        """
+        Skips loading models.
+        """
+
+
+class TestConfigReload(unittest.TestCase):
+    """
+    Tests that reloads update running streams in place where they can.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a configuration file.
+        """
+        self.events: multiprocessing.Queue = multiprocessing.Queue()
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.directory.name) / 'configuration.yaml'
+        self.config = {
+            'video_url': 'rtsp://example.com/stream',
+            'model_key': 'yolo11n',
+            'site': 'Site',
+            'notifications': {'token': 'en'},
+            'detect_with_server': False,
+        }
+
+    def tearDown(self) -> None:
+        """
+        Remove the configuration file.
+        """
+        self.directory.cleanup()
+
+    def reload(self, app: MainApp, **changes) -> tuple[int, dict]:
+        """
+        Writes the configuration with changes, reloads it and waits for
+        the stream's report.
+
+        Args:
+            app (MainApp): The app.
+            **changes: Fields to change.
+
+        Returns:
+            tuple[int, dict]: The stream's process ID and notifications.
+        """
+        self.config_file.write_text(yaml.safe_dump([
+            dict(self.config, **changes),
+        ]))
+        asyncio.run(app.reload_configurations())
+        return self.events.get(timeout=30)
+
+    def check_reloads(self, app: MainApp) -> tuple[int, int]:
+        """
+        Checks that notification changes are applied in the running
+        process and that model changes restart the stream.
+
+        Args:
+            app (MainApp): The app.
+
+        Returns:
+            tuple[int, int]: The process IDs before and after the restart.
+        """
+        try:
+            pid, notifications = self.reload(app)
+            self.assertEqual(notifications, {'token': 'en'})
+
+            self.assertEqual(
+                self.reload(app, notifications={'token': 'zh-TW'}),
+                (pid, {'token': 'zh-TW'}),
+            )
+
+            new_pid, notifications = self.reload(
+                app, notifications={'token': 'zh-TW'}, model_key='yolo11x',
+            )
+            self.assertEqual(notifications, {'token': 'zh-TW'})
+            return pid, new_pid
+        finally:
+            for video_url in list(app.running_processes):
+                app.stop_workflow(video_url)
+
+    def test_process_updated_in_place(self) -> None:
+        """
+        Test in-place updates of a stream process.
+        """
+        app = ReportingApp(str(self.config_file), events=self.events)
+        pid, new_pid = self.check_reloads(app)
+        self.assertNotEqual(new_pid, pid)
+
+    def test_warm_worker_updated_in_place(self) -> None:
+        """
+        Test in-place updates of a stream on a warm worker.
+        """
+        app = ReportingApp(
+            str(self.config_file), events=self.events, warm_workers=1,
+        )
+        app.worker_pool.start()
+        try:
+            pid, new_pid = self.check_reloads(app)
+            # The restarted stream gets the worker it left
+            self.assertEqual(new_pid, pid)
+            self.assertEqual(app.worker_pool.get_metrics()['assignments'], 2)
+        finally:
+            app.worker_pool.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+from sklearn.cluster import HDBSCAN
+
+from src.cone_clustering import create_clusterer
+from src.cone_clustering import RadiusGraphClustering
+from src.danger_detector import DangerDetector
+
+
+class TestRadiusGraphClustering(unittest.TestCase):
+    """
+    Unit tests for the RadiusGraphClustering class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up two lines of cones and a stray cone.
+        """
+        self.points = np.array([
+            [900, 900],  # Stray cone
+            [100, 100], [120, 100], [140, 100], [160, 100],
+            [500, 300], [500, 320], [500, 340],
+        ], dtype=float)
+
+    def test_fit_predict(self) -> None:
+        """
+        Test that linked cones form clusters numbered by first appearance.
+        """
+        labels = RadiusGraphClustering().fit_predict(self.points)
+        self.assertEqual(labels.tolist(), [-1, 0, 0, 0, 0, 1, 1, 1])
+
+    def test_fixed_radius(self) -> None:
+        """
+        Test clustering with a fixed linking radius.
+        """
+        labels = RadiusGraphClustering(radius=15).fit_predict(self.points)
+        self.assertEqual(labels.tolist(), [-1] * 8)
+
+        labels = RadiusGraphClustering(
+            radius=1000, min_cluster_size=2,
+        ).fit_predict(self.points)
+        self.assertEqual(labels.tolist(), [0] * 8)
+
+    def test_few_points(self) -> None:
+        """
+        Test that too few points are noise.
+        """
+        clusterer = RadiusGraphClustering()
+        self.assertEqual(clusterer.fit_predict(np.empty((0, 2))).tolist(), [])
+        self.assertEqual(clusterer.fit_predict(self.points[:1]).tolist(), [-1])
+
+    def test_create_clusterer(self) -> None:
+        """
+        Test that backends are created by name.
+        """
+        self.assertIsInstance(create_clusterer('hdbscan'), HDBSCAN)
+        clusterer = create_clusterer('radius', radius=10)
+        self.assertIsInstance(clusterer, RadiusGraphClustering)
+        self.assertEqual(clusterer.radius, 10)
+        with self.assertRaises(ValueError):
+            create_clusterer('kmeans')
+
+    def test_danger_detector_backends(self) -> None:
+        """
+        Test that both backends find the zones of well separated cones.
+        """
+        datas = [
+            [x - 5, y - 5, x + 5, y + 5, 0.9, 6]
+            for x, y in [
+                [100, 100], [150, 100], [150, 150], [100, 150],
+                [500, 500], [560, 500], [530, 560],
+            ]
+        ]
+        zones = {}
+        for backend in ('hdbscan', 'radius'):
+            polygons = DangerDetector(
+                clustering=backend,
+            ).detect_polygon_from_cones(datas)
+            zones[backend] = sorted(polygon.wkt for polygon in polygons)
+        self.assertEqual(len(zones['radius']), 2)
+        self.assertEqual(zones['radius'], zones['hdbscan'])
+
+
+if __name__ == '__main__':
+    unittest.main()
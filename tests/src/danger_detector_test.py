@@ -4,6 +4,8 @@ import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
+from shapely.geometry import Point
 from shapely.geometry import Polygon
 
 from src.danger_detector import DangerDetector
@@ -204,6 +206,35 @@ class TestDangerDetector(unittest.TestCase):
         polygons = self.detector.detect_polygon_from_cones(normalised_data)
         self.assertEqual(len(polygons), 0)
 
+    def test_people_in_overlapping_polygons(self) -> None:
+        """
+        Test that people are counted once, matching per-point checks.
+        """
+        polygons = [
+            Polygon([(0, 0), (100, 0), (100, 100), (0, 100)]),
+            Polygon([(50, 50), (200, 50), (125, 200)]),
+        ]
+        rng = np.random.default_rng(0)
+        corners = rng.integers(0, 250, (200, 2))
+        data: list[list[float]] = [
+            [x, y, x + 10, y + 10, 0.9, 5] for x, y in corners.tolist()
+        ]
+        # Duplicate people and non-person detections
+        data += data[:20]
+        data += [[60, 60, 70, 70, 0.9, 6]]
+
+        expected = set()
+        for x1, y1, x2, y2, _, label in data:
+            centre = Point((x1 + x2) / 2, (y1 + y2) / 2)
+            if label == 5 and any(p.contains(centre) for p in polygons):
+                expected.add((centre.x, centre.y))
+
+        people_count = self.detector.calculate_people_in_controlled_area(
+            polygons, data,
+        )
+        self.assertGreater(people_count, 0)
+        self.assertEqual(people_count, len(expected))
+
     def test_person_inside_polygon(self) -> None:
         """
         Test case for checking behavior when a person is inside a polygon.
@@ -346,5 +377,167 @@ class TestDangerDetector(unittest.TestCase):
             )
 
 
+class TestDangerDetectorVectorised(unittest.TestCase):
+    """
+    Parity tests between the Python and NumPy danger detection engines.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up detectors for both engines and a seeded random generator.
+        """
+        self.detector = DangerDetector()
+        self.vectorised = DangerDetector(engine='numpy')
+        self.rng = np.random.default_rng(42)
+
+    def random_detections(self, count: int) -> list[list[float]]:
+        """
+        Generates a random frame of integer-aligned detections.
+
+        Args:
+            count (int): The number of detections to generate.
+
+        Returns:
+            list[list[float]]: Detections with labels biased towards
+                persons, violations, cones and machinery.
+        """
+        x1 = self.rng.integers(0, 1800, count)
+        y1 = self.rng.integers(0, 1000, count)
+        w = self.rng.integers(5, 300, count)
+        h = self.rng.integers(5, 300, count)
+        labels = self.rng.choice([0, 2, 4, 5, 5, 6, 6, 7, 8, 9], count)
+        conf = self.rng.random(count).round(2)
+        return [
+            [
+                float(x1[i]), float(y1[i]), float(x1[i] + w[i]),
+                float(y1[i] + h[i]), float(conf[i]), float(labels[i]),
+            ]
+            for i in range(count)
+        ]
+
+    def assert_parity(self, datas: list[list[float]]) -> None:
+        """
+        Asserts that both engines return the same warnings and polygons.
+
+        Args:
+            datas (list[list[float]]): The detections to compare on.
+        """
+        array = DangerDetector.to_array(datas)
+        warnings, polygons = self.detector.detect_danger(array.tolist())
+        vec_warnings, vec_polygons = self.vectorised.detect_danger(array)
+        self.assertEqual(sorted(warnings), sorted(vec_warnings))
+        self.assertEqual(len(polygons), len(vec_polygons))
+        for polygon, vec_polygon in zip(polygons, vec_polygons):
+            self.assertTrue(polygon.equals(vec_polygon))
+
+    def test_invalid_engine(self) -> None:
+        """
+        Test that an unknown engine name is rejected.
+        """
+        with self.assertRaises(ValueError):
+            DangerDetector(engine='fortran')
+
+    def test_to_array_empty(self) -> None:
+        """
+        Test that empty detections convert to an empty N×6 array.
+        """
+        array = DangerDetector.to_array([])
+        self.assertEqual(array.shape, (0, 6))
+        self.assertEqual(array.dtype, np.float32)
+
+    def test_normalise_array(self) -> None:
+        """
+        Test that array normalisation matches `normalise_data`.
+        """
+        datas = [[150, 150, 50, 50, 0.9, 0], [10, 40, 30, 20, 0.8, 5]]
+        np.testing.assert_array_equal(
+            DangerDetector.normalise_array(DangerDetector.to_array(datas)),
+            DangerDetector.to_array(self.detector.normalise_data(datas)),
+        )
+
+    def test_matrix_parity(self) -> None:
+        """
+        Test that the pairwise matrices match the scalar rule functions.
+        """
+        datas = self.detector.normalise_data(self.random_detections(60))
+        bboxes = np.array([d[:4] for d in datas])
+        overlap = DangerDetector.overlap_matrix(bboxes, bboxes)
+        driver = DangerDetector.is_driver_matrix(bboxes, bboxes)
+        is_vehicle = np.arange(len(bboxes)) % 2 == 0
+        close = DangerDetector.is_dangerously_close_matrix(
+            bboxes, bboxes, is_vehicle,
+        )
+        for i, a in enumerate(datas):
+            for j, b in enumerate(datas):
+                self.assertAlmostEqual(
+                    overlap[i, j],
+                    self.detector.overlap_percentage(a[:4], b[:4]),
+                )
+                self.assertEqual(
+                    driver[i, j], self.detector.is_driver(a[:4], b[:4]),
+                )
+                label = 'vehicle' if is_vehicle[j] else 'machinery'
+                self.assertEqual(
+                    close[i, j],
+                    self.detector.is_dangerously_close(a[:4], b[:4], label),
+                )
+
+    def test_detect_danger_parity_fixtures(self) -> None:
+        """
+        Test parity on hand-written frames covering every rule.
+        """
+        frames: list[list[list[float]]] = [
+            [],
+            [[200, 200, 300, 300, 0.85, 5]],
+            [
+                [100, 100, 120, 120, 0.95, 5],  # Person
+                [110, 110, 200, 200, 0.85, 8],  # Machinery
+            ],
+            [
+                [150, 250, 170, 350, 0.9, 5],  # Driver
+                [100, 200, 300, 400, 0.9, 9],  # Vehicle
+                [400, 400, 500, 500, 0.75, 2],  # No hardhat
+            ],
+            [
+                [100, 100, 120, 120, 0.9, 6],
+                [150, 150, 170, 170, 0.85, 6],
+                [130, 130, 140, 140, 0.95, 5],
+                [300, 300, 320, 320, 0.85, 5],
+                [200, 200, 220, 220, 0.89, 6],
+                [250, 250, 270, 270, 0.85, 6],
+                [450, 450, 470, 470, 0.92, 6],
+                [500, 500, 520, 520, 0.88, 6],
+                [550, 550, 570, 570, 0.86, 6],
+            ],
+        ]
+        for datas in frames:
+            with self.subTest(datas=datas):
+                self.assert_parity(datas)
+
+    def test_detect_danger_parity_fractional(self) -> None:
+        """
+        Test parity on fractional coordinates lying on a rule's threshold,
+        which float32 rounding would move across it.
+        """
+        datas = [
+            [150.3, 236.4, 170.7, 271.0, 0.9, 5],  # Driver, on the limit
+            [100.1, 100.2, 300.3, 288.3, 0.9, 9],  # Vehicle
+        ]
+        self.assertEqual(
+            self.detector.detect_danger(datas),
+            self.vectorised.detect_danger(datas),
+        )
+        self.assertEqual(self.vectorised.detect_danger(datas), ([], []))
+
+    def test_detect_danger_parity_random(self) -> None:
+        """
+        Test parity on random crowded frames.
+        """
+        for count in (5, 20, 80, 200):
+            for _ in range(5):
+                with self.subTest(count=count):
+                    self.assert_parity(self.random_detections(count))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.danger_detector import DangerDetector
+from src.detections import Detections
+from src.drawing_manager import DrawingManager
+from src.live_stream_detection import LiveStreamDetector
+
+
+class TestDetections(unittest.TestCase):
+    """
+    Unit tests for the Detections container.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a frame of detections in unsorted label order.
+        """
+        self.datas: list[list[float]] = [
+            [400, 400, 500, 500, 0.75, 9],  # Vehicle
+            [200, 200, 300, 300, 0.85, 5],  # Person
+            [50, 50, 150, 150, 0.95, 0],    # Hardhat
+            [100, 100, 120, 120, 0.9, 6],   # Safety cone
+            [250, 250, 270, 270, 0.8, 5],   # Person
+            [600, 600, 700, 700, 0.7, 8],   # Machinery
+        ]
+        self.detections = Detections.from_list(self.datas)
+
+    def test_layout(self) -> None:
+        """
+        Test that data is a contiguous float32 array sorted by label.
+        """
+        data = self.detections.data
+        self.assertEqual(data.shape, (6, 6))
+        self.assertEqual(data.dtype, np.float32)
+        self.assertTrue(data.flags['C_CONTIGUOUS'])
+        self.assertEqual(self.detections.labels.tolist(), [0, 5, 5, 6, 8, 9])
+        # Rows within a class keep their original order
+        self.assertEqual(
+            self.detections.persons.tolist(),
+            [[200, 200, 300, 300, 0.8500000238418579, 5],
+             [250, 250, 270, 270, 0.800000011920929, 5]],
+        )
+
+    def test_empty(self) -> None:
+        """
+        Test an empty container.
+        """
+        detections = Detections()
+        self.assertEqual(len(detections), 0)
+        self.assertFalse(detections)
+        self.assertEqual(detections.data.shape, (0, 6))
+        self.assertEqual(len(detections.persons), 0)
+        self.assertEqual(detections.tolist(), [])
+
+    def test_class_views_are_zero_copy(self) -> None:
+        """
+        Test that class views share memory with the container.
+        """
+        for view, labels in (
+            (self.detections.persons, [5, 5]),
+            (self.detections.cones, [6]),
+            (self.detections.vehicles, [8, 9]),
+        ):
+            self.assertEqual(view.labels.tolist(), labels)
+            self.assertTrue(
+                np.shares_memory(view.data, self.detections.data),
+            )
+
+    def test_getitem(self) -> None:
+        """
+        Test row access, zero-copy slicing and masking.
+        """
+        row = self.detections[0]
+        self.assertIsInstance(row, np.ndarray)
+        self.assertEqual(row[5], 0)
+
+        sliced = self.detections[1:3]
+        self.assertIsInstance(sliced, Detections)
+        self.assertTrue(np.shares_memory(sliced.data, self.detections.data))
+
+        masked = self.detections[self.detections.confidences > 0.8]
+        self.assertIsInstance(masked, Detections)
+        self.assertEqual(len(masked), 3)
+
+    def test_reversed_slice_stays_sorted(self) -> None:
+        """
+        Test that a negative-step slice is re-sorted so class views still
+        find their rows.
+        """
+        reversed_ = self.detections[::-1]
+        self.assertIsInstance(reversed_, Detections)
+        self.assertEqual(reversed_.labels.tolist(), [0, 5, 5, 6, 8, 9])
+        self.assertEqual(len(reversed_.persons), 2)
+        self.assertEqual(len(reversed_.of_class(Detections.NO_HARDHAT)), 0)
+        self.assertFalse(
+            np.shares_memory(reversed_.data, self.detections.data),
+        )
+
+    def test_drop(self) -> None:
+        """
+        Test removing rows by index.
+        """
+        remaining = self.detections.drop({1, 2})
+        self.assertEqual(remaining.labels.tolist(), [0, 6, 8, 9])
+        self.assertEqual(len(self.detections.drop(set())), 6)
+
+    def test_ensure(self) -> None:
+        """
+        Test that the adapter only wraps legacy data.
+        """
+        self.assertIs(Detections.ensure(self.detections), self.detections)
+        self.assertIsInstance(Detections.ensure(self.datas), Detections)
+
+    def test_centres_and_array(self) -> None:
+        """
+        Test derived columns and NumPy interoperability.
+        """
+        np.testing.assert_array_equal(
+            self.detections.cones.centres, [[110, 110]],
+        )
+        self.assertIs(np.asarray(self.detections), self.detections.data)
+        self.assertEqual(
+            np.asarray(self.detections, dtype=np.float64).dtype, np.float64,
+        )
+
+    def test_from_object_predictions(self) -> None:
+        """
+        Test building detections from SAHI object predictions.
+        """
+        prediction = MagicMock()
+        prediction.bbox.to_voc_bbox.return_value = [10.7, 20.2, 30.9, 40.5]
+        prediction.score.value = 0.95
+        prediction.category.id = 1
+        detections = Detections.from_object_predictions([prediction])
+        np.testing.assert_allclose(
+            detections.data, [[10, 20, 30, 40, 0.95, 1]],
+        )
+
+
+class TestDetectionsPipeline(unittest.TestCase):
+    """
+    Tests that pipeline stages accept Detections as well as legacy lists.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a frame with violations, cones and machinery.
+        """
+        self.datas: list[list[float]] = [
+            [100, 100, 120, 120, 0.95, 5],  # Person
+            [110, 110, 200, 200, 0.85, 8],  # Machinery
+            [400, 400, 500, 500, 0.75, 2],  # No hardhat
+            [405, 405, 495, 495, 0.8, 0],   # Hardhat over the no hardhat
+            [100, 100, 120, 120, 0.9, 6],
+            [150, 150, 170, 170, 0.85, 6],
+            [200, 200, 220, 220, 0.89, 6],
+            [250, 250, 270, 270, 0.85, 6],
+        ]
+
+    def test_danger_detector(self) -> None:
+        """
+        Test that DangerDetector gives the same result for both formats.
+        """
+        detector = DangerDetector()
+        warnings, polygons = detector.detect_danger(self.datas)
+        detections_warnings, detections_polygons = detector.detect_danger(
+            Detections.from_list(self.datas),
+        )
+        self.assertEqual(sorted(warnings), sorted(detections_warnings))
+        self.assertEqual(len(polygons), len(detections_polygons))
+
+        normalised = detector.normalise_data(
+            Detections([[150, 150, 50, 50, 0.9, 0]]),
+        )
+        self.assertIsInstance(normalised, Detections)
+        self.assertEqual(normalised.xyxy.tolist(), [[50, 50, 150, 150]])
+
+    def test_label_post_processing(self) -> None:
+        """
+        Test that label removal preserves the container type.
+        """
+        detector = LiveStreamDetector()
+        filtered_list = detector.remove_completely_contained_labels(
+            detector.remove_overlapping_labels(
+                [list(data) for data in self.datas],
+            ),
+        )
+        filtered = detector.remove_completely_contained_labels(
+            detector.remove_overlapping_labels(
+                Detections.from_list(self.datas),
+            ),
+        )
+        self.assertIsInstance(filtered, Detections)
+        self.assertEqual(
+            sorted(filtered.tolist()),
+            sorted(Detections.from_list(filtered_list).tolist()),
+        )
+
+    def test_drawing_manager(self) -> None:
+        """
+        Test that drawing gives the same frame for both formats.
+        """
+        drawer = DrawingManager()
+        frame = np.zeros((600, 600, 3), dtype=np.uint8)
+        # Sort the legacy rows so both formats draw in the same order
+        datas = Detections.from_list(self.datas)
+        np.testing.assert_array_equal(
+            drawer.draw_detections_on_frame(frame, [], datas.tolist()),
+            drawer.draw_detections_on_frame(frame, [], datas),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,13 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import cv2
 import numpy as np
 from shapely.geometry import Polygon
 
 from src.drawing_manager import DrawingManager
+from src.drawing_manager import FrameRenderCache
+from src.drawing_manager import LabelSpriteCache
 from src.drawing_manager import main
 
 
@@ -199,6 +202,121 @@ class TestDrawingManager(unittest.TestCase):
         # Check if the frame dimensions are the same
         self.assertEqual(frame_with_polygons.shape, self.frame.shape)
 
+    def test_backends_match(self) -> None:
+        """
+        Test that the OpenCV backend draws boxes and labels exactly as the
+        PIL backend, and polygons up to their edge pixels.
+        """
+        pil_drawer = DrawingManager(backend='pil')
+        frame = np.random.default_rng(0).integers(
+            0, 256, self.frame.shape, dtype=np.uint8,
+        )
+        # Includes a box whose label is clipped by the top of the frame
+        datas = self.datas + [[-20, -30, 40, 10, 0.9, 2]]
+        for language in ('en', 'th'):
+            with self.subTest(language=language):
+                np.testing.assert_array_equal(
+                    self.drawer.draw_detections_on_frame(
+                        frame, [], datas, language,
+                    ),
+                    pil_drawer.draw_detections_on_frame(
+                        frame, [], datas, language,
+                    ),
+                )
+
+                drawn = self.drawer.draw_detections_on_frame(
+                    frame, self.polygons, datas, language,
+                )
+                reference = pil_drawer.draw_detections_on_frame(
+                    frame, self.polygons, datas, language,
+                )
+                differing = (drawn != reference).any(axis=2)
+                self.assertLess(differing.mean(), 0.005)
+
+    def test_draw_does_not_modify_frame(self) -> None:
+        """
+        Test that drawing leaves the input frame as it was.
+        """
+        frame = self.frame.copy()
+        self.drawer.draw_detections_on_frame(
+            frame, self.polygons, self.datas,
+        )
+        np.testing.assert_array_equal(frame, self.frame)
+
+    def test_label_sprites_cached(self) -> None:
+        """
+        Test that each label is rasterised once per language and font size,
+        and shared between drawing managers.
+        """
+        with patch.object(
+            DrawingManager, 'label_sprites', LabelSpriteCache(),
+        ) as sprites, patch.object(
+            sprites, 'rasterise', wraps=sprites.rasterise,
+        ) as mock_rasterise:
+            for _ in range(3):
+                DrawingManager().draw_detections_on_frame(
+                    self.frame, [], self.datas, language='th',
+                )
+            # Hardhat, Person and Vehicle labels
+            self.assertEqual(mock_rasterise.call_count, 3)
+            self.assertEqual(
+                set(sprites.sprites),
+                {('th', 0, 20), ('th', 5, 20), ('th', 9, 20)},
+            )
+
+            DrawingManager(font_size=30).draw_detections_on_frame(
+                self.frame, [], self.datas, language='th',
+            )
+            self.assertEqual(mock_rasterise.call_count, 6)
+
+    def test_warm_up(self) -> None:
+        """
+        Test that warming up rasterises every drawn label, so drawing
+        needs no font.
+        """
+        with patch.object(
+            DrawingManager, 'label_sprites', LabelSpriteCache(),
+        ) as sprites:
+            self.drawer.warm_up(['en', 'th'])
+            self.assertEqual(len(sprites.sprites), 14)
+            with patch.object(self.drawer, 'get_font') as mock_get_font:
+                self.drawer.draw_detections_on_frame(
+                    self.frame, [], self.datas, language='th',
+                )
+            mock_get_font.assert_not_called()
+
+    def test_sprite_blit(self) -> None:
+        """
+        Test that a sprite's box is opaque and its overhang only darkens
+        the frame, clipped at the frame's edges.
+        """
+        sprites = LabelSpriteCache()
+        sprite = sprites.rasterise(
+            'Person', self.drawer.get_font('th'), (255, 165, 0),
+        )
+        tile = sprite['tile']
+        box = tile[:sprite['box_height'], :sprite['box_width']]
+        self.assertTrue((box[..., 3] == 255).all())
+        # Black text on the orange background
+        self.assertEqual(
+            tuple(box.reshape(-1, 4).max(axis=0)[:3]), (0, 165, 255),
+        )
+
+        frame = np.full((20, 20, 3), 200, dtype=np.uint8)
+        sprites.blit(frame, sprite, -5, -5)
+        height = min(sprite['box_height'] - 5, 20)
+        width = min(sprite['box_width'] - 5, 20)
+        np.testing.assert_array_equal(
+            frame[:height, :width], box[5:5 + height, 5:5 + width, :3],
+        )
+
+    def test_unsupported_backend(self) -> None:
+        """
+        Test that an unknown backend is rejected.
+        """
+        with self.assertRaises(ValueError):
+            DrawingManager(backend='skia')
+
     def test_save_frame(self) -> None:
         """
         Test saving a frame to disk.
@@ -238,5 +356,67 @@ class TestDrawingManager(unittest.TestCase):
             mock_file().write.assert_called_once()
 
 
+class TestFrameRenderCache(unittest.TestCase):
+    """
+    Unit tests for the FrameRenderCache class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a cache on a frame with detections.
+        """
+        self.cache = FrameRenderCache(DrawingManager())
+        self.frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        self.datas = [[20, 40, 80, 100, 0.9, 5]]
+
+    def test_render_once_per_language(self) -> None:
+        """
+        Test that each language is drawn and encoded once per frame.
+        """
+        self.cache.start_frame(self.frame, [], self.datas)
+        with patch.object(
+            self.cache.drawing_manager, 'draw_detections_on_frame',
+            wraps=self.cache.drawing_manager.draw_detections_on_frame,
+        ) as mock_draw:
+            english = self.cache.encode('en')
+            self.assertIs(self.cache.encode('en'), english)
+            self.assertIs(self.cache.draw('en'), self.cache.draw('en'))
+            thai = self.cache.encode('th')
+            self.assertEqual(mock_draw.call_count, 2)
+        self.assertNotEqual(english, thai)
+        self.assertEqual(
+            cv2.imdecode(np.frombuffer(english, np.uint8), 1).shape,
+            self.frame.shape,
+        )
+
+        metrics = self.cache.get_metrics()
+        self.assertEqual(metrics['frame_draws'], 2)
+        self.assertEqual(metrics['frame_encodes'], 2)
+
+        # The next frame is rendered afresh
+        self.cache.start_frame(self.frame, [], [])
+        self.assertEqual(
+            self.cache.encode('en'),
+            cv2.imencode('.png', self.frame)[1].tobytes(),
+        )
+        metrics = self.cache.get_metrics()
+        self.assertEqual(metrics['frames'], 2)
+        self.assertEqual(metrics['draws'], 3)
+        self.assertEqual(metrics['encodes'], 3)
+        self.assertEqual(metrics['frame_draws'], 1)
+        self.assertEqual(metrics['draws_per_frame'], 1.5)
+
+    def test_clear(self) -> None:
+        """
+        Test that a cleared cache holds no frame.
+        """
+        self.cache.start_frame(self.frame, [], self.datas)
+        self.cache.encode('en')
+        self.cache.clear()
+        self.assertEqual(self.cache.get_metrics()['frame_encodes'], 0)
+        with self.assertRaises(RuntimeError):
+            self.cache.draw('en')
+
+
 if __name__ == '__main__':
     unittest.main()
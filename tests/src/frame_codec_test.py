@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from src.frame_codec import decode_frame
+from src.frame_codec import downscale_frame
+from src.frame_codec import encode_frame
+from src.frame_codec import RAW_HEADER
+from src.frame_codec import UPLOAD_FORMATS
+
+
+class TestFrameCodec(unittest.TestCase):
+    """
+    Unit tests for encoding and decoding uploaded frames.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a smooth frame, which lossy formats keep close.
+        """
+        x = np.linspace(0, 255, 64, dtype=np.uint8)
+        self.frame = np.stack(
+            [np.tile(x, (48, 1)), np.tile(x[:48, None], (1, 64)),
+             np.full((48, 64), 128, dtype=np.uint8)],
+            axis=2,
+        )
+
+    def test_round_trip(self) -> None:
+        """
+        Test that every format decodes to the frame, exactly where it is
+        lossless.
+        """
+        for upload_format, content_type in UPLOAD_FORMATS.items():
+            with self.subTest(upload_format=upload_format):
+                data = encode_frame(self.frame, upload_format, quality=95)
+                decoded = decode_frame(data, content_type)
+                self.assertEqual(decoded.shape, self.frame.shape)
+                if upload_format in ('png', 'raw'):
+                    np.testing.assert_array_equal(decoded, self.frame)
+                else:
+                    diff = np.abs(
+                        decoded.astype(int) - self.frame.astype(int),
+                    )
+                    self.assertLess(diff.mean(), 4)
+
+    def test_decode_without_content_type(self) -> None:
+        """
+        Test that frames are recognised by their header alone.
+        """
+        for upload_format in UPLOAD_FORMATS:
+            with self.subTest(upload_format=upload_format):
+                data = encode_frame(self.frame, upload_format)
+                self.assertEqual(
+                    decode_frame(data).shape, self.frame.shape,
+                )
+
+    def test_raw_grayscale(self) -> None:
+        """
+        Test that single-channel raw frames decode to BGR.
+        """
+        gray = self.frame[:, :, 0]
+        decoded = decode_frame(encode_frame(gray, 'raw'))
+        self.assertEqual(decoded.shape, self.frame.shape)
+        np.testing.assert_array_equal(decoded[:, :, 2], gray)
+
+    def test_invalid_data(self) -> None:
+        """
+        Test that truncated and unknown data is rejected.
+        """
+        raw = encode_frame(self.frame, 'raw')
+        for data, content_type in (
+            (raw[:-1], None),
+            (raw[:RAW_HEADER.size - 1], 'application/octet-stream'),
+            (b'not an image', 'image/jpeg'),
+        ):
+            with self.subTest(data=data[:16]):
+                with self.assertRaises(ValueError):
+                    decode_frame(data, content_type)
+        with self.assertRaises(ValueError):
+            encode_frame(self.frame, 'bmp')
+
+    def test_downscale(self) -> None:
+        """
+        Test that frames are shrunk to the maximum size, never enlarged.
+        """
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        small, scale = downscale_frame(frame, 640)
+        self.assertEqual(small.shape, (360, 640, 3))
+        self.assertAlmostEqual(scale, 1 / 3)
+
+        for max_size in (None, 1920, 4000):
+            with self.subTest(max_size=max_size):
+                same, scale = downscale_frame(frame, max_size)
+                self.assertIs(same, frame)
+                self.assertEqual(scale, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from src.frame_ring import FrameRing
+
+
+def consume_frames(ring: FrameRing, count: int, sums: multiprocessing.Queue):
+    """
+    Reads frames from a ring in another process, reporting their sums.
+    """
+    for _ in range(count):
+        descriptor = ring.read(timeout=10)
+        sums.put((descriptor['sequence'], int(ring.view(descriptor).sum())))
+        ring.release(descriptor)
+
+
+class TestFrameRing(unittest.TestCase):
+    """
+    Unit tests for the FrameRing class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a ring of three small slots.
+        """
+        self.ring = FrameRing(num_slots=3, slot_bytes=64 * 64 * 3)
+        self.frame = np.arange(48 * 64 * 3, dtype=np.uint8).reshape(48, 64, 3)
+
+    def tearDown(self) -> None:
+        """
+        Free the ring.
+        """
+        self.ring.close()
+
+    def test_write_and_read(self) -> None:
+        """
+        Test that a frame comes back unchanged as a view of its slot.
+        """
+        written = self.ring.write(self.frame, timestamp=12.5)
+        self.assertEqual(
+            written,
+            {
+                'slot': 0,
+                'shape': (48, 64, 3),
+                'dtype': '|u1',
+                'timestamp': 12.5,
+                'sequence': 0,
+            },
+        )
+
+        descriptor = self.ring.read(timeout=0)
+        self.assertEqual(descriptor, written)
+        view = self.ring.view(descriptor)
+        np.testing.assert_array_equal(view, self.frame)
+        self.assertIs(view.base, self.ring.frames.buf.obj)
+        del view
+        self.ring.release(descriptor)
+
+        with self.assertRaises(queue.Empty):
+            self.ring.read(timeout=0)
+
+    def test_reserve_in_place(self) -> None:
+        """
+        Test that a reserved slot can be written in place.
+        """
+        slot, view = self.ring.reserve((2, 2), np.float32)
+        view[...] = 1.5
+        del view
+        self.ring.commit(slot)
+        descriptor = self.ring.read(timeout=0)
+        np.testing.assert_array_equal(
+            self.ring.view(descriptor), np.full((2, 2), 1.5, np.float32),
+        )
+
+    def test_frames_read_in_order(self) -> None:
+        """
+        Test that the oldest frame is read first.
+        """
+        for value in range(3):
+            self.ring.write(np.full((4, 4), value, np.uint8))
+        values = []
+        for _ in range(3):
+            descriptor = self.ring.read(timeout=0)
+            values.append(int(self.ring.view(descriptor)[0, 0]))
+            self.ring.release(descriptor)
+        self.assertEqual(values, [0, 1, 2])
+
+    def test_drop_oldest(self) -> None:
+        """
+        Test that a full ring overwrites its oldest unread frame, but not
+        a frame being read.
+        """
+        reading = None
+        for value in range(5):
+            self.ring.write(np.full((4, 4), value, np.uint8))
+            if value == 0:
+                reading = self.ring.read(timeout=0)
+
+        self.assertEqual(int(self.ring.view(reading)[0, 0]), 0)
+        self.assertEqual(
+            self.ring.get_metrics(),
+            {'written': 5, 'dropped': 2, 'read': 1, 'pending': 2},
+        )
+        sequences = [self.ring.read(timeout=0)['sequence'] for _ in range(2)]
+        self.assertEqual(sequences, [3, 4])
+
+    def test_take_and_discard(self) -> None:
+        """
+        Test that a descriptor's frame can be taken until it is dropped
+        for a newer one, and that discarding frees unread frames only.
+        """
+        first = self.ring.write(np.full((4, 4), 1, np.uint8))
+        self.assertTrue(self.ring.take(first))
+        self.assertFalse(self.ring.take(first))
+        self.assertEqual(int(self.ring.view(first)[0, 0]), 1)
+
+        # Two more fill the ring; a third overwrites the oldest unread
+        second = self.ring.write(np.full((4, 4), 2, np.uint8))
+        self.ring.write(np.full((4, 4), 3, np.uint8))
+        self.ring.write(np.full((4, 4), 4, np.uint8))
+        self.assertFalse(self.ring.take(second))
+
+        self.ring.discard()
+        self.assertEqual(self.ring.get_metrics()['pending'], 0)
+        # The frame being read keeps its slot
+        self.assertEqual(int(self.ring.view(first)[0, 0]), 1)
+        self.ring.release(first)
+
+    def test_back_pressure(self) -> None:
+        """
+        Test that without drop-oldest a full ring makes the producer wait
+        until a slot is released.
+        """
+        ring = FrameRing(num_slots=1, slot_bytes=16, drop_oldest=False)
+        self.addCleanup(ring.close)
+        ring.write(np.zeros(4, np.uint8))
+        with self.assertRaises(queue.Full):
+            ring.write(np.zeros(4, np.uint8), timeout=0.05)
+
+        descriptor = ring.read(timeout=0)
+        threading.Timer(0.1, ring.release, (descriptor,)).start()
+        start = time.monotonic()
+        ring.write(np.ones(4, np.uint8), timeout=5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(ring.get_metrics()['dropped'], 0)
+
+    def test_frame_too_large(self) -> None:
+        """
+        Test that frames larger than a slot are rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.ring.write(np.zeros((65, 64, 3), np.uint8))
+        with self.assertRaises(ValueError):
+            FrameRing(num_slots=0)
+
+    def test_cross_process(self) -> None:
+        """
+        Test frames passing to a consumer process.
+        """
+        # Wait for the consumer rather than drop frames
+        ring = FrameRing(num_slots=2, slot_bytes=64, drop_oldest=False)
+        self.addCleanup(ring.close)
+        sums = multiprocessing.Queue()
+        consumer = multiprocessing.Process(
+            target=consume_frames, args=(ring, 6, sums),
+        )
+        consumer.start()
+        for value in range(6):
+            ring.write(np.full((8, 8), value, np.uint8), timeout=10)
+        consumer.join(timeout=10)
+
+        results = sorted(sums.get(timeout=1) for _ in range(6))
+        self.assertEqual(results, [(i, i * 64) for i in range(6)])
+
+
+if __name__ == '__main__':
+    unittest.main()
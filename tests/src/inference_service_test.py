@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import queue
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.detections import Detections
+from src.inference_service import InferenceService
+from src.inference_service import route_model_key
+from src.sliced_inference import SlicedInference
+
+
+def predict_batch(images: list[np.ndarray]) -> list[np.ndarray]:
+    """
+    A stub detector: one box per image, whose x1 is the image's mean pixel
+    value and whose label is the size of the batch it ran in.
+    """
+    return [
+        np.array(
+            [[image.mean(), 0, 200, 10, 0.5, len(images)]],
+            dtype=np.float32,
+        )
+        for image in images
+    ]
+
+
+def create_stub_engine(model_key: str) -> SlicedInference:
+    """
+    Builds an engine around the stub detector, failing for 'broken'.
+    """
+    if model_key == 'broken':
+        raise OSError('weights not found')
+    # One slice per 64x64 frame and no full-frame pass
+    return SlicedInference(
+        predict_batch,
+        slice_height=64,
+        slice_width=64,
+        overlap_height_ratio=0,
+        overlap_width_ratio=0,
+        perform_standard_pred=False,
+    )
+
+
+class TestInferenceService(unittest.TestCase):
+    """
+    Unit tests for the shared inference service.
+    """
+
+    def setUp(self) -> None:
+        """
+        Start a service with two workers around the stub engine.
+        """
+        self.service = InferenceService(
+            num_workers=2,
+            max_clients=8,
+            max_batch_size=8,
+            max_wait_ms=200,
+            max_frame_bytes=64 * 64 * 3,
+            timeout=10,
+            engine_factory=create_stub_engine,
+        )
+        self.service.start()
+
+    def tearDown(self) -> None:
+        """
+        Stop the service.
+        """
+        self.service.stop()
+
+    def test_route_model_key(self) -> None:
+        """
+        Test that a model key always goes to the same worker.
+        """
+        self.assertEqual(route_model_key('yolo11n', 1), 0)
+        self.assertEqual(
+            route_model_key('yolo11x', 4), route_model_key('yolo11x', 4),
+        )
+        self.assertIn(route_model_key('yolo11x', 4), range(4))
+
+    def test_detect(self) -> None:
+        """
+        Test a round trip through a worker process.
+        """
+        client = self.service.create_client()
+        detections = client.detect(
+            'yolo11n', np.full((64, 64, 3), 42, dtype=np.uint8),
+        )
+        self.assertIsInstance(detections, Detections)
+        self.assertEqual(detections.tolist(), [[42, 0, 64, 10, 0.5, 1]])
+
+    def test_requests_are_batched(self) -> None:
+        """
+        Test that frames from several clients share a forward pass and
+        keep their own results.
+        """
+        clients = [self.service.create_client() for _ in range(6)]
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            futures = [
+                executor.submit(
+                    client.detect,
+                    'yolo11n',
+                    np.full((64, 64, 3), i, dtype=np.uint8),
+                )
+                for i, client in enumerate(clients)
+            ]
+            results = [future.result().data for future in futures]
+
+        self.assertEqual([int(data[0, 0]) for data in results], list(range(6)))
+        self.assertGreater(max(int(data[0, 5]) for data in results), 1)
+
+    def test_inference_error(self) -> None:
+        """
+        Test that a worker error is raised in the client.
+        """
+        client = self.service.create_client()
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        with self.assertRaises(RuntimeError):
+            client.detect('broken', frame)
+        # The worker keeps serving other models
+        self.assertEqual(len(client.detect('yolo11n', frame)), 1)
+
+    def test_frame_too_large(self) -> None:
+        """
+        Test that frames larger than the slot are rejected.
+        """
+        client = self.service.create_client()
+        with self.assertRaises(ValueError):
+            client.detect('yolo11n', np.zeros((65, 64, 3), dtype=np.uint8))
+
+    def test_release_client(self) -> None:
+        """
+        Test that released client IDs are reused with their ring cleared
+        of unread frames.
+        """
+        clients = [self.service.create_client() for _ in range(8)]
+        with self.assertRaises(RuntimeError):
+            self.service.create_client()
+
+        # A frame the stopped client left behind
+        clients[3].ring.write(np.zeros((64, 64, 3), dtype=np.uint8))
+        self.service.release_client(clients[3])
+        self.assertEqual(clients[3].ring.get_metrics()['pending'], 0)
+
+        client = self.service.create_client()
+        self.assertEqual(client.client_id, 3)
+        self.assertIs(client.ring, clients[3].ring)
+        detections = client.detect(
+            'yolo11n', np.full((64, 64, 3), 9, dtype=np.uint8),
+        )
+        self.assertEqual(int(detections.data[0, 0]), 9)
+
+    def test_frames_travel_through_ring(self) -> None:
+        """
+        Test that requests carry ring descriptors and the worker releases
+        the slots it read.
+        """
+        client = self.service.create_client()
+        for value in range(3):
+            detections = client.detect(
+                'yolo11n', np.full((64, 64, 3), value, dtype=np.uint8),
+            )
+            self.assertEqual(int(detections.data[0, 0]), value)
+        self.assertEqual(
+            client.ring.get_metrics(),
+            {'written': 3, 'dropped': 0, 'read': 3, 'pending': 0},
+        )
+
+    def test_dropped_frame(self) -> None:
+        """
+        Test that a frame overwritten before the worker took it fails its
+        request instead of running the newer frame.
+        """
+        client = self.service.create_client()
+        worker = route_model_key('yolo11n', len(client.request_queues))
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        # Fill the ring past its two slots, dropping the first frame
+        descriptor = client.ring.write(frame)
+        client.ring.write(frame)
+        client.ring.write(frame)
+        self.assertEqual(client.ring.get_metrics()['dropped'], 1)
+        client.request_queues[worker].put(
+            (client.client_id, 'yolo11n', descriptor),
+        )
+        sequence, result = client.response_queue.get(timeout=10)
+        self.assertEqual(sequence, descriptor['sequence'])
+        self.assertIsInstance(result, RuntimeError)
+
+
+class TestInferenceServiceBackPressure(unittest.TestCase):
+    """
+    Tests a service whose clients wait for free frame slots.
+    """
+
+    def test_back_pressure(self) -> None:
+        """
+        Test that a client with every slot taken waits and then fails
+        rather than dropping frames.
+        """
+        service = InferenceService(
+            max_clients=1,
+            max_frame_bytes=64 * 64 * 3,
+            frame_slots=1,
+            drop_oldest=False,
+            timeout=0.1,
+            engine_factory=create_stub_engine,
+        )
+        self.addCleanup(service.stop)
+        # No workers: the frame stays unread
+        client = service.create_client()
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        with self.assertRaises(TimeoutError):
+            client.detect('yolo11n', frame)
+        with self.assertRaises(queue.Full):
+            client.detect('yolo11n', frame)
+        self.assertEqual(client.ring.get_metrics()['dropped'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
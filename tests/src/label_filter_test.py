@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from src import label_filter
+from src.detections import Detections
+
+
+def filter_pairwise(datas: list[list[float]]) -> list[list[float]]:
+    """
+    Reference filter comparing every positive box with every negative box,
+    as the overlap and containment passes used to.
+    """
+    def overlap(bbox1, bbox2):
+        x1, y1 = max(bbox1[0], bbox2[0]), max(bbox1[1], bbox2[1])
+        x2, y2 = min(bbox1[2], bbox2[2]), min(bbox1[3], bbox2[3])
+        intersection = max(0, x2 - x1 + 1) * max(0, y2 - y1 + 1)
+        area1 = (bbox1[2] - bbox1[0] + 1) * (bbox1[3] - bbox1[1] + 1)
+        area2 = (bbox2[2] - bbox2[0] + 1) * (bbox2[3] - bbox2[1] + 1)
+        return intersection / (area1 + area2 - intersection)
+
+    def contained(inner, outer):
+        return (
+            inner[0] >= outer[0] and inner[1] >= outer[1]
+            and inner[2] <= outer[2] and inner[3] <= outer[3]
+        )
+
+    def run(datas, check):
+        to_remove = set()
+        for positive, negative in label_filter.LABEL_PAIRS:
+            for i, d1 in enumerate(datas):
+                for j, d2 in enumerate(datas):
+                    if d1[5] == positive and d2[5] == negative:
+                        to_remove.update(check(i, d1, j, d2))
+        return [d for i, d in enumerate(datas) if i not in to_remove]
+
+    def check_overlap(i, d1, j, d2):
+        return {j} if overlap(d1[:4], d2[:4]) > 0.8 else set()
+
+    def check_containment(i, d1, j, d2):
+        if contained(d2[:4], d1[:4]):
+            return {j}
+        if contained(d1[:4], d2[:4]):
+            return {i}
+        return set()
+
+    return run(run(datas, check_overlap), check_containment)
+
+
+class TestLabelFilter(unittest.TestCase):
+    """
+    Unit tests for the label_filter module.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a frame with duplicated, contained and unrelated labels.
+        """
+        self.datas = [
+            [10, 10, 50, 50, 0.9, 0],  # Hardhat
+            [10, 10, 50, 45, 0.8, 2],  # NO-Hardhat (overlap > 0.8)
+            [15, 15, 30, 30, 0.8, 2],  # NO-Hardhat (inside Hardhat)
+            [200, 200, 300, 300, 0.8, 4],  # NO-Safety Vest
+            [210, 210, 250, 250, 0.9, 7],  # Safety Vest (inside)
+            [400, 400, 450, 450, 0.9, 5],  # Person
+            [500, 500, 540, 540, 0.8, 2],  # NO-Hardhat (alone)
+        ]
+
+    def test_find_candidate_pairs(self) -> None:
+        """
+        Test that every pair of intersecting boxes is a candidate.
+        """
+        rng = np.random.default_rng(0)
+        boxes1 = rng.uniform(0, 1000, (50, 2))
+        boxes1 = np.hstack([boxes1, boxes1 + rng.uniform(0, 100, (50, 2))])
+        boxes2 = rng.uniform(0, 1000, (60, 2))
+        boxes2 = np.hstack([boxes2, boxes2 + rng.uniform(0, 100, (60, 2))])
+
+        indices1, indices2 = label_filter.find_candidate_pairs(
+            boxes1, boxes2,
+        )
+        candidates = set(zip(indices1.tolist(), indices2.tolist()))
+        self.assertEqual(len(candidates), len(indices1))
+        self.assertLess(len(candidates), len(boxes1) * len(boxes2))
+        for i, box1 in enumerate(boxes1):
+            for j, box2 in enumerate(boxes2):
+                if box1[0] <= box2[2] and box2[0] <= box1[2]:
+                    self.assertIn((i, j), candidates)
+
+        empty = label_filter.find_candidate_pairs(boxes1, boxes2[:0])
+        self.assertEqual([len(indices) for indices in empty], [0, 0])
+
+    def test_filter_labels(self) -> None:
+        """
+        Test that one pass removes overlapping and contained labels.
+        """
+        filtered = label_filter.filter_labels(self.datas)
+        self.assertEqual(
+            filtered,
+            [
+                [10, 10, 50, 50, 0.9, 0],
+                [200, 200, 300, 300, 0.8, 4],
+                [400, 400, 450, 450, 0.9, 5],
+                [500, 500, 540, 540, 0.8, 2],
+            ],
+        )
+        self.assertIs(filtered[0], self.datas[0])
+
+        detections = label_filter.filter_labels(Detections(self.datas))
+        self.assertIsInstance(detections, Detections)
+        self.assertEqual(
+            sorted(detections.tolist()),
+            sorted(Detections(filtered).tolist()),
+        )
+
+        self.assertEqual(label_filter.filter_labels([]), [])
+        self.assertEqual(len(label_filter.filter_labels(Detections())), 0)
+
+    def test_single_filters(self) -> None:
+        """
+        Test the overlap and containment filters on their own.
+        """
+        self.assertEqual(
+            len(label_filter.remove_overlapping_labels(self.datas)), 6,
+        )
+        self.assertEqual(
+            len(label_filter.remove_completely_contained_labels(self.datas)),
+            4,
+        )
+
+    def test_matches_pairwise_filter(self) -> None:
+        """
+        Test that the indexed filter agrees with comparing every pair.
+        """
+        rng = np.random.default_rng(1)
+        for count in (0, 1, 10, 100):
+            xy = rng.integers(0, 300, (count, 2))
+            size = rng.integers(5, 80, (count, 2))
+            boxes = np.hstack([xy, xy + size])
+            # Near duplicates of the first boxes
+            boxes[count // 2:] = boxes[:count - count // 2] + rng.integers(
+                -2, 3, (count - count // 2, 4),
+            )
+            labels = rng.choice([0, 2, 4, 5, 7], count)
+            datas = [
+                [*map(float, box), 0.9, float(label)]
+                for box, label in zip(boxes, labels)
+            ]
+            self.assertEqual(
+                label_filter.filter_labels(datas), filter_pairwise(datas),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 import time
 import unittest
-from typing import Any
+from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import aiohttp
 import cv2
 import numpy as np
 import pytest
+from aiohttp import web
 
+from src.detections import Detections
+from src.frame_codec import decode_frame
+from src.frame_codec import UPLOAD_FORMATS
 from src.live_stream_detection import LiveStreamDetector
 from src.live_stream_detection import main
 
@@ -62,6 +69,82 @@ class TestLiveStreamDetector(unittest.TestCase):
         self.assertEqual(detector.access_token, None)
         self.assertEqual(detector.token_expiry, 0.0)
 
+    @patch('src.live_stream_detection.AutoDetectionModel.from_pretrained')
+    def test_generate_detections_with_inference_client(
+        self,
+        mock_from_pretrained: MagicMock,
+    ) -> None:
+        """
+        Test that local detection runs on the shared inference service
+        when a client is given.
+
+        Args:
+            mock_from_pretrained (MagicMock): Mock for
+                AutoDetectionModel.from_pretrained.
+        """
+        client = MagicMock()
+        client.detect_async = AsyncMock(
+            return_value=Detections([
+                [10, 10, 50, 50, 0.9, 0],
+                [12, 12, 48, 48, 0.8, 2],
+            ]),
+        )
+        detector = LiveStreamDetector(
+            model_key=self.model_key, inference_client=client,
+        )
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        datas = asyncio.run(detector.generate_detections_local(frame))
+
+        client.detect_async.assert_awaited_once_with(self.model_key, frame)
+        mock_from_pretrained.assert_not_called()
+        # The NO-Hardhat box overlapping the Hardhat box is removed
+        np.testing.assert_allclose(datas.data, [[10, 10, 50, 50, 0.9, 0]])
+
+    @patch.dict('src.live_stream_detection._models', clear=True)
+    @patch('src.live_stream_detection.AutoDetectionModel.from_pretrained')
+    def test_model_shared_in_process(
+        self,
+        mock_from_pretrained: MagicMock,
+    ) -> None:
+        """
+        Test that detectors of one process share a model per model key,
+        and run it off the event loop.
+
+        Args:
+            mock_from_pretrained (MagicMock): Mock for
+                AutoDetectionModel.from_pretrained.
+        """
+        threads = []
+
+        def predict(frame):
+            threads.append(threading.current_thread())
+            return Detections([[10, 10, 50, 50, 0.9, 0]])
+
+        sliced_inference = MagicMock()
+        sliced_inference.predict.side_effect = predict
+        detectors = [
+            LiveStreamDetector(model_key=model_key)
+            for model_key in ('yolo11n', 'yolo11n', 'yolo11x')
+        ]
+        for detector in detectors:
+            detector.sliced_inference = sliced_inference
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        async def detect_all():
+            return await asyncio.gather(*(
+                detector.generate_detections_local(frame)
+                for detector in detectors
+            ))
+
+        results = asyncio.run(detect_all())
+
+        self.assertEqual(mock_from_pretrained.call_count, 2)
+        self.assertIs(detectors[0].model, detectors[1].model)
+        self.assertEqual([len(datas) for datas in results], [1, 1, 1])
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(len(set(threads)), 1)
+
     @patch('src.live_stream_detection.cv2.VideoCapture')
     @patch('src.live_stream_detection.AutoDetectionModel.from_pretrained')
     @pytest.mark.asyncio
@@ -97,21 +180,18 @@ class TestLiveStreamDetector(unittest.TestCase):
         ]
         mock_model.predict.return_value = mock_result
 
-        datas: list[list[Any]] = await self.detector.generate_detections_local(
+        datas: Detections = await self.detector.generate_detections_local(
             frame,
         )
 
-        # Assert the structure and types of the detection dataㄋ
-        self.assertIsInstance(datas, list)
-        for data in datas:
-            self.assertIsInstance(data, list)
-            self.assertEqual(len(data), 6)
-            self.assertIsInstance(data[0], int)
-            self.assertIsInstance(data[1], int)
-            self.assertIsInstance(data[2], int)
-            self.assertIsInstance(data[3], int)
-            self.assertIsInstance(data[4], float)
-            self.assertIsInstance(data[5], int)
+        # Assert the structure and types of the detection data
+        self.assertIsInstance(datas, Detections)
+        self.assertEqual(datas.data.shape, (2, 6))
+        self.assertEqual(datas.data.dtype, np.float32)
+        np.testing.assert_allclose(
+            datas.data,
+            [[10, 10, 50, 50, 0.9, 0], [20, 20, 60, 60, 0.8, 1]],
+        )
 
     @pytest.mark.asyncio
     async def test_run_detection(self) -> None:
@@ -160,21 +240,18 @@ class TestLiveStreamDetector(unittest.TestCase):
         ]
         mock_post.return_value.__aenter__.return_value = mock_response
 
-        datas: list[list[Any]] = await self.detector.generate_detections_cloud(
+        datas: Detections = await self.detector.generate_detections_cloud(
             frame,
         )
 
         # Assert the structure and types of the detection data
-        self.assertIsInstance(datas, list)
-        for data in datas:
-            self.assertIsInstance(data, list)
-            self.assertEqual(len(data), 6)
-            self.assertIsInstance(data[0], int)
-            self.assertIsInstance(data[1], int)
-            self.assertIsInstance(data[2], int)
-            self.assertIsInstance(data[3], int)
-            self.assertIsInstance(data[4], float)
-            self.assertIsInstance(data[5], int)
+        self.assertIsInstance(datas, Detections)
+        self.assertEqual(datas.data.shape, (2, 6))
+        self.assertEqual(datas.data.dtype, np.float32)
+        np.testing.assert_allclose(
+            datas.data,
+            [[10, 10, 50, 50, 0.9, 0], [20, 20, 60, 60, 0.8, 1]],
+        )
 
     @pytest.mark.asyncio
     @patch('aiohttp.ClientSession.post')
@@ -432,11 +509,228 @@ class TestLiveStreamDetector(unittest.TestCase):
                 model_key='yolo11n',
                 output_folder=None,
                 detect_with_server=True,
+                batched_slicing=True,
+                slice_batch_size=32,
+                upload_format='jpeg',
+                upload_quality=90,
+                upload_max_size=None,
             )
             mock_run_detection.assert_called_once_with(
                 'http://example.com/virtual_stream',
             )
 
 
+class TestServerSession(unittest.TestCase):
+    """
+    Tests the detector's session against a stub detection server.
+    """
+
+    async def detect_on_stub_server(
+        self,
+        frames: int,
+        formats: list[str] | None = None,
+        format_errors: int = 0,
+        format_status: int = 503,
+        **options,
+    ) -> tuple[list, list, LiveStreamDetector]:
+        """
+        Runs server detections against a stub server.
+
+        Args:
+            frames (int): Number of frames to detect.
+            formats (list[str] | None): Upload formats the server lists.
+                Defaults to a server without the formats route.
+            format_errors (int): Number of requests for the formats that
+                fail first.
+            format_status (int): Status of the failed requests.
+            **options: Options of the detector.
+
+        Returns:
+            tuple[list, list, LiveStreamDetector]: The client address of
+                each request, the content type and decoded shape of each
+                upload, and the closed detector.
+        """
+        peers = []
+        uploads = []
+        format_statuses = [format_status] * format_errors
+
+        async def token(request: web.Request) -> web.Response:
+            peers.append(request.transport.get_extra_info('peername'))
+            return web.json_response({'access_token': 'token'})
+
+        async def list_formats(request: web.Request) -> web.Response:
+            if format_statuses:
+                return web.Response(status=format_statuses.pop())
+            return web.json_response({'formats': formats})
+
+        async def detect(request: web.Request) -> web.Response:
+            peers.append(request.transport.get_extra_info('peername'))
+            image = (await request.post())['image']
+            img = decode_frame(image.file.read(), image.content_type)
+            uploads.append((image.content_type, img.shape))
+            return web.json_response([[10, 10, 50, 50, 0.9, 0]])
+
+        app = web.Application()
+        app.router.add_post('/token', token)
+        app.router.add_post('/detect', detect)
+        if formats is not None:
+            app.router.add_get('/detect/formats', list_formats)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        host, port = runner.addresses[0][:2]
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        try:
+            async with LiveStreamDetector(
+                api_url=f"http://{host}:{port}", detect_with_server=True,
+                **options,
+            ) as detector:
+                for _ in range(frames):
+                    datas, _ = await detector.generate_detections(frame)
+                    self.detections = datas
+        finally:
+            await runner.cleanup()
+        return peers, uploads, detector
+
+    def test_connection_reused(self) -> None:
+        """
+        Test that the token and detection requests share one connection,
+        which is closed with the detector.
+        """
+        peers, _, detector = asyncio.run(self.detect_on_stub_server(3))
+        self.assertEqual(len(peers), 4)
+        self.assertEqual(len(set(peers)), 1)
+        self.assertIsNone(detector.session)
+        np.testing.assert_allclose(
+            self.detections.data, [[10, 10, 50, 50, 0.9, 0]],
+        )
+
+    def test_upload_format_negotiated(self) -> None:
+        """
+        Test that frames are uploaded in the preferred format when the
+        server lists it, and as PNG otherwise.
+        """
+        all_formats = list(UPLOAD_FORMATS)
+        for formats, upload_format, wire_format in (
+            (None, 'jpeg', 'png'),
+            (['png'], 'webp', 'png'),
+            (all_formats, 'jpeg', 'jpeg'),
+            (all_formats, 'webp', 'webp'),
+            (all_formats, 'raw', 'raw'),
+        ):
+            with self.subTest(formats=formats, upload_format=upload_format):
+                _, uploads, detector = asyncio.run(
+                    self.detect_on_stub_server(
+                        2, formats, upload_format=upload_format,
+                    ),
+                )
+                self.assertEqual(detector.wire_format, wire_format)
+                self.assertEqual(
+                    uploads,
+                    [(UPLOAD_FORMATS[wire_format], (480, 640, 3))] * 2,
+                )
+
+    def test_upload_format_negotiation_retried(self) -> None:
+        """
+        Test that a server error while asking for the formats sends the
+        frame as PNG and asks again for the next one.
+        """
+        _, uploads, detector = asyncio.run(
+            self.detect_on_stub_server(
+                2, ['jpeg'], format_errors=1, upload_format='jpeg',
+            ),
+        )
+        self.assertEqual(detector.wire_format, 'jpeg')
+        self.assertEqual(
+            [content_type for content_type, _ in uploads],
+            [UPLOAD_FORMATS['png'], UPLOAD_FORMATS['jpeg']],
+        )
+
+    def test_upload_format_negotiation_connection_error(self) -> None:
+        """
+        Test that a failed request for the formats sends the frame as PNG
+        rather than failing it, and asks again for the next one.
+        """
+        get = aiohttp.ClientSession.get
+        errors = [aiohttp.ClientConnectionError()]
+
+        def failing_get(session, url, **kwargs):
+            if url.endswith('/detect/formats') and errors:
+                raise errors.pop()
+            return get(session, url, **kwargs)
+
+        with patch.object(aiohttp.ClientSession, 'get', failing_get):
+            _, uploads, detector = asyncio.run(
+                self.detect_on_stub_server(
+                    2, ['jpeg'], upload_format='jpeg',
+                ),
+            )
+        self.assertEqual(detector.wire_format, 'jpeg')
+        self.assertEqual(
+            [content_type for content_type, _ in uploads],
+            [UPLOAD_FORMATS['png'], UPLOAD_FORMATS['jpeg']],
+        )
+
+    def test_upload_format_negotiation_reauthenticates(self) -> None:
+        """
+        Test that a rejected token is renewed before asking for the formats
+        again, rather than keeping PNG for good.
+        """
+        peers, uploads, detector = asyncio.run(
+            self.detect_on_stub_server(
+                2, ['jpeg'], format_errors=1, format_status=401,
+                upload_format='jpeg',
+            ),
+        )
+        self.assertEqual(detector.wire_format, 'jpeg')
+        self.assertEqual(
+            [content_type for content_type, _ in uploads],
+            [UPLOAD_FORMATS['jpeg']] * 2,
+        )
+        # Two token requests and two detections
+        self.assertEqual(len(peers), 4)
+
+    def test_upload_format_negotiation_client_error_status(self) -> None:
+        """
+        Test that a client error status other than a missing route is not
+        kept as the answer.
+        """
+        _, uploads, detector = asyncio.run(
+            self.detect_on_stub_server(
+                2, ['jpeg'], format_errors=1, format_status=403,
+                upload_format='jpeg',
+            ),
+        )
+        self.assertEqual(detector.wire_format, 'jpeg')
+        self.assertEqual(
+            [content_type for content_type, _ in uploads],
+            [UPLOAD_FORMATS['png'], UPLOAD_FORMATS['jpeg']],
+        )
+
+    def test_upload_downscaled(self) -> None:
+        """
+        Test that downscaled uploads give detections in the coordinates of
+        the full frame.
+        """
+        _, uploads, _ = asyncio.run(
+            self.detect_on_stub_server(
+                1, ['raw'], upload_format='raw', upload_max_size=320,
+            ),
+        )
+        self.assertEqual(
+            uploads, [('application/octet-stream', (240, 320, 3))],
+        )
+        np.testing.assert_allclose(
+            self.detections.data, [[20, 20, 100, 100, 0.9, 0]],
+        )
+
+    def test_unsupported_upload_format(self) -> None:
+        """
+        Test that an unknown upload format is rejected.
+        """
+        with self.assertRaises(ValueError):
+            LiveStreamDetector(upload_format='bmp')
+
+
 if __name__ == '__main__':
     unittest.main()
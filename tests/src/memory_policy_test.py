@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import gc
+import unittest
+from unittest.mock import patch
+
+from src.memory_policy import MemoryPolicy
+
+
+class TestMemoryPolicy(unittest.TestCase):
+    """
+    Unit tests for the MemoryPolicy class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Remember the collector's thresholds.
+        """
+        self.thresholds = gc.get_threshold()
+
+    def tearDown(self) -> None:
+        """
+        Restore the collector's thresholds and unfreeze the heap.
+        """
+        gc.set_threshold(*self.thresholds)
+        gc.unfreeze()
+
+    def test_apply(self) -> None:
+        """
+        Test that the generation thresholds are set.
+        """
+        MemoryPolicy(thresholds=(1234, 5, 6)).apply()
+        self.assertEqual(gc.get_threshold(), (1234, 5, 6))
+
+    def test_freeze(self) -> None:
+        """
+        Test that the heap is frozen only when enabled.
+        """
+        MemoryPolicy(freeze_after_load=False).freeze()
+        self.assertEqual(gc.get_freeze_count(), 0)
+
+        policy = MemoryPolicy()
+        with self.assertLogs('src.memory_policy', level='INFO'):
+            policy.freeze()
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertEqual(
+            policy.get_metrics()['frozen'], gc.get_freeze_count(),
+        )
+
+    @patch('src.memory_policy.gc.freeze')
+    def test_freeze_once(self, mock_freeze) -> None:
+        """
+        Test that repeated calls freeze the heap only once.
+        """
+        policy = MemoryPolicy()
+        with self.assertLogs('src.memory_policy', level='INFO'):
+            policy.freeze()
+        policy.freeze()
+        mock_freeze.assert_called_once()
+        self.assertTrue(policy.frozen)
+
+    @patch('src.memory_policy.time.monotonic')
+    @patch('src.memory_policy.gc.collect')
+    def test_maybe_collect(self, mock_collect, mock_monotonic) -> None:
+        """
+        Test that full collections run at most once per interval.
+        """
+        mock_monotonic.return_value = 100.0
+        policy = MemoryPolicy(collect_interval=60)
+
+        mock_monotonic.return_value = 130.0
+        self.assertFalse(policy.maybe_collect())
+        mock_monotonic.return_value = 160.0
+        self.assertTrue(policy.maybe_collect())
+        mock_monotonic.return_value = 200.0
+        self.assertFalse(policy.maybe_collect())
+        mock_monotonic.return_value = 220.0
+        self.assertTrue(policy.maybe_collect())
+
+        self.assertEqual(mock_collect.call_count, 2)
+        self.assertEqual(policy.get_metrics()['collections'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
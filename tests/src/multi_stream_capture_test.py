@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import numpy as np
+
+from src.multi_stream_capture import MultiStreamCapture
+from src.stream_capture import StreamCapture
+
+
+class TestMultiStreamCapture(unittest.TestCase):
+    """
+    Unit tests for the MultiStreamCapture class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a MultiStreamCapture with a small thread pool.
+        """
+        self.multi_capture = MultiStreamCapture(
+            max_workers=2, restart_delay=0,
+        )
+
+    def test_add_stream(self) -> None:
+        """
+        Test that streams share the pool and skip decoding.
+        """
+        async def consumer(capture):
+            return None
+
+        capture = self.multi_capture.add_stream(
+            'cam1', 'rtsp://cam1', consumer, capture_interval=5,
+        )
+        self.assertIsInstance(capture, StreamCapture)
+        self.assertIs(capture.executor, self.multi_capture.executor)
+        self.assertTrue(capture.frame_skipping)
+        self.assertEqual(capture.capture_interval, 5)
+        with self.assertRaises(ValueError):
+            self.multi_capture.add_stream('cam1', 'rtsp://cam1', consumer)
+        asyncio.run(self.multi_capture.run())
+
+    @patch('cv2.VideoCapture')
+    def test_reads_run_in_pool(self, mock_video_capture: MagicMock) -> None:
+        """
+        Test that blocking reads of several streams run in the pool while
+        the event loop keeps going.
+
+        Args:
+            mock_video_capture (MagicMock): Mock for cv2.VideoCapture.
+        """
+        read_threads = set()
+
+        def slow_read():
+            read_threads.add(threading.current_thread().name)
+            time.sleep(0.05)
+            return True, np.zeros((4, 4, 3), np.uint8)
+
+        instance: MagicMock = mock_video_capture.return_value
+        instance.isOpened.return_value = True
+        instance.read.side_effect = slow_read
+        frames: dict[str, int] = {}
+
+        async def consumer(capture):
+            key = capture.stream_url
+            async for _ in capture.execute_capture():
+                frames[key] = frames.get(key, 0) + 1
+                if frames[key] == 2:
+                    return
+
+        async def run_and_tick():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            await self.multi_capture.run()
+            ticker.cancel()
+            return ticks
+
+        for i in range(3):
+            self.multi_capture.add_stream(
+                f"cam{i}", f"cam{i}", consumer, capture_interval=0,
+            )
+        ticks = asyncio.run(run_and_tick())
+
+        self.assertEqual(frames, {'cam0': 2, 'cam1': 2, 'cam2': 2})
+        self.assertTrue(
+            all(name.startswith('stream_capture') for name in read_threads),
+        )
+        self.assertLessEqual(len(read_threads), 2)
+        # The loop kept running while reads blocked
+        self.assertGreater(ticks, 5)
+
+    def test_failures_are_isolated(self) -> None:
+        """
+        Test that a failing stream is restarted without affecting others.
+        """
+        calls = {'good': 0, 'flaky': 0}
+
+        async def good(capture):
+            calls['good'] += 1
+
+        async def flaky(capture):
+            calls['flaky'] += 1
+            if calls['flaky'] < 3:
+                raise RuntimeError('stream lost')
+
+        self.multi_capture.add_stream('good', 'rtsp://good', good)
+        self.multi_capture.add_stream('flaky', 'rtsp://flaky', flaky)
+        with self.assertLogs('src.multi_stream_capture', level='ERROR'):
+            asyncio.run(self.multi_capture.run())
+
+        self.assertEqual(calls, {'good': 1, 'flaky': 3})
+        metrics = self.multi_capture.get_metrics()
+        self.assertEqual(metrics['flaky']['failures'], 2)
+        self.assertEqual(metrics['good']['failures'], 0)
+        self.assertEqual(metrics['good']['grabbed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import unittest
+
+import numpy as np
+
+from src.frame_codec import decode_frame
+from src.notification_aggregator import NotificationAggregator
+from src.notification_aggregator import WarningEvent
+
+
+class RecordingNotifier:
+    """
+    Notifier that records what it is asked to deliver.
+    """
+
+    def __init__(self):
+        """
+        Initialises the record.
+        """
+        self.notifications: list[dict] = []
+
+    async def deliver(self, session, notification) -> int:
+        """
+        Records a notification.
+        """
+        self.notifications.append(notification)
+        return 200
+
+
+def make_event(
+    stream: int,
+    tokens: list[str] | None = None,
+    site: str = 'Site',
+    thumbnail: np.ndarray | None = None,
+) -> WarningEvent:
+    """
+    Builds the warning of a stream.
+
+    Args:
+        stream (int): Number of the stream.
+        tokens (list[str] | None): Tokens to notify. Defaults to one.
+        site (str): The site.
+        thumbnail (np.ndarray | None): The thumbnail.
+
+    Returns:
+        WarningEvent: The warning.
+    """
+    return {
+        'site': site,
+        'stream_name': f"camera{stream}",
+        'tokens': tokens or ['token'],
+        'message': f"camera{stream}\nWarning: No hardhat",
+        'thumbnail': thumbnail,
+        'timestamp': 0.0,
+    }
+
+
+class TestNotificationAggregator(unittest.TestCase):
+    """
+    Unit tests for coalescing warnings into digests.
+    """
+
+    def test_first_warning_then_digest(self) -> None:
+        """
+        Test that the first warning is sent at once, and the warnings of
+        its window together when it ends.
+        """
+        aggregator = NotificationAggregator(window=300)
+        first = aggregator.add(make_event(0), now=0)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first[0]['events'], 1)
+        self.assertEqual(first[0]['message'], make_event(0)['message'])
+
+        for i in range(1, 20):
+            self.assertEqual(aggregator.add(make_event(i), now=i), [])
+        # A stream's later warning replaces its earlier one
+        self.assertEqual(aggregator.add(make_event(5), now=50), [])
+        self.assertEqual(aggregator.flush(299), [])
+
+        digests = aggregator.flush(300)
+        self.assertEqual(len(digests), 1)
+        self.assertEqual(digests[0]['token'], 'token')
+        self.assertEqual(digests[0]['site'], 'Site')
+        self.assertEqual(digests[0]['events'], 20)
+        self.assertEqual(digests[0]['message'].count('Warning'), 19)
+
+        # A window without warnings closes, and the next warning is sent
+        # at once again
+        self.assertEqual(aggregator.flush(600), [])
+        self.assertEqual(aggregator.buckets, {})
+        self.assertEqual(len(aggregator.add(make_event(0), now=601)), 1)
+
+    def test_outbound_calls_cut(self) -> None:
+        """
+        Test that twenty cameras warning on every frame for an hour send a
+        token a digest per window rather than a message per camera.
+        """
+        aggregator = NotificationAggregator(window=300)
+        digests = []
+        for now in range(0, 3600, 5):
+            for camera in range(20):
+                digests += aggregator.add(make_event(camera), now)
+            digests += aggregator.flush(now)
+        digests += aggregator.flush(math.inf)
+
+        # Each camera used to notify once per 300 seconds
+        self.assertLessEqual(len(digests) * 10, 20 * 3600 / 300)
+        self.assertEqual(len(digests), 13)
+        self.assertEqual(
+            sum(digest['events'] for digest in digests), 20 * 720,
+        )
+        metrics = aggregator.get_metrics()
+        self.assertEqual(metrics['events'], 20 * 720)
+        self.assertEqual(metrics['digests'], 13)
+
+    def test_windows_per_token_and_site(self) -> None:
+        """
+        Test that tokens and sites have windows of their own, and that
+        tokens holding the same warnings share one image.
+        """
+        thumbnail = np.zeros((36, 64, 3), dtype=np.uint8)
+        aggregator = NotificationAggregator(window=60)
+        first = aggregator.add(
+            make_event(0, ['a', 'b'], thumbnail=thumbnail), now=0,
+        )
+        self.assertEqual([digest['token'] for digest in first], ['a', 'b'])
+        self.assertIs(first[0]['image'], first[1]['image'])
+        self.assertEqual(
+            len(aggregator.add(make_event(0, ['a'], site='Other'), now=1)),
+            1,
+        )
+
+        aggregator.add(make_event(1, ['a', 'b'], thumbnail=thumbnail), 2)
+        digests = aggregator.flush(60)
+        self.assertEqual([digest['token'] for digest in digests], ['a', 'b'])
+        self.assertIs(digests[0]['image'], digests[1]['image'])
+
+    def test_compose_grid(self) -> None:
+        """
+        Test that thumbnails are tiled in the size of the first.
+        """
+        thumbnails = [
+            np.full((36, 64, 3), i * 40, dtype=np.uint8) for i in range(5)
+        ]
+        thumbnails[3] = np.full((72, 128, 3), 120, dtype=np.uint8)
+        grid = NotificationAggregator.compose_grid(thumbnails)
+        self.assertEqual(grid.shape, (72, 192, 3))
+        for i in range(5):
+            row, column = divmod(i, 3)
+            tile = grid[row * 36:(row + 1) * 36, column * 64:(column + 1) * 64]
+            self.assertTrue((tile == i * 40).all())
+        self.assertTrue((grid[36:, 128:] == 0).all())
+
+    def test_compose_image(self) -> None:
+        """
+        Test that digests carry at most `max_thumbnails` thumbnails as a
+        PNG, and no image without thumbnails.
+        """
+        aggregator = NotificationAggregator(max_thumbnails=4)
+        events = [
+            make_event(i, thumbnail=np.zeros((36, 64, 3), dtype=np.uint8))
+            for i in range(6)
+        ]
+        message, image = aggregator.compose(events)
+        self.assertEqual(message.count('Warning'), 6)
+        self.assertEqual(decode_frame(image).shape, (72, 128, 3))
+        self.assertEqual(aggregator.compose([make_event(0)])[1], None)
+
+    def test_make_thumbnail(self) -> None:
+        """
+        Test that frames are shrunk to the thumbnail size.
+        """
+        aggregator = NotificationAggregator(thumbnail_size=320)
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        self.assertEqual(aggregator.make_thumbnail(frame).shape, (180, 320, 3))
+
+    def test_digest_shows_latest_thumbnail(self) -> None:
+        """
+        Test that a digest shows the frame of the latest warning it holds,
+        not the one that opened the window.
+        """
+        aggregator = NotificationAggregator(window=60)
+        first = np.zeros((36, 64, 3), dtype=np.uint8)
+        latest = np.full((36, 64, 3), 255, dtype=np.uint8)
+        aggregator.add(make_event(0, thumbnail=first), now=0)
+        aggregator.add(make_event(0, thumbnail=first), now=1)
+        aggregator.add(make_event(0, thumbnail=latest), now=59)
+        digests = aggregator.flush(60)
+        self.assertEqual(len(digests), 1)
+        np.testing.assert_array_equal(
+            decode_frame(digests[0]['image']), latest,
+        )
+
+    def test_submit_full_queue(self) -> None:
+        """
+        Test that warnings are dropped rather than waited on when the
+        queue is full.
+        """
+        aggregator = NotificationAggregator(max_events=1)
+        self.assertTrue(aggregator.submit(make_event(0)))
+        self.assertFalse(aggregator.submit(make_event(1)))
+        metrics = aggregator.get_metrics()
+        self.assertEqual(metrics['submitted'], 2)
+        self.assertEqual(metrics['dropped'], 1)
+
+    def test_serve(self) -> None:
+        """
+        Test that the aggregator's loop sends the first warning, then the
+        held warnings when it stops.
+        """
+        notifier = RecordingNotifier()
+        aggregator = NotificationAggregator(
+            tick=0.01, notifiers={'line': notifier},
+        )
+        for i in range(10):
+            aggregator.events.put(make_event(i, ['a', 'b']))
+        aggregator.events.put(None)
+        asyncio.run(aggregator.serve())
+
+        self.assertEqual(len(notifier.notifications), 4)
+        self.assertEqual(
+            sorted(n['recipient'] for n in notifier.notifications),
+            ['a', 'a', 'b', 'b'],
+        )
+        self.assertEqual(
+            sorted(
+                n['message'].count('Warning')
+                for n in notifier.notifications
+            ),
+            [1, 1, 9, 9],
+        )
+
+    def test_start_stop(self) -> None:
+        """
+        Test that the aggregator's process stops when asked.
+        """
+        aggregator = NotificationAggregator(tick=0.01)
+        aggregator.start()
+        process = aggregator.process
+        self.assertTrue(process.is_alive())
+        aggregator.stop()
+        self.assertEqual(process.exitcode, 0)
+        self.assertIsNone(aggregator.process)
+
+
+if __name__ == '__main__':
+    unittest.main()
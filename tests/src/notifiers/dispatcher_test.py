@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from aiohttp import web
+
+from src.notifiers.broadcast_notifier import BroadcastNotifier
+from src.notifiers.dispatcher import NotificationDispatcher
+from src.notifiers.line_notifier import LineNotifier
+from src.notifiers.messenger_notifier import MessengerNotifier
+from src.notifiers.wechat_notifier import WeChatNotifier
+
+
+class StubNotifierServer:
+    """
+    Stub of the notifier APIs, answering with the statuses it is given.
+    """
+
+    def __init__(
+        self,
+        statuses: list[int] | None = None,
+        delay: float = 0,
+        bodies: list[dict] | None = None,
+    ):
+        """
+        Initialises the server.
+
+        Args:
+            statuses (list[int] | None): Statuses of the first responses.
+                Later responses are 200.
+            delay (float): Seconds each response takes.
+            bodies (list[dict] | None): JSON bodies of the first responses
+                to POST requests. Later responses give a media ID, and GET
+                requests an access token.
+        """
+        self.statuses = list(statuses or [])
+        self.bodies = list(bodies or [])
+        self.delay = delay
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.runner: web.AppRunner | None = None
+        self.url = ''
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Records a request and answers it.
+        """
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if request.method == 'GET':
+                body = {}
+            elif request.content_type == 'application/json':
+                body = await request.json()
+            else:
+                body = {
+                    name: field.file.read()
+                    if isinstance(field, web.FileField) else field
+                    for name, field in (await request.post()).items()
+                }
+            self.requests.append({
+                'path': request.path,
+                'query': dict(request.query),
+                'headers': dict(request.headers),
+                'body': body,
+                'peer': request.transport.get_extra_info('peername'),
+            })
+            await asyncio.sleep(self.delay)
+            status = self.statuses.pop(0) if self.statuses else 200
+            if request.method == 'GET':
+                body = {'access_token': 'new_token'}
+            else:
+                body = self.bodies.pop(0) if self.bodies else {
+                    'media_id': 'media',
+                }
+            return web.json_response(body, status=status)
+        finally:
+            self.in_flight -= 1
+
+    async def __aenter__(self) -> StubNotifierServer:
+        """
+        Starts the server on a free local port.
+        """
+        app = web.Application()
+        app.router.add_post('/{path:.*}', self.handle)
+        app.router.add_get('/{path:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', 0).start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Stops the server.
+        """
+        await self.runner.cleanup()
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """
+    Unit tests for sending notifications from the outbox.
+    """
+
+    async def dispatch(
+        self,
+        server: StubNotifierServer,
+        count: int,
+        **options,
+    ) -> tuple[NotificationDispatcher, float]:
+        """
+        Submits broadcast notifications and waits until they are handled.
+
+        Args:
+            server (StubNotifierServer): The running stub server.
+            count (int): Number of notifications.
+            **options: Options of the dispatcher.
+
+        Returns:
+            tuple[NotificationDispatcher, float]: The closed dispatcher,
+                and the longest time a submit took in seconds.
+        """
+        notifier = BroadcastNotifier(f"{server.url}/broadcast")
+        options.setdefault('backoff', 0.01)
+        longest = 0.0
+        async with NotificationDispatcher(
+            {'broadcast': notifier}, **options,
+        ) as dispatcher:
+            for i in range(count):
+                start = time.perf_counter()
+                dispatcher.submit('broadcast', f"message {i}")
+                longest = max(longest, time.perf_counter() - start)
+        return dispatcher, longest
+
+    def test_submit_does_not_wait(self) -> None:
+        """
+        Test that submitting returns at once while deliveries are slow,
+        and that closing sends every queued notification.
+        """
+        async def run() -> tuple[NotificationDispatcher, float, int]:
+            async with StubNotifierServer(delay=0.2) as server:
+                dispatcher, longest = await self.dispatch(server, 5)
+            return dispatcher, longest, len(server.requests)
+
+        dispatcher, longest, requests = asyncio.run(run())
+        self.assertLess(longest, 0.01)
+        self.assertEqual(requests, 5)
+        metrics = dispatcher.get_metrics()
+        self.assertEqual(metrics['sent'], 5)
+        self.assertEqual(metrics['queued'], 0)
+        self.assertEqual(dispatcher.tasks, [])
+        self.assertIsNone(dispatcher.session)
+
+    def test_connection_reused(self) -> None:
+        """
+        Test that notifications sent one after another share a connection.
+        """
+        async def run() -> list:
+            async with StubNotifierServer() as server:
+                await self.dispatch(server, 4, workers=1)
+            return [request['peer'] for request in server.requests]
+
+        peers = asyncio.run(run())
+        self.assertEqual(len(peers), 4)
+        self.assertEqual(len(set(peers)), 1)
+
+    def test_retries(self) -> None:
+        """
+        Test that server errors are retried and client errors are not.
+        """
+        for statuses, attempts, sent in (
+            ([503, 429], 3, 1),
+            ([503, 503, 503], 3, 0),
+            ([400], 1, 0),
+        ):
+            with self.subTest(statuses=statuses):
+                async def run() -> tuple[NotificationDispatcher, int]:
+                    async with StubNotifierServer(statuses) as server:
+                        dispatcher, _ = await self.dispatch(server, 1)
+                    return dispatcher, len(server.requests)
+
+                dispatcher, requests = asyncio.run(run())
+                metrics = dispatcher.get_metrics()
+                self.assertEqual(requests, attempts)
+                self.assertEqual(metrics['retries'], attempts - 1)
+                self.assertEqual(metrics['sent'], sent)
+                self.assertEqual(metrics['failed'], 1 - sent)
+
+    def test_connection_errors_retried(self) -> None:
+        """
+        Test that a notifier that cannot be reached fails after its
+        attempts without stopping the workers.
+        """
+        async def run() -> NotificationDispatcher:
+            notifier = BroadcastNotifier('http://127.0.0.1:1/broadcast')
+            async with NotificationDispatcher(
+                {'broadcast': notifier}, workers=1, backoff=0.01,
+            ) as dispatcher:
+                dispatcher.submit('broadcast', 'first')
+                dispatcher.submit('broadcast', 'second')
+            return dispatcher
+
+        metrics = asyncio.run(run()).get_metrics()
+        self.assertEqual(metrics['failed'], 2)
+        self.assertEqual(metrics['retries'], 4)
+
+    def test_backoff_jitter(self) -> None:
+        """
+        Test that retry delays are random up to a doubling bound.
+        """
+        dispatcher = NotificationDispatcher(
+            {}, backoff=1.0, max_backoff=3.0,
+        )
+        with patch('src.notifiers.dispatcher.random.uniform') as uniform:
+            for attempt in (1, 2, 3):
+                dispatcher.get_backoff(attempt)
+        self.assertEqual(
+            [call.args for call in uniform.call_args_list],
+            [(0, 1.0), (0, 2.0), (0, 3.0)],
+        )
+
+    def test_channel_limit(self) -> None:
+        """
+        Test that a channel never has more deliveries in flight than its
+        limit, whatever the number of workers.
+        """
+        for options, limit in (
+            ({'channel_limit': 2}, 2),
+            ({'channel_limits': {'broadcast': 3}}, 3),
+        ):
+            with self.subTest(options=options):
+                async def run() -> int:
+                    async with StubNotifierServer(delay=0.05) as server:
+                        await self.dispatch(server, 8, workers=8, **options)
+                    return server.max_in_flight
+
+                self.assertEqual(asyncio.run(run()), limit)
+
+    def test_drop_policy(self) -> None:
+        """
+        Test that a full outbox drops the oldest or the new notification.
+        """
+        for drop_policy, queued, kept in (
+            ('drop_oldest', [True, True, True], ['b', 'c']),
+            ('drop_newest', [True, True, False], ['a', 'b']),
+        ):
+            with self.subTest(drop_policy=drop_policy):
+                dispatcher = NotificationDispatcher(
+                    {'line': LineNotifier()},
+                    max_queue=2,
+                    drop_policy=drop_policy,
+                )
+                self.assertEqual(
+                    [dispatcher.submit('line', m) for m in 'abc'], queued,
+                )
+                self.assertEqual(
+                    [n['message'] for n in dispatcher.outbox._queue], kept,
+                )
+                metrics = dispatcher.get_metrics()
+                self.assertEqual(metrics['submitted'], 3)
+                self.assertEqual(metrics['dropped'], 1)
+                self.assertEqual(metrics['queued'], 2)
+
+    def test_invalid_options(self) -> None:
+        """
+        Test that unknown drop policies and channels are rejected.
+        """
+        with self.assertRaises(ValueError):
+            NotificationDispatcher({}, drop_policy='block')
+        with self.assertRaises(ValueError):
+            NotificationDispatcher({}).submit('line', 'message')
+
+
+class TestNotifierDelivery(unittest.TestCase):
+    """
+    Unit tests for the requests each notifier delivers.
+    """
+
+    def deliver(self, notifiers: dict, notifications: list[dict]) -> list:
+        """
+        Sends notifications through a dispatcher to a stub server.
+
+        Args:
+            notifiers (dict): Functions making each channel's notifier from
+                the stub server's URL.
+            notifications (list[dict]): Arguments of each submit.
+
+        Returns:
+            list: The requests the server received.
+        """
+        async def run() -> list:
+            async with StubNotifierServer() as server:
+                async with NotificationDispatcher({
+                    channel: make(server.url)
+                    for channel, make in notifiers.items()
+                }) as dispatcher:
+                    for notification in notifications:
+                        dispatcher.submit(**notification)
+            self.assertEqual(dispatcher.get_metrics()['sent'], 1)
+            return server.requests
+
+        return asyncio.run(run())
+
+    def test_line(self) -> None:
+        """
+        Test that LINE notifications send the encoded image unchanged.
+        """
+        requests = self.deliver(
+            {'line': lambda url: LineNotifier(f"{url}/notify")},
+            [{
+                'channel': 'line', 'message': 'Warning',
+                'image': b'png', 'recipient': 'token',
+            }],
+        )
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]['path'], '/notify')
+        self.assertEqual(requests[0]['query'], {'message': 'Warning'})
+        self.assertEqual(
+            requests[0]['headers']['Authorization'], 'Bearer token',
+        )
+        self.assertEqual(requests[0]['body'], {'imageFile': b'png'})
+
+    def test_messenger(self) -> None:
+        """
+        Test that Messenger notifications post to the Send API.
+        """
+        requests = self.deliver(
+            {
+                'messenger': lambda url: MessengerNotifier(
+                    'page_token', f"{url}/messages",
+                ),
+            },
+            [{
+                'channel': 'messenger', 'message': 'Warning',
+                'recipient': 'user',
+            }],
+        )
+        self.assertEqual(requests[0]['query'], {'access_token': 'page_token'})
+        self.assertEqual(
+            requests[0]['body'],
+            {'message': {'text': 'Warning'}, 'recipient': {'id': 'user'}},
+        )
+
+    @patch('src.notifiers.wechat_notifier.requests.get')
+    def test_wechat_image(self, mock_get) -> None:
+        """
+        Test that WeChat images are uploaded before the message is sent.
+        """
+        mock_get.return_value.json.return_value = {'access_token': 'token'}
+        requests = self.deliver(
+            {
+                'wechat': lambda url: WeChatNotifier(
+                    'corp', 'secret', 1, api_url=url,
+                ),
+            },
+            [{
+                'channel': 'wechat', 'message': 'Warning',
+                'image': b'png', 'recipient': 'user',
+            }],
+        )
+        self.assertEqual(
+            [request['path'] for request in requests],
+            ['/media/upload', '/message/send'],
+        )
+        self.assertEqual(requests[0]['body'], {'media': b'png'})
+        self.assertEqual(
+            requests[1]['body']['image'], {'media_id': 'media'},
+        )
+        self.assertEqual(requests[1]['query'], {'access_token': 'token'})
+
+    def deliver_wechat(self, bodies: list[dict]) -> tuple[list, dict]:
+        """
+        Sends a WeChat text through a dispatcher to a stub server
+        answering with the given bodies.
+
+        Args:
+            bodies (list[dict]): JSON bodies of the first responses.
+
+        Returns:
+            tuple[list, dict]: The requests the server received, and the
+                dispatcher's metrics.
+        """
+        async def run() -> tuple[list, dict]:
+            async with StubNotifierServer(bodies=bodies) as server:
+                async with NotificationDispatcher(
+                    {
+                        'wechat': WeChatNotifier(
+                            'corp', 'secret', 1, api_url=server.url,
+                        ),
+                    },
+                    backoff=0.01,
+                ) as dispatcher:
+                    dispatcher.submit(
+                        'wechat', 'Warning', recipient='user',
+                    )
+            return server.requests, dispatcher.get_metrics()
+
+        return asyncio.run(run())
+
+    @patch('src.notifiers.wechat_notifier.requests.get')
+    def test_wechat_expired_token(self, mock_get) -> None:
+        """
+        Test that a WeChat error for an expired token refreshes the token
+        and retries with it.
+        """
+        mock_get.return_value.json.return_value = {'access_token': 'token'}
+        requests, metrics = self.deliver_wechat(
+            [{'errcode': 42001, 'errmsg': 'access_token expired'}],
+        )
+        self.assertEqual(
+            [request['path'] for request in requests],
+            ['/message/send', '/gettoken', '/message/send'],
+        )
+        self.assertEqual(requests[1]['query']['corpsecret'], 'secret')
+        self.assertEqual(
+            requests[2]['query'], {'access_token': 'new_token'},
+        )
+        self.assertEqual(metrics['sent'], 1)
+        self.assertEqual(metrics['retries'], 1)
+
+    @patch('src.notifiers.wechat_notifier.requests.get')
+    def test_wechat_error(self, mock_get) -> None:
+        """
+        Test that a WeChat error reported with HTTP 200 fails the
+        notification, and is only retried if it may pass later.
+        """
+        mock_get.return_value.json.return_value = {'access_token': 'token'}
+        requests, metrics = self.deliver_wechat(
+            [{'errcode': 60020, 'errmsg': 'not allow to access from your ip'}],
+        )
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(metrics['sent'], 0)
+        self.assertEqual(metrics['failed'], 1)
+
+        requests, metrics = self.deliver_wechat(
+            [{'errcode': -1, 'errmsg': 'system busy'}],
+        )
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(metrics['sent'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
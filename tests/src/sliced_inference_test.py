@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import torch
+from sahi.models.yolov8 import Yolov8DetectionModel
+from sahi.predict import get_sliced_prediction
+from sahi.slicing import get_slice_bboxes as sahi_get_slice_bboxes
+
+from src.detections import Detections
+from src.sliced_inference import get_slice_bboxes
+from src.sliced_inference import greedy_nmm
+from src.sliced_inference import match_matrix
+from src.sliced_inference import nms
+from src.sliced_inference import SlicedInference
+from src.sliced_inference import SlicePlanCache
+
+
+def detect_blobs(image: np.ndarray) -> np.ndarray:
+    """
+    A deterministic stand-in for a detector: every bright blob in a colour
+    channel is an object of that channel's class.
+
+    Args:
+        image (np.ndarray): A BGR image.
+
+    Returns:
+        np.ndarray: An (N, 6) array of detection rows.
+    """
+    rows = []
+    for label in range(3):
+        mask = (image[:, :, label] > 128).astype(np.uint8)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        for x, y, w, h, _ in stats[1:]:
+            # A confidence that is a fixed function of the box
+            key = (x * 73856093) ^ (y * 19349663) ^ (w * 83492791) ^ h
+            confidence = 0.3 + (key % 999983) / 1500000
+            rows.append([x, y, x + w, y + h, confidence, label])
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+
+class StubYOLO:
+    """
+    A stub Ultralytics model built on `detect_blobs`.
+    """
+
+    overrides = {'task': 'detect'}
+    names = {0: 'blue', 1: 'green', 2: 'red'}
+
+    def __init__(self):
+        """
+        Initialises the stub.
+        """
+        self.batch_sizes: list[int] = []
+
+    def __call__(self, images, **kwargs):
+        """
+        Runs the stub on one image or a list of BGR images.
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+        self.batch_sizes.append(len(images))
+        return [
+            SimpleNamespace(
+                boxes=SimpleNamespace(
+                    data=torch.from_numpy(detect_blobs(image)),
+                ),
+            )
+            for image in images
+        ]
+
+
+def generate_frame(
+    rng: np.random.Generator,
+    height: int = 720,
+    width: int = 1280,
+) -> np.ndarray:
+    """
+    Generates a frame of random coloured rectangles.
+    """
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(40):
+        x, y = rng.integers(0, width - 80), rng.integers(0, height - 70)
+        w, h = rng.integers(5, 150, 2)
+        frame[y:y + h, x:x + w, rng.integers(0, 3)] = 255
+    return frame
+
+
+class TestSliceGrid(unittest.TestCase):
+    """
+    Unit tests for the slice grid.
+    """
+
+    def test_matches_sahi(self) -> None:
+        """
+        Test that the grid is the one SAHI slices with.
+        """
+        for height, width, size, overlap in (
+            (1080, 1920, 376, 0.3),
+            (720, 1280, 370, 0.3),
+            (480, 640, 256, 0.2),
+            (200, 300, 376, 0.3),
+        ):
+            np.testing.assert_array_equal(
+                get_slice_bboxes(height, width, size, size, overlap, overlap),
+                sahi_get_slice_bboxes(
+                    height,
+                    width,
+                    slice_height=size,
+                    slice_width=size,
+                    overlap_height_ratio=overlap,
+                    overlap_width_ratio=overlap,
+                ),
+            )
+
+
+class TestSlicePlanCache(unittest.TestCase):
+    """
+    Unit tests for the slice plan cache.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a small cache.
+        """
+        self.cache = SlicePlanCache(maxsize=2, log_interval=4)
+
+    def test_plan(self) -> None:
+        """
+        Test the slices and shifts of a plan.
+        """
+        plan = self.cache.get(720, 1280, 376, 376, 0.3, 0.3)
+        self.assertEqual(len(plan), 15)
+        np.testing.assert_array_equal(
+            plan.shifts[:, :2], plan.bboxes[:, :2],
+        )
+        np.testing.assert_array_equal(plan.shifts[:, 2:], plan.shifts[:, :2])
+        self.assertFalse(plan.shifts.flags.writeable)
+
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        slices = plan.crop(frame)
+        self.assertEqual({image.shape for image in slices}, {(376, 376, 3)})
+        self.assertTrue(np.shares_memory(slices[0], frame))
+
+    def test_hits_and_misses(self) -> None:
+        """
+        Test that repeated lookups are served from the cache and logged.
+        """
+        with self.assertLogs('src.sliced_inference', level='INFO') as logs:
+            plan = self.cache.get(1080, 1920, 376, 376, 0.3, 0.3)
+            for _ in range(3):
+                self.assertIs(
+                    self.cache.get(1080, 1920, 376, 376, 0.3, 0.3), plan,
+                )
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('hit rate 75.0%', logs.output[-1])
+        self.assertEqual(
+            self.cache.get_metrics(),
+            {'hits': 3, 'misses': 1, 'hit_rate': 0.75, 'size': 1},
+        )
+
+    def test_keyed_by_configuration(self) -> None:
+        """
+        Test that each slice configuration has its own plan.
+        """
+        plan = self.cache.get(1080, 1920, 376, 376, 0.3, 0.3)
+        self.assertIsNot(self.cache.get(1080, 1920, 370, 370, 0.3, 0.3), plan)
+        self.assertIsNot(self.cache.get(1080, 1920, 376, 376, 0.2, 0.3), plan)
+
+    def test_lru_eviction(self) -> None:
+        """
+        Test that the least recently used plan is evicted.
+        """
+        first = self.cache.get(480, 640, 376, 376, 0.3, 0.3)
+        self.cache.get(720, 1280, 376, 376, 0.3, 0.3)
+        # Touch the first plan so the second is the oldest
+        self.cache.get(480, 640, 376, 376, 0.3, 0.3)
+        self.cache.get(1080, 1920, 376, 376, 0.3, 0.3)
+        self.assertEqual(self.cache.get_metrics()['size'], 2)
+        self.assertIs(self.cache.get(480, 640, 376, 376, 0.3, 0.3), first)
+        self.cache.get(720, 1280, 376, 376, 0.3, 0.3)
+        self.assertEqual(self.cache.get_metrics()['misses'], 4)
+
+    def test_engine_uses_cache(self) -> None:
+        """
+        Test that an engine looks plans up in its cache.
+        """
+        engine = SlicedInference(lambda images: [], plan_cache=self.cache)
+        plan = engine.get_slice_plan(1080, 1920)
+        self.assertEqual(len(plan), 28)
+        self.assertIs(engine.get_slice_plan(1080, 1920), plan)
+        self.assertEqual(self.cache.get_metrics()['hits'], 1)
+
+
+class TestPostprocess(unittest.TestCase):
+    """
+    Unit tests for the vectorised NMS/NMM.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up two overlapping boxes of one class and a box of another.
+        """
+        self.data = np.array([
+            [0, 0, 100, 100, 0.9, 5],
+            [50, 0, 150, 100, 0.8, 5],
+            [50, 0, 150, 100, 0.7, 2],
+        ], dtype=np.float32)
+
+    def test_match_matrix(self) -> None:
+        """
+        Test IOU and IOS values.
+        """
+        boxes = [[0, 0, 100, 100], [50, 0, 150, 100], [0, 0, 10, 10]]
+        np.testing.assert_allclose(
+            match_matrix(boxes, 'IOU')[0], [1, 1 / 3, 0.01],
+        )
+        np.testing.assert_allclose(
+            match_matrix(boxes, 'IOS')[0], [1, 0.5, 1],
+        )
+        with self.assertRaises(ValueError):
+            match_matrix(boxes, 'DICE')
+
+    def test_greedy_nmm(self) -> None:
+        """
+        Test that matching boxes of a class merge into their union.
+        """
+        merged = greedy_nmm(self.data, 'IOS', 0.4)
+        np.testing.assert_allclose(
+            merged,
+            [[0, 0, 150, 100, 0.9, 5], [50, 0, 150, 100, 0.7, 2]],
+        )
+        self.assertEqual(
+            len(greedy_nmm(self.data, 'IOS', 0.4, class_agnostic=True)), 1,
+        )
+
+    def test_nms(self) -> None:
+        """
+        Test that the most confident box of a match is kept.
+        """
+        np.testing.assert_allclose(
+            nms(self.data, 'IOS', 0.4), self.data[[0, 2]],
+        )
+
+
+class TestSlicedInference(unittest.TestCase):
+    """
+    Unit tests for the SlicedInference engine.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a SAHI model around the stub detector.
+        """
+        self.stub = StubYOLO()
+        self.model = Yolov8DetectionModel(
+            model=self.stub,
+            device='cpu',
+            confidence_threshold=0.3,
+        )
+        self.rng = np.random.default_rng(0)
+
+    def test_matches_sahi(self) -> None:
+        """
+        Test that the engine finds the same detections as SAHI.
+        """
+        engine = SlicedInference.from_sahi_model(self.model)
+        for _ in range(5):
+            frame = generate_frame(self.rng)
+            # SAHI expects RGB and flips it back to BGR for the model
+            result = get_sliced_prediction(
+                np.ascontiguousarray(frame[:, :, ::-1]),
+                self.model,
+                slice_height=376,
+                slice_width=376,
+                overlap_height_ratio=0.3,
+                overlap_width_ratio=0.3,
+                verbose=0,
+            )
+            expected = Detections.from_object_predictions(
+                result.object_prediction_list,
+            )
+            detections = engine.predict(frame)
+            self.assertEqual(
+                sorted(map(tuple, detections.tolist())),
+                sorted(map(tuple, expected.tolist())),
+            )
+
+    def test_slices_are_batched(self) -> None:
+        """
+        Test that slices run in forward passes of at most `batch_size`.
+        """
+        engine = SlicedInference.from_sahi_model(self.model, batch_size=12)
+        engine.predict(generate_frame(self.rng, 1080, 1920))
+        # 28 slices in batches of 12, then the whole frame
+        self.assertEqual(self.stub.batch_sizes, [12, 12, 4, 1])
+
+        self.stub.batch_sizes.clear()
+        engine.perform_standard_pred = False
+        engine.predict(generate_frame(self.rng, 1080, 1920))
+        self.assertEqual(self.stub.batch_sizes, [12, 12, 4])
+
+    def test_predict_many(self) -> None:
+        """
+        Test that several frames share forward passes and keep their own
+        detections.
+        """
+        engine = SlicedInference.from_sahi_model(self.model, batch_size=64)
+        frames = [generate_frame(self.rng) for _ in range(3)]
+        results = engine.predict_many(frames)
+        self.assertEqual(self.stub.batch_sizes, [45, 3])
+        for frame, detections in zip(frames, results):
+            self.assertEqual(
+                detections.tolist(), engine.predict(frame).tolist(),
+            )
+
+    def test_empty_frame(self) -> None:
+        """
+        Test a frame without detections.
+        """
+        engine = SlicedInference.from_sahi_model(self.model)
+        detections = engine.predict(np.zeros((480, 640, 3), dtype=np.uint8))
+        self.assertIsInstance(detections, Detections)
+        self.assertEqual(len(detections), 0)
+
+    def test_truncate(self) -> None:
+        """
+        Test that boxes are truncated to whole pixels unless disabled.
+        """
+        def predict_batch(images):
+            return [
+                np.array([[10.5, 20.25, 60.75, 70.5, 0.9, 0]], np.float32)
+                for _ in images
+            ]
+
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        self.assertEqual(
+            SlicedInference(predict_batch).predict(frame).xyxy.tolist(),
+            [[10, 20, 60, 70]],
+        )
+        self.assertEqual(
+            SlicedInference(predict_batch, truncate=False)
+            .predict(frame).xyxy.tolist(),
+            [[10.5, 20.25, 60.75, 70.5]],
+        )
+
+    def test_invalid_parameters(self) -> None:
+        """
+        Test that invalid parameters are rejected.
+        """
+        with self.assertRaises(ValueError):
+            SlicedInference(lambda images: [], postprocess_type='LSNMS')
+        with self.assertRaises(ValueError):
+            SlicedInference(lambda images: [], batch_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import sys
+import time
 import unittest
 from unittest import TestCase
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from src.stream_capture import main as stream_capture_main
@@ -133,6 +136,143 @@ class TestStreamCapture(TestCase):
         # Release resources
         await self.stream_capture.release_resources()
 
+    @patch('cv2.VideoCapture')
+    def test_read_latest_frame(self, mock_video_capture: MagicMock) -> None:
+        """
+        Test that the decoder thread grabs frames and only the frame that
+        is read gets decoded.
+
+        Args:
+            mock_video_capture (MagicMock): Mock for cv2.VideoCapture.
+        """
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        instance: MagicMock = mock_video_capture.return_value
+        instance.grab.side_effect = lambda: time.sleep(0.001) or True
+        instance.retrieve.return_value = (True, frame)
+
+        async def read_twice():
+            first = await self.stream_capture.read_latest_frame()
+            await asyncio.sleep(0.05)
+            second = await self.stream_capture.read_latest_frame()
+            await self.stream_capture.release_resources()
+            return first, second
+
+        first, second = asyncio.run(read_twice())
+
+        self.assertIs(first[0], frame)
+        self.assertGreater(second[1], first[1])
+        self.assertEqual(instance.retrieve.call_count, 2)
+        self.assertGreater(instance.grab.call_count, 2)
+        self.assertIsNone(self.stream_capture.decoder_thread)
+        self.assertIsNone(self.stream_capture.cap)
+
+    @patch('src.stream_capture.StreamCapture.select_quality_based_on_speed')
+    @patch('cv2.VideoCapture')
+    def test_decoder_reopens_stream(
+        self,
+        mock_video_capture: MagicMock,
+        mock_select_quality: MagicMock,
+    ) -> None:
+        """
+        Test that the decoder thread reopens the stream after a failed
+        grab.
+
+        Args:
+            mock_video_capture (MagicMock): Mock for cv2.VideoCapture.
+            mock_select_quality (MagicMock): Mock for
+                select_quality_based_on_speed.
+        """
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        instance: MagicMock = mock_video_capture.return_value
+        grabs = iter([False])
+        instance.grab.side_effect = lambda: next(grabs, True)
+        instance.retrieve.return_value = (True, frame)
+
+        async def read():
+            result = await self.stream_capture.read_latest_frame(timeout=5)
+            await self.stream_capture.release_resources()
+            return result
+
+        result = asyncio.run(read())
+
+        self.assertIs(result[0], frame)
+        self.assertEqual(mock_video_capture.call_count, 2)
+        mock_select_quality.assert_not_called()
+
+    @patch('cv2.VideoCapture')
+    def test_frame_skipping(self, mock_video_capture: MagicMock) -> None:
+        """
+        Test that frames between captures are grabbed but not decoded.
+
+        Args:
+            mock_video_capture (MagicMock): Mock for cv2.VideoCapture.
+        """
+        instance: MagicMock = mock_video_capture.return_value
+        instance.isOpened.return_value = True
+        instance.grab.return_value = True
+        instance.read.return_value = (True, np.zeros((4, 4, 3), np.uint8))
+        stream_capture = StreamCapture(
+            'http://example.com/stream',
+            capture_interval=0.1,
+            frame_skipping=True,
+        )
+
+        async def capture_two_frames():
+            generator = stream_capture.execute_capture()
+            frames = [await generator.__anext__() for _ in range(2)]
+            await generator.aclose()
+            return frames
+
+        frames = asyncio.run(capture_two_frames())
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(instance.read.call_count, 2)
+        self.assertGreater(instance.grab.call_count, 0)
+        metrics = stream_capture.get_capture_metrics()
+        self.assertEqual(metrics['decoded'], 2)
+        self.assertEqual(metrics['grabbed'], instance.grab.call_count + 2)
+        self.assertLess(metrics['decode_ratio'], 1)
+
+    def test_read_frame_without_skipping(self) -> None:
+        """
+        Test that every frame is decoded when skipping is off.
+        """
+        self.stream_capture.cap = MagicMock()
+        self.stream_capture.cap.read.return_value = (True, MagicMock())
+        ret, frame = self.stream_capture.read_frame(decode=False)
+        self.assertTrue(ret)
+        self.assertIsNotNone(frame)
+        self.stream_capture.cap.grab.assert_not_called()
+        self.assertEqual(
+            self.stream_capture.get_capture_metrics(),
+            {'grabbed': 1, 'decoded': 1, 'decode_ratio': 1.0},
+        )
+
+    @patch.object(StreamCapture, 'capture_latest_frames')
+    def test_execute_capture_background_decoding(
+        self,
+        mock_capture_latest_frames: MagicMock,
+    ) -> None:
+        """
+        Test that execute_capture uses the decoder thread when enabled.
+
+        Args:
+            mock_capture_latest_frames (MagicMock): Mock for
+                capture_latest_frames.
+        """
+        async def fake_frames():
+            yield 'frame', 1.0
+
+        mock_capture_latest_frames.return_value = fake_frames()
+        stream_capture = StreamCapture(
+            'http://example.com/stream', background_decoding=True,
+        )
+
+        async def first_frame():
+            return await stream_capture.execute_capture().__anext__()
+
+        self.assertEqual(asyncio.run(first_frame()), ('frame', 1.0))
+
     @patch('speedtest.Speedtest')
     def test_check_internet_speed(self, mock_speedtest: MagicMock) -> None:
         """
@@ -330,6 +470,8 @@ class TestStreamCapture(TestCase):
         # Mock command line argument parsing
         mock_parse_args.return_value = argparse.Namespace(
             url='test_stream_url',
+            background_decoding=False,
+            frame_skipping=False,
         )
 
         # Mock command line argument parsing
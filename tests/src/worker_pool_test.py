@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+import unittest
+from functools import partial
+
+from src.worker_pool import WarmWorkerPool
+
+# Set by the warm-up in worker processes
+warmed_up = False
+
+
+def warm_up() -> None:
+    """
+    Marks the worker as warmed up.
+    """
+    global warmed_up
+    warmed_up = True
+
+
+async def report(events: multiprocessing.Queue, name: str) -> None:
+    """
+    Stub stream: reports its start and its cancellation.
+
+    Args:
+        events (multiprocessing.Queue): Queue to report on.
+        name (str): The stream's name.
+    """
+    events.put(('started', name, os.getpid(), warmed_up))
+    try:
+        await asyncio.sleep(3600)
+    except asyncio.CancelledError:
+        events.put(('cancelled', name, os.getpid(), warmed_up))
+        raise
+
+
+def record_update(events: multiprocessing.Queue, value: str) -> None:
+    """
+    Stub update: reports the value it was sent.
+
+    Args:
+        events (multiprocessing.Queue): Queue to report on.
+        value (str): The update.
+    """
+    events.put(('updated', value, os.getpid(), warmed_up))
+
+
+async def block(events: multiprocessing.Queue, name: str) -> None:
+    """
+    Stub stream that blocks its event loop, so it cannot be cancelled.
+
+    Args:
+        events (multiprocessing.Queue): Queue to report on.
+        name (str): The stream's name.
+    """
+    events.put(('started', name, os.getpid(), warmed_up))
+    time.sleep(3600)
+
+
+class TestWarmWorkerPool(unittest.TestCase):
+    """
+    Unit tests for the WarmWorkerPool class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a queue the stub streams report on.
+        """
+        self.events: multiprocessing.Queue = multiprocessing.Queue()
+        self.pool: WarmWorkerPool | None = None
+
+    def tearDown(self) -> None:
+        """
+        Stop the pool's workers.
+        """
+        if self.pool is not None:
+            self.pool.stop()
+
+    def create_pool(self, target, **kwargs) -> WarmWorkerPool:
+        """
+        Creates and starts a pool running a stub stream.
+
+        Args:
+            target: The stub stream coroutine function.
+            **kwargs: Options of the pool.
+
+        Returns:
+            WarmWorkerPool: The started pool.
+        """
+        self.pool = WarmWorkerPool(
+            partial(target, self.events), warm_up=warm_up, **kwargs,
+        )
+        self.pool.start()
+        self.assertTrue(self.pool.wait_until_ready(timeout=10))
+        return self.pool
+
+    def test_assign_runs_on_warm_worker(self) -> None:
+        """
+        Test that an assignment runs on a worker that has warmed up.
+        """
+        pool = self.create_pool(report)
+        worker = pool.assign('a')
+        self.assertEqual(
+            self.events.get(timeout=10), ('started', 'a', worker.pid, True),
+        )
+        # A spare worker replaces the assigned one
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics['idle'], 1)
+        self.assertEqual(metrics['workers'], 2)
+        self.assertEqual(metrics['assignments'], 1)
+
+    def test_release_keeps_worker(self) -> None:
+        """
+        Test that a released worker is cancelled and takes the next stream.
+        """
+        pool = self.create_pool(report)
+        worker = pool.assign('a')
+        self.events.get(timeout=10)
+
+        pool.release(worker)
+        self.assertEqual(
+            self.events.get(timeout=10),
+            ('cancelled', 'a', worker.pid, True),
+        )
+        self.assertTrue(worker.is_alive())
+        # Releasing twice is harmless
+        pool.release(worker)
+
+        # The restarted stream gets the worker it left
+        self.assertIs(pool.assign('b'), worker)
+        self.assertEqual(
+            self.events.get(timeout=10), ('started', 'b', worker.pid, True),
+        )
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics['idle'], 1)
+        self.assertEqual(metrics['workers'], 2)
+        self.assertEqual(metrics['replaced'], 0)
+
+    def test_send_update(self) -> None:
+        """
+        Test that updates reach the worker of a running assignment only.
+        """
+        pool = self.create_pool(
+            report, update=partial(record_update, self.events),
+        )
+        worker = pool.assign('a')
+        self.events.get(timeout=10)
+
+        self.assertTrue(pool.send(worker, 'b'))
+        self.assertEqual(
+            self.events.get(timeout=10), ('updated', 'b', worker.pid, True),
+        )
+
+        pool.release(worker)
+        self.events.get(timeout=10)
+        self.assertFalse(pool.send(worker, 'c'))
+
+    def test_stuck_worker_replaced(self) -> None:
+        """
+        Test that a worker that does not stop is terminated.
+        """
+        pool = self.create_pool(block, stop_timeout=0.5)
+        worker = pool.assign('a')
+        self.events.get(timeout=10)
+
+        pool.release(worker)
+        self.assertFalse(worker.is_alive())
+        self.assertNotIn(worker, pool.workers.values())
+        self.assertEqual(pool.get_metrics()['replaced'], 1)
+
+    def test_stop(self) -> None:
+        """
+        Test that stopping the pool stops every worker.
+        """
+        pool = self.create_pool(report, size=2)
+        worker = pool.assign('a')
+        self.events.get(timeout=10)
+        workers = list(pool.workers.values())
+        self.assertEqual(len(workers), 3)
+
+        pool.stop()
+        self.assertEqual(
+            self.events.get(timeout=10),
+            ('cancelled', 'a', worker.pid, True),
+        )
+        for process in workers:
+            self.assertFalse(process.is_alive())
+        self.assertEqual(pool.get_metrics()['workers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
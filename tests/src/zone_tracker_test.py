@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.cluster import HDBSCAN
+
+from src.danger_detector import DangerDetector
+from src.zone_tracker import ZoneTracker
+
+
+class TestZoneTracker(unittest.TestCase):
+    """
+    Unit tests for the ZoneTracker class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up two groups of cones and a tracker counting its clusterings.
+        """
+        self.cones = np.array([
+            [100, 100], [150, 100], [150, 150], [100, 150],
+            [500, 500], [560, 500], [530, 560],
+        ], dtype=float)
+        self.clusterer = MagicMock(wraps=HDBSCAN(
+            min_samples=3, min_cluster_size=2,
+        ))
+        self.tracker = ZoneTracker(
+            clusterer=self.clusterer, tolerance=10, move_tolerance=2,
+            refresh_interval=5,
+        )
+
+    def test_matches_clustering(self) -> None:
+        """
+        Test that tracked zones equal the zones of a fresh clustering.
+        """
+        polygons = self.tracker.update(self.cones)
+        expected = DangerDetector().polygons_from_cone_positions(self.cones)
+        self.assertEqual(len(polygons), 2)
+        self.assertEqual(
+            [polygon.wkt for polygon in polygons],
+            [polygon.wkt for polygon in expected],
+        )
+
+    def test_skips_stable_cones(self) -> None:
+        """
+        Test that jittering, reordered cones reuse the clustering and
+        hulls.
+        """
+        first = self.tracker.update(self.cones)
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            jittered = self.cones + rng.uniform(-1, 1, self.cones.shape)
+            polygons = self.tracker.update(jittered[::-1])
+            self.assertEqual(polygons, first)
+
+        self.assertEqual(self.clusterer.fit_predict.call_count, 1)
+        metrics = self.tracker.get_metrics()
+        self.assertEqual(metrics['clusterings'], 1)
+        self.assertEqual(metrics['skipped'], 3)
+        self.assertEqual(metrics['skip_ratio'], 0.75)
+        self.assertEqual(metrics['hulls_reused'], 6)
+
+    def test_rebuilds_moved_hull(self) -> None:
+        """
+        Test that only the hull of the cluster whose cone moved is rebuilt.
+        """
+        first = self.tracker.update(self.cones)
+        moved = self.cones.copy()
+        moved[4] += [5, 0]
+        polygons = self.tracker.update(moved)
+
+        self.assertEqual(self.clusterer.fit_predict.call_count, 1)
+        self.assertIs(polygons[0], first[0])
+        self.assertIsNot(polygons[1], first[1])
+        self.assertTrue(polygons[1].covers(
+            DangerDetector().polygons_from_cone_positions(moved)[1],
+        ))
+
+    def test_reclusters(self) -> None:
+        """
+        Test that changed, unmatched or stale cones are clustered again.
+        """
+        self.tracker.update(self.cones)
+
+        # A cone was added
+        self.tracker.update(np.vstack([self.cones, [[900, 900]]]))
+        self.assertEqual(self.clusterer.fit_predict.call_count, 2)
+
+        # Cones moved beyond the tolerance
+        self.tracker.update(np.vstack([self.cones + 50, [[900, 900]]]))
+        self.assertEqual(self.clusterer.fit_predict.call_count, 3)
+
+        # Too few cones forget the zones
+        self.assertEqual(self.tracker.update(self.cones[:2]), [])
+        self.tracker.update(self.cones)
+        self.assertEqual(self.clusterer.fit_predict.call_count, 4)
+
+        # Forced refresh
+        for _ in range(5):
+            self.tracker.update(self.cones)
+        self.assertEqual(self.clusterer.fit_predict.call_count, 4)
+        self.tracker.update(self.cones)
+        self.assertEqual(self.clusterer.fit_predict.call_count, 5)
+
+    def test_matches_one_to_one(self) -> None:
+        """
+        Test that two cones near one previous cone do not both match it,
+        and that a cluster left with fewer than three matched cones is
+        clustered again rather than keeping its old hull.
+        """
+        tracker = ZoneTracker(
+            clusterer=self.clusterer, tolerance=10, stability_threshold=0.8,
+        )
+        tracker.update(self.cones)
+        doubled = self.cones.copy()
+        doubled[6] = [561, 501]
+
+        nearest = tracker.match(doubled)
+        self.assertEqual(nearest.tolist(), [0, 1, 2, 3, 4, 5, -1])
+
+        polygons = tracker.update(doubled)
+        self.assertEqual(self.clusterer.fit_predict.call_count, 2)
+        expected = DangerDetector().polygons_from_cone_positions(doubled)
+        self.assertEqual(
+            [polygon.wkt for polygon in polygons],
+            [polygon.wkt for polygon in expected],
+        )
+
+    def test_danger_detector(self) -> None:
+        """
+        Test that the danger detector uses its zone tracker.
+        """
+        with patch('src.danger_detector.create_clusterer') as mock_create:
+            detector = DangerDetector(zone_tracker=self.tracker)
+        mock_create.assert_not_called()
+        self.assertIs(detector.clusterer, self.clusterer)
+        datas = [
+            [x - 5, y - 5, x + 5, y + 5, 0.9, 6] for x, y in self.cones
+        ]
+        datas.append([120, 110, 130, 140, 0.9, 5])
+        for _ in range(2):
+            warnings, polygons = detector.detect_danger(datas)
+            self.assertEqual(len(polygons), 2)
+            self.assertIn(
+                'Warning: 1 people have entered the controlled area!',
+                warnings,
+            )
+        self.assertEqual(self.tracker.get_metrics()['skipped'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()